@@ -0,0 +1 @@
+"""Migration tooling; `python -m scripts <command>` runs the dispatcher in __main__.py."""
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""One entry point for the migration tooling.
+
+Every script in this directory is still runnable on its own; this dispatcher
+puts them behind a handful of subcommands so the repair loop starts one
+interpreter with only the imports the step needs. Nothing beyond the standard
+library is imported here: `lint` and `split` load sql_lexer only, `split`
+loads sqlparse only when the statement sidecar is stale, and psycopg2 is
+imported only by the commands that talk to a database (`run`, `fanout`,
+`verify`, `daemon`, `cluster`).
+
+  split  FILE [--show A B]        cached sqlparse numbering (statement_index.py)
+  lint   [FILES...] [--json ...]  structural lint (sql_lint.py)
+  repair PASS [ARGS...]           one repair / rewrite pass; `repair --list` names them
+  run    --file F --host ...      execute a migration (run_sql.py)
+  fanout --file F --dsn A ...     execute on several databases at once (run_sql_fanout.py)
+  verify [--dsn ...]              snapshot and diff the live schema (verify_schema.py)
+  report NAME [ARGS...]           logs, indexes, fingerprints, benchmarks; `report --list`
+  daemon serve | lint | exec ...  warm server and its client (sql_daemon.py)
+  cluster run | up | clone ...    throwaway local Postgres with template clones (local_pg.py)
+
+Arguments after the subcommand (and after PASS / NAME) are passed to the
+script unchanged, so `python scripts lint X` behaves like
+`python scripts/sql_lint.py X`.
+
+Usage:
+  python scripts lint supabase/migrations
+  python -m scripts repair rewriter_advanced scripts/failing_statements_fixed.sql
+  python scripts report --list
+"""
+import importlib
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+
+# command -> (module, True when the module has a main() to call, description)
+COMMANDS = {
+    'split': ('statement_index', True, 'Build or query the cached statement split of a migration'),
+    'lint': ('sql_lint', True, 'Structural lint for SQL migration and PROPOSED FIX files'),
+    'run': ('run_sql', False, 'Run a SQL file against Postgres, one statement at a time'),
+    'fanout': ('run_sql_fanout', True, 'Apply a SQL file to several databases concurrently'),
+    'verify': ('verify_schema', True, 'Snapshot the live schema and diff it against the migrations'),
+    'daemon': ('sql_daemon', True, 'Warm server and thin client for lint / repair / execute of single blocks'),
+    'cluster': ('local_pg', True, 'Throwaway local Postgres with Supabase stubs and template clones'),
+}
+
+# report name -> module
+REPORTS = {
+    'blocks': 'block_index',
+    'bench': 'bench_sql_tools',
+    'corpus': 'gen_corpus',
+    'errors': 'extract_errors',
+    'fingerprint': 'schema_fingerprint',
+    'fix-log': 'parse_fix_log',
+    'manual-review': 'extract_manual_review',
+    'splitters': 'diff_splitters',
+    'suspects': 'find_suspect_patterns',
+}
+
+# scripts that rewrite SQL; the pass name is the module name without a leading `repair_`
+REPAIR_PREFIXES = (
+    'repair_', 'fix_', 'clean_', 'collapse_', 'dedupe_', 'flatten_', 'remove_', 'reassemble_', 'sanitize_',
+    'strip_', 'unwrap_', 'aggressive_', 'add_language_', 'auto_', 'manual_', 'make_idempotent', 'apply_manual_fixes',
+)
+NOT_REPAIRS = {'fix_and_rerun_failures'}
+
+
+def repair_passes():
+    """{pass name: module} for the repair scripts in this directory."""
+    passes = {}
+    for path in sorted(ROOT.glob('*.py')):
+        stem = path.stem
+        if stem.startswith(REPAIR_PREFIXES) and stem not in NOT_REPAIRS:
+            passes[stem[len('repair_'):] if stem.startswith('repair_') else stem] = stem
+    return passes
+
+
+def _run(module, has_main, argv):
+    """Run `module` with `argv` as if it had been started as `python scripts/<module>.py`."""
+    script = str(ROOT / f'{module}.py')
+    sys.argv = [script] + list(argv)
+    if has_main:
+        # imported under its own name, so worker processes can pickle its functions
+        importlib.import_module(module).main()
+    else:
+        import runpy
+        runpy.run_path(script, run_name='__main__')
+
+
+def _pick(kind, table, argv):
+    """(module, remaining argv) for `repair PASS ...` / `report NAME ...`, or exit with the listing."""
+    if not argv or argv[0] in ('-h', '--help', '--list'):
+        print(f"{kind} names:")
+        for name, module in table.items():
+            print(f"  {name:<40} {module}.py")
+        raise SystemExit(0 if argv else 2)
+    name = argv[0]
+    module = table.get(name) or (name if name in table.values() else None)
+    if module is None:
+        raise SystemExit(f"Unknown {kind} {name!r}; `{kind} --list` shows the choices")
+    return module, argv[1:]
+
+
+def usage():
+    lines = ['usage: python scripts <command> [args...]', '', 'commands:']
+    for name, (module, _, help) in COMMANDS.items():
+        lines.append(f"  {name:<8} {help} ({module}.py)")
+    lines.append(f"  {'repair':<8} Run one repair pass (`repair --list`)")
+    lines.append(f"  {'report':<8} Reports, indexes and benchmarks (`report --list`)")
+    lines.append('')
+    lines.append('Set SCRIPTS_TIMING=1 to print the dispatch and run time on stderr.')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    t0 = time.perf_counter()
+    if str(ROOT) not in sys.path:
+        # `python -m scripts` puts the repo root on sys.path; the scripts import each other flat
+        sys.path.insert(0, str(ROOT))
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        raise SystemExit(0 if argv else 2)
+    command, rest = argv[0], argv[1:]
+    if command in COMMANDS:
+        module, has_main, _ = COMMANDS[command]
+    elif command == 'repair':
+        module, rest = _pick('repair', repair_passes(), rest)
+        has_main = False
+    elif command == 'report':
+        module, rest = _pick('report', REPORTS, rest)
+        has_main = False
+    else:
+        raise SystemExit(f"Unknown command {command!r}\n\n{usage()}")
+    try:
+        _run(module, has_main, rest)
+    finally:
+        if os.environ.get('SCRIPTS_TIMING'):
+            print(f"[scripts {command}] {(time.perf_counter() - t0) * 1000:.1f} ms in {module}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
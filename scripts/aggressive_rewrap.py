@@ -9,6 +9,8 @@ Writes: `manual_review_fixes_aggressive.sql`
 import re
 from pathlib import Path
 
+from block_index import write_blocks
+
 ROOT = Path(__file__).resolve().parent
 IN = ROOT / 'manual_review_fixes.sql'
 OUT = ROOT / 'manual_review_fixes_aggressive.sql'
@@ -19,7 +21,7 @@ text = IN.read_text(encoding='utf-8')
 parts = re.split(r"(?m)^-- PROPOSED FIX: Reassembled function for failing statement (\d+)[^\n]*\n", text)
 if len(parts) <= 1:
     print('No PROPOSED FIX blocks found; writing original to aggressive output.')
-    OUT.write_text(text, encoding='utf-8')
+    write_blocks(OUT, text)
     raise SystemExit(0)
 
 head = parts[0]
@@ -69,5 +71,5 @@ for idx, block in entries:
         wrapped = f"DO $wrap$\nBEGIN\n{b}\nEND $wrap$ LANGUAGE plpgsql;\n"
     out_parts.append(f"-- PROPOSED FIX: Reassembled function for failing statement {idx}\n{wrapped}\n")
 
-OUT.write_text(''.join(out_parts), encoding='utf-8')
+write_blocks(OUT, ''.join(out_parts))
 print(f'Wrote {OUT} (aggressive rewrap of {len(entries)} blocks)')
@@ -1,14 +1,19 @@
 #!/usr/bin/env node
 const fs = require('fs');
 const path = require('path');
+const { spawnSync } = require('child_process');
 const fp = process.argv[2] || path.join('supabase','migrations','20251120_all_migrations_gap_fix.sql');
 if (!fs.existsSync(fp)) { console.error('File not found:', fp); process.exit(2); }
-const dir = path.dirname(fp);
-const base = path.basename(fp);
-const ts = new Date().toISOString().replace(/[:]/g,'-');
-const bak = path.join(dir, base + `.manualbatch.bak-${ts}.sql`);
-fs.copyFileSync(fp, bak);
-console.log('Backup created:', bak);
+// version the input in the scripts/backups store; full copy only if Python is unavailable
+const saved = spawnSync(process.env.PYTHON || 'python3', [path.join(__dirname, 'backup_store.py'), 'save', fp, '--label', 'apply_manual_batch'], { encoding: 'utf8' });
+if (saved.status === 0) {
+  console.log('Backup stored:', saved.stdout.trim());
+} else {
+  const ts = new Date().toISOString().replace(/[:]/g,'-');
+  const bak = path.join(path.dirname(fp), path.basename(fp) + `.manualbatch.bak-${ts}.sql`);
+  fs.copyFileSync(fp, bak);
+  console.log('Backup created:', bak);
+}
 let content = fs.readFileSync(fp, 'utf8');
 const changes = [];
 function replaceAllExact(searchRegex, replaceStr, description) {
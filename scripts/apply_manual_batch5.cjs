@@ -1,17 +1,23 @@
 #!/usr/bin/env node
 const fs = require('fs');
 const path = require('path');
+const { spawnSync } = require('child_process');
 const fp = process.argv[2] || path.join(__dirname, '..', 'supabase', 'migrations', '20251120_all_migrations_gap_fix.sql');
 if (!fs.existsSync(fp)) {
   console.error('File not found:', fp);
   process.exit(2);
 }
-const backupDir = path.dirname(fp);
-const ts = new Date().toISOString().replace(/[:.]/g, '-');
-const backupPath = path.join(backupDir, `20251120_all_migrations_gap_fix.sql.batch5.bak-${ts}`);
 const original = fs.readFileSync(fp, 'utf8');
-fs.writeFileSync(backupPath, original, 'utf8');
-console.log('Backup created:', backupPath);
+// version the input in the scripts/backups store; full copy only if Python is unavailable
+const saved = spawnSync(process.env.PYTHON || 'python3', [path.join(__dirname, 'backup_store.py'), 'save', fp, '--label', 'apply_manual_batch5'], { encoding: 'utf8' });
+if (saved.status === 0) {
+  console.log('Backup stored:', saved.stdout.trim());
+} else {
+  const ts = new Date().toISOString().replace(/[:.]/g, '-');
+  const backupPath = path.join(path.dirname(fp), `20251120_all_migrations_gap_fix.sql.batch5.bak-${ts}`);
+  fs.writeFileSync(backupPath, original, 'utf8');
+  console.log('Backup created:', backupPath);
+}
 let modified = original;
 let totalReplacements = 0;
 function applyRegex(re, replaceStr) {
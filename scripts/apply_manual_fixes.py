@@ -12,6 +12,7 @@ confirming you want these fixes applied.
 """
 import argparse
 import re
+import time
 from pathlib import Path
 from datetime import datetime
 
@@ -21,6 +22,9 @@ except Exception:
     print("Missing dependency: install psycopg2-binary in your venv (pip install psycopg2-binary)")
     raise
 
+from block_index import BlockIndex
+from metrics_export import add_metrics_args, metrics_from_args
+
 ROOT = Path(__file__).resolve().parent
 INFILE = ROOT.joinpath('manual_review_fixes.sql')
 LOGFILE = ROOT.joinpath('fix_rerun_log.txt')
@@ -34,6 +38,7 @@ parser.add_argument('--dbname', required=True)
 parser.add_argument('--connect-timeout', type=int, default=10, help='TCP connect timeout in seconds')
 parser.add_argument('--statement-timeout', type=int, default=30000, help='Per-statement timeout in milliseconds (SET statement_timeout)')
 parser.add_argument('--limit', type=int, default=0, help='Limit number of blocks to apply (0 = all)')
+add_metrics_args(parser)
 args = parser.parse_args()
 
 # Safety: avoid accidental use of the generic `postgres` superuser when a
@@ -45,15 +50,8 @@ if user_lower == 'postgres':
     print("ERROR: Refusing to run with username 'postgres'. Please supply the pooler-mode username (e.g. 'postgres.<id>').")
     raise SystemExit(2)
 
-text = INFILE.read_text(encoding='utf-8')
-# Split into blocks starting with -- PROPOSED FIX
-parts = re.split(r"(?m)^-- PROPOSED FIX: Reassembled function for failing statement (\d+)[^\n]*\n", text)
-# The split will produce: ['', idx1, block1, idx2, block2, ...]
-entries = []
-for i in range(1, len(parts), 2):
-    idx = parts[i]
-    block = parts[i+1].strip()
-    entries.append((int(idx), block))
+# Blocks starting with -- PROPOSED FIX, located via the sidecar index
+entries = [(idx, block.strip()) for idx, block in BlockIndex.load(INFILE).entries()]
 
 if not entries:
     print('No PROPOSED FIX blocks found in', INFILE)
@@ -62,6 +60,9 @@ if not entries:
 if args.limit > 0:
     entries = entries[:args.limit]
 
+metrics = metrics_from_args(args, script='apply_manual_fixes', target=f"{args.host}:{args.port}/{args.dbname}")
+connect = metrics.wrap_connect(psycopg2.connect) if metrics else psycopg2.connect
+
 conn = None
 with open(LOGFILE, 'a', encoding='utf-8') as logf:
     logf.write(f"Run started: {datetime.utcnow().isoformat()}Z\n")
@@ -99,8 +100,9 @@ with open(LOGFILE, 'a', encoding='utf-8') as logf:
             exec_block = f"DO $wrap$\nBEGIN\n{block}\nEND\n$wrap$;"
             logf.write("Wrapped block in DO $wrap$ BEGIN/END to allow PL/pgSQL IF parsing.\n")
 
+        t0 = time.perf_counter()
         try:
-            conn = psycopg2.connect(
+            conn = connect(
                 host=args.host,
                 port=args.port,
                 user=args.user,
@@ -118,6 +120,8 @@ with open(LOGFILE, 'a', encoding='utf-8') as logf:
                 pass
             cur.execute(exec_block)
             logf.write("RESULT: SUCCESS\n\n")
+            if metrics:
+                metrics.observe_statement('executed', time.perf_counter() - t0)
             try:
                 cur.close()
             except Exception:
@@ -129,6 +133,9 @@ with open(LOGFILE, 'a', encoding='utf-8') as logf:
         except Exception as exc:
             err = str(exc).replace('\n', ' | ')
             logf.write(f"RESULT: ERROR | {err}\n\n")
+            if metrics:
+                # errors are logged and the run continues, so they count as tolerated
+                metrics.observe_statement('tolerated', time.perf_counter() - t0)
             # Close connection if open
             try:
                 if conn:
@@ -138,4 +145,7 @@ with open(LOGFILE, 'a', encoding='utf-8') as logf:
 
     logf.write(f"Run finished: {datetime.utcnow().isoformat()}Z\n")
 
+if metrics:
+    metrics.close(completed=True, linger=args.metrics_linger)
+
 print(f"Execution finished. See {LOGFILE} for details.")
@@ -3,7 +3,7 @@
 Conservative auto-fixer for top N failing attempted_fix blocks.
 - Reads `scripts/migration_errors.txt` to extract failing IDs (or accept --ids).
 - Reads `scripts/manual_review_fixes.sql`, replaces the block contents for each ID with repaired content.
-- Writes `scripts/manual_review_fixes_fixed_top<N>.sql` and backs up original `scripts/manual_review_fixes.sql.bak`.
+- Writes `scripts/manual_review_fixes_fixed_top<N>.sql` and backs up the original `scripts/manual_review_fixes.sql` to scripts/backups.
 - Conservative fixes implemented:
   - `IF IFT EXISTS` -> `IF NOT EXISTS`
   - Convert `CREATE TYPE IF NOT EXISTS name AS ENUM (...)` into guarded DO $$ BEGIN IF NOT EXISTS(...) THEN EXECUTE 'CREATE TYPE ...'; END IF; END $$;
@@ -19,6 +19,9 @@ import argparse
 import os
 from pathlib import Path
 
+from block_index import write_blocks
+from backup_store import save as backup
+
 ROOT = Path(__file__).resolve().parent
 MIG_ERRORS = ROOT / 'migration_errors.txt'
 MANUAL_IN = ROOT / 'manual_review_fixes.sql'
@@ -213,26 +216,21 @@ def main():
     print('IDs to attempt fix for:', ids)
 
     # Backup manual file
-    bak = MANUAL_IN.with_suffix(MANUAL_IN.suffix + '.bak')
     if MANUAL_IN.exists():
-        if not bak.exists():
-            bak.write_text(MANUAL_IN.read_text(encoding='utf-8', errors='ignore'), encoding='utf-8')
-            print(f'Backed up {MANUAL_IN} -> {bak}')
-        else:
-            print(f'Backup already exists: {bak}')
+        print(f'Backed up {MANUAL_IN} as version {backup(MANUAL_IN, label="auto_fix_top_n")[:12]}')
 
     out, changed = parse_manual_file_and_replace(ids)
     if out is None:
         print('No changes made.')
         return
     out_path = ROOT / f'manual_review_fixes_fixed_top{len(ids)}.sql'
-    out_path.write_text(out, encoding='utf-8')
+    write_blocks(out_path, out)
     print(f'Wrote fixed file: {out_path}')
 
     # Overwrite the executor input as a cautious opt-in
     confirm = input(f'Overwrite {MANUAL_IN} with fixed file? (y/N): ').strip().lower()
     if confirm == 'y':
-        MANUAL_IN.write_text(out, encoding='utf-8')
+        write_blocks(MANUAL_IN, out)
         print(f'Overwrote {MANUAL_IN} with fixed content. Changed blocks: {changed}')
     else:
         print('Did not overwrite manual input. You can inspect the fixed file and copy it manually.')
@@ -9,6 +9,8 @@ import re
 import argparse
 from pathlib import Path
 
+from block_index import write_blocks
+
 ROOT = Path(__file__).resolve().parent
 MIG_ERRORS = ROOT / 'migration_errors.txt'
 MANUAL_IN = ROOT / 'manual_review_fixes.sql'
@@ -92,11 +94,11 @@ def main():
         return
     out, changed = result
     out_path = ROOT / f'manual_review_fixes_fixed_safe_top{len(ids)}.sql'
-    out_path.write_text(out, encoding='utf-8')
+    write_blocks(out_path, out)
     print(f'Wrote fixed file: {out_path}')
     confirm = input(f'Overwrite {MANUAL_IN} with fixed file? (y/N): ').strip().lower()
     if confirm == 'y':
-        MANUAL_IN.write_text(out, encoding='utf-8')
+        write_blocks(MANUAL_IN, out)
         print(f'Overwrote {MANUAL_IN}. Changed blocks: {changed}')
     else:
         print('Did not overwrite manual input. Inspect the fixed file before applying.')
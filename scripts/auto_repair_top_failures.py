@@ -19,6 +19,9 @@ import argparse
 from pathlib import Path
 from collections import Counter
 
+from block_index import write_blocks
+from backup_store import save as backup
+
 ROOT = Path(__file__).resolve().parent
 MANUAL = ROOT / 'manual_review_fixes.sql'
 ERRS = ROOT / 'migration_errors.txt'
@@ -119,9 +122,8 @@ def replace_blocks_in_manual(ids):
             out.append(f"-- PROPOSED FIX: Reassembled function for failing statement {bid}\n")
             out.append(block)
     # backup original
-    bak = MANUAL.parent.joinpath(MANUAL.name + '.auto_repair.bak')
-    MANUAL.replace(bak)
-    MANUAL.write_text(''.join(out), encoding='utf-8')
+    backup(MANUAL, label='auto_repair_top_failures')
+    write_blocks(MANUAL, ''.join(out))
     return replaced
 
 def main():
@@ -134,7 +136,7 @@ def main():
         return
     print('Top ids:', ids)
     replaced = replace_blocks_in_manual(ids)
-    print(f'Replaced {replaced} blocks in {MANUAL} (backup at {MANUAL}.auto_repair.bak)')
+    print(f'Replaced {replaced} blocks in {MANUAL} (previous version in scripts/backups)')
 
 if __name__ == '__main__':
     main()
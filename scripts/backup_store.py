@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""Content-addressed, delta-compressed store for backups and intermediate SQL files.
+
+Replaces the full timestamped copies the fixers used to drop next to their
+inputs (`*.bak`, `*.bak-<timestamp>`, `attempted_fix_*`, `manual_review_fixes_*`
+variants). Layout under `scripts/backups/`:
+
+    objects/ab/cdef...   one object per distinct content (SHA-256 of the bytes)
+    index.jsonl          append-only: one line per saved version (path, sha, time, label)
+    heads.json           latest sha per path (the base for the next delta)
+
+An object is stored as a line delta against the previous version of the same
+file (copy ranges plus inserted lines), compressed with zstd when the
+`zstandard` module is installed and zlib otherwise. Every MAX_CHAIN versions a
+full compressed copy is written instead, so restoring never walks more than
+MAX_CHAIN objects. Saving identical content again only adds an index line.
+Saving costs one delta against the previous version and an index append, no
+matter how many versions exist.
+
+Usage:
+  python scripts/backup_store.py save scripts/manual_review_fixes.sql --label before-tidy
+  python scripts/backup_store.py list [PATH]
+  python scripts/backup_store.py restore 3f2a9c [--to out.sql]   # by sha prefix; default: original path
+  python scripts/backup_store.py import --delete                   # ingest leftover .bak/attempted_fix_* copies
+  python scripts/backup_store.py stats
+"""
+import argparse
+import difflib
+import hashlib
+import json
+import os
+import re
+import struct
+import time
+import zlib
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+ROOT = Path(__file__).resolve().parent
+REPO = ROOT.parent
+STORE = ROOT / 'backups'
+MAX_CHAIN = 16
+MAGIC = b'SQLSTORE1\n'
+
+# Leftovers `import` picks up. Backup copies and per-block scratch files are removed
+# by `import --delete`; manual_review_fixes_*.sql variants are pipeline inputs and stay.
+BACKUP_GLOBS = ('scripts/*.bak*', 'scripts/attempted_fix_*.sql*', 'scripts/backups/*.sql',
+                'supabase/migrations/*.bak*')
+VARIANT_GLOBS = ('scripts/manual_review_fixes_*.sql',)
+SQL_COPY_RE = re.compile(r'^(.+?\.sql)\.')                       # x.sql.bak2, x.sql.batch5.bak-<ts>
+BACKUP_STAMP_RE = re.compile(r'_\d{4}-\d{2}-\d{2}T[\d-]+(?=\.sql$)')  # backups/x_2025-11-23T01-50-42.sql
+
+
+# -- codecs ----------------------------------------------------------------
+
+def _compress(data):
+    if zstandard is not None:
+        return 'zstd', zstandard.ZstdCompressor(level=10).compress(data)
+    return 'zlib', zlib.compress(data, 9)
+
+
+def _decompress(codec, data):
+    if codec == 'zlib':
+        return zlib.decompress(data)
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError('object is zstd-compressed; install the zstandard package to read it')
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise ValueError(f'unknown codec {codec!r}')
+
+
+def make_delta(old, new):
+    """Binary line delta turning `old` into `new`: C<start><count> copies old lines, I<len><bytes> inserts."""
+    a = old.splitlines(keepends=True)
+    b = new.splitlines(keepends=True)
+    out = []
+    for op, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b).get_opcodes():
+        if op == 'equal':
+            out.append(b'C' + struct.pack('>II', i1, i2 - i1))
+        elif j2 > j1:
+            chunk = b''.join(b[j1:j2])
+            out.append(b'I' + struct.pack('>I', len(chunk)) + chunk)
+    return b''.join(out)
+
+
+def apply_delta(old, delta):
+    a = old.splitlines(keepends=True)
+    out, pos = [], 0
+    while pos < len(delta):
+        op = delta[pos:pos + 1]
+        if op == b'C':
+            start, count = struct.unpack_from('>II', delta, pos + 1)
+            out.extend(a[start:start + count])
+            pos += 9
+        elif op == b'I':
+            (size,) = struct.unpack_from('>I', delta, pos + 1)
+            out.append(delta[pos + 5:pos + 5 + size])
+            pos += 5 + size
+        else:
+            raise ValueError(f'corrupt delta at byte {pos}')
+    return b''.join(out)
+
+
+# -- store -------------------------------------------------------------------
+
+def _atomic_write(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + f'.tmp{os.getpid()}')
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _logical_path(path):
+    """Repo-relative path used as the version-history key."""
+    path = Path(path).resolve()
+    try:
+        return path.relative_to(REPO).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+class BackupStore:
+    def __init__(self, root=STORE):
+        self.root = Path(root)
+        self.objects = self.root / 'objects'
+        self.index_path = self.root / 'index.jsonl'
+        self.heads_path = self.root / 'heads.json'
+
+    # -- objects ---------------------------------------------------------
+
+    def _object_path(self, sha):
+        return self.objects / sha[:2] / sha[2:]
+
+    def _read_object(self, sha):
+        raw = self._object_path(sha).read_bytes()
+        if not raw.startswith(MAGIC):
+            raise ValueError(f'{sha[:12]}: not a store object')
+        end = raw.index(b'\n', len(MAGIC))
+        header = json.loads(raw[len(MAGIC):end])
+        return header, _decompress(header['codec'], raw[end + 1:])
+
+    def _write_object(self, sha, header, payload):
+        _atomic_write(self._object_path(sha), MAGIC + json.dumps(header, sort_keys=True).encode() + b'\n' + payload)
+
+    def has(self, sha):
+        return self._object_path(sha).exists()
+
+    def content(self, sha):
+        """Reconstruct the bytes of object `sha` (walks at most MAX_CHAIN deltas)."""
+        chain = []
+        while True:
+            header, data = self._read_object(sha)
+            if header['base'] is None:
+                break
+            chain.append(data)
+            sha = header['base']
+        for delta in reversed(chain):
+            data = apply_delta(data, delta)
+        return data
+
+    def put(self, data, base=None):
+        """Store `data` (as a delta against object `base` when that pays off); returns its sha."""
+        sha = hashlib.sha256(data).hexdigest()
+        if self.has(sha):
+            return sha
+        codec, full = _compress(data)
+        header = {'codec': codec, 'base': None, 'depth': 0, 'size': len(data)}
+        payload = full
+        if base is not None and self.has(base):
+            base_header, _ = self._read_object(base)
+            if base_header['depth'] + 1 < MAX_CHAIN:
+                codec, delta = _compress(make_delta(self.content(base), data))
+                if len(delta) < len(full):
+                    header = {'codec': codec, 'base': base, 'depth': base_header['depth'] + 1, 'size': len(data)}
+                    payload = delta
+        self._write_object(sha, header, payload)
+        return sha
+
+    # -- versions --------------------------------------------------------
+
+    def heads(self):
+        if not self.heads_path.exists():
+            return {}
+        return json.loads(self.heads_path.read_text(encoding='utf-8'))
+
+    def save(self, path, label=None, data=None, logical=None):
+        """Record the current content of `path` (or `data`) as a new version; returns the sha."""
+        key = logical or _logical_path(path)
+        if data is None:
+            data = Path(path).read_bytes()
+        heads = self.heads()
+        sha = self.put(data, base=heads.get(key))
+        entry = {'path': key, 'sha': sha, 'size': len(data), 'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                 'label': label}
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self.index_path.open('a', encoding='utf-8') as fh:
+            fh.write(json.dumps(entry, sort_keys=True) + '\n')
+        heads[key] = sha
+        _atomic_write(self.heads_path, json.dumps(heads, indent=1, sort_keys=True).encode('utf-8'))
+        return sha
+
+    def versions(self, path=None):
+        if not self.index_path.exists():
+            return []
+        key = _logical_path(path) if path else None
+        out = []
+        with self.index_path.open(encoding='utf-8') as fh:
+            for line in fh:
+                entry = json.loads(line)
+                if key is None or entry['path'] == key:
+                    out.append(entry)
+        return out
+
+    def resolve(self, prefix):
+        """Full sha for a unique prefix of a stored version."""
+        shas = {e['sha'] for e in self.versions() if e['sha'].startswith(prefix)}
+        if not shas:
+            raise KeyError(f'no stored version matches {prefix!r}')
+        if len(shas) > 1:
+            raise KeyError(f'{prefix!r} is ambiguous ({len(shas)} versions)')
+        return shas.pop()
+
+    def restore(self, prefix, to=None):
+        """Write a stored version back (to its original path unless `to` is given); returns the path."""
+        sha = self.resolve(prefix)
+        entry = next(e for e in reversed(self.versions()) if e['sha'] == sha)
+        target = Path(to) if to else REPO / entry['path']
+        _atomic_write(target, self.content(sha))
+        return target
+
+    def stats(self):
+        versions = self.versions()
+        stored = sum(p.stat().st_size for p in self.objects.rglob('*') if p.is_file()) if self.objects.exists() else 0
+        objects = sum(1 for p in self.objects.rglob('*') if p.is_file()) if self.objects.exists() else 0
+        return {'versions': len(versions), 'paths': len({e['path'] for e in versions}), 'objects': objects,
+                'raw_bytes': sum(e['size'] for e in versions), 'stored_bytes': stored}
+
+
+def save(path, label=None):
+    """Back up `path` into the default store (no-op when the file does not exist); returns the sha."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    return BackupStore().save(path, label=label)
+
+
+# -- leftovers -----------------------------------------------------------------
+
+def original_name(path):
+    """The file a leftover copy was taken from: x.sql.bak2 -> x.sql, x_2025-11-23T01-50-42.sql -> x.sql."""
+    m = SQL_COPY_RE.match(path.name)
+    name = BACKUP_STAMP_RE.sub('', m.group(1) if m else path.name)
+    parent = path.parent.parent if path.parent.name == 'backups' else path.parent
+    return parent / name
+
+
+def leftovers(patterns):
+    found = set()
+    for pattern in patterns:
+        found.update(p for p in REPO.glob(pattern) if p.is_file())
+    return sorted(found, key=lambda p: (p.stat().st_mtime, p.name))
+
+
+def main():
+    p = argparse.ArgumentParser(description='Content-addressed backup store')
+    sub = p.add_subparsers(dest='cmd', required=True)
+    s = sub.add_parser('save', help='Store the current content of files')
+    s.add_argument('paths', nargs='+')
+    s.add_argument('--label')
+    s = sub.add_parser('list', help='List stored versions')
+    s.add_argument('path', nargs='?')
+    s = sub.add_parser('restore', help='Write a stored version back')
+    s.add_argument('sha', help='Version sha or unique prefix')
+    s.add_argument('--to', help='Write here instead of the original path')
+    s = sub.add_parser('import', help='Store leftover .bak / attempted_fix_* / manual_review_fixes_* files')
+    s.add_argument('--delete', action='store_true', help='Remove each leftover once stored')
+    sub.add_parser('stats', help='Show store size')
+    args = p.parse_args()
+
+    store = BackupStore()
+    if args.cmd == 'save':
+        for path in args.paths:
+            t0 = time.perf_counter()
+            sha = store.save(path, label=args.label)
+            print(f"{sha[:12]}  {_logical_path(path)}  ({(time.perf_counter() - t0) * 1000:.1f} ms)")
+    elif args.cmd == 'list':
+        for e in store.versions(args.path):
+            print(f"{e['sha'][:12]}  {e['time']}  {e['size']:>9}  {e['path']}" + (f"  [{e['label']}]" if e['label'] else ''))
+    elif args.cmd == 'restore':
+        try:
+            print('Restored', store.restore(args.sha, args.to))
+        except KeyError as exc:
+            print(exc.args[0])
+            raise SystemExit(1)
+    elif args.cmd == 'import':
+        backups = leftovers(BACKUP_GLOBS)
+        files = backups + leftovers(VARIANT_GLOBS)
+        for path in files:
+            sha = store.save(path, label=f'import:{path.name}', logical=_logical_path(original_name(path)))
+            print(f"{sha[:12]}  {path.relative_to(REPO)} -> {_logical_path(original_name(path))}")
+        if args.delete:
+            for path in backups:
+                path.unlink()
+        print(f"Imported {len(files)} files" + (f' ({len(backups)} backup copies deleted)' if args.delete else ''))
+    elif args.cmd == 'stats':
+        st = store.stats()
+        ratio = st['stored_bytes'] / st['raw_bytes'] if st['raw_bytes'] else 0
+        print(f"{st['versions']} versions of {st['paths']} files in {st['objects']} objects: "
+              f"{st['raw_bytes']} bytes raw, {st['stored_bytes']} stored ({ratio:.1%})")
+
+
+if __name__ == '__main__':
+    main()
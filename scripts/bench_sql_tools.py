@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""Throughput benchmark for the SQL tooling in scripts/.
+
+Runs each target over a synthetic corpus (gen_corpus.py) or a real file and
+reports MB/s and items/s (statements for whole-text targets, blocks for the
+PROPOSED FIX block passes, definitions for the guard generators):
+
+- split / lex:  sql_lexer.split_statements, sql_lexer.tokenize, sqlparse.split
+- lint / model: sql_lint.lint_text, SchemaModel.apply_sql
+- repair:       whole-file passes (fix_all_function_delimiters, repair_structural_sql, ...)
+- block:        per-block passes (repair_rewriter_advanced.process_block,
+                sanitize_and_rewrap.sanitize_block, repair_plpgsql_parser_v4.rebalance_block, ...)
+                over the same corpus written as a PROPOSED FIX file
+- guard:        the enum / index guard generators, once per CREATE TYPE ... AS ENUM
+                or CREATE INDEX in the corpus
+
+Each target runs --repeat times and the fastest run is reported. Targets whose
+module cannot be imported (sqlparse not installed) are skipped. Results can be
+saved as the baseline for the corpus (scripts/bench_baselines.json, keyed by
+corpus) and later runs print the change against it.
+
+--memprofile runs every target once more under tracemalloc (separately from
+the timed runs) and reports, relative to the traced memory before the pass:
+- peak:     the high-water mark while the pass ran (whole file + working copies)
+- retained: what is still allocated when it returns, its output included
+- leaked:   what is still allocated after the output is dropped (caches, globals)
+- the top allocation sites (file:line) of the retained memory
+The numbers are stored with the timings, so --save / baseline comparison works
+for memory as well.
+
+Usage:
+  python scripts/bench_sql_tools.py                                 # 10k-statement corpus, all targets
+  python scripts/bench_sql_tools.py --statements 100000 --only 'split.*' 'lex.*'
+  python scripts/bench_sql_tools.py --corpus migrations --save      # numbered migrations as one text
+  python scripts/bench_sql_tools.py --fail-on-regression 0.25       # exit 1 if any target is >25% slower
+  python scripts/bench_sql_tools.py --only 'block.*' --repeat 1 --memprofile --top 5
+"""
+import argparse
+import contextlib
+import fnmatch
+import gc
+import importlib
+import io
+import json
+import platform
+import re
+import subprocess
+import time
+import tracemalloc
+from pathlib import Path
+
+from block_index import scan
+from gen_corpus import generate
+from sql_lexer import split_statements
+
+ROOT = Path(__file__).resolve().parent
+BASELINES = ROOT / 'bench_baselines.json'
+
+ENUM_RE = re.compile(r'CREATE\s+TYPE\s+([\w."]+)\s+AS\s+ENUM\s*\(([^)]*)\)', re.I)
+INDEX_RE = re.compile(r'CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:IF\s+NOT\s+EXISTS\s+)?([\w."]+)', re.I)
+
+
+def _consume(it):
+    for _ in it:
+        pass
+
+
+def _model(text):
+    from schema_model import SchemaModel
+    SchemaModel().apply_sql(text, '<bench>')
+
+
+def _labels(body):
+    return re.findall(r"'((?:[^']|'')*)'", body)
+
+
+# name -> (input kind, 'module:attr' or callable, adapter)
+# The adapter turns the target function into a callable over the prepared input.
+TARGETS = {
+    'split.sql_lexer': ('text', 'sql_lexer:split_statements', None),
+    'split.sqlparse': ('text', 'sqlparse:split', None),
+    'lex.sql_lexer': ('text', 'sql_lexer:tokenize', lambda fn: lambda text: _consume(fn(text))),
+    'lint.sql_lint': ('text', 'sql_lint:lint_text', None),
+    'model.schema_model': ('text', _model, None),
+    'repair.fix_all_function_delimiters': ('text', 'fix_all_function_delimiters:fix_all_function_delimiters', None),
+    'repair.fix_function_delimiters': ('text', 'fix_function_delimiters:fix_function_delimiters', None),
+    'repair.fix_nested_execute_do': ('text', 'fix_nested_execute_do:fix_nested_execute_do', None),
+    'repair.fix_do_and_create_type': ('text', 'fix_do_and_create_type:fix_do_and_create_type', None),
+    'repair.unwrap_ddl_blocks': ('text', 'unwrap_ddl_blocks:unwrap_ddl_blocks', None),
+    'repair.repair_structural_sql': ('text', 'repair_structural_sql:repair', None),
+    'block.repair_rewriter_advanced': ('block', 'repair_rewriter_advanced:process_block', None),
+    'block.repair_rewriter_parser': ('block', 'repair_rewriter_parser:process_block_text', None),
+    'block.repair_plpgsql_parser_v3': ('block', 'repair_plpgsql_parser_v3:process_block', None),
+    'block.repair_plpgsql_parser_v4': ('block', 'repair_plpgsql_parser_v4:rebalance_block', None),
+    'block.sanitize_and_rewrap': ('block', 'sanitize_and_rewrap:sanitize_block', None),
+    'block.reassemble_dollar_bodies': ('block', 'reassemble_dollar_bodies:process_block', None),
+    'guard.dedupe_enums': ('enum', 'dedupe_enums:guarded_block',
+                           lambda fn: lambda name, body: fn(name, _labels(body))),
+    'guard.fix_create_type_blocks': ('enum', 'fix_create_type_blocks:guarded_do_block',
+                                     lambda fn: lambda name, body: fn(name, _labels(body))),
+    'guard.sanitize_and_rewrap.type': ('enum', 'sanitize_and_rewrap:make_create_type_guard', None),
+    'guard.repair_rewriter_advanced.type': ('enum', 'repair_rewriter_advanced:make_type_guard', None),
+    'guard.sanitize_and_rewrap.index': ('index', 'sanitize_and_rewrap:make_create_index_guard', None),
+    'guard.repair_rewriter_advanced.index': ('index', 'repair_rewriter_advanced:make_index_guard', None),
+}
+
+
+class Workload:
+    """The prepared inputs for every target kind, built once per corpus."""
+
+    def __init__(self, label, text, fix_text):
+        self.label = label
+        self.text = text
+        self.statements = split_statements(text)
+        data = fix_text.encode('utf-8')
+        self.blocks = [data[b.start:b.end].decode('utf-8') for b in scan(data)]
+        self.enums = [(m.group(1), m.group(2)) for m in ENUM_RE.finditer(text)]
+        self.indexes = []
+        for stmt in self.statements:
+            sig = stmt.significant
+            if sig and sig[0].is_word('CREATE'):
+                m = INDEX_RE.match(stmt.text, stmt.significant[0].start - stmt.start)
+                if m:
+                    self.indexes.append((m.group(1), stmt.text))
+
+    def size(self, kind):
+        """(bytes, items) processed by one run of a target of this kind."""
+        if kind == 'text':
+            return len(self.text.encode('utf-8')), len(self.statements)
+        if kind == 'block':
+            return sum(len(b.encode('utf-8')) for b in self.blocks), len(self.blocks)
+        items = self.enums if kind == 'enum' else self.indexes
+        return sum(len(a) + len(b) for a, b in items), len(items)
+
+    def runner(self, kind, fn):
+        """A zero-argument callable doing one full pass of `fn` over this workload."""
+        if kind == 'text':
+            return lambda: fn(self.text)
+        if kind == 'block':
+            return lambda: [fn(b) for b in self.blocks]
+        items = self.enums if kind == 'enum' else self.indexes
+        return lambda: [fn(a, b) for a, b in items]
+
+
+def corpus(args):
+    """(label, text, fix-file text) for the requested corpus."""
+    if args.corpus == 'migrations':
+        from schema_model import MIGRATIONS_DIR, migration_files
+        text = ''.join(p.read_text(encoding='utf-8') + '\n' for p in migration_files(MIGRATIONS_DIR))
+        fix = ''.join(f"-- PROPOSED FIX: Reassembled function for failing statement {s.index + 1}\n{s.text}\n\n"
+                      for s in split_statements(text))
+        return 'migrations', text, fix
+    if args.corpus:
+        text = Path(args.corpus).read_text(encoding='utf-8')
+        return f'file:{Path(args.corpus).name}', text, text
+    return (f'synthetic:{args.statements}:seed{args.seed}',
+            ''.join(generate(args.statements, args.seed)),
+            ''.join(generate(args.statements, args.seed, fix_file=True)))
+
+
+def resolve(spec):
+    """The target function, or None when its module cannot be imported."""
+    kind, target, adapt = spec
+    if callable(target):
+        fn = target
+    else:
+        module, attr = target.split(':')
+        try:
+            fn = getattr(importlib.import_module(module), attr)
+        except ImportError:
+            return None
+    return adapt(fn) if adapt else fn
+
+
+@contextlib.contextmanager
+def _quiet():
+    # some passes print progress (fix_all_function_delimiters logs to stderr); keep it out of the report
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        yield
+
+
+def run_target(workload, name, repeat):
+    """Time one target; returns its result row, or None if it was skipped."""
+    kind = TARGETS[name][0]
+    fn = resolve(TARGETS[name])
+    if fn is None:
+        return None
+    nbytes, items = workload.size(kind)
+    run = workload.runner(kind, fn)
+    best = None
+    for _ in range(repeat):
+        with _quiet():
+            t0 = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    best = max(best, 1e-9)
+    return {'kind': kind, 'seconds': round(best, 6), 'bytes': nbytes, 'items': items,
+            'mb_s': round(nbytes / 1e6 / best, 3), 'items_s': round(items / best, 1)}
+
+
+def _site(stat):
+    frame = stat.traceback[0]
+    path = Path(frame.filename)
+    where = path.name if path.parent == ROOT else f"{path.parent.name}/{path.name}"
+    return f"{where}:{frame.lineno}"
+
+
+def memprofile_target(workload, name, top):
+    """One traced run of a target; returns peak / retained / leaked bytes and the top retained sites."""
+    kind = TARGETS[name][0]
+    run = workload.runner(kind, resolve(TARGETS[name]))
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        base = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        with _quiet():
+            result = run()
+        current, peak = tracemalloc.get_traced_memory()
+        held = tracemalloc.take_snapshot()
+        del result
+        gc.collect()
+        leaked = tracemalloc.get_traced_memory()[0] - base
+    finally:
+        tracemalloc.stop()
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    stats = held.filter_traces(ignore).compare_to(before.filter_traces(ignore), 'lineno')
+    sites = [{'site': _site(s), 'bytes': s.size_diff, 'blocks': s.count_diff}
+             for s in stats if s.size_diff > 0][:top]
+    return {'peak_bytes': peak - base, 'retained_bytes': current - base, 'leaked_bytes': leaked, 'top': sites}
+
+
+def select(patterns):
+    if not patterns:
+        return list(TARGETS)
+    return [n for n in TARGETS if any(fnmatch.fnmatch(n, p) for p in patterns)]
+
+
+def _commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def load_baselines():
+    try:
+        return json.loads(BASELINES.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def main():
+    p = argparse.ArgumentParser(description='Benchmark the SQL tooling on a synthetic or real corpus')
+    p.add_argument('--statements', type=int, default=10000, help='Synthetic corpus size (default 10000)')
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('--corpus', help="A SQL file to benchmark instead, or 'migrations' for the numbered migrations")
+    p.add_argument('--only', nargs='+', metavar='GLOB', help="Targets to run, e.g. 'split.*' 'block.*'")
+    p.add_argument('--repeat', type=int, default=3, help='Runs per target; the fastest counts (default 3)')
+    p.add_argument('--save', action='store_true', help=f'Store the results as the baseline for this corpus in {BASELINES.name}')
+    p.add_argument('--fail-on-regression', type=float, metavar='FRACTION',
+                   help='Exit 1 if a target is slower than its baseline by more than FRACTION (e.g. 0.25)')
+    p.add_argument('--json', help='Also write the results to this JSON file')
+    p.add_argument('--memprofile', action='store_true', help='Also profile memory per target with tracemalloc')
+    p.add_argument('--top', type=int, default=3, help='Allocation sites to list per target with --memprofile')
+    p.add_argument('--list', action='store_true', help='List the targets and exit')
+    args = p.parse_args()
+
+    if args.list:
+        for name, (kind, _, _) in TARGETS.items():
+            print(f"  {name:<40} {kind}")
+        return
+    names = select(args.only)
+    if not names:
+        raise SystemExit(f"No targets match {args.only}; see --list")
+
+    t0 = time.perf_counter()
+    label, text, fix = corpus(args)
+    workload = Workload(label, text, fix)
+    print(f"Corpus {label}: {len(text.encode('utf-8')) / 1e6:.2f} MB, {len(workload.statements)} statements, "
+          f"{len(workload.blocks)} blocks, {len(workload.enums)} enums, {len(workload.indexes)} indexes "
+          f"(prepared in {time.perf_counter() - t0:.2f}s)")
+
+    baselines = load_baselines()
+    base = baselines.get(label, {}).get('results', {})
+    results, regressions = {}, []
+    print(f"  {'target':<40} {'seconds':>9} {'MB/s':>9} {'items/s':>11}  vs baseline")
+    for name in names:
+        row = run_target(workload, name, args.repeat)
+        if row is None:
+            print(f"  {name:<40} skipped (module not importable)")
+            continue
+        results[name] = row
+        change = ''
+        if name in base:
+            ratio = row['seconds'] / max(base[name]['seconds'], 1e-9)
+            change = f"{(ratio - 1) * 100:+.1f}%"
+            if args.fail_on_regression is not None and ratio - 1 > args.fail_on_regression:
+                regressions.append(name)
+                change += ' REGRESSION'
+        print(f"  {name:<40} {row['seconds']:>9.4f} {row['mb_s']:>9.2f} {row['items_s']:>11.0f}  {change}")
+
+    if args.memprofile:
+        print(f"\n  {'target':<40} {'peak MB':>9} {'retained':>9} {'leaked':>9}  peak vs baseline")
+        for name in results:
+            mem = memprofile_target(workload, name, args.top)
+            results[name]['memory'] = mem
+            change = ''
+            old = base.get(name, {}).get('memory')
+            if old:
+                change = f"{(mem['peak_bytes'] / max(old['peak_bytes'], 1) - 1) * 100:+.1f}%"
+            print(f"  {name:<40} {mem['peak_bytes'] / 1e6:>9.2f} {mem['retained_bytes'] / 1e6:>9.2f} "
+                  f"{mem['leaked_bytes'] / 1e6:>9.2f}  {change}")
+            for site in mem['top']:
+                print(f"      {site['bytes'] / 1e6:>8.2f} MB in {site['blocks']:>7} blocks  {site['site']}")
+
+    record = {'commit': _commit(), 'python': platform.python_version(), 'machine': platform.machine(),
+              'repeat': args.repeat, 'results': results}
+    if args.json:
+        Path(args.json).write_text(json.dumps({label: record}, indent=1) + '\n', encoding='utf-8')
+    if args.save:
+        merged = dict(base)
+        merged.update(results)
+        baselines[label] = dict(record, results=merged)
+        BASELINES.write_text(json.dumps(baselines, indent=1, sort_keys=True) + '\n', encoding='utf-8')
+        print(f"Saved baseline for {label} to {BASELINES}")
+    if regressions:
+        print(f"{len(regressions)} target(s) regressed beyond {args.fail_on_regression:.0%}: {', '.join(regressions)}")
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
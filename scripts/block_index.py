@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""Random-access index of the `-- PROPOSED FIX:` blocks in a fix file.
+
+apply_manual_fixes.py, extract_blocks.py, run_proposed_functions.py,
+run_cleaned_functions.py and make_idempotent.py each re-split the whole
+manual_review_fixes*.sql file with the same regex to find a handful of blocks.
+This module keeps a sidecar next to the file (`<name>.blocks.json`) that maps
+every block to its byte range and a SHA-256 of its bytes, so one block is a
+seek + read away.
+
+- `write_blocks(path, text)` writes a fix file and its sidecar together; the
+  Python writers of PROPOSED FIX files go through it
+- `BlockIndex.load(path)` reads the sidecar, or rebuilds it when it is missing
+  or older than the file (size or mtime changed: a .cjs fixer or an editor
+  wrote the file)
+- `read()` checks the block's hash and rebuilds the sidecar once on mismatch
+
+A block runs from its header line to the next header (anything in between,
+such as `-- MANUAL REVIEW:` notes, belongs to the block before it), which is
+what the old `re.split` produced. Headers are the
+`-- PROPOSED FIX: Reassembled function for failing statement <id>` lines the
+readers have always split on, and block ids are those statement numbers; any
+other `-- PROPOSED FIX:` line stays in the body of the block before it. The `(original statements a..b)` range that
+reassemble_and_propose.py writes into a header is kept as `Block.orig`, so
+readers get (id, original range, body) without re-parsing headers.
+
+Usage:
+  python scripts/block_index.py scripts/manual_review_fixes.sql            # (re)build the sidecar, list blocks
+  python scripts/block_index.py scripts/manual_review_fixes.sql --show 6290
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+VERSION = 3
+SUFFIX = '.blocks.json'
+HEADER_RE = re.compile(rb'(?m)^-- PROPOSED FIX: Reassembled function for failing statement (\d+)[^\n]*(?:\n|\Z)')
+ORIG_RE = re.compile(rb'\(original statements (\d+)\.\.(\d+)\)')
+
+
+class Block:
+    """One block: header line at [header, start), body at [start, end) (byte offsets).
+
+    `orig` is the (first, last) original statement range named in the header, or None.
+    """
+    __slots__ = ('id', 'header', 'start', 'end', 'sha', 'orig')
+
+    def __init__(self, id, header, start, end, sha, orig=None):
+        self.id = id
+        self.header = header
+        self.start = start
+        self.end = end
+        self.sha = sha
+        self.orig = tuple(orig) if orig else None
+
+    def to_list(self):
+        return [self.id, self.header, self.start, self.end, self.sha, self.orig]
+
+
+def sidecar(path):
+    path = Path(path)
+    return path.with_name(path.name + SUFFIX)
+
+
+def scan(data):
+    """Blocks of `data` (bytes) in file order."""
+    heads = list(HEADER_RE.finditer(data))
+    blocks = []
+    for i, m in enumerate(heads):
+        end = heads[i + 1].start() if i + 1 < len(heads) else len(data)
+        orig = ORIG_RE.search(data, m.start(), m.end())
+        blocks.append(Block(int(m.group(1)), m.start(), m.end(), end,
+                            hashlib.sha256(data[m.end():end]).hexdigest(),
+                            (int(orig.group(1)), int(orig.group(2))) if orig else None))
+    return blocks
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def build(path, data=None):
+    """Index `path` (reading it unless its bytes are given) and write the sidecar; returns the blocks."""
+    path = Path(path)
+    blocks = scan(path.read_bytes() if data is None else data)
+    doc = {'version': VERSION, 'file': _stamp(path), 'blocks': [b.to_list() for b in blocks]}
+    sidecar(path).write_text(json.dumps(doc, separators=(',', ':')) + '\n', encoding='utf-8')
+    return blocks
+
+
+def write_blocks(path, text):
+    """Write a PROPOSED FIX file and refresh its sidecar."""
+    path = Path(path)
+    data = text.encode('utf-8')
+    path.write_bytes(data)
+    return build(path, data)
+
+
+class BlockIndex:
+    def __init__(self, path, blocks):
+        self.path = Path(path)
+        self.blocks = blocks
+        self.by_id = {}
+        for b in blocks:
+            self.by_id.setdefault(b.id, []).append(b)
+
+    @classmethod
+    def load(cls, path):
+        """The file's index from its sidecar, rebuilt first when stale."""
+        path = Path(path)
+        try:
+            doc = json.loads(sidecar(path).read_text(encoding='utf-8'))
+            if doc.get('version') == VERSION and doc.get('file') == _stamp(path):
+                return cls(path, [Block(*row) for row in doc['blocks']])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return cls(path, build(path))
+
+    def __len__(self):
+        return len(self.blocks)
+
+    def ids(self):
+        return [b.id for b in self.blocks]
+
+    def read(self, block, f=None):
+        """Body text of `block` (a Block), verified against its hash."""
+        if f is None:
+            with self.path.open('rb') as fh:
+                return self.read(block, fh)
+        f.seek(block.start)
+        data = f.read(block.end - block.start)
+        if hashlib.sha256(data).hexdigest() != block.sha:
+            # the file changed within the same mtime tick; re-index once and find the block again by
+            # id and header range (offsets have moved), taking the same occurrence of a repeated id
+            same = [b for b in self.by_id.get(block.id, ()) if b.orig == block.orig]
+            nth = next((i for i, b in enumerate(same) if b is block), 0)
+            fresh = BlockIndex(self.path, build(self.path))
+            self.blocks, self.by_id = fresh.blocks, fresh.by_id
+            match = [b for b in self.by_id.get(block.id, ()) if b.orig == block.orig]
+            if len(match) <= nth:
+                raise KeyError(f"block {block.id} is gone from {self.path}")
+            f.seek(match[nth].start)
+            data = f.read(match[nth].end - match[nth].start)
+        return data.decode('utf-8')
+
+    def header(self, block, f=None):
+        """The header line of `block` without its newline."""
+        if f is None:
+            with self.path.open('rb') as fh:
+                return self.header(block, fh)
+        f.seek(block.header)
+        return f.read(block.start - block.header).decode('utf-8').rstrip('\n')
+
+    def get(self, block_id):
+        """Body of the first block with id `block_id` (KeyError if there is none)."""
+        return self.read(self.by_id[block_id][0])
+
+    def select(self, ids):
+        """(id, body) for the blocks whose id is in `ids`, in file order, one open file."""
+        wanted = set(ids)
+        picked = [b for b in self.blocks if b.id in wanted]
+        with self.path.open('rb') as f:
+            return [(b.id, self.read(b, f)) for b in picked]
+
+    def entries(self):
+        """(id, body) for every block in file order."""
+        return self.select(self.by_id)
+
+    def ranged_entries(self):
+        """(id, original range or None, body) for every block, in one pass over the file."""
+        with self.path.open('rb') as f:
+            return [(b.id, b.orig, self.read(b, f)) for b in self.blocks]
+
+    def prefix(self):
+        """Text before the first block."""
+        end = self.blocks[0].header if self.blocks else None
+        with self.path.open('rb') as f:
+            return f.read(end if end is not None else -1).decode('utf-8')
+
+
+def main():
+    p = argparse.ArgumentParser(description='Build or query the PROPOSED FIX block index of a fix file')
+    p.add_argument('path')
+    p.add_argument('--show', type=int, nargs='+', help='Print the blocks with these ids')
+    args = p.parse_args()
+
+    path = Path(args.path)
+    if not path.exists():
+        raise SystemExit(f"Input file not found: {path}")
+    if args.show:
+        index = BlockIndex.load(path)
+        for block_id, body in index.select(args.show):
+            print(f"-- PROPOSED FIX: block {block_id}")
+            print(body.rstrip('\n'))
+        return
+    blocks = build(path)
+    print(f"{len(blocks)} blocks in {path}; index at {sidecar(path)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""Regenerate MIGRATIONS_BUNDLE.sql from the numbered migrations.
+
+The bundle is the whole numbered history in one file, for review and for
+local replays (local_pg.py --baseline). It inherits the ordering problems of
+the migrations themselves (001 references tables it never creates), so it is
+not a production runner: the hand-maintained, idempotent
+RUN_ALL_MIGRATIONS.sql stays that, and nothing here writes to it.
+
+The statements of every migration (schema_model.migration_files order) are
+replayed through the static schema model, and a statement is left out of the
+bundle when the model shows it cannot change a fresh database:
+
+- redundant: every object it touches already exists (`CREATE ... IF NOT
+  EXISTS`, guarded DO blocks) or is already gone (`DROP ... IF EXISTS`), or it
+  is an unguarded re-CREATE that would fail and leave the first definition in
+  place anyway
+- superseded: an object created by one statement and later dropped or
+  replaced (policy recreated with DROP POLICY IF EXISTS + CREATE POLICY,
+  function or view redefined with CREATE OR REPLACE) when no statement in
+  between mentions it; only the final definition is kept
+
+DO blocks are only dropped when they contain nothing but guarded DDL (no DML,
+no dynamic EXECUTE). Statements that touch objects the migrations never
+create, non-DDL statements and anything the model does not understand are
+kept. Statements cut short by an unterminated literal are replaced by a
+comment. Output is byte-for-byte deterministic for a given input set: no
+timestamps, and the header records the SHA-256 of the inputs.
+
+Usage:
+  python scripts/bundle_migrations.py                  # rewrite supabase/migrations/MIGRATIONS_BUNDLE.sql
+  python scripts/bundle_migrations.py --check          # exit 1 if the bundle is stale
+  python scripts/bundle_migrations.py --out bundle.sql --explain
+"""
+import argparse
+import hashlib
+from collections import defaultdict
+from pathlib import Path
+
+from schema_model import MIGRATIONS_DIR, SchemaModel, migration_files
+from sql_lexer import DOLLAR, QUOTED_IDENT, STRING, TRIVIA, WORD, ident_value, split_statements, tokenize
+
+BUNDLE = MIGRATIONS_DIR / 'MIGRATIONS_BUNDLE.sql'
+
+NO_CHANGE = ('noop', 'error')
+# Anything in a DO body besides guarded DDL keeps the block in the bundle.
+DO_SIDE_EFFECT_WORDS = {'INSERT', 'UPDATE', 'DELETE', 'PERFORM', 'COPY', 'GRANT', 'REVOKE', 'COMMENT',
+                        'RAISE', 'TRUNCATE', 'CALL', 'NOTIFY', 'REFRESH', 'SELECT'}
+
+
+class Entry:
+    """One source statement and the model's verdict on it."""
+    __slots__ = ('file', 'stmt', 'events', 'words', 'side_effects', 'drop_reason')
+
+    def __init__(self, file, stmt):
+        self.file = file
+        self.stmt = stmt
+        self.events = []
+        self.words = set()
+        self.side_effects = False
+        self.drop_reason = None
+
+
+def _scan(entry, tokens, depth=0):
+    """Collect identifiers (including those inside dollar bodies) and DO-body side effects."""
+    sig = [t for t in tokens if t.kind not in TRIVIA]
+    for k, t in enumerate(sig):
+        if t.kind in (WORD, QUOTED_IDENT):
+            entry.words.add(ident_value(t))
+            if depth and t.kind == WORD:
+                upper = t.value.upper()
+                if upper in DO_SIDE_EFFECT_WORDS and not (upper == 'SELECT' and k and sig[k - 1].value == '('):
+                    entry.side_effects = True
+                if upper == 'EXECUTE':
+                    nxt = sig[k + 1] if k + 1 < len(sig) else None
+                    if nxt is None or nxt.kind not in (STRING, DOLLAR):
+                        entry.side_effects = True  # dynamic SQL
+        elif t.kind == DOLLAR and t.terminated:
+            _scan(entry, list(tokenize(t.value, len(t.tag), len(t.value) - len(t.tag))), depth + 1)
+        elif t.kind == STRING and depth and k and sig[k - 1].is_word('EXECUTE'):
+            inner = t.value[t.value.index("'") + 1:-1].replace("''", "'")
+            _scan(entry, list(tokenize(inner)), depth + 1)
+
+
+def _object_name(kind, key):
+    """The identifier a dependent statement would mention for a model key."""
+    if kind == 'functions':
+        return key[0].split('.')[-1]
+    if isinstance(key, tuple):
+        return key[1]
+    return key.split('.')[-1]
+
+
+def collect(files, model=None):
+    """Replay `files` through the model (a fresh one unless given); returns (entries, model)."""
+    model = SchemaModel() if model is None else model
+    entries = []
+    by_source = {}
+    for path in files:
+        text = path.read_text(encoding='utf-8')
+        for stmt in split_statements(text):
+            e = Entry(path.name, stmt)
+            _scan(e, stmt.tokens)
+            by_source[(path.name, stmt.index)] = e
+            entries.append(e)
+        model.apply_sql(text, path.name)
+    for source, kind, key, action in model.log:
+        e = by_source.get((source.get('file'), source.get('statement')))
+        if e is not None:
+            e.events.append((kind, key, action))
+    return entries, model
+
+
+def plan(entries):
+    """Set `drop_reason` on entries that can be left out of the bundle."""
+    for e in entries:
+        sig = [t for t in e.stmt.tokens if t.kind not in TRIVIA]
+        if any(not t.terminated for t in e.stmt.tokens):
+            e.drop_reason = 'unterminated'
+            continue
+        if not e.events or any(a not in NO_CHANGE for _, _, a in e.events):
+            continue
+        if sig and sig[0].is_word('DO') and e.side_effects:
+            continue
+        e.drop_reason = 'redundant'
+
+    live = [i for i, e in enumerate(entries) if e.drop_reason is None]
+    position = {i: n for n, i in enumerate(live)}
+    creator = {}
+
+    def untouched_between(c, i, name):
+        return not any(name in entries[j].words for j in live[position[c] + 1:position[i]])
+
+    for i in live:
+        e = entries[i]
+        single = len(e.events) == 1
+        for kind, key, action in e.events:
+            obj = (kind, key)
+            if action in ('create', 'replace'):
+                c = creator.get(obj)
+                if action == 'replace' and c is not None and untouched_between(c, i, _object_name(kind, key)):
+                    entries[c].drop_reason = 'superseded'
+                creator[obj] = i if single else None
+            elif action == 'drop':
+                c = creator.pop(obj, None)
+                if single and c is not None and untouched_between(c, i, _object_name(kind, key)):
+                    entries[c].drop_reason = 'superseded'
+                    e.drop_reason = 'superseded'
+            elif action in ('alter', 'unknown'):
+                creator[obj] = None
+
+
+def render(files, entries):
+    digest = hashlib.sha256()
+    for path in files:
+        digest.update(path.name.encode('utf-8') + b'\0' + path.read_bytes())
+    kept = sum(1 for e in entries if e.drop_reason is None)
+    out = [
+        '-- MIGRATIONS BUNDLE: the numbered history in one file, for review and local replays\n'
+        '-- (generated by scripts/bundle_migrations.py; do not edit by hand). Not a runner:\n'
+        '-- apply missing migrations with RUN_ALL_MIGRATIONS.sql.',
+        f'-- Inputs: {len(files)} migration files, sha256 {digest.hexdigest()}',
+        f'-- Statements: {kept} kept of {len(entries)}',
+        '',
+    ]
+    by_file = defaultdict(list)
+    for e in entries:
+        by_file[e.file].append(e)
+    for path in files:
+        rows = by_file.get(path.name, [])
+        if not any(e.drop_reason in (None, 'unterminated') for e in rows):
+            continue
+        out.append('-- =============================================')
+        out.append(f'-- {path.name}')
+        out.append('-- =============================================')
+        for e in rows:
+            if e.drop_reason is None:
+                text = e.stmt.text if e.stmt.text.rstrip().endswith(';') else e.stmt.text + ';'
+                out.append(text)
+                out.append('')
+            elif e.drop_reason == 'unterminated':
+                out.append(f'-- SKIPPED {path.name}:{e.stmt.line}: statement contains an unterminated literal')
+                out.append('')
+    return '\n'.join(out).rstrip('\n') + '\n'
+
+
+def main():
+    p = argparse.ArgumentParser(description='Regenerate the deduplicated migration bundle')
+    p.add_argument('--dir', default=str(MIGRATIONS_DIR))
+    p.add_argument('--out', default=None, help=f'Output path (default: <dir>/{BUNDLE.name})')
+    p.add_argument('--check', action='store_true', help='Do not write; exit 1 if the bundle is out of date')
+    p.add_argument('--explain', action='store_true', help='List every dropped statement and why')
+    args = p.parse_args()
+
+    files = migration_files(args.dir)
+    out_path = Path(args.out) if args.out else Path(args.dir) / BUNDLE.name
+    entries, model = collect(files)
+    plan(entries)
+    text = render(files, entries)
+
+    counts = defaultdict(int)
+    for e in entries:
+        counts[e.drop_reason or 'kept'] += 1
+    print(f"{len(entries)} statements from {len(files)} files: "
+          + ', '.join(f"{k} {v}" for k, v in sorted(counts.items())))
+    if args.explain:
+        for e in entries:
+            if e.drop_reason:
+                first = ' '.join(e.stmt.text.split())[:70]
+                print(f"  {e.drop_reason:<12} {e.file}:{e.stmt.line}  {first}")
+
+    if args.check:
+        current = out_path.read_text(encoding='utf-8') if out_path.exists() else ''
+        if current != text:
+            print(f"{out_path} is out of date; run scripts/bundle_migrations.py")
+            raise SystemExit(1)
+        print(f"{out_path} is up to date")
+        return
+    out_path.write_text(text, encoding='utf-8')
+    print('Wrote', out_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Check run_sql_fanout.py's journal / resume path on a throwaway local cluster.
+
+Boots a local_pg.py cluster, clones two databases from its template and fans
+a small script out to both (as `a` and `b`), with a table pre-created in `b`
+so that its third statement fails:
+
+1. first pass: `a` runs to the end, `b` halts at statement 3 and its journal
+   records 1-2 as executed and 3 as failed
+2. the blocker is dropped from `b` and the file is fanned out again with
+   resume: `a` executes nothing, `b` skips 1-2 and executes 3-4
+3. statement 4 is edited and the file resumed once more: both targets
+   execute statement 4 only, because its SHA-256 no longer matches
+
+Besides the journal lines each pass writes, the rows in the clones are
+checked, so a statement that resume ran twice (or never) fails the check.
+Exits 1 on the first mismatch. initdb refuses to run as root.
+
+Usage:
+  python scripts/check_fanout_resume.py
+  python scripts/check_fanout_resume.py --bindir /usr/lib/postgresql/16/bin --keep
+"""
+import argparse
+import asyncio
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from local_pg import LocalCluster
+from run_sql_fanout import Journal, Target, fan_out
+from statement_index import StatementIndex
+
+SCRIPT = """\
+CREATE TABLE fanout_log (n int);
+INSERT INTO fanout_log VALUES (2);
+CREATE TABLE fanout_blocker (id int);
+INSERT INTO fanout_log VALUES ({last});
+"""
+
+
+def _pass(cluster, workdir, last, resume):
+    """Fan SCRIPT out to both clones; returns {label: (state, [(n, status) journal lines written])}."""
+    path = workdir / 'fanout_check.sql'
+    path.write_text(SCRIPT.format(last=last), encoding='utf-8')
+    statements = StatementIndex.load(path).all()
+    targets = []
+    offsets = {}
+    for label in ('a', 'b'):
+        journal = Journal(workdir / f"fanout_journal_{label}.jsonl")
+        offsets[label] = journal.path.stat().st_size if journal.path.exists() else 0
+        targets.append(Target(label, cluster.dsn(f"fanout_{label}"), statements, journal,
+                              tolerate_errors=False, resume=resume))
+    asyncio.run(fan_out(targets, concurrency=2, interval=60))
+    out = {}
+    for t in targets:
+        with t.journal.path.open(encoding='utf-8') as f:
+            f.seek(offsets[t.label])
+            lines = [json.loads(line) for line in f]
+        out[t.label] = (t.state, [(e['n'], e['status']) for e in lines if 'n' in e])
+    return out
+
+
+def _rows(cluster, label):
+    conn = cluster.connect(f"fanout_{label}")
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT coalesce(array_agg(n ORDER BY n), '{}') FROM fanout_log")
+            return cur.fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _expect(what, got, want):
+    if got != want:
+        raise SystemExit(f"FAIL {what}: expected {want}, got {got}")
+    print(f"ok   {what}: {got}")
+
+
+def main():
+    p = argparse.ArgumentParser(description="Check run_sql_fanout's journal / resume path on a local cluster")
+    p.add_argument('--bindir', help='Directory with initdb and pg_ctl')
+    p.add_argument('--keep', action='store_true', help='Keep the cluster and the journals for inspection')
+    args = p.parse_args()
+
+    cluster = LocalCluster(args.bindir, keep=args.keep)
+    workdir = Path(tempfile.mkdtemp(prefix='fanout_check_'))
+    try:
+        with cluster:
+            cluster.build_template()
+            for label in ('a', 'b'):
+                cluster.clone(f"fanout_{label}")
+            conn = cluster.connect('fanout_b')
+            with conn.cursor() as cur:
+                cur.execute('CREATE TABLE fanout_blocker (id int)')
+            conn.close()
+
+            first = _pass(cluster, workdir, last=4, resume=False)
+            _expect('pass 1, a', first['a'], ('done', [(1, 'executed'), (2, 'executed'), (3, 'executed'),
+                                                       (4, 'executed')]))
+            _expect('pass 1, b', first['b'], ('failed', [(1, 'executed'), (2, 'executed'), (3, 'failed')]))
+            _expect('pass 1, b rows', _rows(cluster, 'b'), [2])
+
+            conn = cluster.connect('fanout_b')
+            with conn.cursor() as cur:
+                cur.execute('DROP TABLE fanout_blocker')
+            conn.close()
+            second = _pass(cluster, workdir, last=4, resume=True)
+            _expect('pass 2 (resume), a', second['a'], ('done', []))
+            _expect('pass 2 (resume), b', second['b'], ('done', [(3, 'executed'), (4, 'executed')]))
+
+            third = _pass(cluster, workdir, last=5, resume=True)
+            _expect('pass 3 (statement 4 edited), a', third['a'], ('done', [(4, 'executed')]))
+            _expect('pass 3 (statement 4 edited), b', third['b'], ('done', [(4, 'executed')]))
+            for label in ('a', 'b'):
+                _expect(f"rows in {label}", _rows(cluster, label), [2, 4, 5])
+    finally:
+        if args.keep:
+            print(f"Journals kept in {workdir}, the stopped cluster in {cluster.workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+    print('run_sql_fanout journal / resume: all checks passed')
+
+
+if __name__ == '__main__':
+    main()
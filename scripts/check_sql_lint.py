@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Regression cases for sql_lint.py: SQL snippets and the rules each must (or must not) raise.
+
+Every case is linted with lint_text(); a case passes when the set of rules
+reported at error level is exactly the expected one. Add a case here with
+every false positive or missed error fixed in the linter.
+
+Usage:
+  python scripts/check_sql_lint.py
+"""
+from sql_lint import ERROR, lint_text
+
+# (SQL, rules expected at error level)
+CASES = [
+    # a closing dollar tag followed by an operator or a clause keyword is fine
+    ("SELECT $$a$$ - 1;", set()),
+    ("SELECT 1 WHERE $$a$$ > $$b$$;", set()),
+    ("SELECT $x$a$x$ * 2;", set()),
+    ("SELECT $a$x$a$ ORDER BY 1;", set()),
+    ("SELECT $a$x$a$ UNION SELECT $b$y$b$ LIMIT 1;", set()),
+    ("SELECT $$[1]$$::jsonb -> 0, $${}$$::jsonb @> $${}$$::jsonb, $$a$$ ~~ $$%$$;", set()),
+    ("CREATE TABLE t (a text DEFAULT $$x$$ CHECK (a <> ''));", set()),
+    ("CREATE FUNCTION f() RETURNS int LANGUAGE sql AS $$ SELECT 1 $$;", set()),
+    # a tag nested inside itself closes the outer body early
+    ("CREATE FUNCTION f() RETURNS void AS $$ BEGIN EXECUTE $$SELECT 1$$; END $$ LANGUAGE plpgsql;",
+     {'dollar-tag-reused'}),
+    ("SELECT $$never closed;", {'unterminated-dollar'}),
+]
+
+
+def main():
+    failed = 0
+    for sql, want in CASES:
+        got = {d.rule for d in lint_text(sql) if d.severity == ERROR}
+        if got != want:
+            failed += 1
+            print(f"FAIL {sql}\n     expected {sorted(want)}, got {sorted(got)}")
+    print(f"{len(CASES) - failed}/{len(CASES)} sql_lint cases passed")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
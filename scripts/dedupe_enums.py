@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""Keep exactly one guarded definition per enum type across a set of SQL files.
+
+Replaces de_duplicate_enums.cjs, which regex-scanned a 200-character window
+around every match and re-searched the whole file with `indexOf` for each
+enum (quadratic, and wrong when identical definitions recur).
+
+One lexer pass per file builds an index of every `CREATE TYPE ... AS ENUM`:
+top-level, inside DO blocks (guarded by `IF NOT EXISTS (... pg_type ...)` or
+not), and inside `EXECUTE '<sql>'` / `EXECUTE $tag$<sql>$tag$` literals. Then:
+
+- the first definition of each enum (file order, then position) is kept; if
+  it is a bare top-level CREATE TYPE it is rewritten as a pg_type-guarded DO
+  block
+- a definition is guarded when it only runs under `IF NOT EXISTS (...
+  pg_type ...)` or inside a `BEGIN ... EXCEPTION WHEN duplicate_object` (or
+  `others`) block
+- statements that contain nothing but enum definitions and their guards are
+  rewritten to pg_type-guarded DO blocks for the first definitions they hold,
+  and their later definitions are removed
+- later definitions buried in statements that do other work are reported
+  instead of edited: guarded ones as notes, unguarded ones as errors (they
+  fail on the server and take the rest of their statement with them), which
+  also makes the exit status non-zero
+- definitions whose label list differs from the first one are flagged as
+  conflicts (the first definition is what a database would end up with)
+
+Usage:
+  python scripts/dedupe_enums.py                           # report on supabase/migrations (numbered files)
+  python scripts/dedupe_enums.py path/to/gap_fix.sql --write   # rewrite in place (previous version kept in scripts/backups)
+"""
+import argparse
+from collections import defaultdict
+from pathlib import Path
+
+from backup_store import BackupStore
+from schema_model import MIGRATIONS_DIR, migration_files
+from sql_lexer import DOLLAR, PUNCT, STRING, TRIVIA, ident_value, split_statements, string_value, tokenize
+
+# Words that may surround enum definitions in a DO block without doing other work.
+GUARD_WORDS = {'BEGIN', 'END', 'IF', 'THEN', 'ELSE', 'NULL', 'EXCEPTION', 'WHEN', 'DUPLICATE_OBJECT', 'OTHERS'}
+
+
+class EnumDef:
+    __slots__ = ('name', 'labels', 'file', 'line', 'col', 'stmt', 'guarded', 'top_level')
+
+    def __init__(self, name, labels, file, line, col, stmt, guarded, top_level):
+        self.name = name
+        self.labels = labels
+        self.file = file
+        self.line = line
+        self.col = col
+        self.stmt = stmt
+        self.guarded = guarded
+        self.top_level = top_level
+
+    @property
+    def key(self):
+        return self.name.split('.')[-1]
+
+    def where(self):
+        return f"{self.file}:{self.line}"
+
+
+def _enum_at(sig, k):
+    """Parse `CREATE TYPE name AS ENUM (labels)` starting at sig[k]; returns (name, labels) or None."""
+    if not (k + 4 < len(sig) and sig[k].is_word('CREATE') and sig[k + 1].is_word('TYPE')):
+        return None
+    j = k + 2
+    if sig[j].is_word('IF'):
+        j += 3  # invalid IF NOT EXISTS form; still a definition
+    parts = [ident_value(sig[j])]
+    j += 1
+    while j + 1 < len(sig) and sig[j].kind == PUNCT and sig[j].value == '.':
+        parts.append(ident_value(sig[j + 1]))
+        j += 2
+    if not (j + 1 < len(sig) and sig[j].is_word('AS') and sig[j + 1].is_word('ENUM')):
+        return None
+    labels = []
+    for t in sig[j + 2:]:
+        if t.kind == PUNCT and t.value == ')':
+            break
+        if t.kind == STRING:
+            labels.append(string_value(t))
+    name = '.'.join(parts)
+    return (name[len('public.'):] if name.startswith('public.') else name), labels
+
+
+def _control_if(sig, k):
+    """Index of the THEN closing the IF at sig[k], or None for `IF [NOT] EXISTS` inside a statement."""
+    j = k + 1
+    while j < len(sig) and not sig[j].is_word('THEN'):
+        if sig[j].kind == PUNCT and sig[j].value == ';':
+            return None
+        j += 1
+    return j
+
+
+def _guarded_ranges(sig):
+    """[lo, hi) index ranges of a PL/pgSQL body in which a CREATE TYPE cannot fail on a duplicate.
+
+    That is the THEN branch of `IF NOT EXISTS (... pg_type ...)` and the statements of a block
+    whose EXCEPTION handler catches duplicate_object (or others).
+    """
+    ranges, stack = [], []  # frames: [kind, start, guard flag or EXCEPTION index]
+    k = 0
+    while k < len(sig):
+        t = sig[k]
+        after_end = k > 0 and sig[k - 1].is_word('END')
+        if t.is_word('BEGIN'):
+            stack.append(['BEGIN', k, None])
+        elif t.is_word('EXCEPTION') and stack and stack[-1][0] == 'BEGIN':
+            stack[-1][2] = k
+        elif t.is_word('IF') and not after_end:
+            j = _control_if(sig, k)
+            if j is not None:
+                cond = {u.value.lower() for u in sig[k + 1:j]}
+                stack.append(['IF', j, {'not', 'exists', 'pg_type'} <= cond])
+                k = j
+        elif t.is_word('ELSE', 'ELSIF') and stack and stack[-1][0] == 'IF':
+            if stack[-1][2]:
+                ranges.append((stack[-1][1], k))
+            stack[-1][2] = False
+        elif t.is_word('LOOP', 'CASE') and not after_end:
+            stack.append([t.upper, k, None])
+        elif t.is_word('END'):
+            nxt = sig[k + 1] if k + 1 < len(sig) else None
+            kind = nxt.upper if nxt is not None and nxt.is_word('IF', 'LOOP', 'CASE') else None
+            while stack:
+                frame = stack.pop()
+                if kind is None or frame[0] == kind:
+                    break
+            else:
+                frame = None
+            if frame is not None and frame[0] == 'IF' and frame[2]:
+                ranges.append((frame[1], k))
+            elif frame is not None and frame[0] == 'BEGIN' and frame[2] is not None:
+                handler = {u.value.lower() for u in sig[frame[2]:k]}
+                if handler & {'duplicate_object', 'others'}:
+                    ranges.append((frame[1], frame[2]))
+            if kind is not None:
+                k += 1
+        k += 1
+    return ranges
+
+
+def _scan_body(text, tokens, found, outer_guarded=False):
+    """Find enum definitions in a PL/pgSQL body; returns True when it holds only enum DDL and guards.
+
+    Appends ((name, labels), token, guarded) to `found`.
+    """
+    sig = [t for t in tokens if t.kind not in TRIVIA]
+    ranges = _guarded_ranges(sig)
+
+    def guarded(k):
+        return outer_guarded or any(lo <= k < hi for lo, hi in ranges)
+
+    pure = True
+    k = 0
+    while k < len(sig):
+        t = sig[k]
+        hit = _enum_at(sig, k)
+        if hit:
+            found.append((hit, t, guarded(k)))
+            while k < len(sig) and not (sig[k].kind == PUNCT and sig[k].value == ';'):
+                k += 1
+        elif t.is_word('EXECUTE') and k + 1 < len(sig) and sig[k + 1].kind in (STRING, DOLLAR):
+            inner = string_value(sig[k + 1])
+            before = len(found)
+            inner_sig = [u for u in tokenize(inner) if u.kind not in TRIVIA]
+            inner_ranges = _guarded_ranges(inner_sig)
+            for j in range(len(inner_sig)):
+                hit = _enum_at(inner_sig, j)
+                if hit:
+                    # reported at the literal
+                    found.append((hit, sig[k + 1], guarded(k) or any(lo <= j < hi for lo, hi in inner_ranges)))
+            if len(found) == before:
+                pure = False
+            k += 1
+        elif t.is_word('IF') and not sig[k - 1].is_word('END') and _control_if(sig, k) is not None:
+            # guard condition up to THEN: IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = '...')
+            j = _control_if(sig, k)
+            cond = {u.value.lower() for u in sig[k + 1:j]}
+            if not ({'not', 'exists', 'pg_type'} <= cond):
+                pure = False
+            k = j
+        elif t.is_word('EXCEPTION'):
+            j = k + 1
+            while j < len(sig) and not sig[j].is_word('THEN'):
+                j += 1
+            k = j
+        elif t.kind == PUNCT and t.value == ';':
+            pass
+        elif t.kind == DOLLAR and k and sig[k - 1].is_word('DO'):
+            pure = _scan_body(text, _body_tokens(text, t), found, guarded(k)) and pure  # nested DO
+        elif not t.is_word(*GUARD_WORDS) and not t.is_word('DO', 'LANGUAGE', 'PLPGSQL'):
+            pure = False
+        k += 1
+    return pure
+
+
+def _body_tokens(text, tok):
+    """Tokens of a dollar-quoted body, positioned in the file (the tag never spans lines)."""
+    tag = len(tok.tag)
+    return list(tokenize(text, tok.start + tag, tok.end - tag if tok.terminated else tok.end, tok.line, tok.col + tag))
+
+
+def index_file(path, defs):
+    """Append the file's EnumDefs to `defs`; returns {statement index: (Statement, pure_enum)}."""
+    text = Path(path).read_text(encoding='utf-8')
+    stmts = {}
+    for stmt in split_statements(text):
+        sig = stmt.significant
+        if not sig:
+            continue
+        found = []
+        pure = False
+        top_level = sig[0].is_word('CREATE')
+        if top_level:
+            hit = _enum_at(sig, 0)
+            if hit:
+                found.append((hit, sig[0], False))
+                pure = True
+        elif sig[0].is_word('DO'):
+            body = next((t for t in sig[1:4] if t.kind in (DOLLAR, STRING)), None)
+            if body is not None and body.kind == DOLLAR:
+                pure = _scan_body(text, _body_tokens(text, body), found)
+            elif body is not None:
+                # DO '...': positions inside the string are not file positions
+                pure = _scan_body(text, list(tokenize(string_value(body))), found)
+                found = [(hit, body, guarded) for hit, _, guarded in found]
+        else:
+            continue
+        for (name, labels), tok, guarded in found:
+            defs.append(EnumDef(name, labels, str(path), tok.line, tok.col, stmt, guarded, top_level))
+        if found:
+            stmts[stmt.index] = (stmt, pure)
+    return text, stmts
+
+
+def guarded_block(name, labels):
+    typname = name.split('.')[-1].strip('"')
+    quoted = ', '.join("'" + label.replace("'", "''") + "'" for label in labels)
+    return (
+        "DO $do$\n"
+        "BEGIN\n"
+        f"  IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = '{typname}') THEN\n"
+        f"    CREATE TYPE {name} AS ENUM ({quoted});\n"
+        "  END IF;\n"
+        "END\n"
+        "$do$;"
+    )
+
+
+def plan(paths):
+    """Index every file; returns (texts, statements, defs by key, edits by file, notes, errors, conflicts)."""
+    defs, texts, statements = [], {}, {}
+    for path in paths:
+        texts[str(path)], statements[str(path)] = index_file(path, defs)
+    by_key = defaultdict(list)
+    for d in defs:
+        by_key[d.key].append(d)
+
+    by_stmt = defaultdict(list)
+    for d in defs:
+        by_stmt[(d.file, d.stmt.index)].append(d)
+
+    edits = defaultdict(dict)   # file -> {stmt index: replacement text}
+    notes, errors, conflicts = [], [], []
+    for key, occurrences in by_key.items():
+        first = occurrences[0]
+        for d in occurrences[1:]:
+            if d.labels != first.labels:
+                conflicts.append(f"{key}: {d.where()} has {d.labels}, first defined at {first.where()} with {first.labels}")
+
+    for (f, idx), members in by_stmt.items():
+        firsts = [d for d in members if by_key[d.key][0] is d]
+        later = [d for d in members if by_key[d.key][0] is not d]
+        _, pure = statements[f][idx]
+        if pure:
+            # only enum DDL and guards: one guarded block per first definition, the rest removed
+            if later or not all(d.guarded for d in firsts):
+                parts = [guarded_block(d.name, d.labels) for d in firsts]
+                if later:
+                    parts.append('\n'.join(f"-- enum {d.key} is defined at {Path(by_key[d.key][0].file).name}:"
+                                           f"{by_key[d.key][0].line}" for d in later))
+                edits[f][idx] = '\n\n'.join(parts)
+            continue
+        for d in firsts:
+            if not d.guarded:
+                notes.append(f"{d.where()}: first definition of {d.key} is not guarded and sits in a statement "
+                             f"that does other work; left in place")
+        for d in later:
+            first = by_key[d.key][0]
+            if d.guarded:
+                notes.append(f"{d.where()}: guarded duplicate of {d.key} (first at {first.where()}) inside a "
+                             f"statement that does other work; left in place")
+            else:
+                errors.append(f"{d.where()}: unguarded duplicate of {d.key} (first at {first.where()}) inside a "
+                              f"statement that does other work; it fails with duplicate_object and aborts "
+                              f"that statement. Guard it with IF NOT EXISTS (SELECT 1 FROM pg_type ...)")
+    return texts, statements, by_key, edits, notes, errors, conflicts
+
+
+def apply_edits(text, statements, replacements):
+    """Splice statement replacements into `text` in one forward pass."""
+    out, pos = [], 0
+    for idx in sorted(replacements, key=lambda i: statements[i][0].start):
+        stmt = statements[idx][0]
+        out.append(text[pos:stmt.start])
+        out.append(replacements[idx])
+        pos = stmt.end
+    out.append(text[pos:])
+    return ''.join(out)
+
+
+def main():
+    p = argparse.ArgumentParser(description='One guarded definition per enum across SQL files')
+    p.add_argument('paths', nargs='*', help='SQL files in apply order (default: numbered migrations)')
+    p.add_argument('--write', action='store_true', help='Rewrite files in place (previous versions go to scripts/backups)')
+    args = p.parse_args()
+
+    paths = [Path(x) for x in args.paths] if args.paths else migration_files(MIGRATIONS_DIR)
+    missing = [x for x in paths if not x.exists()]
+    if missing:
+        print('File not found:', ', '.join(map(str, missing)))
+        raise SystemExit(2)
+
+    texts, statements, by_key, edits, notes, errors, conflicts = plan(paths)
+    total = sum(len(v) for v in by_key.values())
+    print(f"{len(by_key)} enum types, {total} definitions in {len(paths)} files")
+    for f, repl in edits.items():
+        for idx in sorted(repl):
+            stmt = statements[f][idx][0]
+            action = 'guard' if repl[idx].startswith('DO ') else 'remove'
+            print(f"  {action:<6} {f}:{stmt.line}")
+    for n in notes:
+        print('  note  ', n)
+    for e in errors:
+        print('  ERROR ', e)
+    for c in conflicts:
+        print('  CONFLICT', c)
+
+    if args.write:
+        store = BackupStore()
+        for f, repl in edits.items():
+            path = Path(f)
+            sha = store.save(path, label='dedupe_enums', data=texts[f].encode('utf-8'))
+            path.write_text(apply_edits(texts[f], statements[f], repl), encoding='utf-8')
+            print(f"Wrote {path} ({len(repl)} edits; previous version {sha[:12]})")
+    elif edits:
+        print('Dry run; pass --write to apply')
+    raise SystemExit(1 if conflicts or errors else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""Differential test of the statement splitters used across scripts/.
+
+Splitters compared (each turned into a set of statement end offsets):
+- sql_lexer.split_statements   reference: comment-, quote- and dollar-tag-aware
+- sqlparse.split               what run_sql.py numbers statements by (skipped if not installed)
+- sanitize_and_rewrap.split_statements, repair_rewriter_advanced.split_statements
+                               character loops that toggle quote state on every `'`/`"`,
+                               comments included, and re-slice the tail for each `$`
+- make_idempotent.split_statements
+                               `;` followed by a newline, no quoting rules at all
+
+A boundary is the offset just past a statement's terminating `;` (or the end
+of an unterminated tail). Trailing comments and whitespace in a returned piece
+are ignored, and so are pieces that contain only comments. For every input
+the harness reports, per splitter, the reference boundaries it missed (it
+merged statements), the boundaries it added (it split inside a statement),
+pieces it returned that are not verbatim in the input, best-of-N throughput
+and the tracemalloc peak of one split.
+
+The two character-loop splitters copy the rest of the input at every `$`, so
+they are quadratic; inputs above --slow-limit MB skip them (reported as skipped).
+
+Usage:
+  python scripts/diff_splitters.py                         # numbered migrations + 10k synthetic corpus
+  python scripts/diff_splitters.py --synthetic 1000 100000 --show 5
+  python scripts/diff_splitters.py path/to/file.sql --json splitters.json
+"""
+import argparse
+import importlib
+import json
+import time
+import tracemalloc
+from pathlib import Path
+
+from gen_corpus import generate
+from schema_model import MIGRATIONS_DIR, migration_files
+from sql_lexer import split_statements
+
+REFERENCE = 'sql_lexer'
+# name -> 'module:function'; each returns a list of statement strings
+SPLITTERS = {
+    'sqlparse': 'sqlparse:split',
+    'sanitize_and_rewrap': 'sanitize_and_rewrap:split_statements',
+    'repair_rewriter_advanced': 'repair_rewriter_advanced:split_statements',
+    'make_idempotent': 'make_idempotent:split_statements',
+}
+QUADRATIC = {'sanitize_and_rewrap', 'repair_rewriter_advanced'}
+
+
+def _trim(piece):
+    """Drop trailing whitespace and trailing `--` comment lines; '' for comment-only pieces."""
+    while True:
+        piece = piece.rstrip()
+        nl = piece.rfind('\n')
+        if piece[nl + 1:].lstrip().startswith('--'):
+            piece = piece[:nl] if nl >= 0 else ''
+            continue
+        return piece
+
+
+def _lexer_split(text):
+    return [s.text for s in split_statements(text)]
+
+
+def reference_boundaries(text):
+    out = []
+    for stmt in split_statements(text):
+        end = len(_trim(stmt.text))
+        out.append(stmt.start + end)
+    return out
+
+
+def boundaries(text, pieces):
+    """(end offsets, number of pieces not found verbatim) for a splitter's output."""
+    ends, lost, pos = [], 0, 0
+    for piece in pieces:
+        body = _trim(piece.strip())
+        if not body:
+            continue
+        probe = body.rstrip(';').rstrip()
+        at = text.find(probe, pos)
+        if at < 0:
+            lost += 1
+            continue
+        end = at + len(probe)
+        # the `;` may have been dropped by the splitter (make_idempotent) or kept
+        rest = end
+        while rest < len(text) and text[rest] in ' \t\r\n':
+            rest += 1
+        if rest < len(text) and text[rest] == ';':
+            end = rest + 1
+        ends.append(end)
+        pos = end
+    return ends, lost
+
+
+def _load(spec):
+    module, attr = spec.split(':')
+    try:
+        return getattr(importlib.import_module(module), attr)
+    except ImportError:
+        return None
+
+
+def measure(fn, text, repeat):
+    """(pieces, best seconds, tracemalloc peak bytes)."""
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        pieces = fn(text)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    tracemalloc.start()
+    fn(text)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return pieces, max(best, 1e-9), peak
+
+
+def _where(text, offset):
+    line = text.count('\n', 0, offset) + 1
+    col = offset - (text.rfind('\n', 0, offset) + 1) + 1
+    snippet = ' '.join(text[max(0, offset - 30):offset + 30].split())
+    return f"{line}:{col}  …{snippet}…"
+
+
+def compare(label, text, repeat, slow_limit, show):
+    """Run every splitter on one input; returns its report row."""
+    size = len(text.encode('utf-8'))
+    _, ref_time, ref_peak = measure(_lexer_split, text, repeat)
+    ref = reference_boundaries(text)
+    ref_set = set(ref)
+    row = {'input': label, 'bytes': size, 'statements': len(ref), 'splitters': {
+        REFERENCE: {'seconds': round(ref_time, 6), 'mb_s': round(size / 1e6 / ref_time, 3),
+                    'stmts_s': round(len(ref) / ref_time, 1), 'peak_bytes': ref_peak}}}
+    print(f"{label}: {size / 1e6:.2f} MB, {len(ref)} statements")
+    print(f"  {REFERENCE:<26} {ref_time:>9.4f}s {size / 1e6 / ref_time:>8.2f} MB/s {ref_peak / 1e6:>8.1f} MB peak  (reference)")
+    for name, spec in SPLITTERS.items():
+        fn = _load(spec)
+        if fn is None:
+            row['splitters'][name] = {'skipped': 'not installed'}
+            print(f"  {name:<26} skipped (not installed)")
+            continue
+        if name in QUADRATIC and size > slow_limit * 1e6:
+            row['splitters'][name] = {'skipped': f'quadratic, input over {slow_limit} MB'}
+            print(f"  {name:<26} skipped (quadratic, input over {slow_limit} MB)")
+            continue
+        pieces, secs, peak = measure(fn, text, repeat)
+        ends, lost = boundaries(text, pieces)
+        got = set(ends)
+        missed = sorted(ref_set - got)
+        extra = sorted(got - ref_set)
+        row['splitters'][name] = {
+            'seconds': round(secs, 6), 'mb_s': round(size / 1e6 / secs, 3), 'stmts_s': round(len(ref) / secs, 1),
+            'peak_bytes': peak, 'pieces': len(ends), 'missed': len(missed), 'extra': len(extra), 'lost': lost,
+            'missed_at': missed[:show], 'extra_at': extra[:show],
+        }
+        verdict = 'agrees' if not (missed or extra or lost) else f"{len(missed)} missed, {len(extra)} extra, {lost} not verbatim"
+        print(f"  {name:<26} {secs:>9.4f}s {size / 1e6 / secs:>8.2f} MB/s {peak / 1e6:>8.1f} MB peak  {verdict}")
+        for off in missed[:show]:
+            print(f"      missed {_where(text, off)}")
+        for off in extra[:show]:
+            print(f"      extra  {_where(text, off)}")
+    return row
+
+
+def inputs(args):
+    if args.paths:
+        for p in map(Path, args.paths):
+            yield str(p), p.read_text(encoding='utf-8')
+    else:
+        for p in migration_files(MIGRATIONS_DIR):
+            yield p.name, p.read_text(encoding='utf-8')
+    for n in args.synthetic:
+        yield f'synthetic:{n}:seed{args.seed}', ''.join(generate(n, args.seed))
+
+
+def main():
+    p = argparse.ArgumentParser(description='Compare the statement splitters on migrations and synthetic corpora')
+    p.add_argument('paths', nargs='*', help='SQL files (default: the numbered migrations)')
+    p.add_argument('--synthetic', type=int, nargs='*', default=[10000], help='Synthetic corpus sizes (default 10000)')
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('--repeat', type=int, default=3)
+    p.add_argument('--slow-limit', type=float, default=5.0, help='Skip the quadratic splitters above this many MB')
+    p.add_argument('--show', type=int, default=3, help='Disagreements to print per splitter and input')
+    p.add_argument('--json', help='Write the full report to this file')
+    args = p.parse_args()
+
+    rows = [compare(label, text, args.repeat, args.slow_limit, args.show) for label, text in inputs(args)]
+
+    print('\nTotals (inputs where the splitter ran):')
+    for name in [REFERENCE] + list(SPLITTERS):
+        ran = [r for r in rows if 'seconds' in r['splitters'].get(name, {})]
+        if not ran:
+            print(f"  {name:<26} did not run")
+            continue
+        size = sum(r['bytes'] for r in ran)
+        secs = sum(r['splitters'][name]['seconds'] for r in ran)
+        bad = sum(1 for r in ran if any(r['splitters'][name].get(k) for k in ('missed', 'extra', 'lost')))
+        peak = max(r['splitters'][name]['peak_bytes'] for r in ran)
+        print(f"  {name:<26} {size / 1e6 / secs:>8.2f} MB/s  max peak {peak / 1e6:.1f} MB  "
+              f"disagrees on {bad}/{len(ran)} inputs")
+    if args.json:
+        Path(args.json).write_text(json.dumps(rows, indent=1) + '\n', encoding='utf-8')
+        print('Wrote', args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""Generate synthetic migration corpora for benchmarking the SQL tooling.
+
+The statement mix is modelled on supabase/migrations/: tables with auth.users
+foreign keys and updated_at triggers, pg_type-guarded enums (both the
+`IF NOT EXISTS` and the `EXCEPTION WHEN duplicate_object` form), functions with
+`$$`, `$function$` and `$body$` tags, RLS enable + DROP POLICY IF EXISTS +
+CREATE POLICY, guarded indexes, DO blocks that `EXECUTE` views and DDL through
+nested dollar tags (the `$VIEW$` pattern of the app_metrics migrations, and
+DO-inside-EXECUTE wrappers from the repair passes), multi-row seed INSERTs with
+jsonb and doubled quotes (half of them constants only, as in seed files),
+comment banners and COMMENT ON.
+
+Output is streamed, so million-statement corpora do not have to fit in memory,
+and is byte-for-byte reproducible for a given --seed and --statements.
+`--fix-file` writes the same statements grouped into `-- PROPOSED FIX:` blocks
+(one template unit per block), the input format of the block repair passes.
+
+Usage:
+  python scripts/gen_corpus.py --statements 10000 --out /tmp/corpus_10k.sql
+  python scripts/gen_corpus.py --statements 1000000 --seed 7 --out /tmp/corpus_1m.sql
+  python scripts/gen_corpus.py --statements 5000 --fix-file --out /tmp/fixes_5k.sql
+"""
+import argparse
+import random
+import sys
+from pathlib import Path
+
+NOUNS = ('boards', 'board_steps', 'routines', 'routine_steps', 'tasks', 'templates', 'medications',
+         'mood_entries', 'sensory_logs', 'collaborators', 'snapshots', 'app_metrics', 'diet_logs',
+         'time_blocks', 'reminders', 'habits', 'journal_entries', 'focus_sessions')
+STATUS_LABELS = ('pending', 'active', 'paused', 'completed', 'archived', 'cancelled', 'failed')
+ACTIONS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE')
+WORDS = ('morning', 'evening', 'focus', 'calm', 'sensory', 'break', 'plan', "it's", 'quick', 'deep', 'review')
+
+# (template, weight): how often each kind of unit appears
+MIX = (
+    ('table', 8), ('enum', 6), ('function', 6), ('rls', 8), ('index', 10),
+    ('guarded_execute', 5), ('view_block', 3), ('nested_do', 2), ('seed', 6), ('comment', 2),
+)
+
+
+def _literal(s):
+    return "'" + s.replace("'", "''") + "'"
+
+
+class Corpus:
+    """Yields template units (lists of statement texts) from a seeded RNG."""
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        self.n = 0
+        self.tables = []
+        self.seedable = []  # tables with the data_0 JSONB column the seed template fills
+        self.enums = []
+        kinds, weights = zip(*MIX)
+        self.kinds = kinds
+        self.weights = weights
+
+    def _name(self, kind):
+        self.n += 1
+        return f"{self.rng.choice(NOUNS)}_{self.n}" if kind == 'table' else f"{kind}_{self.n}"
+
+    def _table(self):
+        return self.rng.choice(self.tables)
+
+    def _labels(self, k):
+        # 'pending' is always a label: status columns default to it
+        return [STATUS_LABELS[0]] + self.rng.sample(STATUS_LABELS[1:], k - 1)
+
+    def unit(self):
+        kind = self.rng.choices(self.kinds, self.weights)[0]
+        if kind in ('rls', 'index', 'guarded_execute', 'view_block') and not self.tables:
+            kind = 'table'
+        if kind == 'seed' and not self.seedable:
+            kind = 'table'
+        return getattr(self, kind)()
+
+    def table(self):
+        name = self._name('table')
+        self.tables.append(name)
+        cols = ['    id UUID PRIMARY KEY DEFAULT gen_random_uuid()',
+                '    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE',
+                '    name TEXT NOT NULL']
+        if self.enums and self.rng.random() < 0.5:
+            cols.append(f"    status {self.rng.choice(self.enums)} DEFAULT 'pending'")
+        for k in range(self.rng.randint(1, 6)):
+            cols.append(self.rng.choice((
+                f'    notes_{k} TEXT', f'    count_{k} INTEGER DEFAULT 0 CHECK (count_{k} >= 0)',
+                f"    data_{k} JSONB DEFAULT '{{}}'::jsonb", f'    flag_{k} BOOLEAN DEFAULT false',
+                f'    score_{k} DECIMAL(5,2)')))
+            if self.tables[:-1] and self.rng.random() < 0.2:
+                cols.append(f'    parent_{k}_id UUID REFERENCES public.{self.rng.choice(self.tables[:-1])}(id)')
+        if any(c.startswith('    data_0 ') for c in cols):
+            self.seedable.append(name)
+        cols += ['    created_at TIMESTAMPTZ DEFAULT NOW()', '    updated_at TIMESTAMPTZ DEFAULT NOW()']
+        out = [f"CREATE TABLE IF NOT EXISTS public.{name} (\n" + ',\n'.join(cols) + "\n);"]
+        if self.rng.random() < 0.5:
+            out.append(f"CREATE TRIGGER update_{name}_updated_at\n    BEFORE UPDATE ON public.{name}\n"
+                       f"    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();")
+        if self.rng.random() < 0.3:
+            out.append(f"COMMENT ON TABLE public.{name} IS {_literal('Stores ' + name.replace('_', ' '))};")
+        return out
+
+    def enum(self):
+        name = self._name('status_type')
+        self.enums.append(name)
+        labels = ', '.join(_literal(x) for x in self._labels(self.rng.randint(2, 6)))
+        if self.rng.random() < 0.6:
+            return [f"DO $do$\nBEGIN\n  IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = '{name}') THEN\n"
+                    f"    CREATE TYPE {name} AS ENUM ({labels});\n  END IF;\nEND\n$do$;"]
+        return [f"DO $$ BEGIN\n    CREATE TYPE {name} AS ENUM ({labels});\n"
+                f"EXCEPTION\n    WHEN duplicate_object THEN null;\nEND $$;"]
+
+    def function(self):
+        name = self._name('update_fn')
+        tag = self.rng.choice(('$$', '$$', '$function$', '$body$'))
+        lines = ['BEGIN', '    NEW.updated_at = NOW();']
+        if self.tables and self.rng.random() < 0.5:
+            t = self._table()
+            lines[1:1] = ["    IF NEW.status = 'completed' AND (OLD.status IS NULL OR OLD.status != 'completed') THEN",
+                          f'        UPDATE public.{t} SET updated_at = NOW() WHERE id = NEW.id;',
+                          '    END IF;']
+        lines += ['    RETURN NEW;', 'END;']
+        security = ' SECURITY DEFINER' if self.rng.random() < 0.3 else ''
+        return [f"CREATE OR REPLACE FUNCTION public.{name}()\nRETURNS TRIGGER AS {tag}\n" + '\n'.join(lines)
+                + f"\n{tag} LANGUAGE plpgsql{security};"]
+
+    def rls(self):
+        t = self._table()
+        out = [f"ALTER TABLE public.{t} ENABLE ROW LEVEL SECURITY;"]
+        for action in self.rng.sample(ACTIONS, self.rng.randint(1, 4)):
+            policy = f'Users can {action.lower()} own {t}'
+            clause = 'WITH CHECK' if action == 'INSERT' else 'USING'
+            out.append(f'DROP POLICY IF EXISTS "{policy}" ON public.{t};')
+            out.append(f'CREATE POLICY "{policy}"\n    ON public.{t} FOR {action}\n    {clause} (auth.uid() = user_id);')
+        return out
+
+    def index(self):
+        t = self._table()
+        col = self.rng.choice(('user_id', 'created_at', 'name', 'updated_at'))
+        unique = 'UNIQUE ' if self.rng.random() < 0.1 else ''
+        return [f"CREATE {unique}INDEX IF NOT EXISTS idx_{t}_{col} ON public.{t}({col});"]
+
+    def guarded_execute(self):
+        t = self._table()
+        col = self.rng.choice(('user_id', 'created_at', 'name'))
+        idx = f'idx_{t}_{col}_{self.n}'
+        if self.rng.random() < 0.5:
+            inner = f"EXECUTE 'CREATE INDEX {idx} ON public.{t}({col})';"
+        else:
+            inner = f"EXECUTE $create$CREATE INDEX {idx} ON public.{t}({col})$create$;"
+        return [f"DO $$\nBEGIN\n  IF NOT EXISTS (SELECT 1 FROM pg_class WHERE relname = '{idx}' AND relkind = 'i') THEN\n"
+                f"    {inner}\n  END IF;\nEND $$ LANGUAGE plpgsql;"]
+
+    def view_block(self):
+        t = self._table()
+        view = self._name('view')
+        return [f"DO $$\nBEGIN\n  IF to_regclass('public.{t}') IS NOT NULL THEN\n    EXECUTE $VIEW$\n"
+                f"      CREATE OR REPLACE VIEW public.{view} AS\n      SELECT user_id, count(*) AS samples,\n"
+                f"        max(created_at) AS last_at\n      FROM public.{t}\n      GROUP BY user_id;\n"
+                f"    $VIEW$;\n  END IF;\nEND\n$$;"]
+
+    def nested_do(self):
+        name = self._name('status_type')
+        self.enums.append(name)
+        labels = ', '.join(_literal(x) for x in self._labels(3)).replace("'", "''")
+        return [f"DO $outer$\nBEGIN\n  EXECUTE $wrap$\n    DO $$\n    BEGIN\n"
+                f"      IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = '{name}') THEN\n"
+                f"        EXECUTE 'CREATE TYPE {name} AS ENUM ({labels})';\n      END IF;\n    END $$;\n"
+                f"  $wrap$;\nEND $outer$;"]
+
+    def seed(self):
+        t = self.rng.choice(self.seedable)
+        literal = self.rng.random() < 0.5
+        rows = []
+        for _ in range(self.rng.randint(2, 12)):
+            label = ' '.join(self.rng.sample(WORDS, 2))
+            data = '{"steps": [' + ', '.join(f'{{"title": "{w}", "minutes": {self.rng.randint(1, 30)}}}'
+                                             for w in self.rng.sample(WORDS, 2)).replace("'", "''") + ']}'
+            if literal:
+                # seed files with fixed ids and timestamps: every value a constant
+                ident = "'%08x-0000-4000-8000-%012x'" % (self.n, self.rng.getrandbits(48))
+                created = f"'2025-{self.rng.randint(1, 12):02d}-{self.rng.randint(1, 28):02d} 09:00:00+00'"
+            else:
+                ident, created = 'gen_random_uuid()', 'NOW()'
+            rows.append(f"  ({ident}, '00000000-0000-0000-0000-000000000000', {_literal(label)}, "
+                        f"'{data}'::jsonb, {created})")
+        return [f"INSERT INTO public.{t} (id, user_id, name, data_0, created_at) VALUES\n" + ',\n'.join(rows)
+                + "\nON CONFLICT DO NOTHING;"]
+
+    def comment(self):
+        title = self.rng.choice(NOUNS).replace('_', ' ').upper()
+        return [f"-- =============================================\n-- {title}\n"
+                f"-- =============================================\nSELECT 1;"]
+
+
+def generate(statements, seed=0, fix_file=False):
+    """Yield text chunks of a corpus with (at least) `statements` statements."""
+    corpus = Corpus(seed)
+    yield f"-- Synthetic migration corpus: {statements} statements, seed {seed} (scripts/gen_corpus.py)\n\n"
+    yield ("CREATE OR REPLACE FUNCTION update_updated_at_column()\nRETURNS TRIGGER AS $$\nBEGIN\n"
+           "    NEW.updated_at = NOW();\n    RETURN NEW;\nEND;\n$$ LANGUAGE plpgsql;\n\n")
+    count = 1
+    while count < statements:
+        stmts = corpus.unit()
+        if fix_file:
+            yield (f"-- PROPOSED FIX: Reassembled function for failing statement {count + 1} "
+                   f"(original statements {count + 1}..{count + len(stmts)})\n")
+        count += len(stmts)
+        yield '\n\n'.join(stmts) + '\n\n'
+
+
+def main():
+    p = argparse.ArgumentParser(description='Generate a synthetic migration corpus')
+    p.add_argument('--statements', type=int, default=10000, help='Approximate statement count (default 10000)')
+    p.add_argument('--seed', type=int, default=0)
+    p.add_argument('--fix-file', action='store_true', help='Group statements into PROPOSED FIX blocks')
+    p.add_argument('--out', default='-', help='Output path (default: stdout)')
+    args = p.parse_args()
+
+    if args.out == '-':
+        for chunk in generate(args.statements, args.seed, args.fix_file):
+            sys.stdout.write(chunk)
+        return
+    out = Path(args.out)
+    size = 0
+    with out.open('w', encoding='utf-8', newline='\n') as f:
+        for chunk in generate(args.statements, args.seed, args.fix_file):
+            f.write(chunk)
+            size += len(chunk)
+    print(f"Wrote {out} ({size / 1e6:.1f} MB)")
+
+
+if __name__ == '__main__':
+    main()
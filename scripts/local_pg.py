@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+"""Throwaway local Postgres for replaying migrations, one template clone per run.
+
+Every repair iteration used to run against the hosted Supabase database
+because there was no cheap way to get a clean one. This harness:
+
+- runs `initdb` into a temporary directory and starts the server with
+  `pg_ctl` on a free 127.0.0.1 port (trust auth, user postgres, fsync and
+  synchronous commit off: nothing here needs to survive a crash)
+- installs Supabase-compatible stand-ins: the anon / authenticated /
+  service_role / authenticator roles, an `extensions` schema on the search
+  path (uuid-ossp and pgcrypto when the server has them, a
+  gen_random_uuid() based uuid_generate_v4() otherwise), `auth.users`,
+  `auth.identities` and the `auth.uid()` / `auth.role()` / `auth.email()` /
+  `auth.jwt()` functions reading the same `request.jwt.claim*` settings as
+  on Supabase, and the default privileges Supabase grants on `public`
+- builds a template database from those stubs plus the `--baseline` files
+  and marks it IS_TEMPLATE
+- gives every run its own `CREATE DATABASE ... TEMPLATE` clone (a file copy,
+  milliseconds for a schema-sized database), applies the `--file`s to it and
+  drops it; runs are independent, so `--workers` of them go in parallel
+
+Statements are numbered as in run_sql.py (statement_index.py sidecar) and
+applied with statement_batcher.py batches, so a failing statement is reported
+with its own number while the rest keep going. Each run's catalog is
+fingerprinted (schema_fingerprint.py); runs that disagree point at a
+migration that depends on something other than its input.
+
+initdb / pg_ctl come from `--bindir`, $PG_BINDIR, `pg_config --bindir`, PATH or
+/usr/lib/postgresql/*/bin. initdb refuses to run as root.
+
+Usage:
+  python scripts/local_pg.py run                                  # replay all migrations on a fresh clone
+  python scripts/local_pg.py run --baseline supabase/migrations/00[1-9]_*.sql \\
+      --file supabase/migrations/20251120_collaboration_delta.sql --runs 8 --workers 4
+  python scripts/local_pg.py up --baseline supabase/migrations/MIGRATIONS_BUNDLE.sql
+  python scripts/local_pg.py clone try1        # prints the DSN and run_sql.py flags
+  python scripts/local_pg.py drop try1
+  python scripts/local_pg.py down
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import psycopg2
+
+from run_sql_fanout import is_only_comments
+from schema_fingerprint import build_tree
+from schema_model import migration_files
+from statement_batcher import AimdBatcher, batchable, replay, run_batch
+from statement_index import StatementIndex
+from verify_schema import fetch_catalog
+
+ROOT = Path(__file__).resolve().parent
+STATE = ROOT / '.local_pg.json'
+REPORT = ROOT / 'local_pg_report.json'
+TEMPLATE = 'baseline_template'
+
+SERVER_SETTINGS = {
+    'listen_addresses': "'127.0.0.1'",
+    'unix_socket_directories': "''",
+    'fsync': 'off',
+    'synchronous_commit': 'off',
+    'full_page_writes': 'off',
+    'max_connections': '200',
+}
+
+# cluster-wide: roles and the search path Supabase gives them
+ROLES_SQL = """
+CREATE ROLE anon NOLOGIN NOINHERIT;
+CREATE ROLE authenticated NOLOGIN NOINHERIT;
+CREATE ROLE service_role NOLOGIN NOINHERIT BYPASSRLS;
+CREATE ROLE authenticator LOGIN NOINHERIT;
+GRANT anon, authenticated, service_role TO authenticator;
+ALTER ROLE postgres SET search_path TO "$user", public, extensions;
+ALTER ROLE anon SET search_path TO "$user", public, extensions;
+ALTER ROLE authenticated SET search_path TO "$user", public, extensions;
+ALTER ROLE service_role SET search_path TO "$user", public, extensions;
+"""
+
+# per database (goes into the template)
+AUTH_SQL = """
+CREATE SCHEMA IF NOT EXISTS extensions;
+GRANT USAGE ON SCHEMA extensions TO anon, authenticated, service_role;
+CREATE SCHEMA auth;
+GRANT USAGE ON SCHEMA auth TO anon, authenticated, service_role;
+
+CREATE TABLE auth.users (
+  instance_id uuid,
+  id uuid PRIMARY KEY,
+  aud varchar(255),
+  role varchar(255),
+  email varchar(255),
+  encrypted_password varchar(255),
+  email_confirmed_at timestamptz,
+  invited_at timestamptz,
+  confirmation_token varchar(255),
+  confirmation_sent_at timestamptz,
+  recovery_token varchar(255),
+  recovery_sent_at timestamptz,
+  email_change_token_new varchar(255),
+  email_change varchar(255),
+  email_change_sent_at timestamptz,
+  last_sign_in_at timestamptz,
+  raw_app_meta_data jsonb,
+  raw_user_meta_data jsonb,
+  is_super_admin boolean,
+  created_at timestamptz,
+  updated_at timestamptz,
+  phone text UNIQUE,
+  phone_confirmed_at timestamptz,
+  banned_until timestamptz,
+  deleted_at timestamptz,
+  is_anonymous boolean NOT NULL DEFAULT false
+);
+CREATE TABLE auth.identities (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  provider_id text NOT NULL,
+  user_id uuid NOT NULL REFERENCES auth.users (id) ON DELETE CASCADE,
+  identity_data jsonb NOT NULL,
+  provider text NOT NULL,
+  last_sign_in_at timestamptz,
+  created_at timestamptz,
+  updated_at timestamptz,
+  UNIQUE (provider_id, provider)
+);
+
+CREATE FUNCTION auth.jwt() RETURNS jsonb LANGUAGE sql STABLE AS $$
+  SELECT coalesce(nullif(current_setting('request.jwt.claim', true), ''),
+                  nullif(current_setting('request.jwt.claims', true), ''))::jsonb
+$$;
+CREATE FUNCTION auth.uid() RETURNS uuid LANGUAGE sql STABLE AS $$
+  SELECT coalesce(nullif(current_setting('request.jwt.claim.sub', true), ''),
+                  (nullif(current_setting('request.jwt.claims', true), '')::jsonb ->> 'sub'))::uuid
+$$;
+CREATE FUNCTION auth.role() RETURNS text LANGUAGE sql STABLE AS $$
+  SELECT coalesce(nullif(current_setting('request.jwt.claim.role', true), ''),
+                  (nullif(current_setting('request.jwt.claims', true), '')::jsonb ->> 'role'))::text
+$$;
+CREATE FUNCTION auth.email() RETURNS text LANGUAGE sql STABLE AS $$
+  SELECT coalesce(nullif(current_setting('request.jwt.claim.email', true), ''),
+                  (nullif(current_setting('request.jwt.claims', true), '')::jsonb ->> 'email'))::text
+$$;
+GRANT EXECUTE ON ALL FUNCTIONS IN SCHEMA auth TO anon, authenticated, service_role;
+
+GRANT USAGE ON SCHEMA public TO anon, authenticated, service_role;
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL ON TABLES TO anon, authenticated, service_role;
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL ON SEQUENCES TO anon, authenticated, service_role;
+ALTER DEFAULT PRIVILEGES IN SCHEMA public GRANT ALL ON FUNCTIONS TO anon, authenticated, service_role;
+"""
+
+# used when the server was built without contrib
+UUID_FALLBACK_SQL = """
+CREATE FUNCTION extensions.uuid_generate_v4() RETURNS uuid LANGUAGE sql VOLATILE AS 'SELECT gen_random_uuid()';
+"""
+
+
+def find_bindir(bindir=None):
+    """Directory holding initdb and pg_ctl."""
+    candidates = [bindir, os.environ.get('PG_BINDIR')]
+    pg_config = shutil.which('pg_config')
+    if pg_config:
+        try:
+            candidates.append(subprocess.run([pg_config, '--bindir'], capture_output=True, text=True,
+                                             timeout=10).stdout.strip())
+        except (OSError, subprocess.SubprocessError):
+            pass
+    initdb = shutil.which('initdb')
+    if initdb:
+        candidates.append(os.path.dirname(initdb))
+    # Debian / Ubuntu packages, newest major version first
+    candidates += sorted(glob.glob('/usr/lib/postgresql/*/bin'), reverse=True,
+                         key=lambda p: [int(x) for x in re.findall(r'\d+', Path(p).parent.name)])
+    for path in candidates:
+        if path and any(Path(path, exe).exists() for exe in ('initdb', 'initdb.exe')):
+            return str(path)
+    raise RuntimeError('initdb not found; pass --bindir or set PG_BINDIR')
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _quote_ident(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class LocalCluster:
+    """A temporary initdb cluster; use as a context manager to have it stopped and deleted."""
+
+    def __init__(self, bindir=None, workdir=None, port=None, keep=False):
+        self.bindir = find_bindir(bindir)
+        self.workdir = Path(workdir) if workdir else None
+        self.port = port
+        self.keep = keep
+        self.version = 0
+
+    @property
+    def datadir(self):
+        return self.workdir / 'data'
+
+    def _tool(self, name, *args):
+        proc = subprocess.run([str(Path(self.bindir, name)), *args], capture_output=True, text=True)
+        if proc.returncode:
+            raise RuntimeError(f"{name} failed ({proc.returncode}): {(proc.stderr or proc.stdout).strip()}")
+        return proc.stdout
+
+    def start(self):
+        t0 = time.perf_counter()
+        if self.workdir is None:
+            self.workdir = Path(tempfile.mkdtemp(prefix='local_pg_'))
+        self.port = self.port or _free_port()
+        self._tool('initdb', '-D', str(self.datadir), '-U', 'postgres', '-A', 'trust', '-E', 'UTF8',
+                   '--locale=C', '--no-sync')
+        with (self.datadir / 'postgresql.conf').open('a', encoding='utf-8') as f:
+            f.write('\n# local_pg.py\n')
+            f.write(f"port = {self.port}\n")
+            f.writelines(f"{key} = {value}\n" for key, value in SERVER_SETTINGS.items())
+        self._tool('pg_ctl', '-D', str(self.datadir), '-l', str(self.workdir / 'server.log'), '-w', 'start')
+        conn = self.connect('postgres')
+        try:
+            self.version = conn.server_version
+            with conn.cursor() as cur:
+                cur.execute(ROLES_SQL)
+        finally:
+            conn.close()
+        return time.perf_counter() - t0
+
+    def stop(self):
+        if self.workdir is None:
+            return
+        if (self.datadir / 'postmaster.pid').exists():
+            self._tool('pg_ctl', '-D', str(self.datadir), '-m', 'immediate', '-w', 'stop')
+        if not self.keep:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+
+    def __enter__(self):
+        try:
+            self.start()
+        except BaseException:
+            self.stop()  # __exit__ does not run when __enter__ fails
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def conn_params(self, dbname):
+        return dict(host='127.0.0.1', port=self.port, user='postgres', dbname=dbname, sslmode='disable')
+
+    def dsn(self, dbname):
+        return ' '.join(f"{k}={v}" for k, v in self.conn_params(dbname).items())
+
+    def connect(self, dbname):
+        conn = psycopg2.connect(**self.conn_params(dbname))
+        conn.autocommit = True
+        return conn
+
+    def _admin(self, sql):
+        conn = self.connect('postgres')
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql)
+        finally:
+            conn.close()
+
+    def build_template(self, baseline=(), name=TEMPLATE):
+        """Create `name` with the Supabase stubs and the baseline files; returns [(file, n, error)]."""
+        self._admin(f"CREATE DATABASE {_quote_ident(name)}")
+        conn = self.connect(name)
+        try:
+            with conn.cursor() as cur:
+                cur.execute(AUTH_SQL)
+                cur.execute("SELECT name FROM pg_available_extensions WHERE name IN ('uuid-ossp', 'pgcrypto')")
+                available = {row[0] for row in cur.fetchall()}
+                for ext in sorted(available):
+                    cur.execute(f'CREATE EXTENSION IF NOT EXISTS "{ext}" WITH SCHEMA extensions')
+                if 'uuid-ossp' not in available:
+                    cur.execute(UUID_FALLBACK_SQL)
+        finally:
+            conn.close()
+        errors = apply_files(lambda: self.connect(name), baseline)
+        self._admin(f"ALTER DATABASE {_quote_ident(name)} WITH IS_TEMPLATE true ALLOW_CONNECTIONS false")
+        return errors
+
+    def clone(self, name, template=TEMPLATE):
+        # FILE_COPY skips WAL-logging every block, which is what makes a clone take milliseconds
+        strategy = ' STRATEGY FILE_COPY' if self.version >= 150000 else ''
+        self._admin(f"CREATE DATABASE {_quote_ident(name)} TEMPLATE {_quote_ident(template)}{strategy}")
+
+    def drop(self, name):
+        force = ' WITH (FORCE)' if self.version >= 130000 else ''
+        self._admin(f"DROP DATABASE IF EXISTS {_quote_ident(name)}{force}")
+
+
+def apply_statements(connect, statements, batch_max=64):
+    """Run `statements` in order, batched, tolerating errors; returns [(statement number, error)].
+
+    Batchable statements share one connection; barriers (statement_batcher.batchable) each get a
+    fresh one, as in run_sql.py.
+    """
+    batcher = AimdBatcher(maximum=batch_max)
+    errors, pending = [], []
+    conn = connect()
+
+    def flush(final=True):
+        while pending and (final or len(pending) >= batcher.size):
+            chunk = pending[:batcher.size]
+            del pending[:len(chunk)]
+            try:
+                run_batch(conn, [stmt for _, stmt in chunk])
+                batcher.success()
+            except psycopg2.Error:
+                batcher.failure()
+                for offset, _, error in replay(conn, [stmt for _, stmt in chunk], stop_on_error=False):
+                    if error is not None:
+                        errors.append((chunk[offset][0], str(error).strip()))
+
+    try:
+        for n, stmt in enumerate(statements, start=1):
+            if is_only_comments(stmt):
+                continue
+            if batchable(stmt):
+                pending.append((n, stmt))
+                flush(final=False)
+                continue
+            flush()
+            single = connect()
+            try:
+                with single.cursor() as cur:
+                    cur.execute(stmt)
+            except psycopg2.Error as exc:
+                errors.append((n, str(exc).strip()))
+            finally:
+                single.close()
+        flush()
+    finally:
+        conn.close()
+    return errors
+
+
+def apply_files(connect, paths):
+    """apply_statements() over several files in order; returns [(file, statement number, error)]."""
+    errors = []
+    for path in paths:
+        statements = StatementIndex.load(path).all()
+        errors += [(str(path), n, error) for n, error in apply_statements(connect, statements)]
+    return errors
+
+
+def replay_run(cluster, name, files, keep=False):
+    """Clone the template into `name`, apply `files`, fingerprint and drop it; returns the run summary."""
+    t0 = time.perf_counter()
+    cluster.clone(name)
+    t1 = time.perf_counter()
+    errors = apply_files(lambda: cluster.connect(name), files)
+    t2 = time.perf_counter()
+    fingerprint = build_tree(fetch_catalog(cluster.conn_params(name)))['hash']
+    t3 = time.perf_counter()
+    if not keep:
+        cluster.drop(name)
+    return {
+        'database': name,
+        'clone_s': round(t1 - t0, 3),
+        'apply_s': round(t2 - t1, 3),
+        'fingerprint_s': round(t3 - t2, 3),
+        'drop_s': round(time.perf_counter() - t3, 3),
+        'fingerprint': fingerprint,
+        'errors': [{'file': f, 'n': n, 'error': e} for f, n, e in errors],
+    }
+
+
+def _print_errors(errors, limit=5):
+    for f, n, error in errors[:limit]:
+        print(f"    {Path(f).name}:{n}: {error.splitlines()[0]}")
+    if len(errors) > limit:
+        print(f"    ... {len(errors) - limit} more")
+
+
+def cmd_run(args):
+    files = [Path(f) for f in args.file] or migration_files()
+    t0 = time.perf_counter()
+    with LocalCluster(args.bindir, keep=args.keep) as cluster:
+        booted = time.perf_counter() - t0
+        t1 = time.perf_counter()
+        baseline_errors = cluster.build_template(args.baseline)
+        print(f"Cluster on port {cluster.port} ({cluster.workdir}) up in {booted:.2f}s; "
+              f"template from {len(args.baseline)} baseline files in {time.perf_counter() - t1:.2f}s")
+        if baseline_errors:
+            print(f"  {len(baseline_errors)} baseline statements failed:")
+            _print_errors(baseline_errors)
+        names = [f"run_{i}" for i in range(1, args.runs + 1)]
+        with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+            runs = list(pool.map(lambda name: replay_run(cluster, name, files, args.keep), names))
+    total = time.perf_counter() - t0
+
+    for run in runs:
+        print(f"{run['database']}: clone {run['clone_s']:.3f}s, apply {run['apply_s']:.2f}s, "
+              f"drop {run['drop_s']:.3f}s, {len(run['errors'])} failed statements, schema {run['fingerprint'][:12]}")
+        _print_errors([(e['file'], e['n'], e['error']) for e in run['errors']])
+    fingerprints = {run['fingerprint'] for run in runs}
+    if len(fingerprints) > 1:
+        print(f"WARNING: the {len(runs)} runs produced {len(fingerprints)} different schemas")
+    print(f"{len(runs)} runs of {len(files)} files in {total:.2f}s including cluster setup and teardown")
+
+    out = Path(args.report)
+    out.write_text(json.dumps({'files': [str(f) for f in files], 'baseline': list(args.baseline),
+                              'baseline_errors': [{'file': f, 'n': n, 'error': e} for f, n, e in baseline_errors],
+                              'runs': runs, 'seconds': round(total, 3)}, indent=2) + '\n', encoding='utf-8')
+    print('Wrote', out)
+    if args.strict and any(run['errors'] for run in runs):
+        raise SystemExit(1)
+
+
+def _attach():
+    """The cluster started by `up`, from the state file."""
+    try:
+        state = json.loads(STATE.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        raise SystemExit(f"No running cluster ({STATE.name} missing); start one with `up`")
+    cluster = LocalCluster(state['bindir'], state['workdir'], state['port'])
+    cluster.version = state['version']
+    return cluster
+
+
+def main():
+    p = argparse.ArgumentParser(description='Throwaway local Postgres with Supabase stubs and template clones')
+    p.add_argument('--bindir', help='Directory with initdb and pg_ctl')
+    sub = p.add_subparsers(dest='cmd', required=True)
+
+    r = sub.add_parser('run', help='Boot a cluster, replay files on template clones, tear everything down')
+    r.add_argument('--file', action='append', default=[], help='SQL file to replay per run, in order '
+                   '(repeatable; default: the numbered migrations)')
+    r.add_argument('--baseline', nargs='*', default=[], help='SQL files baked into the template first')
+    r.add_argument('--runs', type=int, default=1, help='Number of clones to replay on (default 1)')
+    r.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1),
+                   help='Runs in parallel (default: 4 or the CPU count if lower)')
+    r.add_argument('--keep', action='store_true', help='Keep the cluster directory and the run databases')
+    r.add_argument('--strict', action='store_true', help='Exit 1 when any statement failed')
+    r.add_argument('--report', default=str(REPORT), help=f'Where to write the JSON report (default: {REPORT.name})')
+
+    u = sub.add_parser('up', help='Boot a cluster and build the template; it keeps running until `down`')
+    u.add_argument('--baseline', nargs='*', default=[], help='SQL files baked into the template')
+    for name, help in (('clone', 'Create a database from the template and print how to reach it'),
+                       ('drop', 'Drop a cloned database')):
+        c = sub.add_parser(name, help=help)
+        c.add_argument('name')
+    sub.add_parser('down', help='Stop the cluster started by `up` and delete its directory')
+    args = p.parse_args()
+
+    try:
+        if args.cmd == 'run':
+            cmd_run(args)
+        elif args.cmd == 'up':
+            if STATE.exists():
+                raise SystemExit(f"A cluster is already up ({STATE.name}); `down` it first")
+            cluster = LocalCluster(args.bindir, keep=True)
+            try:
+                booted = cluster.start()
+                errors = cluster.build_template(args.baseline)
+            except BaseException:
+                cluster.keep = False
+                cluster.stop()
+                raise
+            STATE.write_text(json.dumps({'bindir': cluster.bindir, 'workdir': str(cluster.workdir),
+                                         'port': cluster.port, 'version': cluster.version}) + '\n', encoding='utf-8')
+            print(f"Cluster on port {cluster.port} ({cluster.workdir}) up in {booted:.2f}s; "
+                  f"template {TEMPLATE} built, {len(errors)} baseline statements failed")
+            _print_errors(errors)
+        elif args.cmd == 'clone':
+            cluster = _attach()
+            cluster.clone(args.name)
+            print(cluster.dsn(args.name))
+            print(f"run_sql.py --host 127.0.0.1 --port {cluster.port} --user postgres --password postgres "
+                  f"--dbname {args.name} --sslmode disable")
+        elif args.cmd == 'drop':
+            _attach().drop(args.name)
+        elif args.cmd == 'down':
+            _attach().stop()
+            STATE.unlink()
+    except RuntimeError as exc:
+        raise SystemExit(str(exc))
+
+
+if __name__ == '__main__':
+    main()
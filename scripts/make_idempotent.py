@@ -12,12 +12,12 @@ re-applying migration fragments.
 import re
 from pathlib import Path
 
+from block_index import BlockIndex, write_blocks
+
 ROOT = Path(__file__).resolve().parent
 IN = ROOT.joinpath('manual_review_fixes.sql')
 OUT = ROOT.joinpath('manual_review_fixes_idempotent.sql')
 
-text = IN.read_text(encoding='utf-8')
-
 def wrap_index(stmt):
     # Attempt to extract index name after CREATE [UNIQUE] INDEX [IF NOT EXISTS]
     m = re.search(r'CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:IF\s+NOT\s+EXISTS\s+)?(?P<name>"[^"]+"|\S+)', stmt, re.I)
@@ -68,17 +68,18 @@ def wrap_policy(stmt):
     return do
 
 
-def process(text):
-    # Split into top-level blocks by the PROPOSED FIX markers to preserve context
-    parts = re.split(r"(?m)^-- PROPOSED FIX: Reassembled function for failing statement (\d+)[^\n]*\n", text)
-    if len(parts) < 3:
+def split_statements(text):
+    # Naive split on a semicolon at the end of a line; used when the file has no PROPOSED FIX markers
+    return [s.strip() for s in re.split(r";\s*\n", text) if s.strip()]
+
+
+def process(path):
+    # Walk the PROPOSED FIX blocks via the sidecar index to preserve context
+    index = BlockIndex.load(path)
+    if not index.blocks:
         # no markers; operate on whole file by splitting statements by ;\n
-        stmts = re.split(r";\s*\n", text)
         out = []
-        for s in stmts:
-            s = s.strip()
-            if not s:
-                continue
+        for s in split_statements(path.read_text(encoding='utf-8')):
             s2 = s + ';' if not s.endswith(';') else s
             if re.search(r'^CREATE\s+(?:UNIQUE\s+)?INDEX', s2, re.I):
                 out.append(wrap_index(s2))
@@ -90,33 +91,36 @@ def process(text):
                 out.append(s2)
         return '\n\n'.join(out)
 
-    # parts: ['', idx1, block1, idx2, block2, ...]
-    out = parts[0]
-    for i in range(1, len(parts), 2):
-        idx = parts[i]
-        block = parts[i+1]
-        processed_block = block
-        # Replace index/trigger/policy statements inside the block
-        def repl(m):
-            stmt = m.group(0)
-            if re.search(r'^CREATE\s+(?:UNIQUE\s+)?INDEX', stmt, re.I):
-                return wrap_index(stmt)
-            if re.search(r'^CREATE\s+TRIGGER', stmt, re.I):
-                return wrap_trigger(stmt)
-            if re.search(r'^CREATE\s+POLICY', stmt, re.I):
-                return wrap_policy(stmt)
-            return stmt
-
-        # Use a regex to find top-level CREATE INDEX/TRIGGER/POLICY statements ending with a semicolon
-        processed_block = re.sub(r"(?s)(CREATE\s+(?:UNIQUE\s+)?INDEX[\s\S]*?;)", repl, processed_block, flags=re.I)
-        processed_block = re.sub(r"(?s)(CREATE\s+TRIGGER[\s\S]*?;)", repl, processed_block, flags=re.I)
-        processed_block = re.sub(r"(?s)(CREATE\s+POLICY[\s\S]*?;)", repl, processed_block, flags=re.I)
-
-        out += f"-- PROPOSED FIX: Reassembled function for failing statement {idx}\n" + processed_block
-
-    return out
-
-
-new = process(text)
-OUT.write_text(new, encoding='utf-8')
-print(f"Wrote idempotent output to {OUT}")
+    out = [index.prefix()]
+    with path.open('rb') as f:
+        for b in index.blocks:
+            processed_block = index.read(b, f)
+            # Replace index/trigger/policy statements inside the block
+            def repl(m):
+                stmt = m.group(0)
+                if re.search(r'^CREATE\s+(?:UNIQUE\s+)?INDEX', stmt, re.I):
+                    return wrap_index(stmt)
+                if re.search(r'^CREATE\s+TRIGGER', stmt, re.I):
+                    return wrap_trigger(stmt)
+                if re.search(r'^CREATE\s+POLICY', stmt, re.I):
+                    return wrap_policy(stmt)
+                return stmt
+
+            # Use a regex to find top-level CREATE INDEX/TRIGGER/POLICY statements ending with a semicolon
+            processed_block = re.sub(r"(?s)(CREATE\s+(?:UNIQUE\s+)?INDEX[\s\S]*?;)", repl, processed_block, flags=re.I)
+            processed_block = re.sub(r"(?s)(CREATE\s+TRIGGER[\s\S]*?;)", repl, processed_block, flags=re.I)
+            processed_block = re.sub(r"(?s)(CREATE\s+POLICY[\s\S]*?;)", repl, processed_block, flags=re.I)
+
+            out.append(index.header(b, f) + '\n' + processed_block)
+
+    return ''.join(out)
+
+
+def main():
+    new = process(IN)
+    write_blocks(OUT, new)
+    print(f"Wrote idempotent output to {OUT}")
+
+
+if __name__ == '__main__':
+    main()
@@ -12,6 +12,9 @@ This is intentionally conservative and may not preserve all semantics; review be
 import re
 from pathlib import Path
 
+from block_index import write_blocks
+from backup_store import save as backup
+
 ROOT = Path(__file__).resolve().parent
 ERRS = ROOT / 'migration_errors.txt'
 MANUAL = ROOT / 'manual_review_fixes.sql'
@@ -97,9 +100,8 @@ def replace_blocks(replacements: dict):
         else:
             out.append(f"-- PROPOSED FIX: Reassembled function for failing statement {bid}\n")
             out.append(block)
-    bak = MANUAL.parent.joinpath(MANUAL.name + '.manual_batch_fix10.bak')
-    MANUAL.replace(bak)
-    MANUAL.write_text(''.join(out), encoding='utf-8')
+    backup(MANUAL, label='manual_batch_fix_10')
+    write_blocks(MANUAL, ''.join(out))
     return len(replacements)
 
 def main():
@@ -121,7 +123,7 @@ def main():
         reps[bid] = cleaned
     if reps:
         replaced = replace_blocks(reps)
-        print('Replaced', replaced, 'blocks in manual_review_fixes.sql (backup created)')
+        print('Replaced', replaced, 'blocks in manual_review_fixes.sql (previous version in scripts/backups)')
 
 if __name__ == '__main__':
     main()
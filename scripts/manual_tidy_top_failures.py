@@ -18,6 +18,9 @@ import re
 import argparse
 from pathlib import Path
 
+from block_index import write_blocks
+from backup_store import save as backup
+
 ROOT = Path(__file__).resolve().parent
 MANUAL = ROOT / 'manual_review_fixes.sql'
 ERRS = ROOT / 'migration_errors.txt'
@@ -129,9 +132,8 @@ def replace_blocks_in_manual(replacements: dict):
         else:
             out.append(f"-- PROPOSED FIX: Reassembled function for failing statement {bid}\n")
             out.append(block)
-    bak = MANUAL.parent.joinpath(MANUAL.name + '.manual_tidy.bak')
-    MANUAL.replace(bak)
-    MANUAL.write_text(''.join(out), encoding='utf-8')
+    backup(MANUAL, label='manual_tidy_top_failures')
+    write_blocks(MANUAL, ''.join(out))
     return replaced
 
 def main():
@@ -158,7 +160,7 @@ def main():
         print('No replacements prepared')
         return
     replaced = replace_blocks_in_manual(replacements)
-    print(f'Replaced {replaced} blocks in {MANUAL} (backup at {MANUAL}.manual_tidy.bak)')
+    print(f'Replaced {replaced} blocks in {MANUAL} (previous version in scripts/backups)')
 
 if __name__ == '__main__':
     main()
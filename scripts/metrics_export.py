@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""OpenMetrics / Prometheus text exporter for the migration executors.
+
+A `MigrationMetrics` instance collects, for one run:
+- migration_statements_total{status=executed|skipped|tolerated|failed}
+- migration_statement_duration_seconds (histogram)
+- migration_connections_opened_total / migration_connection_errors_total
+- migration_connect_duration_seconds (histogram) and
+  migration_connections_open (gauge) for the per-statement connection "pool"
+- migration_run_duration_seconds and migration_run_completed
+
+It can be written atomically to a text file (for node_exporter's textfile
+collector or a CI artifact) and/or served from a local `/metrics` endpoint.
+Everything is standard library only, so it works offline.
+
+Usage (from a runner):
+  from metrics_export import add_metrics_args, metrics_from_args
+  add_metrics_args(parser)
+  metrics = metrics_from_args(args, script='run_sql', target=f"{host}/{dbname}")
+  metrics.observe_statement('executed', elapsed)
+  metrics.close(completed=True)
+"""
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+STATEMENT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+CONNECT_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATUSES = ('executed', 'skipped', 'tolerated', 'failed')
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in pairs) + '}'
+
+
+def _num(v) -> str:
+    if v == float('inf'):
+        return '+Inf'
+    if isinstance(v, float):
+        return repr(v)
+    return str(v)
+
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+
+    def samples(self, name, base_labels):
+        for upper, c in zip(self.buckets, self.counts):
+            yield f"{name}_bucket{_labels(base_labels + [('le', _num(float(upper)))])} {c}"
+        yield f"{name}_bucket{_labels(base_labels + [('le', '+Inf')])} {self.count}"
+        yield f"{name}_count{_labels(base_labels)} {self.count}"
+        yield f"{name}_sum{_labels(base_labels)} {_num(self.sum)}"
+
+
+class MigrationMetrics:
+    """Thread-safe metric set for a single executor run."""
+
+    def __init__(self, script, target='', textfile=None, flush_interval=5.0, clock=time.time):
+        self.labels = [('script', script), ('target', target)]
+        self.textfile = Path(textfile) if textfile else None
+        self.flush_interval = flush_interval
+        self._last_flush = None
+        self.clock = clock
+        self.started = clock()
+        self.finished = None
+        self.completed = 0
+        self.statements = {s: 0 for s in STATUSES}
+        self.statement_seconds = Histogram(STATEMENT_BUCKETS)
+        self.connect_seconds = Histogram(CONNECT_BUCKETS)
+        self.connections_opened = 0
+        self.connection_errors = 0
+        self.connections_open = 0
+        self.connections_open_max = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    # -- recording -------------------------------------------------------
+
+    def observe_statement(self, status, seconds=None):
+        if status not in self.statements:
+            raise ValueError(f"unknown status: {status}")
+        with self._lock:
+            self.statements[status] += 1
+            if seconds is not None and status != 'skipped':
+                self.statement_seconds.observe(seconds)
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        if self.textfile is None:
+            return
+        now = self.clock()
+        if self._last_flush is not None and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        self.write_textfile()
+
+    def wrap_connect(self, connect):
+        """Return a connect callable that records connect latency and open/close counts."""
+        metrics = self
+
+        def _connect():
+            t0 = time.perf_counter()
+            try:
+                conn = connect()
+            except Exception:
+                with metrics._lock:
+                    metrics.connection_errors += 1
+                raise
+            with metrics._lock:
+                metrics.connections_opened += 1
+                metrics.connect_seconds.observe(time.perf_counter() - t0)
+                metrics.connections_open += 1
+                metrics.connections_open_max = max(metrics.connections_open_max, metrics.connections_open)
+            return _TrackedConnection(conn, metrics)
+
+        return _connect
+
+    def _connection_closed(self):
+        with self._lock:
+            self.connections_open = max(self.connections_open - 1, 0)
+
+    # -- exposition ------------------------------------------------------
+
+    def render(self) -> str:
+        base = self.labels
+        with self._lock:
+            now = self.finished if self.finished is not None else self.clock()
+            out = []
+            out.append('# TYPE migration_statements counter')
+            out.append('# HELP migration_statements Statements processed by outcome.')
+            for status in STATUSES:
+                out.append(f"migration_statements_total{_labels(base + [('status', status)])} {self.statements[status]}")
+            out.append('# TYPE migration_statement_duration_seconds histogram')
+            out.append('# HELP migration_statement_duration_seconds Wall-clock time per executed statement.')
+            out.extend(self.statement_seconds.samples('migration_statement_duration_seconds', base))
+            out.append('# TYPE migration_connections_opened counter')
+            out.append('# HELP migration_connections_opened Database connections opened.')
+            out.append(f"migration_connections_opened_total{_labels(base)} {self.connections_opened}")
+            out.append('# TYPE migration_connection_errors counter')
+            out.append('# HELP migration_connection_errors Failed connection attempts.')
+            out.append(f"migration_connection_errors_total{_labels(base)} {self.connection_errors}")
+            out.append('# TYPE migration_connect_duration_seconds histogram')
+            out.append('# HELP migration_connect_duration_seconds Time spent establishing connections.')
+            out.extend(self.connect_seconds.samples('migration_connect_duration_seconds', base))
+            out.append('# TYPE migration_connections_open gauge')
+            out.append('# HELP migration_connections_open Connections currently open.')
+            out.append(f"migration_connections_open{_labels(base)} {self.connections_open}")
+            out.append('# TYPE migration_connections_open_max gauge')
+            out.append('# HELP migration_connections_open_max Peak concurrently open connections.')
+            out.append(f"migration_connections_open_max{_labels(base)} {self.connections_open_max}")
+            out.append('# TYPE migration_run_start_timestamp_seconds gauge')
+            out.append(f"migration_run_start_timestamp_seconds{_labels(base)} {_num(float(self.started))}")
+            out.append('# TYPE migration_run_duration_seconds gauge')
+            out.append(f"migration_run_duration_seconds{_labels(base)} {_num(float(now - self.started))}")
+            out.append('# TYPE migration_run_completed gauge')
+            out.append('# HELP migration_run_completed 1 once the run finished without halting.')
+            out.append(f"migration_run_completed{_labels(base)} {self.completed}")
+            out.append('# EOF')
+        return '\n'.join(out) + '\n'
+
+    def write_textfile(self, path=None):
+        """Atomically write the exposition to `path` (defaults to the configured textfile)."""
+        path = Path(path) if path else self.textfile
+        if path is None:
+            return None
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f'.{os.getpid()}.tmp')
+        tmp.write_text(self.render(), encoding='utf-8')
+        os.replace(tmp, path)
+        return path
+
+    def serve(self, port, host='127.0.0.1'):
+        """Serve `/metrics` from a daemon thread; returns the bound (host, port)."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, fmt, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server.server_address
+
+    def close(self, completed=False, linger=0):
+        """Mark the run finished, flush the textfile and stop the endpoint after `linger` seconds."""
+        with self._lock:
+            if self.finished is None:
+                self.finished = self.clock()
+            self.completed = 1 if completed else 0
+        path = self.write_textfile()
+        if path:
+            print(f"Wrote metrics to {path}")
+        if self._server is not None:
+            if linger > 0:
+                print(f"Serving final metrics for {linger}s on http://{self._server.server_address[0]}:{self._server.server_address[1]}/metrics")
+                time.sleep(linger)
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class _TrackedConnection:
+    """Thin proxy that reports close() back to the metrics."""
+
+    def __init__(self, conn, metrics):
+        self._conn = conn
+        self._metrics = metrics
+        self._closed = False
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self._metrics._connection_closed()
+        return self._conn.close()
+
+    def __enter__(self):
+        self._conn.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        # psycopg2's context manager ends the transaction but leaves the
+        # connection open; the runners treat the block as the connection's life.
+        try:
+            return self._conn.__exit__(*exc)
+        finally:
+            self.close()
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __setattr__(self, name, value):
+        if name.startswith('_'):
+            object.__setattr__(self, name, value)
+        else:
+            setattr(self._conn, name, value)
+
+
+def add_metrics_args(parser):
+    parser.add_argument('--metrics-file', default=None, help='Write OpenMetrics text to this path (rewritten as the run progresses and at the end).')
+    parser.add_argument('--metrics-port', type=int, default=0, help='Serve /metrics on 127.0.0.1:<port> while running (0 = off).')
+    parser.add_argument('--metrics-linger', type=int, default=0, help='Keep serving /metrics for N seconds after the run so a scrape can collect final values.')
+
+
+def metrics_from_args(args, script, target=''):
+    """Build a MigrationMetrics from parsed args, or None when no exporter was requested."""
+    if not args.metrics_file and not args.metrics_port:
+        return None
+    metrics = MigrationMetrics(script=script, target=target, textfile=args.metrics_file)
+    if args.metrics_port:
+        host, port = metrics.serve(args.metrics_port)
+        print(f"Serving metrics on http://{host}:{port}/metrics")
+    return metrics
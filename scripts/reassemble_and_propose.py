@@ -11,11 +11,9 @@ import re
 import sys
 from pathlib import Path
 
-try:
-    import sqlparse
-except Exception:
-    print("Missing dependency: install sqlparse in your venv (pip install sqlparse)")
-    raise
+from block_index import write_blocks
+from sql_lexer import split_statements
+from statement_index import StatementIndex
 
 ROOT = Path(__file__).resolve().parent
 MIGRATION = ROOT.parent.joinpath('supabase', 'migrations', '20251120_all_migrations_gap_fix.sql')
@@ -31,55 +29,23 @@ def load_failing_indices():
 
 
 def split_migration():
-    raw = MIGRATION.read_text(encoding='utf-8')
-    # Use sqlparse.split to get top-level statement chunks (same approach used previously)
-    stmts = sqlparse.split(raw)
-    return stmts
-
-
-def find_function_block(statements, target_index, max_back=2000, max_forward=2000):
-    # statements is a list; target_index is 1-based statement index from the runner
-    idx = target_index - 1
-    n = len(statements)
-
-    # Search backwards for a CREATE FUNCTION header
-    header_idx = None
-    for back in range(max_back):
-        j = idx - back
-        if j < 0:
-            break
-        s = statements[j].lstrip()
-        # Match several possible block headers (functions, DO $$ blocks, types, procedures)
-        if re.match(r'(?is)^(CREATE\s+(OR\s+REPLACE\s+)?FUNCTION|CREATE\s+TYPE|DO\s+\$\$|CREATE\s+OR\s+REPLACE\s+PROCEDURE)\b', s):
-            header_idx = j
-            break
-
-    if header_idx is None:
-        return None
-
-    # Search forward from header_idx to find the end of the dollar-quoted block
-    # Heuristic: collect until we observe the $$ terminator and a LANGUAGE clause
-    joined = ''
-    end_idx = header_idx
-    for fwd in range(max_forward):
-        if end_idx >= n:
-            break
-        joined += '\n' + statements[end_idx]
-        # Count occurrences of $$ in joined text. A complete dollar-quoted block will have at least 2
-        dollar_count = joined.count('$$')
-        # Also check for a LANGUAGE clause near $$
-        if dollar_count >= 2 and re.search(r'\$\$[^\n]*\bLANGUAGE\b', joined, flags=re.I):
-            return header_idx, end_idx
-        # Some functions may use $$; with LANGUAGE on same statement
-        if re.search(r'\$\$\s*;\s*$', statements[end_idx].strip()) and re.search(r'\bLANGUAGE\b', statements[end_idx-1] if end_idx-1>=0 else ''):
-            return header_idx, end_idx
-        end_idx += 1
-
-    # Fallback: if we saw '$$' twice anywhere in the forward window, accept that
-    if '$$' in joined:
-        return header_idx, min(n-1, header_idx + max_forward)
-
-    return None
+    # Top-level statement chunks as sqlparse.split numbers them (the runner's numbering),
+    # from the cached split index together with the enclosing-block map
+    return StatementIndex.load(MIGRATION)
+
+
+def find_function_block(index, target_index):
+    """0-based (header, end) statements of the function/DO/type/procedure block around `target_index`.
+
+    `target_index` is the 1-based statement index from the runner. The ranges come from one lexer
+    pass over the migration (statement_index.enclosing_blocks), so every lookup is O(1).
+    """
+    return index.block_of(target_index)
+
+
+def is_unterminated(block):
+    """True when `block` has a literal or dollar quote that never closes (it then runs to EOF)."""
+    return any(not t.terminated for stmt in split_statements(block) for t in stmt.tokens)
 
 
 def main(count_only=False):
@@ -92,7 +58,8 @@ def main(count_only=False):
         print("No failing statement indices found in failing_statements.sql")
         sys.exit(0)
 
-    stmts = split_migration()
+    index = split_migration()
+    stmts = index.all()
     total = len(stmts)
     print(f"Migration split into {total} statements; found {len(indices)} failing indices")
 
@@ -101,12 +68,13 @@ def main(count_only=False):
 
     out_lines = []
     meta = []
+    unterminated = {}  # (header, end) -> bool, for blocks that reach the end of the file
     for t in first_indices:
         if t < 1 or t > len(stmts):
             out_lines.append(f"-- MANUAL REVIEW: statement index out of range {t}\n")
             meta.append((t, None, None))
             continue
-        res = find_function_block(stmts, t)
+        res = find_function_block(index, t)
         if res is None:
             meta.append((t, None, None))
             out_lines.append(f"-- MANUAL REVIEW: Could not locate function header for statement {t}\n")
@@ -114,8 +82,21 @@ def main(count_only=False):
             out_lines.append(stmts[t-1].strip() + '\n\n')
             continue
         h, e = res
-        meta.append((t, h+1, e+1))
         block = '\n'.join(stmts[h:e+1]).strip()
+        if e == total - 1:
+            if (h, e) not in unterminated:
+                unterminated[(h, e)] = is_unterminated(block)
+                if unterminated[(h, e)]:
+                    print(f"WARNING: the block starting at statement {h+1} has an unterminated quote and "
+                          f"runs to the end of the file; not proposing it")
+            if unterminated[(h, e)]:
+                meta.append((t, None, None))
+                out_lines.append(f"-- MANUAL REVIEW: statement {t} is inside an unterminated block "
+                                 f"(statements {h+1}..{e+1}, end of file); close its dollar quote first\n")
+                out_lines.append(f"-- Original statement (index {t}):\n")
+                out_lines.append(stmts[t-1].strip() + '\n\n')
+                continue
+        meta.append((t, h+1, e+1))
         out_lines.append(f"-- PROPOSED FIX: Reassembled function for failing statement {t} (original statements {h+1}..{e+1})\n")
         out_lines.append(block)
         # Ensure single terminating semicolon
@@ -123,7 +104,7 @@ def main(count_only=False):
             out_lines.append(';')
         out_lines.append('\n\n')
 
-    OUT.write_text('\n'.join(out_lines), encoding='utf-8')
+    write_blocks(OUT, '\n'.join(out_lines))
     print(f"Wrote proposed fixes to {OUT}\nSummary (t -> header..end):")
     for m in meta:
         print(m)
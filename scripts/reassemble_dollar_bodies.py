@@ -13,6 +13,8 @@ Writes: `manual_review_fixes_reassembled.sql`.
 from pathlib import Path
 import re
 
+from block_index import write_blocks
+
 ROOT = Path(__file__).resolve().parent
 INPUT_CANDIDATES = [
     ROOT / 'manual_review_fixes_parsed.sql',
@@ -104,7 +106,7 @@ def main():
         out_blocks.append(f"-- PROPOSED FIX: {hdr}\n{new_body}\n")
 
     outp = ROOT / 'manual_review_fixes_reassembled.sql'
-    outp.write_text('\n'.join(out_blocks), encoding='utf-8')
+    write_blocks(outp, '\n'.join(out_blocks))
     print(f"Wrote {outp}")
 
 if __name__ == '__main__':
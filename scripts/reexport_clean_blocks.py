@@ -12,10 +12,12 @@ This script is conservative and creates backups.
 """
 import re
 from pathlib import Path
+
+from block_index import write_blocks
+from backup_store import save as backup
 ROOT = Path(__file__).resolve().parent
 AUTO = ROOT / 'manual_review_fixes_auto_repaired.sql'
 OUT = ROOT / 'manual_review_fixes_clean_export.sql'
-BACKUP = ROOT / 'manual_review_fixes_clean_export.sql.bak'
 
 if not AUTO.exists():
     print(f'Missing input file: {AUTO}')
@@ -100,11 +102,9 @@ for i in range(1, len(parts)-1, 3):
 
 # write combined output
 if OUT.exists():
-    if not BACKUP.exists():
-        OUT.replace(BACKUP)
-        print(f'Backed up existing {OUT} -> {BACKUP}')
+    print(f'Backed up existing {OUT} as version {backup(OUT, label="reexport_clean_blocks")[:12]}')
 
-OUT.write_text(out, encoding='utf-8')
+write_blocks(OUT, out)
 print(f'Wrote cleaned combined file: {OUT}')
 print(f'Wrote cleaned per-block files for IDs: {clean_ids[:20]} (total {len(clean_ids)})')
 print('Review the cleaned file before running the executor.')
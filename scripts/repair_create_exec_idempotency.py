@@ -5,16 +5,17 @@ make them idempotent inside DO blocks.
 
 Writes:
  - scripts/manual_review_fixes_idempotent_fixed2.sql (modified content)
- - also backs up original `manual_review_fixes.sql` to `manual_review_fixes.backup.sql`
+ - also backs up original `manual_review_fixes.sql` to the backup store (scripts/backups)
 
 This is a heuristic tool — review the output before applying to production.
 """
 import re
 from pathlib import Path
+
+from backup_store import save as backup
 ROOT = Path(__file__).resolve().parent
 INFILE = ROOT.joinpath('manual_review_fixes.sql')
 OUTFILE = ROOT.joinpath('manual_review_fixes_idempotent_fixed2.sql')
-BACKUP = ROOT.joinpath('manual_review_fixes.backup.sql')
 if not INFILE.exists():
     print(f"Input file not found: {INFILE}")
     raise SystemExit(1)
@@ -57,7 +58,7 @@ if nsub == 0:
     new_text, nsub2 = loose.subn(repl_loose, text)
     nsub = nsub2
 # Backup original
-BACKUP.write_text(text, encoding='utf-8')
+backup(INFILE, label='repair_create_exec_idempotency')
 OUTFILE.write_text(new_text, encoding='utf-8')
 # Also copy into manual_review_fixes.sql so apply script can pick it up
 OUT_MAIN = ROOT.joinpath('manual_review_fixes.sql')
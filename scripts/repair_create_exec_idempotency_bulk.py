@@ -13,10 +13,11 @@ import re
 from pathlib import Path
 import sys
 
+from backup_store import save as backup
+
 ROOT = Path(__file__).resolve().parent
 SRC = ROOT / "manual_review_fixes.sql"
 OUT = ROOT / "manual_review_fixes_idempotent_fixed3.sql"
-BAK = ROOT / "manual_review_fixes.sql.bak"
 
 if not SRC.exists():
     print(f"Source file not found: {SRC}")
@@ -110,9 +111,8 @@ if replacements == 0:
     print("No EXECUTE $$...$$ CREATE INDEX patterns found to replace.")
     sys.exit(0)
 
-# backup original if not already backed up
-if not BAK.exists():
-    BAK.write_text(text, encoding="utf-8")
+# backup original
+backup(SRC, label="repair_create_exec_idempotency_bulk")
 
 # write output and update working file
 OUT.write_text(new_text, encoding="utf-8")
@@ -11,10 +11,11 @@ import re
 from pathlib import Path
 import sys
 
+from backup_store import save as backup
+
 ROOT = Path(__file__).resolve().parent
 SRC = ROOT / "manual_review_fixes.sql"
 OUT = ROOT / "manual_review_fixes_idempotent_collapsed.sql"
-BAK = ROOT / "manual_review_fixes.sql.bak_aggressive"
 
 if not SRC.exists():
     print(f"Source file not found: {SRC}")
@@ -117,9 +118,8 @@ if total_replaced == 0:
     print("No additional nested DO blocks found to collapse.")
     sys.exit(0)
 
-# backup original if not already backed up
-if not BAK.exists():
-    BAK.write_text(SRC.read_text(encoding='utf-8'), encoding='utf-8')
+# backup original
+backup(SRC, label='repair_nested_do_collapse_aggressive')
 
 OUT.write_text(text, encoding='utf-8')
 SRC.write_text(text, encoding='utf-8')
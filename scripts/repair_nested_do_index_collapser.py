@@ -16,10 +16,11 @@ import re
 from pathlib import Path
 import sys
 
+from backup_store import save as backup
+
 ROOT = Path(__file__).resolve().parent
 SRC = ROOT / "manual_review_fixes.sql"
 OUT = ROOT / "manual_review_fixes_idempotent_fixed5.sql"
-BAK = ROOT / "manual_review_fixes.sql.bak3"
 
 if not SRC.exists():
     print(f"Source file not found: {SRC}")
@@ -121,8 +122,7 @@ if replacements == 0:
     sys.exit(0)
 
 # backup and write
-if not BAK.exists():
-    BAK.write_text(text, encoding='utf-8')
+backup(SRC, label='repair_nested_do_index_collapser')
 
 OUT.write_text(new_text, encoding='utf-8')
 SRC.write_text(new_text, encoding='utf-8')
@@ -14,10 +14,11 @@ import re
 from pathlib import Path
 import sys
 
+from backup_store import save as backup
+
 ROOT = Path(__file__).resolve().parent
 SRC = ROOT / "manual_review_fixes.sql"
 OUT = ROOT / "manual_review_fixes_idempotent_fixed4.sql"
-BAK = ROOT / "manual_review_fixes.sql.bak2"
 
 if not SRC.exists():
     print(f"Source file not found: {SRC}")
@@ -82,8 +83,7 @@ if new_text == text:
     sys.exit(0)
 
 # backup and write
-if not BAK.exists():
-    BAK.write_text(text, encoding="utf-8")
+backup(SRC, label="repair_nested_do_to_inner")
 
 OUT.write_text(new_text, encoding="utf-8")
 SRC.write_text(new_text, encoding="utf-8")
@@ -17,6 +17,8 @@ Writes: `manual_review_fixes_parser_repaired.sql`
 import re
 from pathlib import Path
 
+from block_index import write_blocks
+
 ROOT = Path(__file__).resolve().parent
 IN = ROOT / 'manual_review_fixes.sql'
 OUT = ROOT / 'manual_review_fixes_parser_repaired.sql'
@@ -141,5 +143,5 @@ for idx, block in entries:
 
     out.append(f"-- PROPOSED FIX: Reassembled function for failing statement {idx}\n{wrapped}\n")
 
-OUT.write_text(''.join(out), encoding='utf-8')
+write_blocks(OUT, ''.join(out))
 print(f'Wrote {OUT} ({len(entries)} blocks processed)')
@@ -12,6 +12,8 @@ Writes: `manual_review_fixes_parser_repaired_v2.sql`
 import re
 from pathlib import Path
 
+from block_index import write_blocks
+
 ROOT = Path(__file__).resolve().parent
 IN = ROOT / 'manual_review_fixes.sql'
 OUT = ROOT / 'manual_review_fixes_parser_repaired_v2.sql'
@@ -155,5 +157,5 @@ for idx, block in entries:
         wrapped = f"DO $wrap$\nBEGIN\n{repaired}\nEND $wrap$ LANGUAGE plpgsql;\n"
     out.append(f"-- PROPOSED FIX: Reassembled function for failing statement {idx}\n{wrapped}\n")
 
-OUT.write_text(''.join(out), encoding='utf-8')
+write_blocks(OUT, ''.join(out))
 print(f'Wrote {OUT} ({len(entries)} blocks processed)')
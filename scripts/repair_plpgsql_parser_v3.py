@@ -13,6 +13,8 @@ matching opener and closing intervening openers in a safe order.
 import re
 from pathlib import Path
 
+from block_index import write_blocks
+
 ROOT = Path(__file__).resolve().parent
 IN = ROOT / 'manual_review_fixes.sql'
 OUT = ROOT / 'manual_review_fixes_parser_repaired_v3.sql'
@@ -145,7 +147,7 @@ def main():
         out.append(f"-- PROPOSED FIX: Reassembled function for failing statement {idx}\n")
         out.append(wrapped)
 
-    OUT.write_text(''.join(out), encoding='utf-8')
+    write_blocks(OUT, ''.join(out))
     print(f'Wrote {OUT} ({len(entries)} blocks processed)')
 
 if __name__ == '__main__':
@@ -15,6 +15,8 @@ Strategy:
 import re
 from pathlib import Path
 
+from block_index import write_blocks
+
 ROOT = Path(__file__).resolve().parent
 IN = ROOT / 'manual_review_fixes.sql'
 OUT = ROOT / 'manual_review_fixes_parser_repaired_v4.sql'
@@ -179,7 +181,7 @@ def main():
             out.append(f"-- PROPOSED FIX: Reassembled function for failing statement {bid}\n")
             out.append(f"DO $wrap$\nBEGIN\n{repaired}\nEND $wrap$ LANGUAGE plpgsql;\n")
 
-    OUT.write_text(''.join(out), encoding='utf-8')
+    write_blocks(OUT, ''.join(out))
     print(f'Wrote {OUT} ({len(blocks)} blocks processed)')
 
 if __name__ == '__main__':
@@ -20,6 +20,8 @@ This is conservative and avoids inventing complex PL/pgSQL logic.
 from pathlib import Path
 import re
 
+from block_index import write_blocks
+
 ROOT = Path(__file__).resolve().parent
 PREFERENCE_FILES = [
     ROOT / 'manual_review_fixes_auto_repaired.sql',
@@ -190,7 +192,7 @@ def main():
         blocks.append(f"-- PROPOSED FIX: {hdr}\n{rewritten}\n")
 
     outp = ROOT / 'manual_review_fixes_rewritten.sql'
-    outp.write_text('\n'.join([header]+blocks), encoding='utf-8')
+    write_blocks(outp, '\n'.join([header]+blocks))
     print(f"Wrote {outp} with {len(blocks)} blocks")
 
 if __name__ == '__main__':
@@ -19,6 +19,8 @@ from pathlib import Path
 import re
 from typing import List, Tuple, Optional
 
+from block_index import write_blocks
+
 ROOT = Path(__file__).resolve().parent
 PREFERENCE = [
     ROOT / 'manual_review_fixes_rewritten.sql',
@@ -270,7 +272,7 @@ def main():
         out_blocks.append(f"-- PROPOSED FIX: {hdr}\n{new_body}\n")
 
     outp = ROOT / 'manual_review_fixes_parsed.sql'
-    outp.write_text('\n'.join(out_blocks), encoding='utf-8')
+    write_blocks(outp, '\n'.join(out_blocks))
     print(f"Wrote {outp} ({len(blocks)} blocks)")
 
 if __name__ == '__main__':
@@ -12,10 +12,11 @@ import re
 from pathlib import Path
 import sys
 
+from backup_store import save as backup
+
 ROOT = Path(__file__).resolve().parent
 SRC = ROOT / "manual_review_fixes.sql"
 OUT = ROOT / "manual_review_fixes_idempotent_unwrapped.sql"
-BAK = ROOT / "manual_review_fixes.sql.bak_unwrap"
 
 if not SRC.exists():
     print(f"Source file not found: {SRC}")
@@ -82,8 +83,7 @@ if replacements == 0:
     print("No DO blocks with EXECUTE CREATE found to unwrap.")
     sys.exit(0)
 
-if not BAK.exists():
-    BAK.write_text(SRC.read_text(encoding='utf-8'), encoding='utf-8')
+backup(SRC, label='repair_unwrap_execute_create_aggressive')
 
 OUT.write_text(new_text, encoding='utf-8')
 SRC.write_text(new_text, encoding='utf-8')
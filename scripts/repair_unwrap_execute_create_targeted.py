@@ -4,22 +4,22 @@ Targeted repair: find `EXECUTE $tag$CREATE TYPE <name> AS ENUM (...)$tag$;` and
 with a guarded DO block that checks pg_type and executes the CREATE TYPE if missing.
 
 Reads: `scripts/manual_review_fixes.sql`
-Writes: `scripts/manual_review_fixes_idempotent_repaired.sql` and backup `.bak`
+Writes: `scripts/manual_review_fixes_idempotent_repaired.sql` (the input is backed up to scripts/backups)
 """
 import re
 from pathlib import Path
 
+from backup_store import save as backup
+
 IN = Path("scripts/manual_review_fixes.sql")
 OUT = Path("scripts/manual_review_fixes_idempotent_repaired.sql")
-BAK = Path("scripts/manual_review_fixes.sql.bak")
 
 if not IN.exists():
     print(f"Input file not found: {IN}")
     raise SystemExit(1)
 
 text = IN.read_text(encoding="utf-8")
-BAK.write_text(text, encoding="utf-8")
-print(f"Wrote backup: {BAK}")
+print(f"Backed up {IN} as version {backup(IN, label='repair_unwrap_execute_create_targeted')[:12]}")
 
 # Match patterns like: EXECUTE $create$CREATE TYPE schema.name AS ENUM ('a','b');$create$;
 # We capture the dollar tag, the type name, and the enum body.
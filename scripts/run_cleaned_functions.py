@@ -19,6 +19,8 @@ except Exception as e:
     print('Missing dependency:', e)
     raise
 
+from block_index import BlockIndex
+
 ROOT = Path(__file__).resolve().parent
 INFILE = ROOT.joinpath('manual_review_fixes.sql')
 LOG = ROOT.joinpath('fix_rerun_log.txt')
@@ -33,13 +35,7 @@ parser.add_argument('--dbname', required=True)
 parser.add_argument('--limit', type=int, default=0)
 args = parser.parse_args()
 
-text = INFILE.read_text(encoding='utf-8')
-parts = re.split(r"(?m)^-- PROPOSED FIX: Reassembled function for failing statement (\d+)[^\n]*\n", text)
-entries = []
-for i in range(1, len(parts), 2):
-    idx = int(parts[i])
-    block = parts[i+1].strip()
-    entries.append((idx, block))
+entries = [(idx, block.strip()) for idx, block in BlockIndex.load(INFILE).entries()]
 
 if args.limit > 0:
     entries = entries[:args.limit]
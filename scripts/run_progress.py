@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""Live progress, throughput and latency tracking for long migration runs.
+
+`ProgressTracker` is fed one record per statement by the executors
+(`run_sql.py` and friends). It keeps running totals, a streaming latency
+histogram (fixed log-spaced buckets, so memory stays constant no matter how
+many statements run), the slowest-N statements and an ETA derived from the
+byte throughput so far. It renders a one-line status to the terminal and can
+dump the full summary as JSON at the end of the run.
+
+Usage (from another script):
+  from run_progress import ProgressTracker
+  progress = ProgressTracker(total=len(statements), total_bytes=sum(map(len, statements)))
+  progress.record(idx, stmt, elapsed_seconds, 'executed')
+  progress.finish()
+  progress.dump_json(path)
+"""
+import heapq
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+STATUSES = ('executed', 'skipped', 'tolerated', 'failed')
+
+
+class LatencyHistogram:
+    """Streaming histogram with log-spaced buckets.
+
+    Buckets grow by `growth` per step starting at `min_seconds`, which bounds
+    the relative error of any reported percentile to roughly `growth - 1`
+    (5% with the defaults) while using a few hundred integers of memory.
+    """
+
+    def __init__(self, min_seconds=0.0001, max_seconds=3600.0, growth=1.05):
+        self.min_seconds = min_seconds
+        self.growth = growth
+        self._log_growth = math.log(growth)
+        size = int(math.ceil(math.log(max_seconds / min_seconds) / self._log_growth)) + 2
+        self.counts = [0] * size
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def _bucket(self, seconds):
+        if seconds <= self.min_seconds:
+            return 0
+        idx = int(math.log(seconds / self.min_seconds) / self._log_growth) + 1
+        return min(idx, len(self.counts) - 1)
+
+    def upper_bound(self, bucket):
+        """Upper edge (seconds) of a bucket."""
+        return self.min_seconds * (self.growth ** bucket)
+
+    def add(self, seconds):
+        self.counts[self._bucket(seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if self.min is None or seconds < self.min:
+            self.min = seconds
+        if self.max is None or seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, pct):
+        """Approximate percentile (0-100) in seconds, or None when empty."""
+        if not self.count:
+            return None
+        rank = max(1, int(math.ceil(self.count * pct / 100.0)))
+        seen = 0
+        for bucket, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                # never report beyond the observed extremes
+                return min(max(self.upper_bound(bucket), self.min), self.max)
+        return self.max
+
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum_seconds': round(self.total, 6),
+            'min_seconds': self.min,
+            'max_seconds': self.max,
+            'mean_seconds': self.mean(),
+            'p50_seconds': self.percentile(50),
+            'p95_seconds': self.percentile(95),
+            'p99_seconds': self.percentile(99),
+        }
+
+
+class ProgressTracker:
+    """Collect per-statement results and report rates, percentiles and ETA."""
+
+    def __init__(self, total, total_bytes=0, slowest_n=10, stream=None, interval=1.0, live=True, clock=time.monotonic):
+        self.total = total
+        self.total_bytes = total_bytes
+        self.slowest_n = slowest_n
+        self.stream = stream if stream is not None else sys.stderr
+        self.interval = interval
+        self.live = live
+        self.clock = clock
+        self.histogram = LatencyHistogram()
+        self.counts = {s: 0 for s in STATUSES}
+        self.done = 0
+        self.done_bytes = 0
+        self._slowest = []  # min-heap of (elapsed, idx, chars, preview)
+        self._started = clock()
+        self._finished = None
+        self._last_render = None
+        self._tty = hasattr(self.stream, 'isatty') and self.stream.isatty()
+
+    def record(self, idx, stmt, elapsed, status='executed'):
+        """Record one statement. `elapsed` is wall-clock seconds; skipped statements may pass 0."""
+        if status not in self.counts:
+            raise ValueError(f"unknown status: {status}")
+        self.counts[status] += 1
+        self.done += 1
+        self.done_bytes += len(stmt.encode('utf-8'))
+        if status != 'skipped':
+            self.histogram.add(elapsed)
+            entry = (elapsed, idx, len(stmt), ' '.join(stmt.split())[:120])
+            if len(self._slowest) < self.slowest_n:
+                heapq.heappush(self._slowest, entry)
+            elif elapsed > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+        self.render()
+
+    def elapsed(self):
+        end = self._finished if self._finished is not None else self.clock()
+        return max(end - self._started, 1e-9)
+
+    def statements_per_second(self):
+        return self.done / self.elapsed()
+
+    def bytes_per_second(self):
+        return self.done_bytes / self.elapsed()
+
+    def eta_seconds(self):
+        """Remaining time estimated from byte throughput (statement rate if sizes unknown)."""
+        if self.done == 0:
+            return None
+        if self.total_bytes:
+            rate = self.bytes_per_second()
+            remaining = max(self.total_bytes - self.done_bytes, 0)
+        else:
+            rate = self.statements_per_second()
+            remaining = max(self.total - self.done, 0)
+        return remaining / rate if rate > 0 else None
+
+    def slowest(self):
+        """Slowest statements, slowest first."""
+        return [
+            {'index': idx, 'seconds': round(el, 6), 'chars': chars, 'preview': preview}
+            for el, idx, chars, preview in sorted(self._slowest, reverse=True)
+        ]
+
+    def status_line(self):
+        pct = (100.0 * self.done / self.total) if self.total else 100.0
+        p50 = self.histogram.percentile(50)
+        p95 = self.histogram.percentile(95)
+        p99 = self.histogram.percentile(99)
+        eta = self.eta_seconds()
+
+        def ms(v):
+            return '-' if v is None else f"{v * 1000:.0f}ms"
+
+        return (
+            f"[{self.done}/{self.total} {pct:5.1f}%] "
+            f"{self.statements_per_second():.1f} stmt/s {self.bytes_per_second() / 1024:.1f} KiB/s "
+            f"p50={ms(p50)} p95={ms(p95)} p99={ms(p99)} "
+            f"ok={self.counts['executed']} skip={self.counts['skipped']} "
+            f"tol={self.counts['tolerated']} fail={self.counts['failed']} "
+            f"eta={_fmt_duration(eta)}"
+        )
+
+    def render(self, force=False):
+        """Write the status line, at most once per `interval` unless forced.
+
+        With `live=False` only forced renders (i.e. the final line) are written.
+        """
+        if not self.live and not force:
+            return
+        now = self.clock()
+        if not force and self._last_render is not None and now - self._last_render < self.interval:
+            return
+        self._last_render = now
+        if self._tty and self.live:
+            self.stream.write('\r\033[K' + self.status_line())
+        else:
+            self.stream.write(self.status_line() + '\n')
+        self.stream.flush()
+
+    def finish(self):
+        if self._finished is None:
+            self._finished = self.clock()
+        self.render(force=True)
+        if self._tty and self.live:
+            self.stream.write('\n')
+            self.stream.flush()
+
+    def summary(self):
+        return {
+            'total_statements': self.total,
+            'total_bytes': self.total_bytes,
+            'processed_statements': self.done,
+            'processed_bytes': self.done_bytes,
+            'counts': dict(self.counts),
+            'elapsed_seconds': round(self.elapsed(), 6),
+            'statements_per_second': round(self.statements_per_second(), 3),
+            'bytes_per_second': round(self.bytes_per_second(), 3),
+            'eta_seconds': self.eta_seconds(),
+            'latency': self.histogram.to_dict(),
+            'slowest': self.slowest(),
+        }
+
+    def dump_json(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.summary(), indent=2) + '\n', encoding='utf-8')
+        return path
+
+
+def _fmt_duration(seconds):
+    if seconds is None:
+        return '?'
+    seconds = int(round(seconds))
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}:{m:02d}:{s:02d}" if h else f"{m}:{s:02d}"
@@ -15,16 +15,20 @@ CAUTION: This will execute DDL against the DB. It continues on errors.
 """
 import re
 import sys
+import time
 from pathlib import Path
 from datetime import datetime
 
 try:
     import psycopg2
-    import sqlparse
 except Exception as e:
     print('Missing dependency:', e)
     raise
 
+from block_index import BlockIndex
+from metrics_export import add_metrics_args, metrics_from_args
+from statement_index import StatementIndex
+
 ROOT = Path(__file__).resolve().parent
 INFILE = ROOT.joinpath('manual_review_fixes.sql')
 MIGRATION = ROOT.parent.joinpath('supabase', 'migrations', '20251120_all_migrations_gap_fix.sql')
@@ -38,23 +42,13 @@ parser.add_argument('--user', required=True)
 parser.add_argument('--password', required=True)
 parser.add_argument('--dbname', required=True)
 parser.add_argument('--limit', type=int, default=0, help='Limit number of blocks to run (0 = all)')
+add_metrics_args(parser)
 args = parser.parse_args()
+metrics = metrics_from_args(args, script='run_proposed_functions', target=f"{args.host}:{args.port}/{args.dbname}")
+connect = metrics.wrap_connect(psycopg2.connect) if metrics else psycopg2.connect
 
-text = INFILE.read_text(encoding='utf-8')
-# Split into blocks: pattern used previously
-parts = re.split(r"(?m)^-- PROPOSED FIX: Reassembled function for failing statement (\d+)[^\n]*\n", text)
-entries = []
-for i in range(1, len(parts), 2):
-    idx = int(parts[i])
-    block = parts[i+1].strip()
-    # Try to find original range in preceding comment (search backwards)
-    # We'll search for the header line we inserted earlier
-    header_pat = re.compile(rf"-- PROPOSED FIX: Reassembled function for failing statement {idx} \(original statements (\d+)\.\.(\d+)\)")
-    m = header_pat.search(text)
-    orig_range = None
-    if m:
-        orig_range = (int(m.group(1)), int(m.group(2)))
-    entries.append((idx, block, orig_range))
+# (id, original range, body) per block; the range comes from the header via the block index
+entries = [(idx, block.strip(), orig_range) for idx, orig_range, block in BlockIndex.load(INFILE).ranged_entries()]
 
 if not entries:
     print('No proposed fix blocks found in', INFILE)
@@ -63,8 +57,8 @@ if not entries:
 if args.limit > 0:
     entries = entries[:args.limit]
 
-# Prepare migration statements (for fallback)
-migration_stmts = sqlparse.split(MIGRATION.read_text(encoding='utf-8'))
+# Migration statements for the fallback, from the cached split (re-split only when the file changed)
+migration_stmts = StatementIndex.load(MIGRATION)
 
 with open(LOG, 'a', encoding='utf-8') as logf:
     logf.write(f"\n--- run_proposed_functions started: {datetime.utcnow().isoformat()}Z ---\n")
@@ -76,6 +70,8 @@ for seq, (orig_idx, block, orig_range) in enumerate(entries, start=1):
         # Quick check: only process blocks that look like functions or DO blocks
         if not re.search(r"(?is)(CREATE\s+(OR\s+REPLACE\s+)?FUNCTION|DO\s+\$\$|CREATE\s+OR\s+REPLACE\s+PROCEDURE)", block):
             logf.write("SKIP: Block does not look like a function/DO block\n\n")
+            if metrics:
+                metrics.observe_statement('skipped')
             continue
 
         # Write attempted block file
@@ -84,8 +80,9 @@ for seq, (orig_idx, block, orig_range) in enumerate(entries, start=1):
         logf.write(f"Wrote attempted SQL to: {attempt_file}\n")
 
     # Try executing the block
+    t0 = time.perf_counter()
     try:
-        conn = psycopg2.connect(host=args.host, port=args.port, user=args.user, password=args.password, dbname=args.dbname)
+        conn = connect(host=args.host, port=args.port, user=args.user, password=args.password, dbname=args.dbname)
         conn.autocommit = True
         cur = conn.cursor()
         cur.execute(block)
@@ -93,6 +90,8 @@ for seq, (orig_idx, block, orig_range) in enumerate(entries, start=1):
         conn.close()
         with open(LOG, 'a', encoding='utf-8') as logf:
             logf.write('RESULT: SUCCESS\n\n')
+        if metrics:
+            metrics.observe_statement('executed', time.perf_counter() - t0)
         continue
     except Exception as exc:
         err = str(exc).replace('\n', ' | ')
@@ -102,15 +101,13 @@ for seq, (orig_idx, block, orig_range) in enumerate(entries, start=1):
     # Fallback: if original migration range is available, try executing the joined original statements
     if orig_range:
         s_idx, e_idx = orig_range
-        s_idx0 = max(1, s_idx) - 1
-        e_idx0 = min(len(migration_stmts), e_idx) - 1
-        joined = '\n'.join(migration_stmts[s_idx0:e_idx0+1])
+        joined = '\n'.join(migration_stmts.statements(s_idx, e_idx))
         orig_file = ROOT.joinpath(f'attempted_func_{orig_idx}_orig.sql')
         orig_file.write_text(joined + '\n', encoding='utf-8')
         with open(LOG, 'a', encoding='utf-8') as logf:
             logf.write(f'Tried fallback original statements {s_idx}..{e_idx} written to {orig_file}\n')
         try:
-            conn = psycopg2.connect(host=args.host, port=args.port, user=args.user, password=args.password, dbname=args.dbname)
+            conn = connect(host=args.host, port=args.port, user=args.user, password=args.password, dbname=args.dbname)
             conn.autocommit = True
             cur = conn.cursor()
             cur.execute(joined)
@@ -118,17 +115,26 @@ for seq, (orig_idx, block, orig_range) in enumerate(entries, start=1):
             conn.close()
             with open(LOG, 'a', encoding='utf-8') as logf:
                 logf.write('FALLBACK RESULT: SUCCESS\n\n')
+            if metrics:
+                metrics.observe_statement('executed', time.perf_counter() - t0)
             continue
         except Exception as exc2:
             err2 = str(exc2).replace('\n', ' | ')
             with open(LOG, 'a', encoding='utf-8') as logf:
                 logf.write(f'FALLBACK ERROR: {err2}\n\n')
+            if metrics:
+                metrics.observe_statement('tolerated', time.perf_counter() - t0)
             continue
     else:
         with open(LOG, 'a', encoding='utf-8') as logf:
             logf.write('No original range available; skipping fallback\n\n')
+        if metrics:
+            metrics.observe_statement('tolerated', time.perf_counter() - t0)
 
 with open(LOG, 'a', encoding='utf-8') as logf:
     logf.write(f"--- run_proposed_functions finished: {datetime.utcnow().isoformat()}Z ---\n")
 
+if metrics:
+    metrics.close(completed=True, linger=args.metrics_linger)
+
 print('Done. See', LOG)
@@ -2,9 +2,16 @@
 import argparse
 import sys
 import os
+import time
 import traceback
 import psycopg2
 
+from run_progress import ProgressTracker
+from metrics_export import add_metrics_args, metrics_from_args
+from statement_profile import StatementProfiler, snapshot_pg_stat_statements, diff_pg_stat_statements, write_report
+from seed_copy import copy_seed, parse_insert
+from statement_batcher import AimdBatcher, batchable, replay, run_batch
+
 parser = argparse.ArgumentParser(description='Run SQL file against Postgres')
 parser.add_argument('--host', required=True)
 parser.add_argument('--port', required=False, default=5432, type=int)
@@ -14,7 +21,18 @@ parser.add_argument('--dbname', required=True)
 parser.add_argument('--file', required=True)
 parser.add_argument('--sslmode', required=False, default='require')
 parser.add_argument('--tolerate-errors', action='store_true', help='Continue on any SQL error (log and skip).')
+parser.add_argument('--progress', action='store_true', help='Render a live throughput/latency/ETA line instead of one line per statement.')
+parser.add_argument('--progress-json', default=os.path.join('scripts', 'migration_progress.json'), help='Where to write the end-of-run progress summary (JSON).')
+parser.add_argument('--profile', action='store_true', help='Record connect / round-trip / server / network time per statement.')
+parser.add_argument('--profile-out', default=os.path.join('scripts', 'migration_profile.json'), help='Where to write the per-statement profile report (JSON).')
+parser.add_argument('--pg-stat-statements', action='store_true', help='With --profile, bracket the run with pg_stat_statements snapshots.')
+parser.add_argument('--copy-seeds', action='store_true', help='Load literal multi-row INSERT ... VALUES statements with COPY (falls back to INSERT).')
+parser.add_argument('--batch', action='store_true', help='Send runs of consecutive statements as one multi-statement batch, sized AIMD-style; failed batches are replayed per statement under savepoints.')
+parser.add_argument('--batch-max', type=int, default=64, help='Largest --batch size in statements (default 64).')
+add_metrics_args(parser)
 args = parser.parse_args()
+if args.batch and args.profile:
+    parser.error('--profile times single statements; it cannot be combined with --batch')
 
 sql_path = args.file
 if not os.path.isabs(sql_path):
@@ -123,34 +141,182 @@ try:
             return False
         return True
 
+    progress = ProgressTracker(total=len(statements), total_bytes=sum(len(s.encode('utf-8')) for s in statements), live=args.progress)
+    def _say(line: str):
+        # Per-statement chatter is replaced by the live status line in --progress mode
+        if not args.progress:
+            print(line)
+
+    metrics = metrics_from_args(args, script='run_sql', target=f"{args.host}:{args.port}/{args.dbname}")
+
+    def _connect():
+        return psycopg2.connect(host=args.host, port=args.port, dbname=args.dbname, user=args.user, password=args.password, sslmode=args.sslmode)
+    if metrics is not None:
+        _connect = metrics.wrap_connect(_connect)
+
+    def _record(idx: int, stmt: str, elapsed: float, status: str):
+        progress.record(idx, stmt, elapsed, status)
+        if metrics is not None:
+            metrics.observe_statement(status, elapsed)
+
+    profiler = StatementProfiler() if args.profile else None
+    pgss_before = None
+    if profiler is not None and args.pg_stat_statements:
+        _snap_conn = _connect()
+        pgss_before = snapshot_pg_stat_statements(_snap_conn)
+        _snap_conn.close()
+        if pgss_before is None:
+            print("pg_stat_statements not available; server time comes from clock_timestamp() probes only.")
+
+    # --copy-seeds: statements loaded with COPY, rows, seconds, and how many fell back to INSERT
+    copy_stats = {'statements': 0, 'rows': 0, 'seconds': 0.0, 'fallbacks': 0}
+
+    def _copy(idx: int, stmt: str) -> bool:
+        """Load a literal multi-row INSERT with COPY; False when the statement must run as an INSERT."""
+        t0 = time.perf_counter()  # rows/s includes the client-side parse
+        seed = parse_insert(stmt)
+        if seed is None or len(seed.rows) < 2:
+            return False
+        _flush()  # earlier batched statements go first
+        conn = _connect()
+        try:
+            rows = copy_seed(conn, seed)
+        except Exception as exc:
+            copy_stats['fallbacks'] += 1
+            _log(f"COPY {idx}/{len(statements)} fell back to INSERT: {exc}")
+            return False
+        finally:
+            conn.close()
+        elapsed = time.perf_counter() - t0
+        copy_stats['statements'] += 1
+        copy_stats['rows'] += rows
+        copy_stats['seconds'] += elapsed
+        _say(f"Copied statement {idx}/{len(statements)}: {rows} rows into {seed.table}")
+        _log(f"COPY {idx}/{len(statements)} OK rows={rows}")
+        _record(idx, stmt, elapsed, 'executed')
+        return True
+
+    def _fail(idx: int, stmt: str, elapsed: float, exc: Exception):
+        """Report a failing statement; returns under --tolerate-errors, otherwise halts the run by re-raising."""
+        msg = str(exc)
+        _log(f"EXEC {idx}/{len(statements)} ERROR: {msg}")
+        print(f"Error on statement {idx}: {msg}")
+        # If tolerate-errors is enabled, continue; otherwise stop
+        if args.tolerate_errors:
+            print(f"Tolerating error and continuing (statement {idx}).")
+            _log(f"TOLERATED {idx}/{len(statements)}: {msg}")
+            _record(idx, stmt, elapsed, 'tolerated')
+            return
+        print(f"Halting due to error on statement {idx}.")
+        _log(f"HALT {idx}/{len(statements)}: {msg}")
+        log_f.close()
+        _record(idx, stmt, elapsed, 'failed')
+        _finish_run(completed=False)
+        raise exc
+
+    # --batch: statements waiting to be sent together, and the connection the batches share
+    batcher = AimdBatcher(maximum=args.batch_max) if args.batch else None
+    pending = []
+    batch_conn = {'conn': None}
+
+    def _batch_connection():
+        conn = batch_conn['conn']
+        if conn is None or conn.closed:
+            conn = batch_conn['conn'] = _connect()
+            conn.autocommit = True
+        return conn
+
+    def _flush(final: bool = True):
+        """Send pending statements in batches of the current size (all of them when `final`)."""
+        while pending and (final or len(pending) >= batcher.size):
+            chunk = pending[:batcher.size]
+            del pending[:len(chunk)]
+            first, last = chunk[0][0], chunk[-1][0]
+            _say(f"Executing statements {first}-{last}/{len(statements)} as one batch")
+            _log(f"BATCH {first}-{last}/{len(statements)} START size={len(chunk)}")
+            t0 = time.perf_counter()
+            try:
+                run_batch(_batch_connection(), [stmt for _, stmt in chunk])
+            except psycopg2.Error as exc:
+                # nothing of the batch was applied; find the failing statement one savepoint at a time
+                batcher.failure()
+                _log(f"BATCH {first}-{last}/{len(statements)} FAILED, replaying with savepoints: {exc}")
+                results = replay(_batch_connection(), [stmt for _, stmt in chunk],
+                                 stop_on_error=not args.tolerate_errors)
+                for offset, elapsed, error in results:
+                    idx, stmt = chunk[offset]
+                    if error is None:
+                        _log(f"EXEC {idx}/{len(statements)} OK")
+                        _record(idx, stmt, elapsed, 'executed')
+                    else:
+                        _fail(idx, stmt, elapsed, error)
+                continue
+            elapsed = time.perf_counter() - t0
+            batcher.success()
+            _log(f"BATCH {first}-{last}/{len(statements)} OK")
+            for idx, stmt in chunk:
+                # per-statement latency inside a batch is not observable; spread the batch time evenly
+                _record(idx, stmt, elapsed / len(chunk), 'executed')
+
+    def _finish_run(completed: bool):
+        if batcher is not None:
+            if batch_conn['conn'] is not None:
+                batch_conn['conn'].close()
+            print(f"Batches: {batcher.batches} sent, {batcher.failures} replayed statement by statement, "
+                  f"largest size {batcher.peak}")
+        if args.copy_seeds:
+            rate = copy_stats['rows'] / copy_stats['seconds'] if copy_stats['seconds'] else 0.0
+            print(f"COPY seeds: {copy_stats['statements']} statements, {copy_stats['rows']} rows in "
+                  f"{copy_stats['seconds']:.2f}s ({rate:.0f} rows/s); {copy_stats['fallbacks']} fell back to INSERT")
+        if metrics is not None:
+            metrics.close(completed=completed, linger=args.metrics_linger)
+        progress.finish()
+        print(f"Wrote progress summary to {progress.dump_json(args.progress_json)}")
+        if profiler is None:
+            return
+        pgss_delta = None
+        if pgss_before is not None:
+            try:
+                _snap_conn = _connect()
+                pgss_delta = diff_pg_stat_statements(pgss_before, snapshot_pg_stat_statements(_snap_conn))
+                _snap_conn.close()
+            except Exception as exc:
+                print(f"Could not take closing pg_stat_statements snapshot: {exc}")
+        print(write_report(args.profile_out, profiler, pgss_delta))
+
     for idx, stmt in enumerate(statements, start=1):
         if _is_only_comments(stmt):
-            print(f"Skipping statement {idx}/{len(statements)}: comment or empty")
+            _say(f"Skipping statement {idx}/{len(statements)}: comment or empty")
             _log(f"SKIP {idx}/{len(statements)}: comment or empty")
+            _record(idx, stmt, 0.0, 'skipped')
+            continue
+        if args.copy_seeds and _copy(idx, stmt):
+            continue
+        if batcher is not None and batchable(stmt):
+            pending.append((idx, stmt))
+            _flush(final=False)
             continue
+        if batcher is not None:
+            _flush()  # a barrier statement runs alone, after everything before it
+        t0 = time.perf_counter()
         try:
-            print(f"Executing statement {idx}/{len(statements)} (chars={len(stmt)})")
+            _say(f"Executing statement {idx}/{len(statements)} (chars={len(stmt)})")
             _log(f"EXEC {idx}/{len(statements)} START chars={len(stmt)}")
             # Use a fresh connection for each statement to avoid transaction aborts
-            with psycopg2.connect(host=args.host, port=args.port, dbname=args.dbname, user=args.user, password=args.password, sslmode=args.sslmode) as _conn:
-                _conn.autocommit = True
-                with _conn.cursor() as _cur:
-                    _cur.execute(stmt)
+            if profiler is not None:
+                profiler.execute(idx, stmt, _connect)
+            else:
+                with _connect() as _conn:
+                    _conn.autocommit = True
+                    with _conn.cursor() as _cur:
+                        _cur.execute(stmt)
             _log(f"EXEC {idx}/{len(statements)} OK")
+            _record(idx, stmt, time.perf_counter() - t0, 'executed')
         except Exception as exc:
-            msg = str(exc)
-            _log(f"EXEC {idx}/{len(statements)} ERROR: {msg}")
-            print(f"Error on statement {idx}: {msg}")
-            # If tolerate-errors is enabled, continue; otherwise stop
-            if args.tolerate_errors:
-                print(f"Tolerating error and continuing (statement {idx}).")
-                _log(f"TOLERATED {idx}/{len(statements)}: {msg}")
-                continue
-            else:
-                print(f"Halting due to error on statement {idx}.")
-                _log(f"HALT {idx}/{len(statements)}: {msg}")
-                log_f.close()
-                raise
+            _fail(idx, stmt, time.perf_counter() - t0, exc)
+    if batcher is not None:
+        _flush()
+    _finish_run(completed=True)
     print("SQL executed successfully (with non-fatal warnings possible).")
     _log("RUN COMPLETE: success")
     log_f.close()
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""Apply one SQL file to several databases concurrently (dev, preview, staging, prod).
+
+run_sql.py applies a file to one database; keeping the Supabase projects and
+branch databases in sync meant running it once per target, one after another.
+This executor runs the same statement stream against N targets at once:
+
+- statements are numbered as in run_sql.py (non-empty `sqlparse.split`
+  pieces, from the cached split in statement_index.py); comment-only
+  statements are skipped
+- every target runs its statements in order on one autocommit connection
+  driven by psycopg2's asynchronous mode on the asyncio event loop, so a slow
+  target never holds up the others; a dropped connection is re-opened
+- `--concurrency` caps the number of statements in flight across all targets
+- each target appends to its own journal
+  (`scripts/fanout_journal_<label>.jsonl`: one line per statement with its
+  number, SHA-256, status, milliseconds and error); `--resume` skips the
+  statements a target's journal already records as executed or skipped with
+  the same hash
+- without `--tolerate-errors` a failing statement halts that target only;
+  the others run to the end and the exit status reports the failure
+- a combined progress view (one ProgressTracker line per target plus a total)
+  is redrawn every `--interval` seconds, and the per-target summaries are
+  written to `--progress-json`
+
+Targets are `--dsn` libpq strings, optionally prefixed with `LABEL=`; local
+Postgres stand-ins work the same way as the hosted projects.
+check_fanout_resume.py exercises the journal / resume path end to end on a
+local_pg.py cluster; by hand, the same loop is `local_pg.py up`, `clone` two
+databases, fan out, fix what halted a target and re-run with `--resume`.
+
+Usage:
+  python scripts/run_sql_fanout.py --file supabase/migrations/20251120_collaboration_delta.sql \\
+      --dsn dev="host=... dbname=postgres user=postgres password=..." \\
+      --dsn staging="host=... dbname=postgres user=postgres password=..." --concurrency 4
+  python scripts/run_sql_fanout.py --file migration.sql --dsn "host=localhost port=54321 dbname=t1" \\
+      --dsn "host=localhost port=54321 dbname=t2" --tolerate-errors --resume
+  python scripts/local_pg.py up && python scripts/local_pg.py clone a && python scripts/local_pg.py clone b
+  python scripts/run_sql_fanout.py --file migration.sql --dsn "<DSN printed for a>" --dsn "<DSN printed for b>"
+  python scripts/run_sql_fanout.py --file migration.sql --dsn "<DSN printed for a>" --dsn "<DSN printed for b>" --resume
+  python scripts/local_pg.py down
+  python scripts/check_fanout_resume.py         # the same, scripted, with checks
+"""
+import argparse
+import asyncio
+import hashlib
+import io
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import psycopg2
+import psycopg2.extensions
+
+from run_progress import ProgressTracker
+from sql_lexer import split_statements
+from statement_index import StatementIndex
+from verify_schema import parse_target, unique_labels
+
+ROOT = Path(__file__).resolve().parent
+JOURNAL_DIR = ROOT
+PROGRESS_JSON = ROOT / 'fanout_progress.json'
+DONE = ('executed', 'skipped')
+
+
+def _sha(stmt):
+    return hashlib.sha256(stmt.encode('utf-8')).hexdigest()
+
+
+def is_only_comments(stmt):
+    return not any(s.significant for s in split_statements(stmt))
+
+
+class Journal:
+    """Append-only per-target record of statement outcomes."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.f = None
+
+    def completed(self):
+        """{statement number: sha} of the statements this journal records as done."""
+        done = {}
+        if not self.path.exists():
+            return done
+        with self.path.open(encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by a crash
+                if entry.get('status') in DONE:
+                    done[entry['n']] = entry['sha']
+                elif 'n' in entry:
+                    done.pop(entry['n'], None)
+        return done
+
+    def open(self, header):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.f = self.path.open('a', encoding='utf-8')
+        self.write(header)
+
+    def write(self, entry):
+        self.f.write(json.dumps(entry, separators=(',', ':')) + '\n')
+        self.f.flush()
+
+    def close(self):
+        if self.f is not None:
+            self.f.close()
+
+
+async def _wait(conn):
+    """Drive an asynchronous psycopg2 connection until its pending operation completes."""
+    loop = asyncio.get_running_loop()
+    while True:
+        state = conn.poll()
+        if state == psycopg2.extensions.POLL_OK:
+            return
+        fd = conn.fileno()
+        ready = loop.create_future()
+        if state == psycopg2.extensions.POLL_READ:
+            loop.add_reader(fd, ready.set_result, None)
+            try:
+                await ready
+            finally:
+                loop.remove_reader(fd)
+        elif state == psycopg2.extensions.POLL_WRITE:
+            loop.add_writer(fd, ready.set_result, None)
+            try:
+                await ready
+            finally:
+                loop.remove_writer(fd)
+        else:
+            raise psycopg2.OperationalError(f"unexpected poll state {state}")
+
+
+class Target:
+    def __init__(self, label, dsn, statements, journal, tolerate_errors, resume):
+        self.label = label
+        self.dsn = dsn
+        self.statements = statements
+        self.journal = journal
+        self.tolerate_errors = tolerate_errors
+        self.done = journal.completed() if resume else {}
+        self.progress = ProgressTracker(total=len(statements),
+                                        total_bytes=sum(len(s.encode('utf-8')) for s in statements),
+                                        stream=io.StringIO(), live=False)  # CombinedView draws the lines
+        self.conn = None
+        self.state = 'waiting'
+        self.error = None
+
+    async def connect(self):
+        conn = psycopg2.connect(self.dsn, async_=1)
+        await _wait(conn)
+        self.conn = conn
+
+    async def execute(self, stmt):
+        if self.conn is None or self.conn.closed:
+            await self.connect()
+        cur = self.conn.cursor()
+        try:
+            cur.execute(stmt)
+            await _wait(self.conn)
+        finally:
+            cur.close()
+
+    async def run(self, limit):
+        self.journal.open({'started': datetime.utcnow().isoformat() + 'Z', 'statements': len(self.statements)})
+        self.state = 'running'
+        try:
+            for n, stmt in enumerate(self.statements, start=1):
+                sha = _sha(stmt)
+                if self.done.get(n) == sha or is_only_comments(stmt):
+                    self.progress.record(n, stmt, 0.0, 'skipped')
+                    if self.done.get(n) != sha:
+                        self.journal.write({'n': n, 'sha': sha, 'status': 'skipped', 'ms': 0})
+                    continue
+                async with limit:
+                    t0 = time.perf_counter()
+                    try:
+                        await self.execute(stmt)
+                        status, error = 'executed', None
+                    except psycopg2.Error as exc:
+                        status, error = ('tolerated' if self.tolerate_errors else 'failed'), str(exc).strip()
+                    elapsed = time.perf_counter() - t0
+                self.progress.record(n, stmt, elapsed, status)
+                entry = {'n': n, 'sha': sha, 'status': status, 'ms': round(elapsed * 1000, 3)}
+                if error:
+                    entry['error'] = error
+                self.journal.write(entry)
+                if status == 'failed':
+                    self.state, self.error = 'failed', f"statement {n}: {error}"
+                    return
+            self.state = 'done'
+        except (psycopg2.Error, OSError) as exc:
+            self.state, self.error = 'failed', str(exc).strip()
+        finally:
+            self.progress.finish()
+            self.journal.close()
+            if self.conn is not None and not self.conn.closed:
+                self.conn.close()
+
+
+class CombinedView:
+    """One status line per target and a total, redrawn in place on a terminal."""
+
+    def __init__(self, targets, stream=None):
+        self.targets = targets
+        self.stream = stream if stream is not None else sys.stderr
+        self.tty = hasattr(self.stream, 'isatty') and self.stream.isatty()
+        self.started = time.monotonic()
+        self.drawn = 0
+
+    def lines(self):
+        width = max(len(t.label) for t in self.targets)
+        out = [f"{t.label:<{width}} {t.state:<7} {t.progress.status_line()}" for t in self.targets]
+        done = sum(t.progress.done for t in self.targets)
+        total = sum(t.progress.total for t in self.targets)
+        failed = sum(1 for t in self.targets if t.state == 'failed')
+        elapsed = time.monotonic() - self.started
+        out.append(f"{'total':<{width}} {done}/{total} statements, {done / max(elapsed, 1e-9):.1f} stmt/s, "
+                   f"{failed} targets failed, {elapsed:.1f}s elapsed")
+        return out
+
+    def render(self):
+        lines = self.lines()
+        if self.tty and self.drawn:
+            self.stream.write(f"\033[{self.drawn}F")
+        self.stream.write(''.join(('\033[K' if self.tty else '') + line + '\n' for line in lines))
+        if not self.tty:
+            self.stream.write('\n')
+        self.stream.flush()
+        self.drawn = len(lines)
+
+    async def run(self, interval):
+        while True:
+            self.render()
+            await asyncio.sleep(interval)
+
+
+async def fan_out(targets, concurrency, interval):
+    limit = asyncio.Semaphore(max(1, concurrency))
+    view = CombinedView(targets)
+    ticker = asyncio.create_task(view.run(interval))
+    try:
+        await asyncio.gather(*(t.run(limit) for t in targets))
+    finally:
+        ticker.cancel()
+        view.render()
+
+
+def main():
+    p = argparse.ArgumentParser(description='Apply one SQL file to several databases concurrently')
+    p.add_argument('--file', required=True)
+    p.add_argument('--dsn', action='append', required=True, metavar='[LABEL=]DSN',
+                   help='libpq connection string; repeat once per target database')
+    p.add_argument('--concurrency', type=int, default=4, help='Statements in flight across all targets (default 4)')
+    p.add_argument('--tolerate-errors', action='store_true', help='Log failing statements and keep going')
+    p.add_argument('--resume', action='store_true', help="Skip statements each target's journal records as done")
+    p.add_argument('--journal-dir', default=str(JOURNAL_DIR), help='Where the per-target journals go (default: scripts/)')
+    p.add_argument('--interval', type=float, default=1.0, help='Seconds between progress redraws')
+    p.add_argument('--progress-json', default=str(PROGRESS_JSON), help='Where to write the per-target summaries')
+    args = p.parse_args()
+
+    path = Path(args.file)
+    if not path.exists():
+        raise SystemExit(f"SQL file not found: {path}")
+    statements = StatementIndex.load(path).all()
+    specs = [parse_target(spec) for spec in args.dsn]
+    unique_labels(specs)
+
+    targets = [Target(label, dsn, statements, Journal(Path(args.journal_dir) / f"fanout_journal_{label}.jsonl"),
+                      args.tolerate_errors, args.resume)
+               for label, dsn in specs]
+    print(f"Applying {len(statements)} statements from {path} to {len(targets)} targets "
+          f"(concurrency {args.concurrency})")
+    asyncio.run(fan_out(targets, args.concurrency, args.interval))
+
+    out = Path(args.progress_json)
+    out.write_text(json.dumps({t.label: dict(t.progress.summary(), state=t.state, error=t.error) for t in targets},
+                              indent=2) + '\n', encoding='utf-8')
+    print('Wrote', out)
+    for t in targets:
+        if t.error:
+            print(f"[{t.label}] FAILED: {t.error}")
+    raise SystemExit(1 if any(t.state == 'failed' for t in targets) else 0)
+
+
+if __name__ == '__main__':
+    main()
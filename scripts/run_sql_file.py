@@ -5,6 +5,7 @@ Usage:
   python scripts/run_sql_file.py --file <path> --host <host> --user <user> --password <pw> --dbname <db>
 """
 import argparse
+import time
 from pathlib import Path
 from datetime import datetime
 try:
@@ -13,6 +14,8 @@ except Exception:
     print("Missing dependency: install psycopg2-binary in your venv (pip install psycopg2-binary)")
     raise
 
+from metrics_export import add_metrics_args, metrics_from_args
+
 parser = argparse.ArgumentParser()
 parser.add_argument('--file', required=True)
 parser.add_argument('--host', required=True)
@@ -21,6 +24,7 @@ parser.add_argument('--user', required=True)
 parser.add_argument('--password', required=True)
 parser.add_argument('--dbname', required=True)
 parser.add_argument('--statement-timeout', type=int, default=30000)
+add_metrics_args(parser)
 args = parser.parse_args()
 
 SQL_PATH = Path(args.file)
@@ -30,11 +34,15 @@ if not SQL_PATH.exists():
 
 sql = SQL_PATH.read_text(encoding='utf-8')
 log = SQL_PATH.parent.joinpath('run_sql_file_log.txt')
+metrics = metrics_from_args(args, script='run_sql_file', target=f"{args.host}:{args.port}/{args.dbname}")
+connect = metrics.wrap_connect(psycopg2.connect) if metrics else psycopg2.connect
+completed = False
+elapsed = None
 
 with open(log, 'a', encoding='utf-8') as lf:
     lf.write(f'--- Run started: {datetime.utcnow().isoformat()}Z file={SQL_PATH.name}\n')
     try:
-        conn = psycopg2.connect(
+        conn = connect(
             host=args.host,
             port=args.port,
             user=args.user,
@@ -48,11 +56,20 @@ with open(log, 'a', encoding='utf-8') as lf:
             cur.execute(f"SET statement_timeout = {int(args.statement_timeout)}")
         except Exception:
             pass
-        cur.execute(sql)
+        t0 = time.perf_counter()
+        try:
+            cur.execute(sql)
+        finally:
+            elapsed = time.perf_counter() - t0
         lf.write('RESULT: SUCCESS\n')
         print('SQL file executed successfully.')
+        completed = True
+        if metrics:
+            metrics.observe_statement('executed', elapsed)
     except Exception as exc:
         err = str(exc).replace('\n', ' | ')
+        if metrics:
+            metrics.observe_statement('failed', elapsed)
         lf.write(f'RESULT: ERROR | {err}\n')
         print('Execution error:', err)
     finally:
@@ -65,3 +82,6 @@ with open(log, 'a', encoding='utf-8') as lf:
             conn.close()
         except Exception:
             pass
+
+if metrics:
+    metrics.close(completed=completed, linger=args.metrics_linger)
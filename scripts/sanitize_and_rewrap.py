@@ -14,6 +14,8 @@ Writes: `scripts/manual_review_fixes_sanitized.sql`.
 import re
 from pathlib import Path
 
+from block_index import write_blocks
+
 ROOT = Path(__file__).resolve().parent
 INPUT = ROOT / "manual_review_fixes_auto_repaired.sql"
 OUTPUT = ROOT / "manual_review_fixes_sanitized.sql"
@@ -156,7 +158,7 @@ def main():
         sanitized = sanitize_block(body)
         out_blocks.append(f"-- PROPOSED FIX: {header_line}\n{sanitized}\n")
 
-    OUTPUT.write_text('\n'.join([header]+out_blocks), encoding='utf-8')
+    write_blocks(OUTPUT, '\n'.join([header]+out_blocks))
     print(f"Wrote {OUTPUT} with {len(out_blocks)} sanitized blocks")
 
 if __name__ == '__main__':
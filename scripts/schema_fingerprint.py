@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Merkle-style fingerprints of a schema catalog.
+
+Every catalog object gets a stable SHA-256 leaf hash over its canonical JSON:
+a table (columns, constraints, indexes and RLS flag together), a view, an
+enum's labels, a policy's command/roles/expressions, a trigger definition, a
+function's signature and body. Leaves roll up into per-category nodes, then
+per-schema nodes, then a single root:
+
+    root -> schema (public, auth, ...) -> category (tables, policies, ...) -> object
+
+Two environments compare by root first and only descend into children whose
+hashes differ, so the work is proportional to what changed rather than to the
+size of the schema.
+
+Input is the catalog JSON written by verify_schema.py (`schema_verification*.json`)
+or a fingerprint tree written by this module.
+
+Usage:
+  python scripts/schema_fingerprint.py scripts/schema_verification.json            # print roots
+  python scripts/schema_fingerprint.py dev.json prod.json                          # diff two environments
+  python scripts/schema_fingerprint.py dev.json --out scripts/schema_fingerprint.json
+"""
+import argparse
+import hashlib
+import json
+from pathlib import Path
+
+
+def _hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def leaf_hash(payload) -> str:
+    return _hash(json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8'))
+
+
+def _split_qualified(name, default='public'):
+    """'auth.users' -> ('auth', 'users'); unqualified names belong to `default`."""
+    if name and '.' in name:
+        schema, rel = name.split('.', 1)
+        return schema.strip('"'), rel.strip('"')
+    return default, (name or '').strip('"')
+
+
+def catalog_objects(catalog):
+    """Group catalog rows into {schema: {category: {object_key: payload}}}."""
+    out = {}
+
+    def put(schema, category, key, payload):
+        out.setdefault(schema, {}).setdefault(category, {})[key] = payload
+
+    kinds = {r['table_name']: r.get('kind', 'r') for r in catalog.get('public_tables', [])}
+    rls = {r['relname'] for r in catalog.get('rls_enabled_tables', [])}
+    tables = {}
+    for name, kind in kinds.items():
+        tables[name] = {'kind': kind, 'rls': name in rls, 'columns': [], 'constraints': {}, 'indexes': {}}
+    for r in catalog.get('columns', []):
+        t = tables.get(r['table_name'])
+        if t is not None:
+            t['columns'].append({k: r.get(k) for k in ('column_name', 'data_type', 'not_null', 'default')})
+    for r in catalog.get('constraints', []):
+        t = tables.get(r['table_name'])
+        if t is not None:
+            t['constraints'][r['constraint_name']] = {'type': r.get('type'), 'definition': r.get('definition')}
+    for r in catalog.get('indexes', []):
+        t = tables.get(r['table_name'])
+        if t is not None:
+            t['indexes'][r['index_name']] = r.get('definition')
+    for name, t in tables.items():
+        put('public', 'views' if t['kind'] == 'v' else 'tables', name, t)
+
+    for r in catalog.get('enum_types', []):
+        put(r.get('schema', 'public'), 'enums', r['name'], r.get('labels'))
+    for r in catalog.get('policies', []):
+        schema, table = _split_qualified(r['table_name'])
+        put(schema, 'policies', f"{table}/{r['polname']}",
+            {k: r.get(k) for k in ('cmd', 'permissive', 'roles', 'using', 'with_check')})
+    for r in catalog.get('triggers', []):
+        schema, table = _split_qualified(r['table_name'])
+        put(schema, 'triggers', f"{table}/{r['tgname']}", r.get('definition'))
+    for r in catalog.get('functions', []):
+        put(r.get('routine_schema', 'public'), 'functions', f"{r['routine_name']}({r.get('arguments') or ''})",
+            {k: r.get(k) for k in ('returns', 'language', 'body')})
+    return out
+
+
+def _node(children):
+    """Interior node: hash over the sorted (name, child hash) pairs."""
+    lines = ''.join(f"{name}\0{child['hash']}\n" for name, child in sorted(children.items()))
+    return {'hash': _hash(lines.encode('utf-8')), 'children': children}
+
+
+def build_tree(catalog):
+    """Merkle tree for a verify_schema catalog: {'hash', 'children': {schema: {...}}}."""
+    schemas = {}
+    for schema, categories in catalog_objects(catalog).items():
+        cats = {}
+        for category, objects in categories.items():
+            cats[category] = _node({key: {'hash': leaf_hash(payload)} for key, payload in objects.items()})
+        schemas[schema] = _node(cats)
+    return _node(schemas)
+
+
+def roots(tree, depth=1):
+    """Copy of `tree` truncated to `depth` levels: what two environments exchange first."""
+    out = {'hash': tree['hash']}
+    if depth > 0 and 'children' in tree:
+        out['children'] = {name: roots(child, depth - 1) for name, child in tree['children'].items()}
+    return out
+
+
+def diff_trees(a, b, path=()):
+    """Yield (path, change) for differing leaves, descending only into differing subtrees.
+
+    change is 'added' (only in b), 'removed' (only in a) or 'changed'.
+    """
+    if a['hash'] == b['hash']:
+        return
+    ca, cb = a.get('children'), b.get('children')
+    if ca is None or cb is None:
+        yield path, 'changed'
+        return
+    for name in sorted(set(ca) | set(cb)):
+        if name not in cb:
+            yield path + (name,), 'removed'
+        elif name not in ca:
+            yield path + (name,), 'added'
+        else:
+            yield from diff_trees(ca[name], cb[name], path + (name,))
+
+
+def load_tree(path):
+    """Load a fingerprint tree, building it first when `path` holds a catalog."""
+    data = json.loads(Path(path).read_text(encoding='utf-8'))
+    if isinstance(data, dict) and 'hash' in data and 'children' in data:
+        return data
+    return build_tree(data)
+
+
+def write_tree(tree, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(tree, indent=1, sort_keys=True) + '\n', encoding='utf-8')
+    return path
+
+
+def main():
+    p = argparse.ArgumentParser(description='Merkle fingerprints of verify_schema catalogs')
+    p.add_argument('left', help='Catalog or fingerprint JSON')
+    p.add_argument('right', nargs='?', help='Second catalog or fingerprint JSON to diff against')
+    p.add_argument('--out', help='Write the fingerprint tree of LEFT to this path')
+    args = p.parse_args()
+
+    left = load_tree(args.left)
+    if args.out:
+        print('Wrote fingerprints to', write_tree(left, args.out))
+    if not args.right:
+        print(f"root {left['hash']}")
+        for schema, node in sorted(left['children'].items()):
+            print(f"  {schema} {node['hash']}")
+            for category, cat in sorted(node['children'].items()):
+                print(f"    {category:<10} {cat['hash'][:16]} ({len(cat['children'])} objects)")
+        return
+
+    right = load_tree(args.right)
+    if left['hash'] == right['hash']:
+        print('Schemas are identical (root', left['hash'][:16] + ')')
+        return
+    changes = list(diff_trees(left, right))
+    for path, change in changes:
+        print(f"{change:<8} {'/'.join(path)}")
+    print(f"{len(changes)} differences")
+    raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,1053 @@
+#!/usr/bin/env python3
+"""Static expected-schema model built from the migrations directory.
+
+`SchemaModel` interprets `supabase/migrations/<number>_*.sql` in order, without
+a database, and keeps an in-memory catalog of what the migrations should
+produce: tables (columns, constraints, RLS flag), enums, indexes, policies,
+triggers, functions/procedures and views.
+
+It understands the idioms used throughout the migrations:
+- `IF NOT EXISTS` / `IF EXISTS` / `CREATE OR REPLACE`
+- DDL wrapped in `DO $$ ... $$` blocks, either inline behind `IF ... THEN`
+  guards or as `EXECUTE '<sql>'` / `EXECUTE $tag$<sql>$tag$` strings; guarded
+  DDL is treated as create-if-missing
+- `ALTER TABLE` column/constraint/RLS changes, `ALTER TYPE ... ADD VALUE`,
+  `ALTER POLICY`, renames and drops (dropping a table drops its dependents)
+
+Every change is appended to `model.log` as (source, kind, key, action), where
+action is one of create/replace/alter/drop/noop/error/unknown; statements that
+would fail against a real database (e.g. CREATE of an existing object without a
+guard) are recorded in `model.warnings` instead of aborting. `unknown` marks
+statements that target an object the migrations never create, or ALTER TABLE
+actions the model does not interpret (so their effect depends on state outside
+the model). `model.ddl` keeps the text of the statement that last created or
+replaced each object.
+
+Usage:
+  python scripts/schema_model.py                 # summary of the expected schema
+  python scripts/schema_model.py --json out.json # dump the model
+"""
+import argparse
+import json
+import re
+from pathlib import Path
+
+from sql_lexer import (DOLLAR, NUMBER, PUNCT, QUOTED_IDENT, STRING, TRIVIA, WORD,
+                       ident_value, split_statements, string_value)
+
+ROOT = Path(__file__).resolve().parent
+MIGRATIONS_DIR = ROOT.parent / 'supabase' / 'migrations'
+# Numbered migrations only; helper scripts (check_*, create_demo_user*, RUN_ALL_*)
+# and `*.disabled.sql` backups are not part of the applied sequence.
+MIGRATION_NAME_RE = re.compile(r'^\d+_[^.]+\.sql$')
+
+KINDS = ('tables', 'enums', 'indexes', 'policies', 'triggers', 'functions', 'views')
+
+COLUMN_CONSTRAINT_WORDS = {'CONSTRAINT', 'NOT', 'NULL', 'DEFAULT', 'PRIMARY', 'REFERENCES',
+                           'UNIQUE', 'CHECK', 'GENERATED', 'COLLATE'}
+TABLE_CONSTRAINT_WORDS = {'CONSTRAINT', 'PRIMARY', 'UNIQUE', 'CHECK', 'FOREIGN', 'EXCLUDE'}
+FUNCTION_OPTION_WORDS = {'AS', 'LANGUAGE', 'IMMUTABLE', 'STABLE', 'VOLATILE', 'SECURITY', 'SET',
+                         'COST', 'ROWS', 'STRICT', 'CALLED', 'PARALLEL', 'LEAKPROOF', 'WINDOW',
+                         'TRANSFORM', 'SUPPORT', 'EXTERNAL', 'NOT', 'BEGIN', 'RETURN'}
+PLPGSQL_STMT_LEADERS = {'THEN', 'ELSE', 'BEGIN', 'LOOP'}
+DDL_WORDS = {'CREATE', 'ALTER', 'DROP', 'DO'}
+
+TYPE_ALIASES = {
+    'int': 'integer', 'int4': 'integer', 'serial': 'integer', 'serial4': 'integer',
+    'int8': 'bigint', 'bigserial': 'bigint', 'serial8': 'bigint',
+    'int2': 'smallint', 'smallserial': 'smallint', 'serial2': 'smallint',
+    'bool': 'boolean', 'float': 'double precision', 'float8': 'double precision',
+    'float4': 'real', 'decimal': 'numeric', 'varchar': 'character varying',
+    'char': 'character', 'bpchar': 'character', 'varbit': 'bit varying',
+    'timestamptz': 'timestamp with time zone', 'timetz': 'time with time zone',
+}
+MULTIWORD_TYPE_HEADS = {'double', 'character', 'timestamp', 'time', 'bit', 'interval', 'national'}
+
+
+def migration_files(directory=MIGRATIONS_DIR):
+    """Numbered migration files in apply order."""
+    return sorted(p for p in Path(directory).glob('*.sql') if MIGRATION_NAME_RE.match(p.name))
+
+
+def norm_name(name: str) -> str:
+    """Drop the default `public.` schema so qualified and bare names compare equal."""
+    return name[len('public.'):] if name.startswith('public.') else name
+
+
+def normalize_type(text: str) -> str:
+    """Canonical spelling of a column/argument type, matching `format_type()` output."""
+    t = ' '.join(text.replace('"', '').lower().split())
+    t = re.sub(r'\s*([(),])\s*', r'\1', t).replace(',', ', ')
+    arrays = 0
+    while t.endswith('[]'):
+        arrays += 1
+        t = t[:-2].rstrip()
+    if t.endswith(' array'):
+        arrays += 1
+        t = t[:-len(' array')]
+    t = norm_name(t)
+    tz = ''
+    for suffix in (' with time zone', ' without time zone'):
+        if t.endswith(suffix):
+            tz, t = suffix, t[:-len(suffix)]
+    mod = ''
+    if '(' in t:
+        t, mod = t.split('(', 1)
+        mod = '(' + mod
+    t = t.strip()
+    if t in ('character varying', 'double precision', 'bit varying'):
+        base = t
+    else:
+        base = TYPE_ALIASES.get(t, t)
+    if base in ('timestamp', 'time') and not tz:
+        tz = ' without time zone'
+    if base == 'timestamp with time zone' or base == 'time with time zone':
+        base, tz = base.split(' ', 1)[0], ' with time zone'
+    if base == 'character' and not mod:
+        mod = '(1)'
+    return f"{base}{mod}{tz}" + '[]' * arrays
+
+
+def norm_sql(tokens) -> str:
+    """Whitespace/case-insensitive rendering of a token run (string literals kept verbatim)."""
+    out = []
+    for t in tokens:
+        if t.kind in TRIVIA:
+            continue
+        out.append(t.value.lower() if t.kind == WORD else t.value)
+    return ' '.join(out)
+
+
+def split_top_level(tokens, sep=','):
+    """Split a significant-token list on depth-0 separators."""
+    parts, current, depth = [], [], 0
+    for t in tokens:
+        if t.kind == PUNCT:
+            if t.value in ('(', '['):
+                depth += 1
+            elif t.value in (')', ']'):
+                depth -= 1
+            elif t.value == sep and depth == 0:
+                parts.append(current)
+                current = []
+                continue
+        current.append(t)
+    if current:
+        parts.append(current)
+    return parts
+
+
+class _Cursor:
+    """Forward-only reader over the significant tokens of one statement."""
+
+    def __init__(self, tokens, src):
+        self.toks = [t for t in tokens if t.kind not in TRIVIA]
+        self.src = src
+        self.i = 0
+
+    def peek(self, k=0):
+        j = self.i + k
+        return self.toks[j] if j < len(self.toks) else None
+
+    def at_end(self):
+        tok = self.peek()
+        return tok is None or (tok.kind == PUNCT and tok.value == ';')
+
+    def accept(self, *words):
+        """Consume the given keyword sequence if it is next; return whether it was."""
+        for k, w in enumerate(words):
+            tok = self.peek(k)
+            if tok is None or not tok.is_word(w):
+                return False
+        self.i += len(words)
+        return True
+
+    def accept_punct(self, value):
+        tok = self.peek()
+        if tok is not None and tok.kind == PUNCT and tok.value == value:
+            self.i += 1
+            return True
+        return False
+
+    def next(self):
+        tok = self.peek()
+        self.i += 1
+        return tok
+
+    def name(self):
+        """Read a possibly schema-qualified name; returns the normalized string."""
+        tok = self.next()
+        if tok is None:
+            return None
+        parts = [ident_value(tok)]
+        while self.accept_punct('.'):
+            nxt = self.next()
+            if nxt is None:
+                break
+            parts.append(ident_value(nxt))
+        return norm_name('.'.join(parts))
+
+    def paren_group(self):
+        """Consume a balanced ( ... ) group; return the inner tokens (or None if not at '(')."""
+        tok = self.peek()
+        if tok is None or tok.kind != PUNCT or tok.value != '(':
+            return None
+        depth = 0
+        start = self.i
+        while self.i < len(self.toks):
+            t = self.toks[self.i]
+            self.i += 1
+            if t.kind == PUNCT and t.value == '(':
+                depth += 1
+            elif t.kind == PUNCT and t.value == ')':
+                depth -= 1
+                if depth == 0:
+                    return self.toks[start + 1:self.i - 1]
+        return self.toks[start + 1:]
+
+    def rest(self):
+        out = self.toks[self.i:]
+        if out and out[-1].kind == PUNCT and out[-1].value == ';':
+            out = out[:-1]
+        self.i = len(self.toks)
+        return out
+
+    def text(self, tokens):
+        """Original source text spanning `tokens`."""
+        if not tokens:
+            return ''
+        return self.src[tokens[0].start:tokens[-1].end]
+
+
+class SchemaModel:
+    def __init__(self):
+        self.tables = {}
+        self.enums = {}
+        self.indexes = {}
+        self.policies = {}
+        self.triggers = {}
+        self.functions = {}
+        self.views = {}
+        self.extensions = set()
+        self.log = []
+        self.warnings = []
+        self.ddl = {}          # (kind, key) -> text of the statement that last created/replaced it
+        self._guarded = 0
+        self._source = None
+        self._text = None
+
+    # -- entry points ----------------------------------------------------
+
+    @classmethod
+    def from_directory(cls, directory=MIGRATIONS_DIR):
+        model = cls()
+        for path in migration_files(directory):
+            model.apply_file(path)
+        return model
+
+    def apply_file(self, path):
+        path = Path(path)
+        self.apply_sql(path.read_text(encoding='utf-8'), path.name)
+
+    def apply_sql(self, text, file='<sql>'):
+        for stmt in split_statements(text):
+            self._source = {'file': file, 'statement': stmt.index, 'line': stmt.line}
+            self._apply(stmt.tokens, text)
+
+    # -- bookkeeping -----------------------------------------------------
+
+    def _event(self, kind, key, action):
+        self.log.append((dict(self._source or {}), kind, key, action))
+
+    def _warn(self, msg):
+        src = self._source or {}
+        self.warnings.append(f"{src.get('file')}:{src.get('line')}: {msg}")
+
+    def _create(self, kind, key, obj, if_not_exists=False, or_replace=False):
+        store = getattr(self, kind)
+        obj['source'] = dict(self._source or {})
+        if key in store:
+            if or_replace:
+                store[key] = obj
+                self.ddl[(kind, key)] = self._text
+                self._event(kind, key, 'replace')
+            elif if_not_exists or self._guarded:
+                self._event(kind, key, 'noop')
+            else:
+                self._warn(f"{kind[:-1]} {key} already exists (statement would fail)")
+                self._event(kind, key, 'error')
+            return
+        store[key] = obj
+        self.ddl[(kind, key)] = self._text
+        self._event(kind, key, 'create')
+
+    def _drop(self, kind, key, if_exists):
+        store = getattr(self, kind)
+        if key in store:
+            del store[key]
+            self._event(kind, key, 'drop')
+            if kind == 'tables':
+                self._drop_dependents(key)
+        else:
+            if not if_exists and not self._guarded:
+                self._warn(f"{kind[:-1]} {key} does not exist (statement would fail)")
+                self._event(kind, key, 'unknown')
+            else:
+                self._event(kind, key, 'noop')
+
+    def _drop_dependents(self, table):
+        for k in [k for k, v in self.indexes.items() if v['table'] == table]:
+            del self.indexes[k]
+            self._event('indexes', k, 'drop')
+        for kind in ('policies', 'triggers'):
+            store = getattr(self, kind)
+            for k in [k for k in store if k[0] == table]:
+                del store[k]
+                self._event(kind, k, 'drop')
+
+    # -- dispatch --------------------------------------------------------
+
+    def _apply(self, tokens, src):
+        cur = _Cursor(tokens, src)
+        if cur.at_end():
+            return
+        end = len(cur.toks) - (1 if cur.toks[-1].kind == PUNCT and cur.toks[-1].value == ';' else 0)
+        self._text = cur.text(cur.toks[:end])
+        if cur.accept('CREATE'):
+            or_replace = cur.accept('OR', 'REPLACE')
+            cur.accept('TEMP') or cur.accept('TEMPORARY') or cur.accept('UNLOGGED')
+            if cur.accept('TABLE'):
+                return self._create_table(cur)
+            if cur.accept('UNIQUE', 'INDEX'):
+                return self._create_index(cur, unique=True)
+            if cur.accept('INDEX'):
+                return self._create_index(cur, unique=False)
+            if cur.accept('TYPE'):
+                return self._create_type(cur)
+            if cur.accept('POLICY'):
+                return self._create_policy(cur)
+            if cur.accept('CONSTRAINT', 'TRIGGER') or cur.accept('TRIGGER'):
+                return self._create_trigger(cur, or_replace)
+            if cur.accept('FUNCTION'):
+                return self._create_function(cur, or_replace, 'function')
+            if cur.accept('PROCEDURE'):
+                return self._create_function(cur, or_replace, 'procedure')
+            if cur.accept('MATERIALIZED', 'VIEW'):
+                return self._create_view(cur, or_replace, materialized=True)
+            if cur.accept('VIEW'):
+                return self._create_view(cur, or_replace, materialized=False)
+            if cur.accept('EXTENSION'):
+                cur.accept('IF', 'NOT', 'EXISTS')
+                name = cur.name()
+                if name:
+                    self.extensions.add(name)
+            return
+        if cur.accept('ALTER'):
+            if cur.accept('TABLE'):
+                return self._alter_table(cur)
+            if cur.accept('TYPE'):
+                return self._alter_type(cur)
+            if cur.accept('POLICY'):
+                return self._alter_policy(cur)
+            return
+        if cur.accept('DROP'):
+            return self._drop_statement(cur)
+        if cur.accept('DO'):
+            return self._do_block(cur)
+
+    # -- tables ----------------------------------------------------------
+
+    def _create_table(self, cur):
+        if_not_exists = cur.accept('IF', 'NOT', 'EXISTS')
+        name = cur.name()
+        body = cur.paren_group()
+        table = {'columns': {}, 'constraints': {}, 'rls': False, 'force_rls': False}
+        if body is None:
+            # CREATE TABLE ... AS / OF / PARTITION OF: columns are not known statically
+            table['columns_known'] = False
+        else:
+            for element in split_top_level(body):
+                self._table_element(name, table, element, cur)
+        self._create('tables', name, table, if_not_exists=if_not_exists)
+
+    def _table_element(self, table_name, table, element, cur):
+        if not element:
+            return
+        head = element[0]
+        if head.is_word('LIKE'):
+            return
+        if head.kind == WORD and head.value.upper() in TABLE_CONSTRAINT_WORDS:
+            name, definition, implicit = self._constraint(table_name, element, cur)
+            table['constraints'][name] = {'definition': definition, 'implicit': implicit}
+            return
+        col, info, inline = self._column(table_name, element, cur)
+        table['columns'][col] = info
+        for cname, definition in inline:
+            table['constraints'][cname] = {'definition': definition, 'implicit': True, 'column': col}
+
+    def _column(self, table_name, element, cur):
+        col = ident_value(element[0])
+        i, depth = 1, 0
+        while i < len(element):
+            t = element[i]
+            if t.kind == PUNCT and t.value in '([':
+                depth += 1
+            elif t.kind == PUNCT and t.value in ')]':
+                depth -= 1
+            elif depth == 0 and t.kind == WORD and t.value.upper() in COLUMN_CONSTRAINT_WORDS:
+                break
+            i += 1
+        type_text = cur.text(element[1:i])
+        info = {'type': normalize_type(type_text), 'not_null': False, 'default': None,
+                'definition': cur.text(element)}
+        inline = []
+        rest = element[i:]
+        words = [t.value.upper() if t.kind == WORD else t.value for t in rest]
+        j = 0
+        while j < len(rest):
+            w = words[j]
+            if w == 'NOT' and j + 1 < len(rest) and words[j + 1] == 'NULL':
+                info['not_null'] = True
+                j += 2
+                continue
+            if w == 'PRIMARY':
+                info['not_null'] = True
+                inline.append((f"{table_name.split('.')[-1]}_pkey", f"PRIMARY KEY ({col})"))
+            elif w == 'UNIQUE':
+                inline.append((f"{table_name.split('.')[-1]}_{col}_key", f"UNIQUE ({col})"))
+            elif w == 'REFERENCES':
+                inline.append((f"{table_name.split('.')[-1]}_{col}_fkey", norm_sql(rest[j:_clause_end(rest, j + 1)])))
+            elif w == 'CHECK':
+                inline.append((f"{table_name.split('.')[-1]}_{col}_check", norm_sql(rest[j:_clause_end(rest, j + 1)])))
+            elif w == 'DEFAULT':
+                end = _clause_end(rest, j + 1)
+                info['default'] = norm_sql(rest[j + 1:end])
+                j = end
+                continue
+            j += 1
+        return col, info, inline
+
+    def _constraint(self, table_name, element, cur):
+        base = table_name.split('.')[-1]
+        if element[0].is_word('CONSTRAINT') and len(element) > 1:
+            return ident_value(element[1]), norm_sql(element[2:]), False
+        head = element[0].value.upper()
+        cols = ''
+        if len(element) > 1:
+            inner = _first_paren(element)
+            cols = '_'.join(ident_value(t) for t in inner if t.kind in (WORD, QUOTED_IDENT))
+        suffix = {'PRIMARY': 'pkey', 'UNIQUE': 'key', 'FOREIGN': 'fkey', 'CHECK': 'check', 'EXCLUDE': 'excl'}[head]
+        if head == 'PRIMARY':
+            name = f"{base}_pkey"
+        elif head == 'CHECK':
+            name = f"{base}_check"
+        else:
+            name = f"{base}_{cols}_{suffix}"
+        return name, norm_sql(element), True
+
+    def _alter_table(self, cur):
+        if_exists = cur.accept('IF', 'EXISTS')
+        cur.accept('ONLY')
+        name = cur.name()
+        table = self.tables.get(name)
+        if table is None:
+            if not if_exists:
+                self._warn(f"ALTER TABLE on unknown table {name}")
+            self._event('tables', name, 'unknown')
+            return
+        changed, understood = False, True
+        for action in split_top_level(cur.rest()):
+            result = self._alter_table_action(name, table, action, cur)
+            changed = result or changed
+            understood = understood and result is not None
+            if name not in self.tables:
+                # renamed; follow the new name for subsequent actions
+                break
+        # actions the model does not interpret (OWNER TO, SET STATISTICS, ...) still change the database
+        self._event('tables', name, 'alter' if changed else 'noop' if understood else 'unknown')
+
+    def _alter_table_action(self, name, table, action, cur):
+        """Apply one ALTER TABLE action: True if it changed the table, False if it was a
+        no-op, None if the model does not interpret it."""
+        a = _Cursor(action, cur.src)
+        if a.accept('ADD'):
+            tok = a.peek()
+            if tok is not None and tok.kind == WORD and tok.value.upper() in TABLE_CONSTRAINT_WORDS:
+                cname, definition, implicit = self._constraint(name, a.rest(), cur)
+                if cname in table['constraints'] and not self._guarded:
+                    self._warn(f"constraint {cname} on {name} already exists (statement would fail)")
+                    return False
+                table['constraints'][cname] = {'definition': definition, 'implicit': implicit}
+                return True
+            a.accept('COLUMN')
+            if_not_exists = a.accept('IF', 'NOT', 'EXISTS')
+            element = a.rest()
+            if not element:
+                return False
+            col, info, inline = self._column(name, element, cur)
+            if col in table['columns']:
+                if not (if_not_exists or self._guarded):
+                    self._warn(f"column {name}.{col} already exists (statement would fail)")
+                return False
+            table['columns'][col] = info
+            for cname, definition in inline:
+                table['constraints'][cname] = {'definition': definition, 'implicit': True, 'column': col}
+            return True
+        if a.accept('DROP'):
+            if a.accept('CONSTRAINT'):
+                if_exists = a.accept('IF', 'EXISTS')
+                cname = ident_value(a.next())
+                if table['constraints'].pop(cname, None) is None:
+                    if not if_exists and not self._guarded:
+                        self._warn(f"constraint {cname} on {name} does not exist")
+                    return False
+                return True
+            a.accept('COLUMN')
+            if_exists = a.accept('IF', 'EXISTS')
+            col = ident_value(a.next())
+            if table['columns'].pop(col, None) is None:
+                if not if_exists and not self._guarded:
+                    self._warn(f"column {name}.{col} does not exist")
+                return False
+            # constraints declared on the column go with it
+            table['constraints'] = {k: v for k, v in table['constraints'].items() if v.get('column') != col}
+            return True
+        if a.accept('ALTER'):
+            a.accept('COLUMN')
+            col = ident_value(a.next())
+            info = table['columns'].get(col)
+            if info is None:
+                self._warn(f"ALTER COLUMN on unknown column {name}.{col}")
+                return False
+            if a.accept('SET', 'DATA', 'TYPE') or a.accept('TYPE'):
+                rest = a.rest()
+                end = next((k for k, t in enumerate(rest) if t.is_word('USING', 'COLLATE')), len(rest))
+                info['type'] = normalize_type(cur.text(rest[:end]))
+            elif a.accept('SET', 'DEFAULT'):
+                info['default'] = norm_sql(a.rest())
+            elif a.accept('DROP', 'DEFAULT'):
+                info['default'] = None
+            elif a.accept('SET', 'NOT', 'NULL'):
+                info['not_null'] = True
+            elif a.accept('DROP', 'NOT', 'NULL'):
+                info['not_null'] = False
+            else:
+                return None
+            return True
+        if a.accept('ENABLE', 'ROW', 'LEVEL', 'SECURITY'):
+            table['rls'] = True
+            return True
+        if a.accept('DISABLE', 'ROW', 'LEVEL', 'SECURITY'):
+            table['rls'] = False
+            return True
+        if a.accept('FORCE', 'ROW', 'LEVEL', 'SECURITY'):
+            table['force_rls'] = True
+            return True
+        if a.accept('NO', 'FORCE', 'ROW', 'LEVEL', 'SECURITY'):
+            table['force_rls'] = False
+            return True
+        if a.accept('RENAME'):
+            if a.accept('TO'):
+                new = norm_name(ident_value(a.next()))
+                self.tables[new] = self.tables.pop(name)
+                for idx in self.indexes.values():
+                    if idx['table'] == name:
+                        idx['table'] = new
+                for kind in ('policies', 'triggers'):
+                    store = getattr(self, kind)
+                    for k in [k for k in store if k[0] == name]:
+                        store[(new, k[1])] = store.pop(k)
+                self._event('tables', new, 'create')
+                return True
+            if a.accept('CONSTRAINT'):
+                old = ident_value(a.next())
+                a.accept('TO')
+                new = ident_value(a.next())
+                if old in table['constraints']:
+                    table['constraints'][new] = table['constraints'].pop(old)
+                    return True
+                return False
+            a.accept('COLUMN')
+            old = ident_value(a.next())
+            a.accept('TO')
+            new = ident_value(a.next())
+            if old in table['columns']:
+                table['columns'] = {(new if k == old else k): v for k, v in table['columns'].items()}
+                for info in table['constraints'].values():
+                    if info.get('column') == old:
+                        info['column'] = new
+                return True
+            return False
+        return None
+
+    # -- types -----------------------------------------------------------
+
+    def _create_type(self, cur):
+        if_not_exists = cur.accept('IF', 'NOT', 'EXISTS')
+        name = cur.name()
+        if cur.accept('AS', 'ENUM'):
+            body = cur.paren_group() or []
+            labels = [string_value(t) for t in body if t.kind == STRING]
+            existing = self.enums.get(name)
+            if existing is not None and existing['labels'] != labels:
+                self._warn(f"enum {name} redefined with different labels {labels} (kept {existing['labels']})")
+            self._create('enums', name, {'labels': labels}, if_not_exists=if_not_exists)
+
+    def _alter_type(self, cur):
+        name = cur.name()
+        enum = self.enums.get(name)
+        if enum is None:
+            self._warn(f"ALTER TYPE on unknown type {name}")
+            self._event('enums', name, 'unknown')
+            return
+        if cur.accept('ADD', 'VALUE'):
+            if_not_exists = cur.accept('IF', 'NOT', 'EXISTS')
+            label = string_value(cur.next())
+            if label in enum['labels']:
+                if not (if_not_exists or self._guarded):
+                    self._warn(f"enum {name} already has label {label!r}")
+                self._event('enums', name, 'noop')
+                return
+            pos = len(enum['labels'])
+            if cur.accept('BEFORE'):
+                ref = string_value(cur.next())
+                pos = enum['labels'].index(ref) if ref in enum['labels'] else pos
+            elif cur.accept('AFTER'):
+                ref = string_value(cur.next())
+                pos = enum['labels'].index(ref) + 1 if ref in enum['labels'] else pos
+            enum['labels'].insert(pos, label)
+            self._event('enums', name, 'alter')
+        elif cur.accept('RENAME', 'VALUE'):
+            old = string_value(cur.next())
+            cur.accept('TO')
+            new = string_value(cur.next())
+            enum['labels'] = [new if lbl == old else lbl for lbl in enum['labels']]
+            self._event('enums', name, 'alter')
+        elif cur.accept('RENAME', 'TO'):
+            new = norm_name(ident_value(cur.next()))
+            self.enums[new] = self.enums.pop(name)
+            self._event('enums', name, 'drop')
+            self._event('enums', new, 'create')
+
+    # -- indexes ---------------------------------------------------------
+
+    def _create_index(self, cur, unique):
+        cur.accept('CONCURRENTLY')
+        if_not_exists = cur.accept('IF', 'NOT', 'EXISTS')
+        name = None
+        if not cur.peek().is_word('ON'):
+            name = cur.name()
+        cur.accept('ON')
+        cur.accept('ONLY')
+        table = cur.name()
+        rest = cur.rest()
+        if table not in self.tables and table not in self.views:
+            self._warn(f"index on unknown table {table}")
+        if name is None:
+            inner = _first_paren(rest)
+            cols = '_'.join(ident_value(t) for t in inner if t.kind in (WORD, QUOTED_IDENT))
+            name = f"{table.split('.')[-1]}_{cols}_idx"
+        self._create('indexes', name, {
+            'table': table, 'unique': unique, 'definition': norm_sql(rest),
+        }, if_not_exists=if_not_exists)
+
+    # -- policies --------------------------------------------------------
+
+    def _create_policy(self, cur):
+        name = ident_value(cur.next())
+        cur.accept('ON')
+        table = cur.name()
+        policy = {'cmd': 'ALL', 'permissive': True, 'roles': ['public'], 'using': None, 'with_check': None}
+        self._policy_clauses(cur, policy)
+        self._create('policies', (table, name), policy)
+
+    def _alter_policy(self, cur):
+        name = ident_value(cur.next())
+        cur.accept('ON')
+        table = cur.name()
+        policy = self.policies.get((table, name))
+        if policy is None:
+            self._warn(f"ALTER POLICY on unknown policy {name} ON {table}")
+            self._event('policies', (table, name), 'unknown')
+            return
+        if cur.accept('RENAME', 'TO'):
+            new = ident_value(cur.next())
+            self.policies[(table, new)] = self.policies.pop((table, name))
+            self._event('policies', (table, name), 'drop')
+            self._event('policies', (table, new), 'create')
+            return
+        self._policy_clauses(cur, policy)
+        self._event('policies', (table, name), 'alter')
+
+    def _policy_clauses(self, cur, policy):
+        while not cur.at_end():
+            if cur.accept('AS'):
+                policy['permissive'] = not cur.next().is_word('RESTRICTIVE')
+            elif cur.accept('FOR'):
+                policy['cmd'] = cur.next().value.upper()
+            elif cur.accept('TO'):
+                roles = []
+                while not cur.at_end():
+                    roles.append(ident_value(cur.next()))
+                    if not cur.accept_punct(','):
+                        break
+                policy['roles'] = sorted(roles)
+            elif cur.accept('USING'):
+                policy['using'] = norm_sql(cur.paren_group() or [])
+            elif cur.accept('WITH', 'CHECK'):
+                policy['with_check'] = norm_sql(cur.paren_group() or [])
+            else:
+                cur.next()
+
+    # -- triggers --------------------------------------------------------
+
+    def _create_trigger(self, cur, or_replace):
+        name = ident_value(cur.next())
+        body = cur.rest()
+        table, function = None, None
+        for k, t in enumerate(body):
+            if t.is_word('ON') and table is None and k + 1 < len(body):
+                sub = _Cursor(body[k + 1:], cur.src)
+                table = sub.name()
+            if t.is_word('EXECUTE') and k + 2 < len(body):
+                function = norm_name(ident_value(body[k + 2]))
+        if table is None:
+            self._warn(f"could not find table for trigger {name}")
+            return
+        self._create('triggers', (table, name), {'function': function, 'definition': norm_sql(body)},
+                     or_replace=or_replace)
+
+    # -- functions -------------------------------------------------------
+
+    def _create_function(self, cur, or_replace, kind):
+        name = cur.name()
+        args = cur.paren_group() or []
+        signature = function_signature(args, cur.src)
+        returns, language, body = None, None, None
+        toks = cur.rest()
+        k = 0
+        while k < len(toks):
+            t = toks[k]
+            if t.is_word('RETURNS'):
+                end = k + 1
+                depth = 0
+                while end < len(toks):
+                    u = toks[end]
+                    if u.kind == PUNCT and u.value == '(':
+                        depth += 1
+                    elif u.kind == PUNCT and u.value == ')':
+                        depth -= 1
+                    elif depth == 0 and u.kind == WORD and u.value.upper() in FUNCTION_OPTION_WORDS:
+                        break
+                    end += 1
+                returns = norm_sql(toks[k + 1:end])
+                k = end
+                continue
+            if t.is_word('LANGUAGE') and k + 1 < len(toks):
+                lang = toks[k + 1]
+                language = string_value(lang).lower() if lang.kind == STRING else lang.value.lower()
+                k += 2
+                continue
+            if t.is_word('AS') and k + 1 < len(toks) and toks[k + 1].kind in (DOLLAR, STRING):
+                body = string_value(toks[k + 1])
+                k += 2
+                continue
+            k += 1
+        self._create('functions', (name, signature), {
+            'kind': kind, 'returns': returns, 'language': language, 'body': body,
+        }, or_replace=or_replace)
+
+    # -- views -----------------------------------------------------------
+
+    def _create_view(self, cur, or_replace, materialized):
+        if_not_exists = cur.accept('IF', 'NOT', 'EXISTS')
+        name = cur.name()
+        cur.paren_group()
+        if cur.accept('WITH'):
+            cur.paren_group()
+        cur.accept('AS')
+        query = norm_sql(cur.rest())
+        self._create('views', name, {'materialized': materialized, 'query': query},
+                     if_not_exists=if_not_exists, or_replace=or_replace)
+
+    # -- drops -----------------------------------------------------------
+
+    def _drop_statement(self, cur):
+        kinds = [
+            (('TABLE',), 'tables'), (('MATERIALIZED', 'VIEW'), 'views'), (('VIEW',), 'views'),
+            (('INDEX',), 'indexes'), (('TYPE',), 'enums'), (('FUNCTION',), 'functions'),
+            (('PROCEDURE',), 'functions'), (('POLICY',), 'policies'), (('TRIGGER',), 'triggers'),
+        ]
+        for words, kind in kinds:
+            if cur.accept(*words):
+                break
+        else:
+            return
+        cur.accept('CONCURRENTLY')
+        if_exists = cur.accept('IF', 'EXISTS')
+        if kind in ('policies', 'triggers'):
+            name = ident_value(cur.next())
+            cur.accept('ON')
+            table = cur.name()
+            return self._drop(kind, (table, name), if_exists)
+        while not cur.at_end():
+            name = cur.name()
+            if kind == 'functions':
+                args = cur.paren_group()
+                if args is None:
+                    matches = [k for k in self.functions if k[0] == name]
+                    if not matches:
+                        self._drop(kind, (name, ''), if_exists)
+                    for key in matches:
+                        self._drop(kind, key, if_exists)
+                else:
+                    self._drop(kind, (name, function_signature(args, cur.src)), if_exists)
+            else:
+                self._drop(kind, name, if_exists)
+            if not cur.accept_punct(','):
+                break
+
+    # -- DO blocks -------------------------------------------------------
+
+    def _do_block(self, cur):
+        body_tok = None
+        while not cur.at_end():
+            t = cur.next()
+            if t.kind in (DOLLAR, STRING):
+                body_tok = t
+            elif t.is_word('LANGUAGE'):
+                lang = cur.next()
+                if lang is not None and lang.value.strip("'").lower() not in ('plpgsql',):
+                    return
+        if body_tok is None:
+            return
+        self._guarded += 1
+        try:
+            self._apply_plpgsql(string_value(body_tok))
+        finally:
+            self._guarded -= 1
+
+    def _apply_plpgsql(self, body):
+        """Interpret DDL inside a PL/pgSQL body: inline statements and EXECUTE literals."""
+        for stmt in split_statements(body):
+            toks = stmt.significant
+            k = 0
+            while k < len(toks):
+                t = toks[k]
+                at_start = k == 0 or toks[k - 1].is_word(*PLPGSQL_STMT_LEADERS)
+                if at_start and t.kind == WORD:
+                    word = t.value.upper()
+                    if word in DDL_WORDS:
+                        self._apply(toks[k:], body)
+                        break
+                    if word == 'EXECUTE':
+                        arg = toks[k + 1] if k + 1 < len(toks) else None
+                        after = toks[k + 2] if k + 2 < len(toks) else None
+                        literal_only = after is None or (after.kind == PUNCT and after.value == ';') or after.is_word('USING', 'INTO')
+                        if arg is not None and arg.kind in (STRING, DOLLAR) and literal_only:
+                            sql = string_value(arg)
+                            for inner in split_statements(sql):
+                                self._apply(inner.tokens, sql)
+                        elif arg is not None:
+                            self._warn('dynamic EXECUTE not interpreted')
+                        break
+                k += 1
+
+    # -- export ----------------------------------------------------------
+
+    def to_dict(self):
+        def keyed(store):
+            return {(k if isinstance(k, str) else '/'.join(k)): v for k, v in sorted(store.items())}
+        out = {kind: keyed(getattr(self, kind)) for kind in KINDS}
+        out['extensions'] = sorted(self.extensions)
+        out['warnings'] = list(self.warnings)
+        return out
+
+    def summary(self):
+        return {kind: len(getattr(self, kind)) for kind in KINDS}
+
+
+def _clause_end(tokens, start):
+    """Index of the next depth-0 column-constraint keyword at or after `start`."""
+    depth = 0
+    for k in range(start, len(tokens)):
+        t = tokens[k]
+        if t.kind == PUNCT and t.value == '(':
+            depth += 1
+        elif t.kind == PUNCT and t.value == ')':
+            depth -= 1
+        elif depth == 0 and t.kind == WORD and t.value.upper() in COLUMN_CONSTRAINT_WORDS - {'NULL'}:
+            return k
+    return len(tokens)
+
+
+def _first_paren(tokens):
+    depth, start = 0, None
+    for k, t in enumerate(tokens):
+        if t.kind == PUNCT and t.value == '(':
+            if depth == 0:
+                start = k + 1
+            depth += 1
+        elif t.kind == PUNCT and t.value == ')':
+            depth -= 1
+            if depth == 0 and start is not None:
+                return tokens[start:k]
+    return []
+
+
+def function_signature(args, src):
+    """Identity signature (input argument types only), e.g. 'uuid, integer'."""
+    types = []
+    for arg in split_top_level(args):
+        toks = [t for t in arg if t.kind not in TRIVIA]
+        if not toks:
+            continue
+        mode = toks[0].value.upper() if toks[0].kind == WORD else ''
+        if mode in ('IN', 'OUT', 'INOUT', 'VARIADIC'):
+            toks = toks[1:]
+            if mode == 'OUT':
+                continue
+        for k, t in enumerate(toks):
+            if t.is_word('DEFAULT') or (t.kind == PUNCT and t.value == '='):
+                toks = toks[:k]
+                break
+        if len(toks) >= 2 and toks[0].kind in (WORD, QUOTED_IDENT) and toks[1].kind in (WORD, QUOTED_IDENT, NUMBER) \
+                and toks[0].value.lower() not in MULTIWORD_TYPE_HEADS:
+            toks = toks[1:]
+        elif len(toks) >= 2 and toks[0].kind in (WORD, QUOTED_IDENT) and toks[0].value.lower() in MULTIWORD_TYPE_HEADS \
+                and toks[1].kind == WORD and toks[1].value.lower() not in ('precision', 'varying', 'with', 'without', 'zone'):
+            # "time timestamptz": an argument named like a type head
+            toks = toks[1:]
+        types.append(normalize_type(src[toks[0].start:toks[-1].end]) if toks else '')
+    return ', '.join(types)
+
+
+def diff_against_live(model, catalog):
+    """Compare the expected model with a live catalog from verify_schema.fetch_catalog().
+
+    Returns a list of human-readable difference lines (empty when they match).
+    """
+    out = []
+
+    def section(title, missing, extra):
+        for item in sorted(missing):
+            out.append(f"[{title}] missing in live: {item}")
+        for item in sorted(extra):
+            out.append(f"[{title}] not in migrations: {item}")
+
+    live_tables = {r['table_name'] for r in catalog.get('public_tables', []) if r.get('kind', 'r') in ('r', 'p', 'f')}
+    live_views = {r['table_name'] for r in catalog.get('public_tables', []) if r.get('kind') == 'v'}
+    exp_tables = {k for k in model.tables if '.' not in k}
+    section('tables', exp_tables - live_tables, live_tables - exp_tables)
+    exp_views = {k for k, v in model.views.items() if '.' not in k and not v['materialized']}
+    section('views', exp_views - live_views, live_views - exp_views)
+
+    live_cols = {}
+    for r in catalog.get('columns', []):
+        live_cols.setdefault(r['table_name'], {})[r['column_name']] = r
+    for tname in sorted(exp_tables & live_tables):
+        table = model.tables[tname]
+        if table.get('columns_known') is False:
+            continue
+        exp_c = table['columns']
+        got = live_cols.get(tname, {})
+        section(f'columns {tname}', set(exp_c) - set(got), set(got) - set(exp_c))
+        for col in sorted(set(exp_c) & set(got)):
+            exp_type = exp_c[col]['type']
+            live_type = normalize_type(got[col]['data_type'])
+            if exp_type != live_type:
+                out.append(f"[columns {tname}] {col}: expected type {exp_type}, live {live_type}")
+            if exp_c[col]['not_null'] != bool(got[col]['not_null']):
+                out.append(f"[columns {tname}] {col}: expected not_null={exp_c[col]['not_null']}, live {got[col]['not_null']}")
+
+    live_rls = {r['relname'] for r in catalog.get('rls_enabled_tables', [])}
+    exp_rls = {k for k, v in model.tables.items() if v['rls'] and '.' not in k}
+    section('rls', exp_rls - live_rls, live_rls - exp_rls)
+
+    live_enums = {r['name']: r.get('labels') for r in catalog.get('enum_types', []) if r.get('schema') == 'public'}
+    exp_enums = {k: v['labels'] for k, v in model.enums.items() if '.' not in k}
+    section('enums', set(exp_enums) - set(live_enums), set(live_enums) - set(exp_enums))
+    for name in sorted(set(exp_enums) & set(live_enums)):
+        if live_enums[name] is not None and exp_enums[name] != live_enums[name]:
+            out.append(f"[enums] {name}: expected labels {exp_enums[name]}, live {live_enums[name]}")
+
+    live_idx = {r['index_name'] for r in catalog.get('indexes', [])}
+    exp_idx = set(model.indexes)
+    # constraint-backed indexes (pkey/unique) exist live but are declared as constraints
+    live_constraint_idx = {r['constraint_name'] for r in catalog.get('constraints', []) if r.get('type') in ('p', 'u', 'x')}
+    section('indexes', exp_idx - live_idx, live_idx - exp_idx - live_constraint_idx)
+
+    live_pol = {(norm_name(r['table_name']), r['polname']) for r in catalog.get('policies', [])}
+    exp_pol = set(model.policies)
+    section('policies', {f"{t}/{n}" for t, n in exp_pol - live_pol},
+            {f"{t}/{n}" for t, n in live_pol - exp_pol if '.' not in t})
+
+    live_trg = {(norm_name(r['table_name']), r['tgname']) for r in catalog.get('triggers', [])}
+    exp_trg = set(model.triggers)
+    section('triggers', {f"{t}/{n}" for t, n in exp_trg - live_trg},
+            {f"{t}/{n}" for t, n in live_trg - exp_trg if '.' not in t})
+
+    live_fn = {(r['routine_name'], ', '.join(normalize_type(a.strip()) for a in _split_args(r.get('arguments') or '')))
+               for r in catalog.get('functions', []) if r.get('routine_schema') == 'public'}
+    exp_fn = {k for k in model.functions if '.' not in k[0]}
+    section('functions', {f"{n}({s})" for n, s in exp_fn - live_fn}, {f"{n}({s})" for n, s in live_fn - exp_fn})
+
+    live_con = {(r['table_name'], r['constraint_name']) for r in catalog.get('constraints', [])}
+    exp_con = {(t, c) for t, v in model.tables.items() if '.' not in t
+               for c, info in v['constraints'].items() if not info['implicit']}
+    section('constraints', {f"{t}/{c}" for t, c in exp_con - live_con}, set())
+    return out
+
+
+def _split_args(text):
+    """Split pg_get_function_identity_arguments() output into argument types."""
+    if not text.strip():
+        return []
+    parts, depth, cur = [], 0, ''
+    for ch in text:
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        if ch == ',' and depth == 0:
+            parts.append(cur)
+            cur = ''
+        else:
+            cur += ch
+    parts.append(cur)
+    out = []
+    for p in parts:
+        words = p.split()
+        if words and words[0].upper() in ('IN', 'INOUT', 'VARIADIC'):
+            words = words[1:]
+        # identity arguments are "name type" when the argument is named
+        if len(words) >= 2 and words[0].lower() not in MULTIWORD_TYPE_HEADS:
+            words = words[1:]
+        out.append(' '.join(words))
+    return out
+
+
+def main():
+    p = argparse.ArgumentParser(description='Build the expected schema from the migrations directory')
+    p.add_argument('--dir', default=str(MIGRATIONS_DIR))
+    p.add_argument('--json', help='Write the model as JSON to this path')
+    args = p.parse_args()
+
+    files = migration_files(args.dir)
+    model = SchemaModel()
+    for path in files:
+        model.apply_file(path)
+    print(f"Interpreted {len(files)} migration files")
+    for kind, count in model.summary().items():
+        print(f"  {kind}: {count}")
+    if model.warnings:
+        print(f"{len(model.warnings)} warnings:")
+        for w in model.warnings:
+            print('  ' + w)
+    if args.json:
+        Path(args.json).write_text(json.dumps(model.to_dict(), indent=1) + '\n', encoding='utf-8')
+        print('Wrote', args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""Load literal multi-row INSERT ... VALUES seed statements with COPY.
+
+run_sql.py sends every statement as one round trip on a fresh connection, and
+the server parses and plans every VALUES row. For seed data that is pure
+literals, `COPY ... FROM STDIN` (psycopg2 `copy_expert`) streams the same rows
+without a plan per statement. `parse_insert()` accepts a statement only when
+every row value is one of:
+
+- a string constant ('...', N'...' or a dollar-quoted string)
+- a number, optionally signed
+- NULL, TRUE or FALSE
+- ARRAY[...] of the above (becomes an array literal)
+
+each optionally followed by a `::type` cast (single-word or dotted type names,
+with an optional modifier and []). Anything else (function calls such as NOW()
+or jsonb_build_object(), DEFAULT, sub-selects, E'' strings, multi-word types,
+RETURNING, INSERT ... SELECT) returns None and the caller runs the INSERT as
+before. The values are matched with one compiled regex per value rather than
+sql_lexer.tokenize(), which was 8x slower on large seeds; even so the client
+parse runs at about 60-80k rows/s, so the COPY path pays off when the server,
+not the client, is the bottleneck (a busy or remote database). run_sql.py
+reports the rows/s it achieved.
+
+Rows go straight into the table when no value carries a cast and there is no
+ON CONFLICT clause. Otherwise they are copied into a temporary staging table
+whose columns have the cast types (or the target column types) and moved with
+`INSERT INTO t (cols) SELECT ... FROM staging <ON CONFLICT ...>`. That
+applies the same assignment casts and conflict handling as the original
+statement. A COPY that fails is rolled back and the caller falls back to the
+INSERT, so error attribution is unchanged.
+
+Usage (from an executor):
+  seed = parse_insert(stmt)
+  if seed is not None and len(seed.rows) > 1:
+      rows = copy_seed(conn, seed)       # conn must not be in autocommit mode
+
+  python scripts/seed_copy.py supabase/migrations/004_board_templates_seed.sql   # which INSERTs qualify
+"""
+import argparse
+import io
+import re
+from pathlib import Path
+
+from sql_lexer import split_statements
+
+STAGING = '_seed_copy_staging'
+
+
+class SeedInsert:
+    """A literal INSERT: target table, column list, rows of text values (None for NULL), per-column casts."""
+    __slots__ = ('table', 'columns', 'rows', 'casts', 'tail')
+
+    def __init__(self, table, columns, rows, casts, tail):
+        self.table = table
+        self.columns = columns
+        self.rows = rows
+        self.casts = casts
+        self.tail = tail
+
+
+# Comments and whitespace between tokens (block comments must not nest; a nested one fails the parse).
+_GAP = r"(?:\s+|--[^\n]*|/\*(?:[^*]|\*(?!/))*\*/)*"
+_GAP_RE = re.compile(_GAP)
+_NAME = r'(?:"(?:[^"]|"")*"|[A-Za-z_][A-Za-z0-9_$]*)'
+_HEAD_RE = re.compile(
+    _GAP + r'INSERT' + _GAP + r'INTO\b' + _GAP + rf'(?P<table>{_NAME}(?:\s*\.\s*{_NAME})?)' + _GAP
+    + r'\((?P<cols>[^()]*)\)' + _GAP + r'VALUES\b', re.I)
+_COLUMN_RE = re.compile(rf'\s*({_NAME})\s*')
+_LITERAL = r"""
+    [Nn]?'(?P<s>(?:[^']|'')*)'
+  | (?P<tag>\$(?:[A-Za-z_][A-Za-z0-9_]*)?\$)(?P<d>.*?)(?P=tag)
+  | (?P<n>[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)(?![\w.$])
+  | (?P<k>(?i:NULL|TRUE|FALSE))(?![\w$])
+"""
+_LITERAL_RE = re.compile(_LITERAL, re.X | re.S)
+_ARRAY_RE = re.compile(r'(?i:ARRAY)' + _GAP + r'\[')
+_CAST = r'::' + _GAP + rf'(?P<cast>{_NAME}(?:\s*\.\s*{_NAME})?(?:\s*\(\s*\d+(?:\s*,\s*\d+)*\s*\))?(?:\s*\[\s*\])*)'
+_CAST_RE = re.compile(_GAP + _CAST)
+# the common case in one match: a scalar literal, its optional cast and the `,` or `)` after it
+_ITEM_RE = re.compile(_GAP + '(?:' + _LITERAL + ')' + f'(?:{_GAP}{_CAST})?' + _GAP + r'(?P<sep>[,)])', re.X | re.S)
+_PUNCT_RE = {c: re.compile(_GAP + re.escape(c)) for c in '(),[]'}
+_ON_CONFLICT_RE = re.compile(_GAP + r'ON' + _GAP + r'CONFLICT\b', re.I)
+
+
+def _punct(stmt, pos, char):
+    """Position after `char` (comments and whitespace allowed before it), or None."""
+    m = _PUNCT_RE[char].match(stmt, pos)
+    return m.end() if m else None
+
+
+def _decode(m):
+    """Text value (None for NULL) of a _LITERAL match."""
+    s, tag, n, k = m.group('s', 'tag', 'n', 'k')
+    if s is not None:
+        return s.replace("''", "'")
+    if tag is not None:
+        return m.group('d')
+    if n is not None:
+        return n.lstrip('+')
+    k = k.lower()
+    return None if k == 'null' else k[0]
+
+
+def _literal(stmt, pos):
+    """(text value or None for NULL, position after it); raises ValueError when there is no literal at `pos`."""
+    m = _LITERAL_RE.match(stmt, _GAP_RE.match(stmt, pos).end())
+    if not m:
+        raise ValueError(pos)
+    return _decode(m), m.end()
+
+
+def _array_element(value):
+    if value is None:
+        return 'NULL'
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"') + '"'
+
+
+def _cast(text):
+    return ' '.join(text.split()).lower()
+
+
+def _value(stmt, pos):
+    """(text value, normalized cast type or None, position after it) for one row value."""
+    m = _ARRAY_RE.match(stmt, _GAP_RE.match(stmt, pos).end())
+    if m:
+        pos, items = m.end(), []
+        end = _punct(stmt, pos, ']')
+        while end is None:
+            item, pos = _literal(stmt, pos)
+            items.append(item)
+            end = _punct(stmt, pos, ']')
+            if end is None:
+                pos = _punct(stmt, pos, ',')
+                if pos is None:
+                    raise ValueError(pos)
+        value, pos = '{' + ','.join(_array_element(v) for v in items) + '}', end
+    else:
+        value, pos = _literal(stmt, pos)
+    m = _CAST_RE.match(stmt, pos)
+    if m:
+        return value, _cast(m.group('cast')), m.end()
+    return value, None, pos
+
+
+def parse_insert(stmt):
+    """SeedInsert for a literal `INSERT INTO t (cols) VALUES (...), ... [ON CONFLICT ...]`, else None."""
+    head = _HEAD_RE.match(stmt)
+    if not head:
+        return None  # COPY needs the column list to line values up
+    columns = []
+    for col in head.group('cols').split(','):
+        m = _COLUMN_RE.fullmatch(col)
+        if not m:
+            return None
+        columns.append(m.group(1))
+    width = len(columns)
+    rows, casts = [], [None] * width
+    pos = head.end()
+    try:
+        while True:
+            pos = _punct(stmt, pos, '(')
+            if pos is None:
+                return None
+            row = []
+            for i in range(width):
+                m = _ITEM_RE.match(stmt, pos)
+                if m:
+                    value, cast, pos, sep = _decode(m), m.group('cast'), m.end(), m.group('sep')
+                    if cast is not None:
+                        cast = _cast(cast)
+                else:
+                    value, cast, pos = _value(stmt, pos)  # ARRAY[...]
+                    sep = next((c for c in ',)' if _punct(stmt, pos, c) is not None), None)
+                    if sep is None:
+                        return None
+                    pos = _punct(stmt, pos, sep)
+                if cast != casts[i]:
+                    if rows:
+                        return None  # a cast that differs from the earlier rows'
+                    casts[i] = cast
+                row.append(value)
+                if (sep == ')') != (i == width - 1):
+                    return None  # too few or too many values
+            rows.append(row)
+            after = _punct(stmt, pos, ',')
+            if after is None:
+                break
+            pos = after
+    except ValueError:
+        return None
+    rest = split_statements(stmt[pos:])
+    if not rest:
+        return SeedInsert(head.group('table'), columns, rows, casts, '')
+    if len(rest) > 1 or not _ON_CONFLICT_RE.match(rest[0].text):
+        return None  # RETURNING and anything else keep the INSERT
+    return SeedInsert(head.group('table'), columns, rows, casts, rest[0].text.rstrip(';').rstrip())
+
+
+def _copy_field(value):
+    if value is None:
+        return '\\N'
+    return value.replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def copy_text(rows):
+    """Rows in COPY text format."""
+    buf = io.StringIO()
+    for row in rows:
+        buf.write('\t'.join(_copy_field(v) for v in row))
+        buf.write('\n')
+    buf.seek(0)
+    return buf
+
+
+def copy_seed(conn, seed):
+    """COPY the seed's rows in one transaction on `conn` (commits); returns the number of rows loaded.
+
+    Raises the server error after rolling back, so the caller can fall back to the INSERT.
+    """
+    cols = ', '.join(seed.columns)
+    try:
+        with conn.cursor() as cur:
+            if not seed.tail and not any(seed.casts):
+                cur.copy_expert(f"COPY {seed.table} ({cols}) FROM STDIN", copy_text(seed.rows))
+            else:
+                # staging columns take the cast type when the literal had one, the target column's otherwise
+                select = ', '.join(f"NULL::{cast} AS {col}" if cast else f"t.{col}"
+                                   for col, cast in zip(seed.columns, seed.casts))
+                cur.execute(f"CREATE TEMP TABLE {STAGING} ON COMMIT DROP AS "
+                            f"SELECT {select} FROM {seed.table} t WITH NO DATA")
+                cur.copy_expert(f"COPY {STAGING} ({cols}) FROM STDIN", copy_text(seed.rows))
+                cur.execute(f"INSERT INTO {seed.table} ({cols}) SELECT {cols} FROM {STAGING} {seed.tail}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return len(seed.rows)
+
+
+def main():
+    p = argparse.ArgumentParser(description='Report which INSERT statements of SQL files can be loaded with COPY')
+    p.add_argument('paths', nargs='+')
+    args = p.parse_args()
+
+    for path in map(Path, args.paths):
+        for stmt in split_statements(path.read_text(encoding='utf-8')):
+            if not stmt.significant[0].is_word('INSERT'):
+                continue
+            seed = parse_insert(stmt.text)
+            if seed is None:
+                verdict = 'INSERT (non-literal values or clauses)'
+            else:
+                staged = ' via staging table' if seed.tail or any(seed.casts) else ''
+                verdict = f"COPY {len(seed.rows)} rows into {seed.table}{staged}"
+            print(f"{path}:{stmt.line}: {verdict}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""Warm local server for the edit / repair / rerun loop, plus its thin client.
+
+Every step of the loop used to start an interpreter, import psycopg2 and
+sqlparse, re-read and re-split the migration and the fix file, and open a
+new connection. `serve` does all of that once and keeps it in memory:
+
+- the fix file's BlockIndex (block_index.py) and the migration's
+  StatementIndex (statement_index.py), reloaded when either file changes
+- sql_lint and the block-level repair functions, already imported
+- a psycopg2 ThreadedConnectionPool and the catalog snapshot that
+  verify_schema.py takes (one `pg_catalog` round trip), re-fetched lazily
+  after a successful execute
+
+Clients talk to it over a Unix socket (default scripts/.sql_daemon.sock), one
+newline-terminated JSON request and one JSON reply per connection. The client
+commands import only the standard library, so a request costs an interpreter
+start plus one local round trip.
+
+Requests (`op` plus arguments) and their replies:
+  ping                                  pid, uptime, what is loaded
+  lint       block | path | sql         diagnostics (sql_lint.lint_text)
+  repair     block | sql, pass, write   repaired text and its diagnostics; `write` splices it into the fix file
+  execute    block | statements | sql   run on a pooled connection; `dry_run` rolls back
+                                        (and refuses COMMIT, DO ... COMMIT and other
+                                        statements the rollback would not undo)
+  statements first, last                migration statements (sqlparse numbering) and the enclosing block
+  catalog    category, refresh          category counts, or the rows of one category
+  reload / shutdown
+
+Usage:
+  python scripts/sql_daemon.py serve --host ... --user ... --password ... --dbname ... &
+  python scripts/sql_daemon.py lint 6290
+  python scripts/sql_daemon.py repair 6290 --pass rewriter --write
+  python scripts/sql_daemon.py exec 6290 --dry-run
+  python scripts/sql_daemon.py stop
+"""
+import argparse
+import json
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+SOCKET = ROOT / '.sql_daemon.sock'
+FIXES = ROOT / 'manual_review_fixes.sql'
+MIGRATION = ROOT.parent / 'supabase' / 'migrations' / '20251120_all_migrations_gap_fix.sql'
+
+# pass name -> 'module:function'; each takes a block's text and returns the repaired text
+REPAIRS = {
+    'rewriter': 'repair_rewriter_advanced:process_block',
+    'sanitize': 'sanitize_and_rewrap:sanitize_block',
+    'rebalance': 'repair_plpgsql_parser_v4:rebalance_block',
+    'nested-execute-do': 'fix_nested_execute_do:fix_nested_execute_do',
+}
+
+
+def _stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+class Workspace:
+    """Everything the server keeps warm; heavy modules are imported here, never by the client."""
+
+    def __init__(self, fixes, migration, conn_params=None, pool_size=4):
+        import threading
+
+        self.fixes = Path(fixes)
+        self.migration = Path(migration)
+        self.conn_params = conn_params
+        self.pool_size = pool_size
+        self.lock = threading.RLock()
+        self.started = time.time()
+        self.warnings = []
+        self._blocks = self._blocks_stamp = None
+        self._stmts = self._stmts_stamp = None
+        self._pool = None
+        self._catalog = None
+        self._repairs = {}
+
+    # -- warm state --------------------------------------------------------
+
+    def warm(self):
+        """Load everything up front so the first request is as fast as the rest."""
+        import importlib
+
+        importlib.import_module('sql_lint')  # load the linter now rather than on the first lint request
+        for name in REPAIRS:
+            self.repair_fn(name)
+        for what, load in (('fix file', self.blocks), ('migration', self.statement_index)):
+            try:
+                load()
+            except Exception as exc:
+                self.warnings.append(f"{what}: {exc}")
+        if self.conn_params is not None:
+            try:
+                self.catalog()
+            except Exception as exc:
+                self.warnings.append(f"database: {str(exc).strip()}")
+
+    def blocks(self):
+        from block_index import BlockIndex
+
+        with self.lock:
+            stamp = _stamp(self.fixes)
+            if self._blocks is None or stamp != self._blocks_stamp:
+                self._blocks = BlockIndex.load(self.fixes)
+                self._blocks_stamp = stamp
+            return self._blocks
+
+    def statement_index(self):
+        from statement_index import StatementIndex
+
+        with self.lock:
+            stamp = _stamp(self.migration)
+            if self._stmts is None or stamp != self._stmts_stamp:
+                self._stmts = StatementIndex.load(self.migration)
+                self._stmts_stamp = stamp
+            return self._stmts
+
+    def repair_fn(self, name):
+        if name not in REPAIRS:
+            raise KeyError(f"unknown repair pass {name!r} (choices: {', '.join(REPAIRS)})")
+        if name not in self._repairs:
+            import importlib
+
+            module, attr = REPAIRS[name].split(':')
+            self._repairs[name] = getattr(importlib.import_module(module), attr)
+        return self._repairs[name]
+
+    def pool(self):
+        with self.lock:
+            if self._pool is None:
+                if self.conn_params is None:
+                    raise RuntimeError('the server was started without connection arguments')
+                from psycopg2.pool import ThreadedConnectionPool
+
+                if isinstance(self.conn_params, str):
+                    self._pool = ThreadedConnectionPool(1, self.pool_size, self.conn_params)
+                else:
+                    self._pool = ThreadedConnectionPool(1, self.pool_size, **self.conn_params)
+            return self._pool
+
+    def catalog(self, refresh=False):
+        from verify_schema import CATALOG_QUERY
+
+        with self.lock:
+            if self._catalog is None or refresh:
+                pool = self.pool()
+                conn = pool.getconn()
+                try:
+                    conn.autocommit = True
+                    with conn.cursor() as cur:
+                        cur.execute(CATALOG_QUERY)
+                        self._catalog = json.loads(cur.fetchone()[0])
+                finally:
+                    pool.putconn(conn, close=bool(conn.closed))
+            return self._catalog
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.closeall()
+
+    # -- request helpers ---------------------------------------------------
+
+    def _block(self, block_id):
+        index = self.blocks()
+        found = index.by_id.get(int(block_id))
+        if not found:
+            raise KeyError(f"no block {block_id} in {self.fixes.name}")
+        return index, found[0]
+
+    def source(self, req):
+        """(label, text) named by a request's `block`, `statements`, `path` or `sql`."""
+        if req.get('block') is not None:
+            index, block = self._block(req['block'])
+            return f"block {block.id}", index.read(block)
+        if req.get('statements'):
+            first, last = req['statements']
+            return f"statements {first}..{last}", '\n'.join(self.statement_index().statements(first, last))
+        if req.get('path'):
+            return req['path'], Path(req['path']).read_text(encoding='utf-8')
+        if req.get('sql') is not None:
+            return '<sql>', req['sql']
+        raise ValueError('request names no block, statements, path or sql')
+
+    # -- ops ---------------------------------------------------------------
+
+    def op_ping(self, req):
+        return {'pid': os.getpid(), 'uptime': round(time.time() - self.started, 1),
+                'blocks': len(self._blocks) if self._blocks is not None else None,
+                'statements': len(self._stmts) if self._stmts is not None else None,
+                'catalog': self._catalog is not None, 'pool': self._pool is not None,
+                'warnings': self.warnings}
+
+    def op_lint(self, req):
+        from sql_lint import lint_text
+
+        label, text = self.source(req)
+        return {'source': label, 'diagnostics': [d.to_dict() for d in lint_text(text, label)]}
+
+    def op_repair(self, req):
+        from sql_lint import lint_text
+
+        fn = self.repair_fn(req.get('pass', 'rewriter'))
+        label, text = self.source(req)
+        repaired = fn(text).rstrip('\n') + '\n'
+        out = {'source': label, 'pass': req.get('pass', 'rewriter'), 'changed': repaired.strip() != text.strip(),
+               'sql': repaired, 'diagnostics': [d.to_dict() for d in lint_text(repaired, label)]}
+        if req.get('write'):
+            if req.get('block') is None:
+                raise ValueError('`write` needs a block')
+            out['backup'] = self._splice(req['block'], repaired)
+        return out
+
+    def _splice(self, block_id, body):
+        """Replace one block's body in the fix file (after a backup); returns the backup id."""
+        from backup_store import save as backup
+        from block_index import write_blocks
+
+        with self.lock:
+            index, block = self._block(block_id)
+            data = self.fixes.read_bytes()
+            if index.read(block) != data[block.start:block.end].decode('utf-8'):
+                raise RuntimeError(f"{self.fixes.name} changed while block {block_id} was being repaired")
+            backup_id = backup(self.fixes, label='sql_daemon')
+            text = data[:block.start].decode('utf-8') + body + '\n' + data[block.end:].decode('utf-8')
+            write_blocks(self.fixes, text)
+            self._blocks = None
+            return backup_id
+
+    def op_execute(self, req):
+        label, text = self.source(req)
+        if req.get('dry_run'):
+            _check_rollback(label, text)
+        pool = self.pool()
+        conn = pool.getconn()
+        t0 = time.perf_counter()
+        try:
+            conn.autocommit = not req.get('dry_run')
+            with conn.cursor() as cur:
+                cur.execute(text)
+            if req.get('dry_run'):
+                conn.rollback()
+            else:
+                self._catalog = None
+            return {'source': label, 'ms': round((time.perf_counter() - t0) * 1000, 2), 'error': None,
+                    'dry_run': bool(req.get('dry_run'))}
+        except Exception as exc:
+            if not conn.closed and not conn.autocommit:
+                conn.rollback()
+            diag = getattr(exc, 'diag', None)
+            position = getattr(diag, 'statement_position', None) if diag else None
+            line = text.count('\n', 0, int(position) - 1) + 1 if position else None
+            return {'source': label, 'ms': round((time.perf_counter() - t0) * 1000, 2),
+                    'error': str(exc).strip(), 'pgcode': getattr(exc, 'pgcode', None), 'line': line,
+                    'dry_run': bool(req.get('dry_run'))}
+        finally:
+            pool.putconn(conn, close=bool(conn.closed))
+
+    def op_statements(self, req):
+        index = self.statement_index()
+        first, last = int(req['first']), int(req.get('last') or req['first'])
+        return {'statements': index.statements(first, last), 'block': index.block_of(first)}
+
+    def op_catalog(self, req):
+        catalog = self.catalog(refresh=bool(req.get('refresh')))
+        if req.get('category'):
+            return {'category': req['category'], 'rows': catalog.get(req['category'], [])}
+        return {'counts': {name: len(rows) for name, rows in catalog.items()}}
+
+    def op_reload(self, req):
+        with self.lock:
+            self._blocks = self._stmts = self._catalog = None
+            self.warnings = []
+        self.warm()
+        return self.op_ping(req)
+
+    def handle(self, req):
+        fn = getattr(self, f"op_{req.get('op')}", None)
+        if fn is None:
+            return {'ok': False, 'error': f"unknown op {req.get('op')!r}"}
+        t0 = time.perf_counter()
+        try:
+            out = fn(req)
+        except Exception as exc:
+            return {'ok': False, 'error': f"{type(exc).__name__}: {exc}"}
+        out['ok'] = True
+        out['server_ms'] = round((time.perf_counter() - t0) * 1000, 2)
+        return out
+
+
+def _check_rollback(label, text):
+    """Refuse a dry run of `text` when one of its statements would not be undone by the rollback."""
+    from sql_lexer import split_statements
+    from statement_batcher import batchable
+
+    for stmt in split_statements(text):
+        if stmt.significant and not batchable(stmt.text):
+            raise ValueError(f"{label} line {stmt.line}: the {stmt.significant[0].upper} statement commits or "
+                             f"cannot run inside a transaction, so a dry run would not roll it back")
+
+
+def serve(workspace, path):
+    import socketserver
+    import threading
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            try:
+                req = json.loads(self.rfile.readline())
+            except ValueError as exc:
+                req, reply = {}, {'ok': False, 'error': f"bad request: {exc}"}
+            else:
+                reply = {'ok': True} if req.get('op') == 'shutdown' else workspace.handle(req)
+            self.wfile.write(json.dumps(reply).encode('utf-8') + b'\n')
+            if req.get('op') == 'shutdown':
+                # shutdown() waits for serve_forever() to return, so it cannot run on a request thread's behalf inline
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    path = Path(path)
+    if path.exists():
+        if request(path, {'op': 'ping'}, timeout=1).get('ok'):
+            raise SystemExit(f"A server is already listening on {path}")
+        path.unlink()
+    t0 = time.perf_counter()
+    workspace.warm()
+    with Server(str(path), Handler) as server:
+        os.chmod(path, 0o600)
+        print(f"Listening on {path} (warm-up {time.perf_counter() - t0:.2f}s, pid {os.getpid()})", flush=True)
+        for w in workspace.warnings:
+            print('warning:', w, flush=True)
+        try:
+            server.serve_forever(poll_interval=0.2)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            workspace.close()
+            path.unlink(missing_ok=True)
+    print('Server stopped')
+
+
+def request(path, req, timeout=300):
+    """Send one request and return the reply; {'ok': False, ...} when nothing is listening."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(str(path))
+    except OSError as exc:
+        sock.close()
+        return {'ok': False, 'error': f"no server on {path} ({exc.strerror}); start one with `sql_daemon.py serve`"}
+    with sock, sock.makefile('rwb') as f:
+        f.write(json.dumps(req).encode('utf-8') + b'\n')
+        f.flush()
+        return json.loads(f.readline() or b'{"ok": false, "error": "server closed the connection"}')
+
+
+def _print_diagnostics(reply):
+    for d in reply.get('diagnostics', []):
+        print(f"{d['path']}:{d['line']}:{d['col']}: {d['severity']} {d['rule']}: {d['message']}")
+
+
+def _source(args):
+    if getattr(args, 'block', None) is not None:
+        return {'block': args.block}
+    if getattr(args, 'statements', None):
+        return {'statements': args.statements}
+    if getattr(args, 'file', None):
+        return {'path': str(Path(args.file).resolve())}
+    if getattr(args, 'sql', None) is not None:
+        return {'sql': args.sql}
+    raise SystemExit('Name a block id, --statements A B, --file or --sql')
+
+
+def main():
+    p = argparse.ArgumentParser(description='Warm server for lint / repair / execute of single blocks')
+    p.add_argument('--socket', default=str(SOCKET), help=f'Unix socket path (default: {SOCKET.name})')
+    sub = p.add_subparsers(dest='cmd', required=True)
+
+    s = sub.add_parser('serve', help='Start the server in the foreground')
+    s.add_argument('--fixes', default=str(FIXES), help=f'PROPOSED FIX file (default: {FIXES.name})')
+    s.add_argument('--migration', default=str(MIGRATION), help=f'Migration for statement lookups (default: {MIGRATION.name})')
+    s.add_argument('--host')
+    s.add_argument('--port', type=int, default=5432)
+    s.add_argument('--user')
+    s.add_argument('--password')
+    s.add_argument('--dbname')
+    s.add_argument('--sslmode', default='require')
+    s.add_argument('--dsn', help='libpq connection string instead of --host/--user/...')
+    s.add_argument('--pool', type=int, default=4, help='Maximum pooled connections (default 4)')
+
+    for name, help in (('lint', 'Lint a block, file or SQL text'), ('repair', 'Run a repair pass on a block'),
+                       ('exec', 'Execute a block, statement range or SQL text')):
+        c = sub.add_parser(name, help=help)
+        c.add_argument('block', nargs='?', type=int, help='Block id (failing statement number) in the fix file')
+        c.add_argument('--statements', type=int, nargs=2, metavar=('FIRST', 'LAST'), help='Migration statements instead')
+        c.add_argument('--file', help='SQL file instead')
+        c.add_argument('--sql', help='SQL text instead')
+        if name == 'repair':
+            c.add_argument('--pass', dest='pass_', default='rewriter', choices=sorted(REPAIRS))
+            c.add_argument('--write', action='store_true', help='Splice the result into the fix file (backed up first)')
+        if name == 'exec':
+            c.add_argument('--dry-run', action='store_true', help='Run in a transaction and roll back')
+
+    c = sub.add_parser('show', help='Print migration statements and their enclosing block')
+    c.add_argument('first', type=int)
+    c.add_argument('last', type=int, nargs='?')
+    c = sub.add_parser('catalog', help='Catalog snapshot counts, or the rows of one category')
+    c.add_argument('category', nargs='?')
+    c.add_argument('--refresh', action='store_true')
+    sub.add_parser('ping', help='Server status')
+    sub.add_parser('reload', help='Drop and reload the cached state')
+    sub.add_parser('stop', help='Stop the server')
+    args = p.parse_args()
+
+    if args.cmd == 'serve':
+        conn_params = None
+        if args.dsn:
+            conn_params = args.dsn
+        elif args.host and args.user and args.dbname:
+            conn_params = dict(host=args.host, port=args.port, user=args.user, password=args.password,
+                               dbname=args.dbname, sslmode=args.sslmode)
+        serve(Workspace(args.fixes, args.migration, conn_params, args.pool), args.socket)
+        return
+
+    t0 = time.perf_counter()
+    if args.cmd == 'lint':
+        req = dict(op='lint', **_source(args))
+    elif args.cmd == 'repair':
+        req = dict(op='repair', write=args.write, **_source(args))
+        req['pass'] = args.pass_
+    elif args.cmd == 'exec':
+        req = dict(op='execute', dry_run=args.dry_run, **_source(args))
+    elif args.cmd == 'show':
+        req = {'op': 'statements', 'first': args.first, 'last': args.last}
+    elif args.cmd == 'catalog':
+        req = {'op': 'catalog', 'category': args.category, 'refresh': args.refresh}
+    else:
+        req = {'op': {'stop': 'shutdown'}.get(args.cmd, args.cmd)}
+    reply = request(args.socket, req)
+    if not reply.get('ok'):
+        raise SystemExit(f"error: {reply.get('error')}")
+    rtt = (time.perf_counter() - t0) * 1000
+
+    if args.cmd == 'lint':
+        _print_diagnostics(reply)
+        print(f"{reply['source']}: {len(reply['diagnostics'])} diagnostics")
+    elif args.cmd == 'repair':
+        print(reply['sql'], end='')
+        _print_diagnostics(reply)
+        state = 'changed' if reply['changed'] else 'unchanged'
+        written = f", written (backup {reply['backup']})" if reply.get('backup') else ''
+        print(f"-- {reply['source']}: {reply['pass']} {state}, {len(reply['diagnostics'])} diagnostics{written}",
+              file=sys.stderr)
+    elif args.cmd == 'exec':
+        mode = ' (rolled back)' if reply['dry_run'] else ''
+        if reply['error']:
+            where = f" at line {reply['line']}" if reply.get('line') else ''
+            print(f"{reply['source']}: ERROR [{reply.get('pgcode')}]{where}: {reply['error']}{mode}")
+        else:
+            print(f"{reply['source']}: OK in {reply['ms']} ms{mode}")
+    elif args.cmd == 'show':
+        print('\n'.join(reply['statements']))
+        if reply['block']:
+            first, last = reply['block']
+            print(f"-- enclosing block: statements {first + 1}..{last + 1}", file=sys.stderr)
+    elif args.cmd == 'catalog':
+        if args.category:
+            for row in reply['rows']:
+                print(json.dumps(row, sort_keys=True))
+        else:
+            for name, count in reply['counts'].items():
+                print(f"{name:<12} {count}")
+    else:
+        print(json.dumps({k: v for k, v in reply.items() if k != 'ok'}, indent=1))
+    print(f"({reply.get('server_ms', 0):.1f} ms in the server, {rtt:.1f} ms round trip)", file=sys.stderr)
+    if args.cmd == 'exec' and reply['error']:
+        raise SystemExit(1)
+    if args.cmd == 'lint' and any(d['severity'] == 'error' for d in reply['diagnostics']):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""Single-pass PostgreSQL lexer and statement splitter.
+
+The repair scripts each carried their own regex-based splitter; this module
+is the shared, linear-time replacement. It understands everything that can
+hide a semicolon or a keyword from a naive scan:
+
+- `-- line` and nested `/* block */` comments
+- single-quoted strings, including E'' (backslash escapes), B'', X'', N'', U&''
+- "quoted identifiers"
+- dollar-quoted strings with arbitrary tags (`$$`, `$body$`, ...)
+- positional parameters (`$1`) which are *not* dollar quotes
+
+Every token carries its byte-offset span plus 1-based line/column, computed
+incrementally so the whole pass stays O(n). Unterminated strings, quoted
+identifiers, dollar bodies and block comments are returned as tokens with
+`terminated=False` instead of raising, so linters can report them.
+
+Usage:
+  from sql_lexer import tokenize, split_statements
+  for stmt in split_statements(text):
+      print(stmt.line, stmt.text[:40])
+"""
+import re
+
+WS = 'ws'
+COMMENT = 'comment'
+BLOCK_COMMENT = 'block_comment'
+STRING = 'string'
+QUOTED_IDENT = 'quoted_ident'
+DOLLAR = 'dollar'
+WORD = 'word'
+NUMBER = 'number'
+PARAM = 'param'
+PUNCT = 'punct'
+
+TRIVIA = (WS, COMMENT, BLOCK_COMMENT)
+
+_WS_RE = re.compile(r'\s+')
+_LINE_COMMENT_RE = re.compile(r'--[^\n]*')
+_BLOCK_EDGE_RE = re.compile(r'/\*|\*/')
+_STD_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_ESC_STRING_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'", re.DOTALL)
+_STRING_PREFIX_RE = re.compile(r"(?:[EeBbXxNn]|[Uu]&)'")
+_QUOTED_IDENT_RE = re.compile(r'"(?:[^"]|"")*"')
+_UNICODE_IDENT_RE = re.compile(r'[Uu]&"(?:[^"]|"")*"')
+# Identifier characters are spelled as negated ASCII classes (letters, `_` and anything non-ASCII;
+# digits and `$` after the first): a literal \u0080-\uffff range costs ~25 ms of charset
+# compilation at import, which is most of a lint run's start-up time.
+_IDENT_START = r'[^\x00-\x40\x5b-\x5e\x60\x7b-\x7f]'
+_TAG_CHAR = r'[^\x00-\x2f\x3a-\x40\x5b-\x5e\x60\x7b-\x7f]'
+_WORD_CHAR = r'[^\x00-\x23\x25-\x2f\x3a-\x40\x5b-\x5e\x60\x7b-\x7f]'
+_DOLLAR_TAG_RE = re.compile(rf'\$(?:{_IDENT_START}{_TAG_CHAR}*)?\$')
+_PARAM_RE = re.compile(r'\$\d+')
+_WORD_RE = re.compile(rf'{_IDENT_START}{_WORD_CHAR}*')
+_NUMBER_RE = re.compile(r'(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?')
+_MULTI_PUNCT = ('::', ':=', '=>', '<=', '>=', '<>', '!=', '||', '->>', '->', '#>>', '#>', '#-',
+                '!~~*', '!~~', '!~*', '!~', '~~*', '~~', '~*', '@>', '<@', '@@', '&&', '?|', '?&')
+
+
+class Token:
+    __slots__ = ('kind', 'value', 'start', 'end', 'line', 'col', 'tag', 'terminated')
+
+    def __init__(self, kind, value, start, end, line, col, tag=None, terminated=True):
+        self.kind = kind
+        self.value = value
+        self.start = start
+        self.end = end
+        self.line = line
+        self.col = col
+        self.tag = tag
+        self.terminated = terminated
+
+    @property
+    def upper(self):
+        """Upper-cased value for keyword comparisons (words only)."""
+        return self.value.upper() if self.kind == WORD else self.value
+
+    def is_word(self, *words):
+        return self.kind == WORD and self.value.upper() in words
+
+    def __repr__(self):
+        return f"Token({self.kind}, {self.value[:30]!r}, {self.line}:{self.col})"
+
+
+def _scan_block_comment(text, pos):
+    """Return end offset of a (possibly nested) block comment starting at pos, or -1."""
+    depth = 0
+    i = pos
+    while True:
+        m = _BLOCK_EDGE_RE.search(text, i)
+        if not m:
+            return -1
+        if m.group(0) == '/*':
+            depth += 1
+        else:
+            depth -= 1
+        i = m.end()
+        if depth == 0:
+            return i
+
+
+def tokenize(text, start=0, end=None, line=1, col=1):
+    """Yield tokens for text[start:end]. `line`/`col` give the position of `start`."""
+    n = len(text) if end is None else end
+    pos = start
+    line_start = start - (col - 1)  # virtual offset of the current line's first char
+    while pos < n:
+        ch = text[pos]
+        kind = None
+        tok_end = pos
+        tag = None
+        terminated = True
+
+        if ch.isspace():
+            kind, tok_end = WS, _WS_RE.match(text, pos, n).end()
+        elif ch == '-' and text.startswith('--', pos):
+            kind, tok_end = COMMENT, _LINE_COMMENT_RE.match(text, pos, n).end()
+        elif ch == '/' and text.startswith('/*', pos):
+            kind = BLOCK_COMMENT
+            tok_end = _scan_block_comment(text, pos)
+            if tok_end == -1 or tok_end > n:
+                tok_end, terminated = n, False
+        elif ch == "'" or (ch in 'EeBbXxNnUu' and _STRING_PREFIX_RE.match(text, pos, n)):
+            kind = STRING
+            quote = text.index("'", pos)
+            rx = _ESC_STRING_RE if ch in 'Ee' else _STD_STRING_RE
+            m = rx.match(text, quote, n)
+            if m:
+                tok_end = m.end()
+            else:
+                tok_end, terminated = n, False
+        elif ch == '"' or (ch in 'Uu' and _UNICODE_IDENT_RE.match(text, pos, n)):
+            kind = QUOTED_IDENT
+            m = _QUOTED_IDENT_RE.match(text, text.index('"', pos), n)
+            if m:
+                tok_end = m.end()
+            else:
+                tok_end, terminated = n, False
+        elif ch == '$':
+            m = _DOLLAR_TAG_RE.match(text, pos, n)
+            if m:
+                kind = DOLLAR
+                tag = m.group(0)
+                close = text.find(tag, m.end(), n)
+                if close == -1:
+                    tok_end, terminated = n, False
+                else:
+                    tok_end = close + len(tag)
+            else:
+                m = _PARAM_RE.match(text, pos, n)
+                if m:
+                    kind, tok_end = PARAM, m.end()
+                else:
+                    kind, tok_end = PUNCT, pos + 1
+        elif ch.isalpha() or ch == '_' or ch >= '\u0080':
+            kind, tok_end = WORD, _WORD_RE.match(text, pos, n).end()
+        elif ch.isdigit() or (ch == '.' and pos + 1 < n and text[pos + 1].isdigit()):
+            kind, tok_end = NUMBER, _NUMBER_RE.match(text, pos, n).end()
+        else:
+            kind, tok_end = PUNCT, pos + 1
+            for op in _MULTI_PUNCT:
+                if text.startswith(op, pos):
+                    tok_end = pos + len(op)
+                    break
+
+        value = text[pos:tok_end]
+        yield Token(kind, value, pos, tok_end, line, pos - line_start + 1, tag, terminated)
+        nl = value.count('\n')
+        if nl:
+            line += nl
+            line_start = pos + value.rindex('\n') + 1
+        pos = tok_end
+
+
+class Statement:
+    """One top-level statement: offsets into the source plus its tokens."""
+    __slots__ = ('index', 'start', 'end', 'line', 'col', 'text', 'tokens')
+
+    def __init__(self, index, start, end, line, col, text, tokens):
+        self.index = index
+        self.start = start
+        self.end = end
+        self.line = line
+        self.col = col
+        self.text = text
+        self.tokens = tokens
+
+    @property
+    def significant(self):
+        """Tokens without whitespace and comments."""
+        return [t for t in self.tokens if t.kind not in TRIVIA]
+
+    def __repr__(self):
+        return f"Statement(#{self.index} line {self.line}: {' '.join(self.text.split())[:40]!r})"
+
+
+def split_statements(text, keep_empty=False):
+    """Split on top-level semicolons. Returns Statement objects (1-based `index`).
+
+    The statement text is stripped of surrounding whitespace/comments and
+    includes its terminating semicolon when present. Statements consisting
+    only of comments/whitespace are dropped unless `keep_empty` is set.
+    """
+    out = []
+    current = []
+    for tok in tokenize(text):
+        current.append(tok)
+        if tok.kind == PUNCT and tok.value == ';':
+            _emit(text, current, out, keep_empty)
+            current = []
+    if current:
+        _emit(text, current, out, keep_empty)
+    return out
+
+
+def _emit(text, tokens, out, keep_empty):
+    sig = [t for t in tokens if t.kind not in TRIVIA]
+    if not sig or (len(sig) == 1 and sig[0].value == ';'):
+        if not keep_empty:
+            return
+        sig = tokens
+    first, last = sig[0], sig[-1]
+    out.append(Statement(len(out) + 1, first.start, last.end, first.line, first.col,
+                         text[first.start:last.end], tokens))
+
+
+def dollar_body(tok):
+    """Inner text of a dollar-quoted token (without the tags)."""
+    if tok.kind != DOLLAR:
+        raise ValueError('not a dollar-quoted token')
+    v = tok.value
+    return v[len(tok.tag):len(v) - len(tok.tag)] if tok.terminated else v[len(tok.tag):]
+
+
+def string_value(tok):
+    """Decoded value of a plain or dollar-quoted string literal (E'' escapes are left as-is)."""
+    if tok.kind == DOLLAR:
+        return dollar_body(tok)
+    if tok.kind != STRING:
+        raise ValueError('not a string token')
+    body = tok.value[tok.value.index("'") + 1:]
+    if tok.terminated:
+        body = body[:-1]
+    return body.replace("''", "'")
+
+
+def ident_value(tok):
+    """Normalized identifier: unquoted words fold to lower case, quoted ones keep their case."""
+    if tok.kind == QUOTED_IDENT:
+        return tok.value[1:-1].replace('""', '"') if tok.value.startswith('"') else tok.value
+    return tok.value.lower()
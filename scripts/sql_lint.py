@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""Lexer-based structural linter for migration and PROPOSED FIX files.
+
+Replaces check_balance.py and check_dollar_balance.cjs. Both counted regex
+matches of `$tag$`, `BEGIN` and `END` anywhere in the text, including inside
+strings, comments and `END IF`/`END LOOP`, so every block came out
+unbalanced. This linter makes one pass with sql_lexer and reports
+line:column diagnostics for:
+
+- unterminated-string / unterminated-identifier / unterminated-comment /
+  unterminated-dollar: a literal or comment that runs to end of file
+- dollar-tag-reused: a dollar body that ends mid-statement and is followed by
+  SQL text, which is what happens when the same tag (usually `$$`) is nested
+  inside itself
+- block-mismatch / block-unclosed / block-unexpected-end: BEGIN/END,
+  IF/END IF, LOOP/END LOOP and CASE/END CASE nesting inside PL/pgSQL bodies
+  (DO blocks and LANGUAGE plpgsql functions, recursively through
+  `EXECUTE $tag$...$tag$` literals)
+- create-type-if-not-exists: `CREATE TYPE IF NOT EXISTS`, which PostgreSQL
+  rejects
+- create-type-unguarded: `CREATE TYPE ... AS ENUM` outside a
+  `IF NOT EXISTS (SELECT 1 FROM pg_type ...)` guard or a block handling
+  `duplicate_object`
+
+Files with `-- PROPOSED FIX:` headers also get the block number on each
+diagnostic.
+
+Directories are expanded to their *.sql files and linted in parallel worker
+processes. Results are cached in scripts/.sql_lint_cache.json by content
+hash (and by a hash of the linter itself), so unchanged files are not
+re-linted.
+
+Usage:
+  python scripts/sql_lint.py                              # manual_review_fixes_auto_repaired.sql -> balance_report.txt
+  python scripts/sql_lint.py supabase/migrations
+  python scripts/sql_lint.py supabase/migrations --json lint.json --sarif lint.sarif
+"""
+import argparse
+import bisect
+import hashlib
+import json
+import re
+from pathlib import Path
+
+from sql_lexer import (BLOCK_COMMENT, DOLLAR, NUMBER, PUNCT, QUOTED_IDENT, STRING, TRIVIA, WORD,
+                       string_value, tokenize)
+
+ROOT = Path(__file__).resolve().parent
+INPUT = ROOT / 'manual_review_fixes_auto_repaired.sql'
+REPORT = ROOT / 'balance_report.txt'
+CACHE = ROOT / '.sql_lint_cache.json'
+CACHE_LIMIT = 2000
+
+ERROR = 'error'
+WARNING = 'warning'
+
+HEADER_RE = re.compile(r'(?m)^-- PROPOSED FIX:')
+CREATE_ENUM_RE = re.compile(r'\bCREATE\s+TYPE\b(?:(?!;).)*?\bAS\s+ENUM\b', re.IGNORECASE | re.DOTALL)
+
+# Words that may legitimately follow a closing dollar tag. Any operator or punctuation may too; only a
+# word outside this set, a literal or a quoted identifier means the body closed mid-statement.
+AFTER_DOLLAR_WORDS = {'LANGUAGE', 'USING', 'INTO', 'AS', 'SET', 'IMMUTABLE', 'STABLE', 'VOLATILE',
+                      'SECURITY', 'STRICT', 'CALLED', 'RETURNS', 'COST', 'ROWS', 'PARALLEL', 'LEAKPROOF',
+                      'NOT', 'WINDOW', 'SUPPORT', 'THEN', 'ELSE', 'END', 'LOOP', 'AND', 'OR', 'IS',
+                      'FROM', 'WHERE', 'WHEN', 'IN', 'LIKE', 'ILIKE', 'COLLATE', 'ESCAPE', 'SIMILAR',
+                      'BETWEEN', 'ISNULL', 'NOTNULL', 'AT', 'OVERLAPS',
+                      # clauses that can follow a literal in a query
+                      'ORDER', 'GROUP', 'HAVING', 'UNION', 'INTERSECT', 'EXCEPT', 'LIMIT', 'OFFSET',
+                      'FETCH', 'FOR', 'ON', 'WITH', 'RETURNING', 'JOIN', 'INNER', 'LEFT', 'RIGHT', 'FULL',
+                      'CROSS', 'NATURAL', 'ASC', 'DESC', 'NULLS',
+                      # column and constraint clauses after a literal DEFAULT
+                      'DEFAULT', 'CHECK', 'CONSTRAINT', 'REFERENCES', 'PRIMARY', 'UNIQUE', 'GENERATED'}
+# A body ending with one of these stopped in the middle of an expression.
+DANGLING_TAIL_WORDS = {'EXECUTE', 'AS', 'RETURN', 'PERFORM', 'THEN', 'ELSE', 'AND', 'OR'}
+DANGLING_TAIL_PUNCT = {'(', ',', ':=', '=', '||'}
+STMT_LEADERS = {'THEN', 'ELSE', 'BEGIN', 'LOOP', 'DECLARE', 'EXCEPTION'}
+
+
+class Diagnostic:
+    __slots__ = ('path', 'line', 'col', 'severity', 'rule', 'message', 'block')
+
+    def __init__(self, path, line, col, severity, rule, message, block=None):
+        self.path = path
+        self.line = line
+        self.col = col
+        self.severity = severity
+        self.rule = rule
+        self.message = message
+        self.block = block
+
+    def to_dict(self):
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __str__(self):
+        where = f" [block {self.block}]" if self.block is not None else ''
+        return f"{self.path}:{self.line}:{self.col}: {self.severity} {self.rule}: {self.message}{where}"
+
+
+class _Linter:
+    def __init__(self, text, path):
+        self.text = text
+        self.path = str(path)
+        self.diagnostics = []
+
+    def report(self, tok, severity, rule, message):
+        self.diagnostics.append(Diagnostic(self.path, tok.line, tok.col, severity, rule, message))
+
+    def body_tokens(self, tok, keep_trivia=False):
+        """Tokens of a dollar body, lexed in place so positions stay file-relative."""
+        start = tok.start + len(tok.tag)
+        end = tok.end - len(tok.tag) if tok.terminated else tok.end
+        toks = list(tokenize(self.text, start, end, tok.line, tok.col + len(tok.tag)))
+        return toks if keep_trivia else [t for t in toks if t.kind not in TRIVIA]
+
+    # -- SQL level -------------------------------------------------------
+
+    def lint_sql(self, tokens, execute_literal=False):
+        """Lint top-level SQL; `tokens` is a full token list (trivia included)."""
+        sig = [t for t in tokens if t.kind not in TRIVIA]
+        self._check_terminated(tokens)
+        broken = {t.start for k, t in enumerate(sig)
+                  if t.kind == DOLLAR and t.terminated and not self._check_dollar(t, sig[k + 1] if k + 1 < len(sig) else None)}
+        stmt_start = True
+        for k, t in enumerate(sig):
+            if stmt_start and t.is_word('CREATE') and not execute_literal:
+                self._check_create_type(sig, k)
+            if stmt_start and t.is_word('DO'):
+                body = next((u for u in sig[k + 1:k + 4] if u.kind in (DOLLAR, STRING)), None)
+                if body is not None and body.kind == DOLLAR and body.terminated and body.start not in broken:
+                    self.lint_plpgsql(body)
+            if t.is_word('FUNCTION', 'PROCEDURE') and k > 0 and sig[k - 1].is_word('CREATE', 'REPLACE'):
+                self._lint_function(sig, k, broken)
+            stmt_start = t.kind == PUNCT and t.value == ';'
+
+    def _check_terminated(self, tokens):
+        for t in tokens:
+            if t.terminated:
+                continue
+            if t.kind == STRING:
+                self.report(t, ERROR, 'unterminated-string', 'string literal is never closed')
+            elif t.kind == QUOTED_IDENT:
+                self.report(t, ERROR, 'unterminated-identifier', 'quoted identifier is never closed')
+            elif t.kind == BLOCK_COMMENT:
+                self.report(t, ERROR, 'unterminated-comment', 'block comment is never closed')
+            elif t.kind == DOLLAR:
+                self.report(t, ERROR, 'unterminated-dollar', f"dollar quote {t.tag} is never closed")
+
+    def _check_dollar(self, tok, after):
+        """Report a dollar body that closes mid-statement; returns False when it does."""
+        inner = self.body_tokens(tok)
+        tail = inner[-1] if inner else None
+        dangling = tail is not None and (
+            tail.is_word(*DANGLING_TAIL_WORDS) or (tail.kind == PUNCT and tail.value in DANGLING_TAIL_PUNCT))
+        followed_by_sql = after is not None and (
+            (after.kind == WORD and after.value.upper() not in AFTER_DOLLAR_WORDS)
+            or after.kind in (DOLLAR, STRING, QUOTED_IDENT, NUMBER))
+        if dangling or followed_by_sql:
+            self.report(tok, ERROR, 'dollar-tag-reused',
+                        f"{tok.tag} body closes at line {_end_line(tok)} in the middle of a statement; "
+                        f"the tag is nested inside itself (use a distinct tag such as $inner$) or is a stray closer")
+            return False
+        return True
+
+    def _check_create_type(self, sig, k):
+        nxt = sig[k + 1] if k + 1 < len(sig) else None
+        if nxt is None or not nxt.is_word('TYPE'):
+            return
+        if k + 3 < len(sig) and sig[k + 2].is_word('IF') and sig[k + 3].is_word('NOT'):
+            self.report(sig[k], ERROR, 'create-type-if-not-exists',
+                        'CREATE TYPE does not support IF NOT EXISTS; guard it with a pg_type check in a DO block')
+            return
+        for u in sig[k + 2:]:
+            if u.kind == PUNCT and u.value == ';':
+                break
+            if u.is_word('ENUM'):
+                self.report(sig[k], WARNING, 'create-type-unguarded',
+                            'CREATE TYPE ... AS ENUM is not idempotent; wrap it in a pg_type guard')
+                break
+
+    def _lint_function(self, sig, k, broken):
+        body, language = None, None
+        for j in range(k + 1, len(sig)):
+            u = sig[j]
+            if u.kind == PUNCT and u.value == ';':
+                break
+            if u.is_word('AS') and j + 1 < len(sig) and sig[j + 1].kind == DOLLAR:
+                body = sig[j + 1]
+            elif u.is_word('LANGUAGE') and j + 1 < len(sig):
+                language = sig[j + 1].value.strip("'\"").lower()
+        if body is not None and body.terminated and body.start not in broken and language == 'plpgsql':
+            self.lint_plpgsql(body)
+
+    # -- PL/pgSQL level --------------------------------------------------
+
+    def lint_plpgsql(self, body_tok):
+        """Check block nesting and CREATE TYPE guards inside a dollar-quoted PL/pgSQL body."""
+        tokens = self.body_tokens(body_tok, keep_trivia=True)
+        self._check_terminated(tokens)
+        sig = [t for t in tokens if t.kind not in TRIVIA]
+        # frames: [kind, token, guarded, pending_create_types]
+        stack = []
+        k = 0
+        while k < len(sig):
+            t = sig[k]
+            prev = sig[k - 1] if k else None
+            at_start = prev is None or (prev.kind == PUNCT and prev.value == ';') or prev.is_word(*STMT_LEADERS)
+            if t.kind == DOLLAR and t.terminated:
+                ok = self._check_dollar(t, sig[k + 1] if k + 1 < len(sig) else None)
+                if ok and prev is not None and prev.is_word('EXECUTE'):
+                    self._execute_literal(t, stack)
+            elif t.kind == STRING and prev is not None and prev.is_word('EXECUTE'):
+                if CREATE_ENUM_RE.search(string_value(t)):
+                    self._create_type_in_body(t, stack)
+            elif t.kind != WORD:
+                pass
+            elif t.is_word('END'):
+                nxt = sig[k + 1] if k + 1 < len(sig) else None
+                closes = 'BEGIN'
+                if nxt is not None and nxt.is_word('IF', 'LOOP', 'CASE'):
+                    closes = nxt.value.upper()
+                    k += 1
+                self._close(t, closes, stack)
+            elif t.is_word('BEGIN'):
+                stack.append(['BEGIN', t, False, []])
+            elif t.is_word('IF') and at_start:
+                j = k + 1
+                while j < len(sig) and not sig[j].is_word('THEN'):
+                    j += 1
+                cond = ' '.join(u.value.lower() for u in sig[k + 1:j])
+                guarded = 'not exists' in cond and 'pg_type' in cond
+                stack.append(['IF', t, guarded, []])
+            elif t.is_word('LOOP'):
+                stack.append(['LOOP', t, False, []])
+            elif t.is_word('CASE'):
+                stack.append(['CASE' if at_start else 'CASE-EXPR', t, False, []])
+            elif t.is_word('EXCEPTION') and stack and stack[-1][0] == 'BEGIN':
+                j = k + 1
+                while j < len(sig) and not sig[j].is_word('THEN'):
+                    j += 1
+                if any(u.is_word('DUPLICATE_OBJECT', 'OTHERS') for u in sig[k + 1:j]):
+                    stack[-1][2] = True
+            elif t.is_word('CREATE') and at_start and k + 1 < len(sig) and sig[k + 1].is_word('TYPE'):
+                if any(u.is_word('ENUM') for u in _until_semicolon(sig, k)):
+                    self._create_type_in_body(t, stack)
+            k += 1
+        for frame in stack:
+            self.report(frame[1], ERROR, 'block-unclosed', f"{_frame_name(frame[0])} opened here is never closed")
+            self._flush_pending(frame)
+
+    def _execute_literal(self, tok, stack):
+        inner = self.body_tokens(tok, keep_trivia=True)
+        if CREATE_ENUM_RE.search(string_value(tok)):
+            self._create_type_in_body(tok, stack)
+        # EXECUTEd text is SQL in its own right (often a nested DO block)
+        self.lint_sql(inner, execute_literal=True)
+
+    def _create_type_in_body(self, tok, stack):
+        if any(frame[2] for frame in stack if frame[0] == 'IF'):
+            return
+        for frame in reversed(stack):
+            if frame[0] == 'BEGIN':
+                # may still be guarded by an EXCEPTION WHEN duplicate_object handler
+                frame[3].append(tok)
+                return
+        self.report(tok, WARNING, 'create-type-unguarded',
+                    'CREATE TYPE ... AS ENUM is not guarded by a pg_type check or duplicate_object handler')
+
+    def _flush_pending(self, frame):
+        if frame[0] == 'BEGIN' and not frame[2]:
+            for tok in frame[3]:
+                self.report(tok, WARNING, 'create-type-unguarded',
+                            'CREATE TYPE ... AS ENUM is not guarded by a pg_type check or duplicate_object handler')
+
+    def _close(self, tok, closes, stack):
+        expected = {'BEGIN': ('BEGIN', 'CASE-EXPR'), 'IF': ('IF',), 'LOOP': ('LOOP',), 'CASE': ('CASE',)}[closes]
+        label = 'END' if closes == 'BEGIN' else f'END {closes}'
+        if not stack:
+            self.report(tok, ERROR, 'block-unexpected-end', f"{label} without a matching opener")
+            return
+        frame = stack[-1]
+        if frame[0] in expected:
+            stack.pop()
+            self._flush_pending(frame)
+            return
+        # assume a typo'd closer (END for END IF, ...) so later blocks still line up
+        self.report(tok, ERROR, 'block-mismatch',
+                    f"{label} closes {_frame_name(frame[0])} opened at line {frame[1].line}")
+        stack.pop()
+        self._flush_pending(frame)
+
+
+def _frame_name(kind):
+    return {'CASE-EXPR': 'CASE expression'}.get(kind, kind)
+
+
+def _until_semicolon(sig, k):
+    for u in sig[k:]:
+        if u.kind == PUNCT and u.value == ';':
+            return
+        yield u
+
+
+def _end_line(tok):
+    return tok.line + tok.value.count('\n')
+
+
+def lint_text(text, path='<sql>'):
+    """Return the diagnostics for one SQL text, sorted by position."""
+    linter = _Linter(text, path)
+    linter.lint_sql(list(tokenize(text)))
+    headers, line, pos = [], 1, 0
+    for m in HEADER_RE.finditer(text):
+        line += text.count('\n', pos, m.start())
+        pos = m.start()
+        headers.append(line)
+    if headers:
+        for d in linter.diagnostics:
+            block = bisect.bisect_right(headers, d.line)
+            d.block = block or None
+    # de-duplicate (a body may be reached both as DO body and EXECUTE literal)
+    seen = set()
+    out = []
+    for d in sorted(linter.diagnostics, key=lambda d: (d.line, d.col, d.rule)):
+        key = (d.line, d.col, d.rule)
+        if key not in seen:
+            seen.add(key)
+            out.append(d)
+    return out
+
+
+def lint_file(path):
+    return lint_text(Path(path).read_text(encoding='utf-8'), path)
+
+
+def linter_version():
+    """Hash of the lint rules and lexer, so cached results expire when either changes."""
+    h = hashlib.sha256()
+    for name in ('sql_lint.py', 'sql_lexer.py'):
+        h.update((ROOT / name).read_bytes())
+    return h.hexdigest()[:16]
+
+
+def expand_paths(paths):
+    """Files as given, directories expanded to their *.sql files (sorted)."""
+    out = []
+    for p in paths:
+        p = Path(p)
+        out.extend(sorted(p.glob('*.sql')) if p.is_dir() else [p])
+    return out
+
+
+def _lint_worker(path):
+    return [d.to_dict() for d in lint_file(path)]
+
+
+def lint_paths(paths, jobs=None, cache_path=CACHE):
+    """Lint files in parallel, reusing cached results for unchanged content.
+
+    Returns ({path: [Diagnostic]}, number of files actually linted).
+    """
+    version = linter_version()
+    cache = {}
+    if cache_path and Path(cache_path).exists():
+        try:
+            stored = json.loads(Path(cache_path).read_text(encoding='utf-8'))
+            if stored.get('version') == version:
+                cache = stored.get('files', {})
+        except ValueError:
+            cache = {}
+
+    digests = {str(p): hashlib.sha256(Path(p).read_bytes()).hexdigest() for p in paths}
+    todo = [key for key, digest in digests.items() if digest not in cache]
+    if len(todo) > 1 and jobs != 1:
+        # imported here: multiprocessing costs more start-up time than linting a single file
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            fresh = list(pool.map(_lint_worker, todo))
+    else:
+        fresh = [_lint_worker(key) for key in todo]
+    for key, diags in zip(todo, fresh):
+        cache[digests[key]] = diags
+
+    results = {key: [Diagnostic(**dict(d, path=key)) for d in cache[digest]] for key, digest in digests.items()}
+    if cache_path:
+        # keep entries for files seen this run plus a bounded tail of older ones
+        kept = {d: cache[d] for d in digests.values()}
+        for k, v in cache.items():
+            if len(kept) >= CACHE_LIMIT:
+                break
+            kept.setdefault(k, v)
+        Path(cache_path).write_text(json.dumps({'version': version, 'files': kept}) + '\n', encoding='utf-8')
+    return results, len(todo)
+
+
+def to_sarif(results):
+    """SARIF 2.1.0 log for the merged results (one run, one result per diagnostic)."""
+    rules = sorted({d.rule for ds in results.values() for d in ds})
+    sarif_results = []
+    for path, diags in results.items():
+        for d in diags:
+            sarif_results.append({
+                'ruleId': d.rule,
+                'level': d.severity,
+                'message': {'text': d.message},
+                'locations': [{'physicalLocation': {
+                    'artifactLocation': {'uri': Path(path).as_posix()},
+                    'region': {'startLine': d.line, 'startColumn': d.col},
+                }}],
+            })
+    return {
+        'version': '2.1.0',
+        '$schema': 'https://json.schemastore.org/sarif-2.1.0.json',
+        'runs': [{
+            'tool': {'driver': {'name': 'sql_lint', 'rules': [{'id': r} for r in rules]}},
+            'artifacts': [{'location': {'uri': Path(p).as_posix()}} for p in results],
+            'results': sarif_results,
+        }],
+    }
+
+
+def format_report(results):
+    """Text report: summary counts followed by every diagnostic."""
+    diags = [d for ds in results.values() for d in ds]
+    errors = sum(1 for d in diags if d.severity == ERROR)
+    lines = [
+        f"Files scanned: {len(results)}",
+        f"Errors: {errors}  Warnings: {len(diags) - errors}",
+        '',
+    ]
+    lines.extend(str(d) for d in diags)
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    p = argparse.ArgumentParser(description='Structural lint for SQL migration files')
+    p.add_argument('files', nargs='*', help=f'SQL files or directories (default: {INPUT.name})')
+    p.add_argument('--report', help=f'Write the text report here (default: {REPORT.name} when no files are given)')
+    p.add_argument('--json', help='Write diagnostics as JSON to this path')
+    p.add_argument('--sarif', help='Write diagnostics as SARIF 2.1.0 to this path')
+    p.add_argument('--jobs', '-j', type=int, default=None, help='Worker processes (default: CPU count)')
+    p.add_argument('--no-cache', action='store_true', help=f'Ignore and do not update {CACHE.name}')
+    p.add_argument('--no-warnings', action='store_true', help='Only report errors')
+    args = p.parse_args()
+
+    files = expand_paths(args.files) if args.files else [INPUT]
+    report_path = args.report or (None if args.files else str(REPORT))
+    results, linted = lint_paths(files, jobs=args.jobs, cache_path=None if args.no_cache else CACHE)
+    if args.no_warnings:
+        results = {f: [d for d in ds if d.severity == ERROR] for f, ds in results.items()}
+
+    text = format_report(results)
+    print(text, end='')
+    print(f"({linted} linted, {len(results) - linted} from cache)")
+    if report_path:
+        Path(report_path).write_text(text, encoding='utf-8')
+        print('Wrote', report_path)
+    if args.json:
+        Path(args.json).write_text(json.dumps({f: [d.to_dict() for d in ds] for f, ds in results.items()}, indent=1) + '\n',
+                                   encoding='utf-8')
+        print('Wrote', args.json)
+    if args.sarif:
+        Path(args.sarif).write_text(json.dumps(to_sarif(results), indent=1) + '\n', encoding='utf-8')
+        print('Wrote', args.sarif)
+    raise SystemExit(1 if any(d.severity == ERROR for ds in results.values() for d in ds) else 0)
+
+
+if __name__ == '__main__':
+    main()
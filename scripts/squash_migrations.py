@@ -0,0 +1,626 @@
+#!/usr/bin/env python3
+"""Squash a range of migrations into equivalent final-state DDL.
+
+The numbered migrations before the range are replayed through the static
+schema model to get the starting state; the range itself (plus any `--also`
+files, e.g. fix_time_blocks_rls.sql) gives the final state. Instead of
+replaying every CREATE/ALTER/DROP in between, the output goes straight from
+one to the other:
+
+- new tables as one CREATE TABLE with their final columns and constraints;
+  tables that already existed get only the ALTERs that are still needed
+- enums with their final labels (new labels on existing enums via ADD VALUE,
+  emitted before the transaction)
+- policies, triggers and indexes from their final definitions; functions and
+  views from the text of the statement that last (re)defined them
+- objects created and dropped within the range disappear entirely
+
+Statements the model does not fold (seeds and other DML, GRANT/COMMENT,
+DO blocks with side effects, DDL on objects the migrations never create) are
+carried over verbatim, in their original order, after the DDL; CREATE
+EXTENSION/SCHEMA/SEQUENCE/DOMAIN and composite types go first.
+
+Before writing, the squashed SQL is replayed on the starting state and the
+resulting model must match the final state object for object; any difference
+is printed and nothing is written. The output is re-runnable (IF NOT EXISTS,
+DROP ... IF EXISTS + CREATE, CREATE OR REPLACE, guarded DO blocks, the repo's
+usual idioms) and deterministic for a given input set. To compare against a
+real database built from it, use `verify_schema.py --expected`.
+
+Usage:
+  python scripts/squash_migrations.py --from 007 --to 008 --also fix_time_blocks_rls.sql
+  python scripts/squash_migrations.py --out squashed.sql           # the whole numbered set
+  python scripts/squash_migrations.py --from 007 --to 010 --check  # exit 1 if the output is stale
+"""
+import argparse
+import copy
+import hashlib
+import re
+from pathlib import Path
+
+from bundle_migrations import collect
+from dedupe_enums import guarded_block
+from schema_model import KINDS, MIGRATIONS_DIR, SchemaModel, migration_files
+from sql_lexer import PUNCT, QUOTED_IDENT, TRIVIA, WORD, tokenize
+
+ROOT = Path(__file__).resolve().parent
+
+# CREATE <word> statements the model does not track but later DDL may depend on.
+PRELUDE_WORDS = ('EXTENSION', 'SCHEMA', 'SEQUENCE', 'DOMAIN', 'TYPE', 'ROLE')
+TRANSACTION_WORDS = ('BEGIN', 'COMMIT', 'END', 'ROLLBACK', 'START')
+SIMPLE_IDENT_RE = re.compile(r'^[a-z_][a-z0-9_$]*$')
+RESERVED = {'all', 'analyse', 'analyze', 'and', 'any', 'array', 'as', 'asc', 'both', 'case', 'cast', 'check',
+            'collate', 'column', 'constraint', 'create', 'current_date', 'current_role', 'current_time',
+            'current_timestamp', 'current_user', 'default', 'desc', 'distinct', 'do', 'else', 'end', 'except',
+            'false', 'fetch', 'for', 'foreign', 'from', 'grant', 'group', 'having', 'in', 'initially',
+            'intersect', 'into', 'leading', 'limit', 'not', 'null', 'offset', 'on', 'only', 'or', 'order',
+            'placing', 'primary', 'references', 'returning', 'select', 'session_user', 'some', 'table', 'then',
+            'to', 'trailing', 'true', 'union', 'unique', 'user', 'using', 'when', 'where', 'window', 'with'}
+REFERENCES_RE = re.compile(r'references\s+((?:"[^"]+"|[\w$]+)(?:\s*\.\s*(?:"[^"]+"|[\w$]+))?)', re.I)
+OR_REPLACE_RE = re.compile(r'^CREATE\s+(?:OR\s+REPLACE\s+)?', re.I)
+# Keywords written with a space before "("; any other word followed by "(" is a call.
+PAREN_KEYWORDS = {'IN', 'AND', 'OR', 'NOT', 'EXISTS', 'CHECK', 'USING', 'AS', 'ON', 'WHERE', 'SELECT', 'THEN',
+                  'ELSE', 'WHEN', 'KEY', 'FROM', 'JOIN', 'VALUES', 'WITH', 'BY', 'INCLUDE', 'FUNCTION', 'PROCEDURE'}
+
+
+def quote_ident(name):
+    """Quote a (possibly schema-qualified) model name where SQL needs it."""
+    parts = []
+    for part in name.split('.'):
+        parts.append(part if SIMPLE_IDENT_RE.match(part) and part not in RESERVED
+                     else '"' + part.replace('"', '""') + '"')
+    return '.'.join(parts)
+
+
+def pretty(sql):
+    """Readable spacing for the model's space-separated token renderings (norm_sql).
+
+    Only whitespace changes, so the model reads the result back identically.
+    """
+    out, prev = [], None
+    for t in tokenize(sql):
+        if t.kind in TRIVIA:
+            continue
+        tight = prev is None or (
+            (t.kind == PUNCT and t.value in (')', ',', '.', '::', '[', ']'))
+            or (prev.kind == PUNCT and prev.value in ('(', '.', '::', '['))
+            or (t.kind == PUNCT and t.value == '(' and prev.kind in (WORD, QUOTED_IDENT)
+                and prev.value.upper() not in PAREN_KEYWORDS))
+        out.append(t.value if tight else ' ' + t.value)
+        prev = t
+    return ''.join(out)
+
+
+def _quoted_name(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _literal(value):
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _stmt(text):
+    text = text.rstrip()
+    return text if text.endswith(';') else text + ';'
+
+
+# -- range selection -----------------------------------------------------
+
+def select_files(directory, first=None, last=None, also=()):
+    """(base files, squashed files): numbered migrations before/inside the range, plus `also`."""
+    files = migration_files(directory)
+    names = [p.name for p in files]
+
+    def position(prefix, pick):
+        hits = [k for k, n in enumerate(names) if n.startswith(prefix)]
+        if not hits:
+            raise SystemExit(f"No migration in {directory} starts with {prefix!r}")
+        return pick(hits)
+
+    lo = position(first, min) if first else 0
+    hi = position(last, max) if last else len(files) - 1
+    if hi < lo:
+        raise SystemExit(f"--to {last!r} comes before --from {first!r}")
+    extra = []
+    for name in also:
+        path = Path(name)
+        if not path.exists():
+            path = Path(directory) / name
+        if not path.exists():
+            raise SystemExit(f"File not found: {name}")
+        extra.append(path)
+    return files[:lo], files[lo:hi + 1] + extra
+
+
+def model_of(files):
+    model = SchemaModel()
+    for path in files:
+        model.apply_file(path)
+    return model
+
+
+# -- statement classification --------------------------------------------
+
+def classify(entries):
+    """Split range statements into (prelude, tail, skipped, folded) lists of entries."""
+    prelude, tail, skipped, folded = [], [], [], []
+    for e in entries:
+        sig = [t for t in e.stmt.tokens if t.kind not in TRIVIA]
+        if not sig:
+            continue
+        if any(not t.terminated for t in e.stmt.tokens):
+            skipped.append(e)
+        elif not e.events:
+            if sig[0].is_word(*TRANSACTION_WORDS):
+                continue  # the squashed file has its own transaction
+            if sig[0].is_word('CREATE') and any(t.is_word(*PRELUDE_WORDS) for t in sig[1:4]):
+                prelude.append(e)
+            else:
+                tail.append(e)
+        elif any(a == 'unknown' for _, _, a in e.events) or (sig[0].is_word('DO') and e.side_effects):
+            tail.append(e)
+        else:
+            folded.append(e)
+    return prelude, tail, skipped, folded
+
+
+# -- comparison ------------------------------------------------------------
+
+def comparable(model):
+    """The model's objects without provenance, for state-to-state comparison."""
+    out = {}
+    for kind in KINDS:
+        store = {}
+        for key, obj in getattr(model, kind).items():
+            obj = {k: v for k, v in obj.items() if k != 'source'}
+            if kind == 'tables':
+                obj['columns'] = {c: {k: v for k, v in info.items() if k != 'definition'}
+                                  for c, info in obj['columns'].items()}
+            store[key] = obj
+        out[kind] = store
+    out['extensions'] = set(model.extensions)
+    return out
+
+
+def state_diff(got, want):
+    """Human-readable differences between two comparable() states."""
+    lines = []
+    for kind in KINDS:
+        a, b = got[kind], want[kind]
+        for key in sorted(set(a) | set(b), key=str):
+            label = key if isinstance(key, str) else '/'.join(key)
+            if key not in a:
+                lines.append(f"[{kind}] missing: {label}")
+            elif key not in b:
+                lines.append(f"[{kind}] unexpected: {label}")
+            elif a[key] != b[key]:
+                fields = sorted(k for k in set(a[key]) | set(b[key]) if a[key].get(k) != b[key].get(k))
+                lines.append(f"[{kind}] differs: {label} ({', '.join(fields)})")
+    for name in sorted(want['extensions'] - got['extensions']):
+        lines.append(f"[extensions] missing: {name}")
+    return lines
+
+
+# -- rendering -------------------------------------------------------------
+
+def _inline_sql(info):
+    """Column-level spelling of a constraint declared on a column."""
+    definition = info['definition']
+    if definition.upper().startswith('PRIMARY KEY'):
+        return 'PRIMARY KEY'
+    if definition.upper().startswith('UNIQUE'):
+        return 'UNIQUE'
+    return pretty(definition)
+
+
+def _table_constraint_sql(name, info):
+    """Table-level spelling of a constraint; explicit names are kept."""
+    definition = pretty(info['definition'])
+    if info.get('column') and definition.lower().startswith('references'):
+        definition = f"FOREIGN KEY ({quote_ident(info['column'])}) {definition}"
+    return definition if info['implicit'] else f"CONSTRAINT {quote_ident(name)} {definition}"
+
+
+def _column_sql(col, info, constraints):
+    parts = [quote_ident(col), info['type']]
+    if info['not_null']:
+        parts.append('NOT NULL')
+    if info['default'] is not None:
+        parts.append('DEFAULT ' + pretty(info['default']))
+    parts.extend(_inline_sql(c) for c in constraints.values() if c.get('column') == col)
+    return ' '.join(parts)
+
+
+def _references(info):
+    m = REFERENCES_RE.search(info['definition'])
+    return m and m.group(1).replace('"', '').replace(' ', '').removeprefix('public.')
+
+
+def _order_tables(names, tables):
+    """New tables in source order, moved after the new tables their foreign keys reference."""
+    pending = set(names)
+    placed, order = set(), []
+
+    def place(name, path):
+        if name in placed or name not in pending:
+            return
+        path = path | {name}
+        for info in tables[name]['constraints'].values():
+            ref = _references(info)
+            if ref and ref != name and ref not in path:
+                place(ref, path)
+        placed.add(name)
+        order.append(name)
+
+    for name in names:
+        place(name, set())
+    return order
+
+
+def _policy_sql(table, name, p):
+    parts = [f"CREATE POLICY {_quoted_name(name)}", f"ON {quote_ident(table)}"]
+    if not p['permissive']:
+        parts.append('AS RESTRICTIVE')
+    parts.append(f"FOR {p['cmd']}")
+    if p['roles'] != ['public']:
+        parts.append('TO ' + ', '.join(quote_ident(r) for r in p['roles']))
+    if p['using'] is not None:
+        parts.append(f"USING ({pretty(p['using'])})")
+    if p['with_check'] is not None:
+        parts.append(f"WITH CHECK ({pretty(p['with_check'])})")
+    return '\n    '.join(parts) + ';'
+
+
+def _add_constraint(table, cname, info):
+    """ALTER TABLE ... ADD CONSTRAINT in a DO block that skips it when the constraint already exists."""
+    return ("DO $do$\n"
+            "BEGIN\n"
+            f"  IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = {_literal(cname)}) THEN\n"
+            f"    ALTER TABLE {quote_ident(table)} ADD {_table_constraint_sql(cname, info)};\n"
+            "  END IF;\n"
+            "END\n"
+            "$do$;")
+
+
+def _or_replace(text):
+    return OR_REPLACE_RE.sub('CREATE OR REPLACE ', text.lstrip(), count=1)
+
+
+def _enum_additions(name, old, new):
+    """ALTER TYPE ... ADD VALUE statements turning `old` labels into `new`, or None if impossible."""
+    it = iter(new)
+    if not all(label in it for label in old):
+        return None  # labels removed, renamed or reordered
+    out = []
+    for k, label in enumerate(new):
+        if label in old:
+            continue
+        where = f" AFTER {_literal(new[k - 1])}" if k else f" BEFORE {_literal(new[1])}" if len(new) > 1 else ''
+        out.append(f"ALTER TYPE {quote_ident(name)} ADD VALUE IF NOT EXISTS {_literal(label)}{where};")
+    return out
+
+
+class Squash:
+    """Final-state DDL for the difference between two models."""
+
+    def __init__(self, base, final, file_order):
+        self.base = base
+        self.final = final
+        self.order = file_order
+        self.before = comparable(base)
+        self.after = comparable(final)
+        self.problems = []
+
+    def _source_key(self, obj):
+        src = obj.get('source', {})
+        return self.order.get(src.get('file'), -1), src.get('statement', 0), src.get('line', 0)
+
+    def changed(self, kind):
+        """Keys of `kind` that are new or different in the final state, in source order."""
+        a, b = self.before[kind], self.after[kind]
+        keys = [k for k in b if k not in a or a[k] != b[k]]
+        store = getattr(self.final, kind)
+        return sorted(keys, key=lambda k: self._source_key(store[k]))
+
+    def removed(self, kind):
+        return sorted((k for k in self.before[kind] if k not in self.after[kind]), key=str)
+
+    def drops(self):
+        out = []
+        dropped_tables = set(self.removed('tables'))
+        for table, name in self.removed('triggers'):
+            if table not in dropped_tables:
+                out.append(f"DROP TRIGGER IF EXISTS {quote_ident(name)} ON {quote_ident(table)};")
+        for table, name in self.removed('policies'):
+            if table not in dropped_tables:
+                out.append(f"DROP POLICY IF EXISTS {_quoted_name(name)} ON {quote_ident(table)};")
+        for name in self.removed('views'):
+            mat = 'MATERIALIZED ' if self.base.views[name]['materialized'] else ''
+            out.append(f"DROP {mat}VIEW IF EXISTS {quote_ident(name)};")
+        for name, sig in self.removed('functions'):
+            out.append(f"DROP {self.base.functions[(name, sig)]['kind'].upper()} IF EXISTS {quote_ident(name)}({sig});")
+        for name in self.removed('indexes'):
+            if self.base.indexes[name]['table'] not in dropped_tables:
+                out.append(f"DROP INDEX IF EXISTS {quote_ident(name)};")
+        for name in dropped_tables:
+            out.append(f"DROP TABLE IF EXISTS {quote_ident(name)};")
+        for name in self.removed('enums'):
+            out.append(f"DROP TYPE IF EXISTS {quote_ident(name)};")
+        return out
+
+    def enums(self):
+        """(statements outside the transaction, statements inside it)."""
+        outside, inside = [], []
+        for name in self.changed('enums'):
+            labels = self.final.enums[name]['labels']
+            if name not in self.base.enums:
+                inside.append(guarded_block(quote_ident(name), labels))
+                continue
+            adds = _enum_additions(name, self.base.enums[name]['labels'], labels)
+            if adds is None:
+                self.problems.append(f"enum {name}: labels were removed or reordered; cannot be squashed in place")
+                continue
+            outside.extend(adds)
+        return outside, inside
+
+    def function(self, key):
+        fn = self.final.functions[key]
+        text = self.final.ddl.get(('functions', key))
+        if text is None:
+            self.problems.append(f"function {key[0]}({key[1]}): no defining statement recorded")
+            return []
+        out = []
+        old = self.base.functions.get(key)
+        if old is not None and old['returns'] != fn['returns']:
+            out.append(f"DROP {fn['kind'].upper()} IF EXISTS {quote_ident(key[0])}({key[1]});")
+        out.append(_stmt(_or_replace(text)))
+        return out
+
+    def view(self, name):
+        view = self.final.views[name]
+        text = self.final.ddl.get(('views', name))
+        if text is None:
+            self.problems.append(f"view {name}: no defining statement recorded")
+            return []
+        if view['materialized']:
+            return [f"DROP MATERIALIZED VIEW IF EXISTS {quote_ident(name)};", _stmt(text)]
+        return [_stmt(_or_replace(text))]
+
+    def tables(self):
+        """(table statements, deferred foreign keys)."""
+        out, deferred = [], []
+        changed = self.changed('tables')
+        new = [n for n in changed if n not in self.base.tables]
+        order = _order_tables(new, self.final.tables)
+        for name in order:
+            table = self.final.tables[name]
+            if table.get('columns_known') is False:
+                text = self.final.ddl.get(('tables', name))
+                out.append(_stmt(text) if text else f"-- table {name}: columns unknown, not squashed")
+                continue
+            cons = table['constraints']
+            later = set(order[order.index(name) + 1:])
+            body = [_column_sql(c, info, {k: v for k, v in cons.items() if _references(v) not in later})
+                    for c, info in table['columns'].items()]
+            for cname, info in cons.items():
+                if _references(info) in later:
+                    deferred.append((name, cname, info))
+                elif not info.get('column'):
+                    body.append(_table_constraint_sql(cname, info))
+            out.append(f"CREATE TABLE IF NOT EXISTS {quote_ident(name)} (\n    " + ',\n    '.join(body) + '\n);')
+            out.extend(self._rls(name, {'rls': False, 'force_rls': False}, table))
+        for name in changed:
+            if name in self.base.tables:
+                out.extend(self._alter(name, self.base.tables[name], self.final.tables[name]))
+        return out, deferred
+
+    def _rls(self, name, old, new):
+        out = []
+        if new['rls'] != old['rls']:
+            out.append(f"ALTER TABLE {quote_ident(name)} {'ENABLE' if new['rls'] else 'DISABLE'} ROW LEVEL SECURITY;")
+        if new['force_rls'] != old['force_rls']:
+            out.append(f"ALTER TABLE {quote_ident(name)} {'' if new['force_rls'] else 'NO '}FORCE ROW LEVEL SECURITY;")
+        return out
+
+    def _alter(self, name, old, new):
+        q = quote_ident(name)
+        actions = []
+        old_cols, new_cols = old['columns'], new['columns']
+        old_cons, new_cons = old['constraints'], new['constraints']
+        for col in old_cols:
+            if col not in new_cols:
+                actions.append(f"DROP COLUMN IF EXISTS {quote_ident(col)}")
+        gone = {c for c in old_cols if c not in new_cols}
+        for cname, info in old_cons.items():
+            if info.get('column') in gone:
+                continue  # dropped with its column
+            if new_cons.get(cname) != info:
+                actions.append(f"DROP CONSTRAINT IF EXISTS {quote_ident(cname)}")
+        for col, info in new_cols.items():
+            was = old_cols.get(col)
+            c = quote_ident(col)
+            if was is None:
+                inline = {k: v for k, v in new_cons.items() if v.get('column') == col and old_cons.get(k) != v}
+                actions.append(f"ADD COLUMN IF NOT EXISTS {_column_sql(col, info, inline)}")
+                continue
+            if was['type'] != info['type']:
+                actions.append(f"ALTER COLUMN {c} TYPE {info['type']}")
+            if was['default'] != info['default']:
+                actions.append(f"ALTER COLUMN {c} " + (f"SET DEFAULT {info['default']}" if info['default'] is not None
+                                                      else 'DROP DEFAULT'))
+            if was['not_null'] != info['not_null']:
+                actions.append(f"ALTER COLUMN {c} {'SET' if info['not_null'] else 'DROP'} NOT NULL")
+        out = []
+        if actions:
+            out.append(f"ALTER TABLE {q}\n    " + ',\n    '.join(actions) + ';')
+        # ADD CONSTRAINT has no IF NOT EXISTS; keep it out of the ALTER so a re-run does not abort on it
+        for cname, info in new_cons.items():
+            if old_cons.get(cname) == info or (info.get('column') and info['column'] not in old_cols):
+                continue
+            out.append(_add_constraint(name, cname, info))
+        out.extend(self._rls(name, old, new))
+        return out
+
+    def deferred_constraints(self, deferred):
+        out = []
+        for table, cname, info in deferred:
+            out.append(_add_constraint(table, cname, info))
+            if info.get('column'):
+                self.problems.append(f"constraint {table}/{cname}: column REFERENCES deferred to a table constraint")
+        return out
+
+    def routines_and_views(self, sql_language):
+        """Functions of one language class and, with SQL functions, views, in source order."""
+        items = [('functions', k) for k in self.changed('functions')
+                 if (self.final.functions[k]['language'] == 'sql') == sql_language]
+        if sql_language:
+            items += [('views', k) for k in self.changed('views')]
+        items.sort(key=lambda item: self._source_key(getattr(self.final, item[0])[item[1]]))
+        out = []
+        for kind, key in items:
+            out.extend(self.function(key) if kind == 'functions' else self.view(key))
+        return out
+
+    def indexes(self):
+        out = []
+        for name in self.changed('indexes'):
+            idx = self.final.indexes[name]
+            if name in self.base.indexes:
+                out.append(f"DROP INDEX IF EXISTS {quote_ident(name)};")
+            unique = 'UNIQUE ' if idx['unique'] else ''
+            out.append(f"CREATE {unique}INDEX IF NOT EXISTS {quote_ident(name)} ON {quote_ident(idx['table'])} "
+                       f"{pretty(idx['definition'])};")
+        return out
+
+    def policies(self):
+        out = []
+        for table, name in self.changed('policies'):
+            out.append(f"DROP POLICY IF EXISTS {_quoted_name(name)} ON {quote_ident(table)};")
+            out.append(_policy_sql(table, name, self.final.policies[(table, name)]))
+        return out
+
+    def triggers(self):
+        out = []
+        for table, name in self.changed('triggers'):
+            trg = self.final.triggers[(table, name)]
+            out.append(f"DROP TRIGGER IF EXISTS {quote_ident(name)} ON {quote_ident(table)};")
+            out.append(f"CREATE TRIGGER {quote_ident(name)} {pretty(trg['definition'])};")
+        return out
+
+
+def render(squash, files, prelude, tail, skipped, folded_count):
+    digest = hashlib.sha256()
+    for path in files:
+        digest.update(path.name.encode('utf-8') + b'\0' + path.read_bytes())
+    outside, new_enums = squash.enums()
+    tables, deferred = squash.tables()
+    sections = [
+        ('Carried over: extensions, schemas, sequences, types', [_stmt(e.stmt.text) for e in prelude]),
+        ('Dropped objects', squash.drops()),
+        ('Enums', new_enums),
+        ('Functions (procedural)', squash.routines_and_views(sql_language=False)),
+        ('Tables', tables),
+        ('Foreign keys to tables created later', squash.deferred_constraints(deferred)),
+        ('SQL functions and views', squash.routines_and_views(sql_language=True)),
+        ('Indexes', squash.indexes()),
+        ('Policies', squash.policies()),
+        ('Triggers', squash.triggers()),
+        ('Carried over verbatim (not folded)', [_stmt(e.stmt.text) for e in tail]
+         + [f"-- SKIPPED {e.file}:{e.stmt.line}: statement contains an unterminated literal" for e in skipped]),
+    ]
+    out = [
+        '-- SQUASHED MIGRATIONS (generated by scripts/squash_migrations.py; do not edit by hand)',
+        f"-- Range: {', '.join(p.name for p in files)}",
+        f'-- Inputs sha256 {digest.hexdigest()}',
+        f'-- Folded {folded_count} statements; carried over {len(prelude) + len(tail)}',
+        '',
+    ]
+    if outside:
+        out += ['-- New labels on existing enums (ALTER TYPE ... ADD VALUE runs outside the transaction)']
+        out += outside + ['']
+    out += ['BEGIN;', '']
+    for title, stmts in sections:
+        if stmts:
+            out += [f'-- {title}'] + [s + '\n' for s in stmts]
+    out += ['COMMIT;']
+    return '\n'.join(out) + '\n'
+
+
+def squash(base_files, files):
+    """Returns (text, problems, stats) for squashing `files` on top of `base_files`."""
+    base = model_of(base_files)
+    entries, final = collect(files, copy.deepcopy(base))
+    prelude, tail, skipped, folded = classify(entries)
+    notes = _forget_skipped(final, skipped)
+    sq = Squash(base, final, {p.name: k for k, p in enumerate(files)})
+    text = render(sq, files, prelude, tail, skipped, len(folded))
+
+    check = model_of(base_files)
+    check.apply_sql(text, 'squashed.sql')
+    problems = sq.problems + state_diff(comparable(check), comparable(final))
+    counts = {'statements': len(entries), 'folded': len(folded), 'carried': len(prelude) + len(tail),
+              'skipped': len(skipped)}
+    return text, problems, notes, counts
+
+
+def _forget_skipped(final, skipped):
+    """Remove objects defined by unterminated statements from the final state; returns notes.
+
+    Such a statement swallows the rest of its file, so what the model read from it
+    is not what a database would run (it is a syntax error there).
+    """
+    notes = []
+    where = {(e.file, e.stmt.index): e for e in skipped}
+    for source, kind, key, action in final.log:
+        e = where.get((source.get('file'), source.get('statement')))
+        store = getattr(final, kind)
+        if e is None or action not in ('create', 'replace') or key not in store:
+            continue
+        if store[key].get('source', {}).get('statement') == e.stmt.index:
+            del store[key]
+            label = f"{key[0]}({key[1]})" if kind == 'functions' else key if isinstance(key, str) else '/'.join(key)
+            notes.append(f"{kind[:-1]} {label}: defined inside the unterminated statement at {e.file}:{e.stmt.line}; left out")
+    return notes
+
+
+def main():
+    p = argparse.ArgumentParser(description='Squash a migration range into final-state DDL')
+    p.add_argument('--dir', default=str(MIGRATIONS_DIR))
+    p.add_argument('--from', dest='first', help='First migration (file name prefix, e.g. 007)')
+    p.add_argument('--to', dest='last', help='Last migration (file name prefix)')
+    p.add_argument('--also', action='append', default=[], metavar='FILE',
+                   help='Extra file applied after the range (e.g. fix_time_blocks_rls.sql); repeatable')
+    p.add_argument('--out', help='Output path (default: scripts/squashed_<first>__<last>.sql)')
+    p.add_argument('--check', action='store_true', help='Do not write; exit 1 if the output is out of date')
+    args = p.parse_args()
+
+    base_files, files = select_files(args.dir, args.first, args.last, args.also)
+    out_path = Path(args.out) if args.out else ROOT / f"squashed_{files[0].stem}__{files[-1].stem}.sql"
+    text, problems, notes, counts = squash(base_files, files)
+
+    original = sum(len(p.read_bytes()) for p in files)
+    print(f"{len(files)} files on top of {len(base_files)}: {counts['statements']} statements, "
+          f"{counts['folded']} folded, {counts['carried']} carried over, {counts['skipped']} skipped")
+    print(f"{original} bytes -> {len(text.encode('utf-8'))} bytes")
+    for line in notes:
+        print('  note: ' + line)
+    if problems:
+        print(f"Squashed SQL does not reproduce the final state ({len(problems)} differences):")
+        for line in problems:
+            print('  ' + line)
+        raise SystemExit(1)
+    print('Verified: replaying the squashed SQL on the starting state gives the same model')
+
+    if args.check:
+        current = out_path.read_text(encoding='utf-8') if out_path.exists() else ''
+        if current != text:
+            print(f"{out_path} is out of date; run scripts/squash_migrations.py")
+            raise SystemExit(1)
+        print(f"{out_path} is up to date")
+        return
+    out_path.write_text(text, encoding='utf-8')
+    print('Wrote', out_path)
+
+
+if __name__ == '__main__':
+    main()
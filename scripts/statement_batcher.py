@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""Send runs of consecutive statements as one multi-statement batch, sized AIMD-style.
+
+run_sql.py opens a connection and waits for one round trip per statement,
+which is most of the run time for long stretches of cheap DDL (CREATE INDEX IF
+NOT EXISTS, COMMENT ON, GRANT). With `--batch` it joins consecutive statements
+into one simple-query string instead:
+
+- the batch size grows by one after every batch that succeeds and halves after
+  one that fails (additive increase, multiplicative decrease), between 1 and
+  `--batch-max`
+- Postgres runs a multi-statement query string as one implicit transaction, so
+  a failing batch leaves nothing behind; it is replayed one statement at a
+  time inside a transaction with a SAVEPOINT around each statement. The
+  statements before the failing one are committed, the failing one is rolled
+  back to its savepoint and reported with its own number and error, exactly
+  as the per-statement executor reports it
+- statements that behave differently inside a transaction or change session
+  state are barriers: they end the current batch and run on their own
+  (see `batchable()`)
+
+Batches share one autocommit connection; barriers keep the executor's fresh
+connection per statement, so a SET in the file still only affects itself.
+
+Usage (from an executor):
+  batcher = AimdBatcher(maximum=64)
+  try:
+      run_batch(conn, statements[:batcher.size])
+      batcher.success()
+  except psycopg2.Error:
+      batcher.failure()
+      results = replay(conn, statements[:batcher.size], stop_on_error=True)   # [(offset, seconds, error)]
+
+  python scripts/statement_batcher.py supabase/migrations/20251120_collaboration_delta.sql   # barrier report
+"""
+import argparse
+import re
+import time
+from pathlib import Path
+
+from sql_lexer import WORD, split_statements
+
+# first keywords of statements that cannot share a transaction (or a session) with their neighbours
+BARRIER_FIRST = {
+    'BEGIN', 'START', 'COMMIT', 'END', 'ROLLBACK', 'ABORT', 'SAVEPOINT', 'RELEASE', 'PREPARE',
+    'VACUUM', 'REINDEX', 'CLUSTER', 'CHECKPOINT', 'CALL', 'COPY',
+    'SET', 'RESET', 'DISCARD', 'LISTEN', 'UNLISTEN',
+}
+BARRIER_OBJECTS = {'DATABASE', 'TABLESPACE', 'SYSTEM', 'SUBSCRIPTION'}
+SAVEPOINT = 'statement_batcher_replay'
+_TRANSACTION_CONTROL_RE = re.compile(r'\b(?:COMMIT|ROLLBACK)\b', re.I)
+_ADD_VALUE_RE = re.compile(r'\bADD\s+VALUE\b', re.I)
+
+
+def batchable(stmt):
+    """True when `stmt` can run inside a multi-statement batch (one implicit transaction)."""
+    pieces = split_statements(stmt)
+    if len(pieces) != 1:
+        return False  # the lexer disagrees with sqlparse about the boundaries; keep it alone
+    words = [t.upper for t in pieces[0].significant if t.kind == WORD]
+    if not words or words[0] in BARRIER_FIRST or 'CONCURRENTLY' in words:
+        return False
+    if len(words) > 1 and words[0] in ('CREATE', 'ALTER', 'DROP') and words[1] in BARRIER_OBJECTS:
+        return False
+    if words[0] == 'DO' and _TRANSACTION_CONTROL_RE.search(stmt):
+        return False  # COMMIT / ROLLBACK inside a DO block only work outside a transaction block
+    if _ADD_VALUE_RE.search(stmt):
+        return False  # a new enum label cannot be used in the transaction that added it (also from a DO block)
+    return True
+
+
+class AimdBatcher:
+    """Batch size that grows by one on success and halves on failure."""
+    __slots__ = ('size', 'maximum', 'batches', 'failures', 'peak')
+
+    def __init__(self, maximum=64, start=2):
+        self.maximum = max(1, maximum)
+        self.size = min(start, self.maximum)
+        self.batches = 0
+        self.failures = 0
+        self.peak = self.size
+
+    def success(self):
+        self.batches += 1
+        self.size = min(self.maximum, self.size + 1)
+        self.peak = max(self.peak, self.size)
+
+    def failure(self):
+        self.batches += 1
+        self.failures += 1
+        self.size = max(1, self.size // 2)
+
+
+def run_batch(conn, statements):
+    """Execute `statements` as one query string on an autocommit connection; raises on the first error."""
+    with conn.cursor() as cur:
+        # `;` on a line of its own, so a trailing -- comment cannot swallow it; empty statements are harmless
+        cur.execute(''.join(f"{s}\n;\n" for s in statements))
+
+
+def replay(conn, statements, stop_on_error):
+    """Re-run a failed batch one statement at a time under savepoints and commit what succeeded.
+
+    Returns [(offset, seconds, error or None)] for the statements executed; with `stop_on_error`
+    the list ends at the first failure.
+    """
+    import psycopg2
+
+    results = []
+    conn.autocommit = False
+    try:
+        with conn.cursor() as cur:
+            for offset, stmt in enumerate(statements):
+                t0 = time.perf_counter()
+                cur.execute(f"SAVEPOINT {SAVEPOINT}")
+                try:
+                    cur.execute(stmt)
+                except psycopg2.Error as exc:
+                    cur.execute(f"ROLLBACK TO SAVEPOINT {SAVEPOINT}")
+                    results.append((offset, time.perf_counter() - t0, exc))
+                    if stop_on_error:
+                        break
+                    continue
+                cur.execute(f"RELEASE SAVEPOINT {SAVEPOINT}")
+                results.append((offset, time.perf_counter() - t0, None))
+        conn.commit()
+    except BaseException:
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        if not conn.closed:
+            conn.autocommit = True
+    return results
+
+
+def main():
+    p = argparse.ArgumentParser(description='Report which statements of SQL files would end a --batch run')
+    p.add_argument('paths', nargs='+')
+    args = p.parse_args()
+
+    for path in map(Path, args.paths):
+        stmts = [s for s in split_statements(path.read_text(encoding='utf-8')) if s.significant]
+        barriers = [s for s in stmts if not batchable(s.text)]
+        print(f"{path}: {len(stmts)} statements, {len(barriers)} barriers")
+        for s in barriers:
+            print(f"  line {s.line}: {' '.join(t.value for t in s.significant[:4])}")
+
+
+if __name__ == '__main__':
+    main()
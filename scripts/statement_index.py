@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Cached `sqlparse.split` of a migration, as byte ranges in a sidecar.
+
+The failing-statement numbers in failing_statements.sql and the
+`(original statements a..b)` ranges in PROPOSED FIX headers are 1-based
+positions in `sqlparse.split(migration)` (the numbering run_sql.py uses).
+Splitting the 20k-line gap-fix migration with sqlparse takes seconds, and
+run_proposed_functions.py and reassemble_and_propose.py both did it on every
+run. This module splits once and keeps the statement byte ranges in
+`<name>.stmts.json` next to the migration; the sidecar is rebuilt when the
+file's size or mtime changes.
+
+The same build also records, for every statement, the range of statements
+that make up its enclosing DO / CREATE FUNCTION / CREATE PROCEDURE / CREATE
+TYPE block. sqlparse cuts some dollar-quoted bodies into several
+"statements"; one sql_lexer pass finds the real block boundaries and a merge
+sweep maps them onto the sqlparse numbering, so reassemble_and_propose.py
+looks the range up instead of scanning back and forth for `$$`.
+
+Usage:
+  python scripts/statement_index.py supabase/migrations/20251120_all_migrations_gap_fix.sql
+  python scripts/statement_index.py <migration> --show 6126 6130
+"""
+import argparse
+import json
+import os
+from pathlib import Path
+
+from sql_lexer import split_statements
+
+VERSION = 2
+SUFFIX = '.stmts.json'
+
+
+def sidecar(path):
+    path = Path(path)
+    return path.with_name(path.name + SUFFIX)
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _split(text):
+    """(char start, char end, byte start, byte end) of the non-empty `sqlparse.split` statements."""
+    import sqlparse
+
+    spans, pos, bpos = [], 0, 0
+    for stmt in sqlparse.split(text):
+        stmt = stmt.strip()
+        if not stmt:
+            continue
+        at = text.find(stmt, pos)
+        if at < 0:
+            raise ValueError(f"sqlparse returned text that is not in the input near offset {pos}")
+        bpos += len(text[pos:at].encode('utf-8'))
+        size = len(stmt.encode('utf-8'))
+        spans.append((at, at + len(stmt), bpos, bpos + size))
+        bpos += size
+        pos = at + len(stmt)
+    return spans
+
+
+def split_ranges(text):
+    """Byte ranges of the non-empty `sqlparse.split` statements of `text`, in order."""
+    return [(bs, be) for _, _, bs, be in _split(text)]
+
+
+def _is_block_header(sig):
+    """DO, CREATE [OR REPLACE] FUNCTION / PROCEDURE, or CREATE TYPE."""
+    if not sig:
+        return False
+    if sig[0].is_word('DO'):
+        return True
+    if not sig[0].is_word('CREATE'):
+        return False
+    k = 3 if len(sig) > 2 and sig[1].is_word('OR') else 1
+    return k < len(sig) and sig[k].is_word('FUNCTION', 'PROCEDURE', 'TYPE')
+
+
+def enclosing_blocks(text, spans):
+    """For each sqlparse statement (char spans from `_split`), the 0-based (first, last) statements of
+    the DO/FUNCTION/PROCEDURE/TYPE block that contains it, or None.
+
+    The lexer statements and the sqlparse spans are both in file order, so one forward sweep pairs
+    every block with the sqlparse statements that overlap it. A block with an unterminated dollar
+    quote runs to the end of the file, as it would on the server.
+    """
+    enclosing = [None] * len(spans)
+    i = 0
+    for stmt in split_statements(text):
+        if not _is_block_header(stmt.significant):
+            continue
+        while i < len(spans) and spans[i][1] <= stmt.start:
+            i += 1
+        first = i
+        j = i
+        while j < len(spans) and spans[j][0] < stmt.end:
+            j += 1
+        if j == first:
+            continue
+        for k in range(first, j):
+            if enclosing[k] is None:
+                enclosing[k] = (first, j - 1)
+        i = j
+    return enclosing
+
+
+def build(path, text=None):
+    """Split `path` and write the sidecar; returns (statement byte ranges, enclosing block ranges)."""
+    path = Path(path)
+    text = path.read_text(encoding='utf-8') if text is None else text
+    spans = _split(text)
+    ranges = [(bs, be) for _, _, bs, be in spans]
+    enclosing = enclosing_blocks(text, spans)
+    doc = {'version': VERSION, 'file': _stamp(path), 'statements': ranges, 'enclosing': enclosing}
+    sidecar(path).write_text(json.dumps(doc, separators=(',', ':')) + '\n', encoding='utf-8')
+    return ranges, enclosing
+
+
+class StatementIndex:
+    def __init__(self, path, ranges, enclosing):
+        self.path = Path(path)
+        self.ranges = [tuple(r) for r in ranges]
+        self.enclosing = [tuple(r) if r else None for r in enclosing]
+
+    @classmethod
+    def load(cls, path):
+        """The migration's split from its sidecar, re-split first when stale."""
+        path = Path(path)
+        try:
+            doc = json.loads(sidecar(path).read_text(encoding='utf-8'))
+            if doc.get('version') == VERSION and doc.get('file') == _stamp(path):
+                return cls(path, doc['statements'], doc['enclosing'])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return cls(path, *build(path))
+
+    def __len__(self):
+        return len(self.ranges)
+
+    def statements(self, first, last, f=None):
+        """Statements `first`..`last` (1-based, inclusive, clamped to the file)."""
+        if f is None:
+            with self.path.open('rb') as fh:
+                return self.statements(first, last, fh)
+        out = []
+        for start, end in self.ranges[max(1, first) - 1:min(len(self.ranges), last)]:
+            f.seek(start)
+            out.append(f.read(end - start).decode('utf-8'))
+        return out
+
+    def statement(self, number):
+        """Statement `number` (1-based)."""
+        if not 1 <= number <= len(self.ranges):
+            raise IndexError(f"statement {number} out of range 1..{len(self.ranges)}")
+        return self.statements(number, number)[0]
+
+    def block_of(self, number):
+        """0-based (first, last) statements of the block enclosing statement `number` (1-based), or None."""
+        if not 1 <= number <= len(self.enclosing):
+            return None
+        return self.enclosing[number - 1]
+
+    def all(self):
+        """Every statement, in order (one read of the file)."""
+        data = self.path.read_bytes()
+        return [data[start:end].decode('utf-8') for start, end in self.ranges]
+
+
+def main():
+    p = argparse.ArgumentParser(description='Build or query the cached statement split of a migration')
+    p.add_argument('path')
+    p.add_argument('--show', type=int, nargs=2, metavar=('FIRST', 'LAST'), help='Print statements FIRST..LAST')
+    args = p.parse_args()
+
+    path = Path(args.path)
+    if not path.exists():
+        raise SystemExit(f"Input file not found: {path}")
+    if args.show:
+        print('\n'.join(StatementIndex.load(path).statements(*args.show)))
+        return
+    ranges, enclosing = build(path)
+    blocks = len({r for r in enclosing if r})
+    print(f"{len(ranges)} statements ({blocks} DO/function/procedure/type blocks) in {path}; index at {sidecar(path)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Per-statement latency breakdown for the migration executors.
+
+For every statement `StatementProfiler.execute` records:
+- connect_seconds: time spent in `psycopg2.connect` (TCP + TLS + auth)
+- rtt_seconds:     a `SELECT 1` ping on the fresh connection (network round trip)
+- execute_seconds: client-observed time of the statement itself
+- server_seconds:  server-side execution time, from a `clock_timestamp() -
+                   statement_timestamp()` probe sent in the same query string
+- network_seconds: execute_seconds - server_seconds (wire + client overhead)
+
+The probe turns the query string into an implicit transaction block, so it is
+skipped for the statements statement_batcher.py keeps out of batches for the
+same reason (CONCURRENTLY, VACUUM, CALL, DO blocks that COMMIT, ...); those
+statements report `server_source: "unavailable"`.
+
+Optionally the whole run is bracketed by `pg_stat_statements` snapshots; the
+per-query deltas are included in the report when the extension is available.
+"""
+import json
+import time
+from pathlib import Path
+
+from statement_batcher import batchable
+
+SERVER_PROBE = "\n;SELECT extract(epoch FROM clock_timestamp() - statement_timestamp())::float8"
+
+def can_probe(stmt: str) -> bool:
+    """The probe makes the query string one implicit transaction: the same rule as a --batch batch."""
+    return batchable(stmt)
+
+
+class StatementProfiler:
+    """Execute statements on fresh connections and keep a timing record for each."""
+
+    def __init__(self, ping=True, clock=time.perf_counter):
+        self.ping = ping
+        self.clock = clock
+        self.records = []
+
+    def execute(self, idx, stmt, connect):
+        """Run `stmt` on a connection from the zero-arg `connect` callable.
+
+        Exceptions from the statement propagate after the record is stored.
+        """
+        rec = {
+            'index': idx,
+            'chars': len(stmt),
+            'connect_seconds': None,
+            'rtt_seconds': None,
+            'execute_seconds': None,
+            'server_seconds': None,
+            'network_seconds': None,
+            'server_source': 'unavailable',
+            'error': None,
+        }
+        self.records.append(rec)
+        t0 = self.clock()
+        conn = connect()
+        rec['connect_seconds'] = self.clock() - t0
+        try:
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                if self.ping:
+                    t0 = self.clock()
+                    cur.execute('SELECT 1')
+                    cur.fetchone()
+                    rec['rtt_seconds'] = self.clock() - t0
+                probe = can_probe(stmt)
+                t0 = self.clock()
+                try:
+                    cur.execute(stmt + SERVER_PROBE if probe else stmt)
+                except Exception as exc:
+                    rec['error'] = str(exc).strip()
+                    raise
+                finally:
+                    rec['execute_seconds'] = self.clock() - t0
+                if probe:
+                    row = cur.fetchone()
+                    if row and row[0] is not None:
+                        rec['server_seconds'] = float(row[0])
+                        rec['server_source'] = 'clock_timestamp'
+                        rec['network_seconds'] = max(rec['execute_seconds'] - rec['server_seconds'], 0.0)
+        finally:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        return rec
+
+    def totals(self):
+        out = {}
+        for key in ('connect_seconds', 'rtt_seconds', 'execute_seconds', 'server_seconds', 'network_seconds'):
+            vals = [r[key] for r in self.records if r[key] is not None]
+            out[key] = round(sum(vals), 6)
+        out['statements'] = len(self.records)
+        out['errors'] = sum(1 for r in self.records if r['error'])
+        return out
+
+
+def snapshot_pg_stat_statements(conn):
+    """Return {queryid: {'query', 'calls', 'exec_ms'}} for the current database, or None.
+
+    Handles both the PG13+ (`total_exec_time`) and older (`total_time`) column names.
+    """
+    for col in ('total_exec_time', 'total_time'):
+        try:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"SELECT queryid, query, calls, {col} FROM pg_stat_statements "
+                    "WHERE dbid = (SELECT oid FROM pg_database WHERE datname = current_database())"
+                )
+                return {qid: {'query': q, 'calls': calls, 'exec_ms': float(ms)} for qid, q, calls, ms in cur.fetchall()}
+        except Exception:
+            # extension missing, permission denied, or wrong column name
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+    return None
+
+
+def diff_pg_stat_statements(before, after, top=50):
+    """Per-query deltas between two snapshots, most expensive first."""
+    if before is None or after is None:
+        return None
+    rows = []
+    for qid, a in after.items():
+        b = before.get(qid, {'calls': 0, 'exec_ms': 0.0})
+        calls = a['calls'] - b['calls']
+        if calls <= 0:
+            continue
+        rows.append({
+            'queryid': qid,
+            'calls': calls,
+            'exec_ms': round(a['exec_ms'] - b['exec_ms'], 3),
+            'query': ' '.join(a['query'].split())[:200],
+        })
+    rows.sort(key=lambda r: r['exec_ms'], reverse=True)
+    return rows[:top]
+
+
+def write_report(path, profiler, pg_stat_delta=None, top=20):
+    """Write the JSON profile and return a short human-readable summary."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    totals = profiler.totals()
+    report = {
+        'totals': totals,
+        'statements': profiler.records,
+        'pg_stat_statements': pg_stat_delta,
+    }
+    path.write_text(json.dumps(report, indent=2) + '\n', encoding='utf-8')
+
+    def ms(v):
+        return '-' if v is None else f"{v * 1000:.1f}"
+
+    lines = [
+        f"Profiled {totals['statements']} statements ({totals['errors']} errors)",
+        f"  connect {totals['connect_seconds']:.3f}s | rtt {totals['rtt_seconds']:.3f}s | "
+        f"server {totals['server_seconds']:.3f}s | network {totals['network_seconds']:.3f}s | "
+        f"execute {totals['execute_seconds']:.3f}s",
+        f"Top {top} statements by total time (ms): idx connect rtt server network",
+    ]
+    ranked = sorted(
+        profiler.records,
+        key=lambda r: (r['connect_seconds'] or 0) + (r['execute_seconds'] or 0),
+        reverse=True,
+    )
+    for r in ranked[:top]:
+        lines.append(
+            f"  {r['index']:>6} {ms(r['connect_seconds']):>8} {ms(r['rtt_seconds']):>8} "
+            f"{ms(r['server_seconds']):>8} {ms(r['network_seconds']):>8}"
+        )
+    lines.append(f"Full profile: {path}")
+    return '\n'.join(lines)
@@ -13,6 +13,9 @@ import re
 import argparse
 from pathlib import Path
 
+from block_index import write_blocks
+from backup_store import save as backup
+
 ROOT = Path(__file__).resolve().parent
 IN = ROOT / 'manual_review_fixes.sql'
 OUT = ROOT / 'manual_review_fixes_aggressive2.sql'
@@ -73,14 +76,13 @@ def main():
         out.append(f"-- PROPOSED FIX: Reassembled function for failing statement {bid}\n")
         out.append(wrapped)
 
-    OUT.write_text(''.join(out), encoding='utf-8')
+    write_blocks(OUT, ''.join(out))
     print(f'Wrote {OUT}')
 
     if args.replace:
-        bak = IN.parent.joinpath(IN.name + '.aggressive2.bak')
-        IN.replace(bak)
+        sha = backup(IN, label='strip_all_wrappers_and_rewrap')
         OUT.replace(IN)
-        print(f'Replaced {IN} (backup at {bak})')
+        print(f'Replaced {IN} (previous version {sha[:12]} in scripts/backups)')
 
 if __name__ == '__main__':
     main()
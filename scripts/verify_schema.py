@@ -1,55 +1,293 @@
+#!/usr/bin/env python3
+"""Snapshot the live schema of one or more databases.
+
+All categories (tables, enums, triggers, policies, RLS flags, functions,
+columns, indexes and constraints) are fetched in a single round trip: one
+`SELECT json_build_object(...)` that reads `pg_catalog` directly and
+aggregates each category with `json_agg`. This avoids the slow
+`information_schema` views and the per-category round trips.
+
+Several databases can be verified concurrently by passing `--dsn` more than
+once; each target gets its own `schema_verification[_<label>].txt/.json`. A
+`--dsn` may be prefixed with `LABEL=`; bare DSNs are labelled
+`user_host_port_dbname`, and two targets with the same label are rejected
+rather than left to overwrite each other's files.
+
+With `--expected` the live catalog is also diffed against the schema the
+migrations directory should produce (see schema_model.py); differences go to
+`schema_diff[_<label>].txt` and make the exit status non-zero.
+
+Each snapshot also gets a Merkle fingerprint tree (`*_fingerprint.json`, see
+schema_fingerprint.py). When several targets are verified their roots are
+compared and only the differing subtrees are reported.
+
+Usage:
+  python scripts/verify_schema.py --host ... --user ... --password ... --dbname ...
+  python scripts/verify_schema.py --dsn dev="host=... user=postgres.<ref> ..." --dsn staging="..." --workers 4
+  python scripts/verify_schema.py --dsn "..." --expected supabase/migrations
+"""
 import argparse
 import json
+import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import psycopg2
 
+from schema_fingerprint import build_tree, diff_trees, load_tree, write_tree
+
 OUT = Path('scripts/schema_verification.txt')
+DIFF_OUT = Path('scripts/schema_diff.txt')
 
-QUERIES = [
-    ("public_tables", "SELECT table_name FROM information_schema.tables WHERE table_schema='public' ORDER BY table_name;"),
-    ("enum_types", "SELECT n.nspname AS schema, t.typname AS name FROM pg_type t JOIN pg_catalog.pg_namespace n ON n.oid = t.typnamespace WHERE t.typtype='e' ORDER BY t.typname;"),
-    ("triggers", "SELECT tgname, tgrelid::regclass::text AS table_name FROM pg_trigger WHERE NOT tgisinternal;"),
-    ("policies", "SELECT polname, polrelid::regclass::text AS table_name FROM pg_policy ORDER BY polrelid::regclass::text, polname;"),
-    ("rls_enabled_tables", "SELECT relname FROM pg_class WHERE relkind='r' AND relname IN (SELECT table_name FROM information_schema.tables WHERE table_schema='public') AND relrowsecurity;"),
-    ("functions", "SELECT routine_name, routine_schema FROM information_schema.routines WHERE routine_schema NOT IN ('pg_catalog','information_schema') ORDER BY routine_schema, routine_name;")
+# (name, keys shown in the text report, aggregate over pg_catalog)
+CATEGORIES = [
+    ("public_tables", ("table_name",), """
+        SELECT json_agg(json_build_object('table_name', c.relname, 'kind', c.relkind) ORDER BY c.relname)
+        FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p', 'v', 'f')"""),
+    ("enum_types", ("schema", "name"), """
+        SELECT json_agg(json_build_object(
+                   'schema', n.nspname, 'name', t.typname,
+                   'labels', (SELECT json_agg(e.enumlabel ORDER BY e.enumsortorder) FROM pg_enum e WHERE e.enumtypid = t.oid))
+               ORDER BY t.typname)
+        FROM pg_type t JOIN pg_namespace n ON n.oid = t.typnamespace
+        WHERE t.typtype = 'e'"""),
+    ("triggers", ("tgname", "table_name"), """
+        SELECT json_agg(json_build_object('tgname', tg.tgname, 'table_name', tg.tgrelid::regclass::text,
+                                          'definition', pg_get_triggerdef(tg.oid))
+               ORDER BY tg.tgrelid::regclass::text, tg.tgname)
+        FROM pg_trigger tg
+        WHERE NOT tg.tgisinternal"""),
+    ("policies", ("polname", "table_name"), """
+        SELECT json_agg(json_build_object('polname', p.polname, 'table_name', p.polrelid::regclass::text,
+                                          'cmd', p.polcmd, 'permissive', p.polpermissive,
+                                          'roles', (SELECT json_agg(r ORDER BY r) FROM (
+                                              SELECT CASE WHEN rid = 0 THEN 'public' ELSE pg_get_userbyid(rid)::text END AS r
+                                              FROM unnest(p.polroles) AS rid) roles),
+                                          'using', pg_get_expr(p.polqual, p.polrelid),
+                                          'with_check', pg_get_expr(p.polwithcheck, p.polrelid))
+               ORDER BY p.polrelid::regclass::text, p.polname)
+        FROM pg_policy p"""),
+    ("rls_enabled_tables", ("relname",), """
+        SELECT json_agg(json_build_object('relname', c.relname) ORDER BY c.relname)
+        FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public' AND c.relkind = 'r' AND c.relrowsecurity"""),
+    ("functions", ("routine_name", "routine_schema"), """
+        SELECT json_agg(json_build_object('routine_name', p.proname, 'routine_schema', n.nspname,
+                                          'arguments', pg_get_function_identity_arguments(p.oid),
+                                          'returns', pg_get_function_result(p.oid),
+                                          'language', l.lanname, 'body', p.prosrc)
+               ORDER BY n.nspname, p.proname, pg_get_function_identity_arguments(p.oid))
+        FROM pg_proc p
+        JOIN pg_namespace n ON n.oid = p.pronamespace
+        JOIN pg_language l ON l.oid = p.prolang
+        WHERE n.nspname NOT IN ('pg_catalog', 'information_schema') AND p.prokind IN ('f', 'p')"""),
+    ("columns", ("table_name", "column_name", "data_type"), """
+        SELECT json_agg(json_build_object('table_name', c.relname, 'column_name', a.attname,
+                                          'data_type', format_type(a.atttypid, a.atttypmod),
+                                          'not_null', a.attnotnull,
+                                          'default', pg_get_expr(d.adbin, d.adrelid))
+               ORDER BY c.relname, a.attnum)
+        FROM pg_attribute a
+        JOIN pg_class c ON c.oid = a.attrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+        WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p', 'v', 'f') AND a.attnum > 0 AND NOT a.attisdropped"""),
+    ("indexes", ("index_name", "table_name"), """
+        SELECT json_agg(json_build_object('index_name', ic.relname, 'table_name', tc.relname,
+                                          'definition', pg_get_indexdef(i.indexrelid))
+               ORDER BY tc.relname, ic.relname)
+        FROM pg_index i
+        JOIN pg_class ic ON ic.oid = i.indexrelid
+        JOIN pg_class tc ON tc.oid = i.indrelid
+        JOIN pg_namespace n ON n.oid = tc.relnamespace
+        WHERE n.nspname = 'public'"""),
+    ("constraints", ("constraint_name", "table_name", "type"), """
+        SELECT json_agg(json_build_object('constraint_name', con.conname, 'table_name', c.relname,
+                                          'type', con.contype, 'definition', pg_get_constraintdef(con.oid))
+               ORDER BY c.relname, con.conname)
+        FROM pg_constraint con
+        JOIN pg_class c ON c.oid = con.conrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public'"""),
 ]
 
+CATALOG_QUERY = "SELECT json_build_object(\n" + ",\n".join(
+    f"  '{name}', COALESCE(({sql.strip()}), '[]'::json)" for name, _keys, sql in CATEGORIES
+) + "\n)::text"
 
-def run_queries(conn_params):
-    out = []
-    conn = psycopg2.connect(**conn_params)
+
+def fetch_catalog(conn_params):
+    """Return {category: [row dicts]} for one database in a single round trip.
+
+    `conn_params` is either a dict of psycopg2.connect keyword arguments or a DSN string.
+    """
+    if isinstance(conn_params, str):
+        conn = psycopg2.connect(conn_params)
+    else:
+        conn = psycopg2.connect(**conn_params)
     try:
         cur = conn.cursor()
-        for name, q in QUERIES:
-            cur.execute(q)
-            rows = cur.fetchall()
-            out.append({'name': name, 'count': len(rows), 'rows': rows})
+        cur.execute(CATALOG_QUERY)
+        # cast to text server-side so the client does a single json.loads
+        return json.loads(cur.fetchone()[0])
     finally:
         conn.close()
-    return out
 
 
-def main():
-    p = argparse.ArgumentParser()
-    p.add_argument('--host', required=True)
-    p.add_argument('--port', type=int, default=5432)
-    p.add_argument('--user', required=True)
-    p.add_argument('--password', required=True)
-    p.add_argument('--dbname', required=True)
-    args = p.parse_args()
+def run_queries(conn_params):
+    """Return ([{'name', 'count', 'rows'}], catalog); report rows are tuples of the display keys."""
+    catalog = fetch_catalog(conn_params)
+    out = []
+    for name, keys, _sql in CATEGORIES:
+        rows = [tuple(r.get(k) for k in keys) for r in catalog.get(name, [])]
+        out.append({'name': name, 'count': len(rows), 'rows': rows})
+    return out, catalog
+
 
-    conn_params = dict(host=args.host, port=args.port, user=args.user, password=args.password, dbname=args.dbname, sslmode='require')
-    results = run_queries(conn_params)
-    # write human readable and JSON
+def write_outputs(results, catalog, out_path: Path):
     txt = []
     for r in results:
         txt.append(f"== {r['name']} ({r['count']}) ==")
         for row in r['rows']:
             txt.append(str(row))
         txt.append('')
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text('\n'.join(txt), encoding='utf-8')
+    out_path.with_suffix('.json').write_text(json.dumps(catalog, indent=1, sort_keys=True) + '\n', encoding='utf-8')
+    write_tree(build_tree(catalog), fingerprint_path(out_path))
+    return out_path
+
+
+def fingerprint_path(out_path: Path) -> Path:
+    return out_path.with_name(f"{out_path.stem}_fingerprint.json")
+
+
+def target_label(conn_params) -> str:
+    """File-name-safe `user_host_port_dbname`: pooler DSNs differ only by user, local servers by port."""
+    if isinstance(conn_params, str):
+        parsed = psycopg2.extensions.parse_dsn(conn_params)
+    else:
+        parsed = conn_params
+    parts = [parsed.get('user'), parsed.get('host') or 'local', parsed.get('port'), parsed.get('dbname')]
+    label = '_'.join(str(part) for part in parts if part)
+    return re.sub(r'[^A-Za-z0-9_.-]+', '_', label)
+
+
+def parse_target(spec):
+    """(label, dsn) from `LABEL=DSN` or a bare DSN (labelled by target_label)."""
+    try:
+        psycopg2.extensions.parse_dsn(spec)
+        return target_label(spec), spec
+    except psycopg2.ProgrammingError:
+        label, _, dsn = spec.partition('=')
+        psycopg2.extensions.parse_dsn(dsn)
+        return label, dsn
+
+
+def unique_labels(targets):
+    """Exit when two (label, conn_params) targets share a label: their output files would collide."""
+    labels = [label for label, _ in targets]
+    if len(set(labels)) != len(labels):
+        raise SystemExit(f"Target labels must be unique (use LABEL=DSN): {', '.join(labels)}")
+
+
+def write_diff(model, catalog, out_path: Path):
+    """Diff the live catalog against the expected model; returns the number of differences."""
+    from schema_model import diff_against_live
+
+    lines = diff_against_live(model, catalog)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text('\n'.join(lines) + '\n' if lines else 'Live schema matches the migrations.\n', encoding='utf-8')
+    return len(lines)
+
+
+def verify_many(targets, workers=4, model=None):
+    """Verify (label, conn_params) targets concurrently; returns [(label, out_path or None, error or None, diffs)].
+
+    `diffs` is the number of differences from `model` (None when no model is given).
+    """
+    unique_labels(targets)
+
+    def _one(target):
+        label, conn_params = target
+        try:
+            results, catalog = run_queries(conn_params)
+            path = OUT.with_name(f"{OUT.stem}_{label}{OUT.suffix}")
+            diffs = None
+            if model is not None:
+                diffs = write_diff(model, catalog, DIFF_OUT.with_name(f"{DIFF_OUT.stem}_{label}{DIFF_OUT.suffix}"))
+            return label, write_outputs(results, catalog, path), None, diffs
+        except Exception as exc:
+            return label, None, str(exc).strip(), None
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return list(pool.map(_one, targets))
+
+
+def compare_fingerprints(snapshots):
+    """Compare each snapshot's fingerprint root with the first one; print differing objects."""
+    if len(snapshots) < 2:
+        return
+    base_label, base_path = snapshots[0]
+    base = load_tree(fingerprint_path(base_path))
+    for label, path in snapshots[1:]:
+        tree = load_tree(fingerprint_path(path))
+        if tree['hash'] == base['hash']:
+            print(f'[{label}] schema identical to {base_label} (root {tree["hash"][:16]})')
+            continue
+        changes = list(diff_trees(base, tree))
+        print(f'[{label}] {len(changes)} objects differ from {base_label}:')
+        for obj, change in changes:
+            print(f"    {change:<8} {'/'.join(obj)}")
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument('--host')
+    p.add_argument('--port', type=int, default=5432)
+    p.add_argument('--user')
+    p.add_argument('--password')
+    p.add_argument('--dbname')
+    p.add_argument('--sslmode', default='require')
+    p.add_argument('--dsn', action='append', default=[], metavar='[LABEL=]DSN',
+                   help='libpq connection string, optionally labelled; repeat to verify several databases concurrently')
+    p.add_argument('--workers', type=int, default=4, help='Concurrent connections when several --dsn are given')
+    p.add_argument('--expected', nargs='?', const='supabase/migrations', default=None, metavar='DIR',
+                   help='Also diff against the schema the migrations in DIR should produce (default: supabase/migrations)')
+    args = p.parse_args()
+
+    model = None
+    if args.expected:
+        from schema_model import SchemaModel
+        model = SchemaModel.from_directory(args.expected)
+        for w in model.warnings:
+            print('migrations:', w)
+
+    if args.dsn:
+        failed = 0
+        results = verify_many([parse_target(spec) for spec in args.dsn], args.workers, model)
+        for label, path, err, diffs in results:
+            if err:
+                failed += 1
+                print(f'[{label}] ERROR: {err}')
+            else:
+                print(f'[{label}] Wrote schema verification to {path}')
+                if diffs:
+                    failed += 1
+                    print(f'[{label}] {diffs} differences from the migrations')
+        compare_fingerprints([(label, path) for label, path, err, _ in results if path])
+        raise SystemExit(1 if failed else 0)
 
-    OUT.write_text('\n'.join(txt), encoding='utf-8')
+    if not (args.host and args.user and args.password and args.dbname):
+        p.error('--host, --user, --password and --dbname are required unless --dsn is given')
+    conn_params = dict(host=args.host, port=args.port, user=args.user, password=args.password, dbname=args.dbname, sslmode=args.sslmode)
+    results, catalog = run_queries(conn_params)
+    write_outputs(results, catalog, OUT)
     print('Wrote schema verification to', OUT)
+    if model is not None:
+        diffs = write_diff(model, catalog, DIFF_OUT)
+        print(f'{diffs} differences from the migrations; see {DIFF_OUT}')
+        raise SystemExit(1 if diffs else 0)
 
 
 if __name__ == '__main__':
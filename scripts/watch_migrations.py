@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""Watch migration and PROPOSED FIX files; re-lint and re-repair what changed.
+
+Polls file mtimes (standard library only, works the same on every OS) and,
+for each edited file:
+- finds the changed byte range (common prefix/suffix against the previous
+  version) and re-lexes only from the statement boundary before it up to the
+  first statement boundary after it that lines up with the old text again;
+  untouched statements are shifted, not re-lexed
+- re-lints only the statements (migrations) or `-- PROPOSED FIX:` blocks
+  (manual_review_fixes*.sql) whose text changed
+- for the repair input (the file repair_rewriter_advanced.py would pick),
+  re-runs `process_block` on changed blocks only and rewrites
+  manual_review_fixes_rewritten.sql from cached block outputs
+- prints the diagnostics that appeared or disappeared and how long it took
+
+Usage:
+  python scripts/watch_migrations.py                 # supabase/migrations + scripts/manual_review_fixes*.sql
+  python scripts/watch_migrations.py --interval 0.2 path/to/file.sql
+"""
+import argparse
+import hashlib
+import re
+import time
+from pathlib import Path
+
+from block_index import write_blocks
+from sql_lexer import PUNCT, TRIVIA, tokenize
+from sql_lint import lint_text
+
+ROOT = Path(__file__).resolve().parent
+MIGRATIONS_DIR = ROOT.parent / 'supabase' / 'migrations'
+FIX_GLOB = 'manual_review_fixes*.sql'
+REPAIR_OUTPUT = ROOT / 'manual_review_fixes_rewritten.sql'
+HEADER_RE = re.compile(r'(?m)^-- PROPOSED FIX:')
+
+
+def _digest(text):
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class Span:
+    """One statement or block: offsets into the file plus its 1-based start line/col.
+
+    `stop` is the offset where lexing can safely restart (just past the `;`).
+    """
+    __slots__ = ('start', 'end', 'stop', 'line', 'col', 'stop_line', 'stop_col', 'digest')
+
+    def __init__(self, start, end, stop, line, col, stop_line, stop_col, digest):
+        self.start = start
+        self.end = end
+        self.stop = stop
+        self.line = line
+        self.col = col
+        self.stop_line = stop_line
+        self.stop_col = stop_col
+        self.digest = digest
+
+    def shifted(self, delta, line_delta):
+        return Span(self.start + delta, self.end + delta, self.stop + delta, self.line + line_delta,
+                    self.col, self.stop_line + line_delta, self.stop_col, self.digest)
+
+
+def lex_spans(text, start=0, line=1, col=1, until=None):
+    """Statement spans from `start`; stops at the first boundary >= `until` for which
+    `until(boundary_offset)` is true (then returns (spans, True)), else lexes to the end."""
+    spans = []
+    first = None
+    for tok in tokenize(text, start, None, line, col):
+        if tok.kind in TRIVIA:
+            continue
+        if first is None:
+            first = tok
+        if tok.kind == PUNCT and tok.value == ';':
+            stop = tok.end
+            spans.append(Span(first.start, stop, stop, first.line, first.col, tok.line, tok.col + 1,
+                              _digest(text[first.start:stop])))
+            first = None
+            if until is not None and until(stop):
+                return spans, True
+        last = tok
+    if first is not None:
+        # unterminated tail: trailing trivia (possibly an unclosed comment) belongs to it,
+        # so it can only be restarted from its own start
+        n = len(text)
+        spans.append(Span(first.start, last.end, n, first.line, first.col,
+                          first.line + text.count('\n', first.start, n), n - text.rfind('\n', 0, n),
+                          _digest(text[first.start:last.end])))
+    return spans, False
+
+
+def changed_range(old, new):
+    """(prefix_len, old_suffix_start, new_suffix_start) of the differing region."""
+    n = min(len(old), len(new))
+    lo, hi = 0, n
+    while lo < hi:  # longest common prefix by bisection on slice equality
+        mid = (lo + hi + 1) // 2
+        if old[:mid] == new[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    prefix = lo
+    lo, hi = 0, n - prefix
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if old[len(old) - mid:] == new[len(new) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return prefix, len(old) - lo, len(new) - lo
+
+
+def respan(old_text, old_spans, new_text):
+    """Incrementally update statement spans; returns (spans, relexed_count)."""
+    if not old_spans:
+        spans, _ = lex_spans(new_text)
+        return spans, len(spans)
+    a, old_b, new_b = changed_range(old_text, new_text)
+    delta = len(new_text) - len(old_text)
+    line_delta = new_text.count('\n', a, new_b) - old_text.count('\n', a, old_b)
+
+    # restart after the last statement that ends before the edit
+    k = 0
+    while k < len(old_spans) and old_spans[k].stop < a:
+        k += 1
+    keep = old_spans[:k]
+    if keep:
+        start, line, col = keep[-1].stop, keep[-1].stop_line, keep[-1].stop_col
+    else:
+        start, line, col = 0, 1, 1
+
+    old_stops = {s.stop: j for j, s in enumerate(old_spans) if s.stop >= old_b}
+
+    def realigned(stop):
+        # past the edit, on an old boundary, and on a later line (so columns did not move)
+        return stop >= new_b and (stop - delta) in old_stops and new_text.find('\n', new_b, stop) != -1
+
+    fresh, aligned = lex_spans(new_text, start, line, col, until=realigned)
+    if not aligned:
+        return keep + fresh, len(fresh)
+    j = old_stops[fresh[-1].stop - delta]
+    tail = [s.shifted(delta, line_delta) for s in old_spans[j + 1:]]
+    return keep + fresh + tail, len(fresh)
+
+
+def block_spans(text):
+    """PROPOSED FIX blocks as spans (block i runs from its header to the next one)."""
+    starts = [m.start() for m in HEADER_RE.finditer(text)]
+    spans, line, pos = [], 1, 0
+    for i, s in enumerate(starts):
+        line += text.count('\n', pos, s)
+        pos = s
+        end = starts[i + 1] if i + 1 < len(starts) else len(text)
+        spans.append(Span(s, end, end, line, 1, line, 1, _digest(text[s:end])))
+    return spans
+
+
+def _to_file(span, rel):
+    """Move span-relative (line, col, ...) diagnostics to file coordinates."""
+    for line, col, sev, rule, msg in rel:
+        yield (line + span.line - 1, col + span.col - 1 if line == 1 else col, sev, rule, msg)
+
+
+class WatchedFile:
+    def __init__(self, path, repair=False):
+        self.path = Path(path)
+        self.is_fix = self.path.name.startswith('manual_review_fixes')
+        self.repair = repair
+        self.text = ''
+        self.mtime = None
+        self.spans = []
+        self.lint_cache = {}     # digest -> diagnostics relative to the span text
+        self.repair_cache = {}   # digest -> repaired block text
+        self.diagnostics = set()
+
+    def poll(self):
+        """Re-process the file if its mtime changed; returns a delta report or None."""
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        if mtime == self.mtime:
+            return None
+        self.mtime = mtime
+        t0 = time.perf_counter()
+        new = self.path.read_text(encoding='utf-8')
+        if new == self.text and self.spans:
+            return None
+        if self.is_fix:
+            spans = block_spans(new)
+            relexed = sum(1 for s in spans if s.digest not in self.lint_cache)
+        else:
+            spans, relexed = respan(self.text, self.spans, new)
+        self.text, self.spans = new, spans
+
+        diags, linted = set(), 0
+        for span in spans:
+            rel = self.lint_cache.get(span.digest)
+            if rel is None:
+                linted += 1
+                rel = [(d.line, d.col, d.severity, d.rule, d.message) for d in lint_text(new[span.start:span.end])]
+                self.lint_cache[span.digest] = rel
+            diags.update(_to_file(span, rel))
+        # forget stale entries so the caches track the current file
+        live = {s.digest for s in spans}
+        self.lint_cache = {k: v for k, v in self.lint_cache.items() if k in live}
+
+        repaired = self._repair() if self.repair else 0
+        added = sorted(diags - self.diagnostics)
+        removed = sorted(self.diagnostics - diags)
+        self.diagnostics = diags
+        return {
+            'path': self.path, 'spans': len(spans), 'relexed': relexed, 'linted': linted,
+            'repaired': repaired, 'added': added, 'removed': removed,
+            'total': len(diags), 'ms': (time.perf_counter() - t0) * 1000,
+        }
+
+    def _repair(self):
+        from repair_rewriter_advanced import process_block
+
+        first = self.spans[0].start if self.spans else len(self.text)
+        blocks, count = [], 0
+        for span in self.spans:
+            out = self.repair_cache.get(span.digest)
+            if out is None:
+                count += 1
+                chunk = self.text[span.start:span.end][len('-- PROPOSED FIX:'):]
+                lines = chunk.splitlines()
+                hdr = lines[0] if lines else ''
+                body = '\n'.join(lines[1:])
+                try:
+                    rewritten = process_block(body)
+                except Exception:
+                    rewritten = body  # same fallback as repair_rewriter_advanced.main
+                out = f"-- PROPOSED FIX: {hdr}\n{rewritten}\n"
+                self.repair_cache[span.digest] = out
+            blocks.append(out)
+        live = {s.digest for s in self.spans}
+        self.repair_cache = {k: v for k, v in self.repair_cache.items() if k in live}
+        if count:
+            write_blocks(REPAIR_OUTPUT, '\n'.join([self.text[:first]] + blocks))
+        return count
+
+
+def discover(paths):
+    """Files to watch: explicit paths, or the migrations directory plus manual fix files."""
+    if paths:
+        files = []
+        for p in map(Path, paths):
+            files.extend(sorted(p.glob('*.sql')) if p.is_dir() else [p])
+        return files
+    return sorted(MIGRATIONS_DIR.glob('*.sql')) + sorted(
+        p for p in ROOT.glob(FIX_GLOB) if p.resolve() != REPAIR_OUTPUT.resolve())
+
+
+def repair_input():
+    try:
+        from repair_rewriter_advanced import find_input
+        return find_input().resolve()
+    except FileNotFoundError:
+        return None
+
+
+def print_delta(report):
+    parts = [f"{report['spans']} spans", f"{report['relexed']} re-lexed", f"{report['linted']} re-linted"]
+    if report['repaired']:
+        parts.append(f"{report['repaired']} re-repaired -> {REPAIR_OUTPUT.name}")
+    print(f"[{time.strftime('%H:%M:%S')}] {report['path'].name}: {', '.join(parts)} "
+          f"({report['ms']:.0f} ms, {report['total']} diagnostics)")
+    for line, col, sev, rule, msg in report['added']:
+        print(f"  + {report['path'].name}:{line}:{col}: {sev} {rule}: {msg}")
+    for line, col, sev, rule, msg in report['removed']:
+        print(f"  - {report['path'].name}:{line}:{col}: {sev} {rule}")
+
+
+def main():
+    p = argparse.ArgumentParser(description='Re-lint and re-repair migration files as they change')
+    p.add_argument('paths', nargs='*', help='Files or directories to watch (default: migrations + manual fix files)')
+    p.add_argument('--interval', type=float, default=0.25, help='Polling interval in seconds')
+    p.add_argument('--no-repair', action='store_true', help='Only lint; do not regenerate the rewritten fix file')
+    p.add_argument('--once', action='store_true', help='Process the files once and exit')
+    args = p.parse_args()
+
+    target = None if args.no_repair else repair_input()
+    watched = {}
+    print('Watching', ', '.join(sorted({str(f.parent) for f in discover(args.paths)})) or 'nothing', '(Ctrl+C to stop)')
+    try:
+        while True:
+            for path in discover(args.paths):
+                wf = watched.get(path)
+                initial = wf is None
+                if initial:
+                    wf = watched[path] = WatchedFile(path, repair=target is not None and path.resolve() == target)
+                report = wf.poll()
+                # the initial scan only mentions files that have something to say
+                if report and (not initial or report['added'] or report['repaired']):
+                    print_delta(report)
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print()
+
+
+if __name__ == '__main__':
+    main()
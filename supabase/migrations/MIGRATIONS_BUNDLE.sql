@@ -0,0 +1,3728 @@
+-- MIGRATIONS BUNDLE: the numbered history in one file, for review and local replays
+-- (generated by scripts/bundle_migrations.py; do not edit by hand). Not a runner:
+-- apply missing migrations with RUN_ALL_MIGRATIONS.sql.
+-- Inputs: 19 migration files, sha256 2c0a09aba0f96f6614f9e37b9595cc09ba65842cef5e66d6a460ab36a347d1c2
+-- Statements: 501 kept of 533
+
+-- =============================================
+-- 001_initial_schema.sql
+-- =============================================
+CREATE TABLE IF NOT EXISTS tasks (
+        id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+        user_id UUID NOT NULL REFERENCES user_profiles(id) ON DELETE CASCADE,
+        title TEXT NOT NULL,
+        description TEXT,
+        category task_category NOT NULL,
+        priority priority DEFAULT 'medium',
+        estimated_duration INTEGER NOT NULL, -- minutes
+        actual_duration INTEGER,
+        buffer_time INTEGER DEFAULT 0,
+        status task_status DEFAULT 'not-started',
+        due_date TIMESTAMPTZ,
+        scheduled_at TIMESTAMPTZ,
+        completed_at TIMESTAMPTZ,
+        tags TEXT[] DEFAULT '{}',
+        energy_required energy_level DEFAULT 'medium',
+        focus_required focus_level DEFAULT 'medium',
+        sensory_considerations JSONB DEFAULT '[]',
+        created_at TIMESTAMPTZ DEFAULT NOW(),
+        updated_at TIMESTAMPTZ DEFAULT NOW()
+      );
+
+CREATE TABLE IF NOT EXISTS routines (
+        id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+        user_id UUID NOT NULL REFERENCES user_profiles(id) ON DELETE CASCADE,
+        name TEXT NOT NULL,
+        description TEXT,
+        type routine_type NOT NULL,
+        is_active BOOLEAN DEFAULT true,
+        is_template BOOLEAN DEFAULT false,
+        flexibility flexibility_level DEFAULT 'flexible',
+        schedule JSONB NOT NULL, -- frequency, days, times, etc.
+        adaptive_rules JSONB DEFAULT '[]',
+        visual_board JSONB, -- board configuration
+        created_at TIMESTAMPTZ DEFAULT NOW(),
+        updated_at TIMESTAMPTZ DEFAULT NOW()
+      );
+
+CREATE TABLE IF NOT EXISTS routine_tasks (
+        id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+        routine_id UUID NOT NULL REFERENCES routines(id) ON DELETE CASCADE,
+        task_id UUID NOT NULL REFERENCES tasks(id) ON DELETE CASCADE,
+        order_index INTEGER NOT NULL,
+        is_optional BOOLEAN DEFAULT false,
+        estimated_duration INTEGER NOT NULL,
+        buffer_time INTEGER DEFAULT 0,
+        conditions JSONB, -- conditional execution rules
+        created_at TIMESTAMPTZ DEFAULT NOW(),
+        UNIQUE(routine_id, task_id)
+      );
+
+CREATE TABLE IF NOT EXISTS mood_entries (
+        id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+        user_id UUID NOT NULL REFERENCES user_profiles(id) ON DELETE CASCADE,
+        timestamp TIMESTAMPTZ NOT NULL,
+        mood INTEGER NOT NULL CHECK (mood >= 1 AND mood <= 10),
+        energy INTEGER NOT NULL CHECK (energy >= 1 AND energy <= 10),
+        focus INTEGER NOT NULL CHECK (focus >= 1 AND focus <= 10),
+        anxiety INTEGER NOT NULL CHECK (anxiety >= 1 AND anxiety <= 10),
+        stress INTEGER NOT NULL CHECK (stress >= 1 AND stress <= 10),
+        motivation INTEGER NOT NULL CHECK (motivation >= 1 AND motivation <= 10),
+        notes TEXT,
+        triggers TEXT[],
+        context JSONB, -- location, weather, sleep, etc.
+        created_at TIMESTAMPTZ DEFAULT NOW()
+      );
+
+CREATE TABLE IF NOT EXISTS ai_insights (
+        id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+        user_id UUID NOT NULL REFERENCES user_profiles(id) ON DELETE CASCADE,
+        type insight_type NOT NULL,
+        title TEXT NOT NULL,
+        description TEXT NOT NULL,
+        confidence DECIMAL(3,2) CHECK (confidence >= 0 AND confidence <= 1),
+        relevance DECIMAL(3,2) CHECK (relevance >= 0 AND relevance <= 1),
+        actionable BOOLEAN DEFAULT false,
+        suggestions JSONB DEFAULT '[]',
+        data JSONB DEFAULT '{}', -- raw analysis data
+        generated_at TIMESTAMPTZ DEFAULT NOW(),
+        dismissed_at TIMESTAMPTZ
+      );
+
+CREATE TABLE IF NOT EXISTS shared_boards (
+        id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+        board_id UUID NOT NULL, -- references routine or custom board
+        owner_id UUID NOT NULL REFERENCES user_profiles(id) ON DELETE CASCADE,
+        shared_with JSONB NOT NULL, -- array of access objects
+        permissions JSONB NOT NULL,
+        is_public BOOLEAN DEFAULT false,
+        share_code TEXT UNIQUE,
+        expires_at TIMESTAMPTZ,
+        created_at TIMESTAMPTZ DEFAULT NOW()
+      );
+
+CREATE TABLE IF NOT EXISTS notifications (
+        id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+        user_id UUID NOT NULL REFERENCES user_profiles(id) ON DELETE CASCADE,
+        title TEXT NOT NULL,
+        message TEXT NOT NULL,
+        type notification_type NOT NULL,
+        priority priority DEFAULT 'medium',
+        actionable BOOLEAN DEFAULT false,
+        actions JSONB, -- available actions
+        scheduled_for TIMESTAMPTZ,
+        delivered_at TIMESTAMPTZ,
+        read_at TIMESTAMPTZ,
+        dismissed_at TIMESTAMPTZ,
+        created_at TIMESTAMPTZ DEFAULT NOW()
+      );
+
+CREATE TABLE IF NOT EXISTS app_events (
+        id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+        user_id UUID REFERENCES user_profiles(id) ON DELETE CASCADE,
+        type event_type NOT NULL,
+        source event_source NOT NULL,
+        data JSONB DEFAULT '{}',
+        timestamp TIMESTAMPTZ DEFAULT NOW()
+      );
+
+CREATE TABLE IF NOT EXISTS quick_captures (
+        id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+        user_id UUID NOT NULL REFERENCES user_profiles(id) ON DELETE CASCADE,
+        type TEXT NOT NULL CHECK (type IN ('voice_note', 'photo', 'free_write', 'sketch')),
+        title TEXT,
+        content TEXT,
+        file_url TEXT, -- for photos/audio files
+        metadata JSONB DEFAULT '{}',
+        created_at TIMESTAMPTZ DEFAULT NOW(),
+        updated_at TIMESTAMPTZ DEFAULT NOW()
+      );
+
+CREATE TABLE IF NOT EXISTS user_activity (
+        id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+        user_id UUID NOT NULL REFERENCES user_profiles(id) ON DELETE CASCADE,
+        activity_type TEXT NOT NULL CHECK (activity_type IN ('task_work', 'routine_execution', 'quick_capture', 'dashboard_view')),
+        entity_id UUID, -- references task, routine, or capture
+        entity_type TEXT CHECK (entity_type IN ('task', 'routine', 'quick_capture')),
+        duration_minutes INTEGER,
+        context JSONB DEFAULT '{}',
+        started_at TIMESTAMPTZ DEFAULT NOW(),
+        ended_at TIMESTAMPTZ
+      );
+
+CREATE INDEX IF NOT EXISTS idx_tasks_user_id ON tasks(user_id);
+
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);
+
+CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks(due_date);
+
+CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority);
+
+CREATE INDEX IF NOT EXISTS idx_tasks_category ON tasks(category);
+
+CREATE INDEX IF NOT EXISTS idx_routines_user_id ON routines(user_id);
+
+CREATE INDEX IF NOT EXISTS idx_routines_type ON routines(type);
+
+CREATE INDEX IF NOT EXISTS idx_routines_active ON routines(is_active);
+
+CREATE INDEX IF NOT EXISTS idx_routine_tasks_routine_id ON routine_tasks(routine_id);
+
+CREATE INDEX IF NOT EXISTS idx_routine_tasks_order ON routine_tasks(order_index);
+
+CREATE INDEX IF NOT EXISTS idx_mood_entries_user_id ON mood_entries(user_id);
+
+CREATE INDEX IF NOT EXISTS idx_mood_entries_timestamp ON mood_entries(timestamp);
+
+CREATE INDEX IF NOT EXISTS idx_ai_insights_user_id ON ai_insights(user_id);
+
+CREATE INDEX IF NOT EXISTS idx_ai_insights_type ON ai_insights(type);
+
+CREATE INDEX IF NOT EXISTS idx_ai_insights_dismissed ON ai_insights(dismissed_at);
+
+CREATE INDEX IF NOT EXISTS idx_notifications_user_id ON notifications(user_id);
+
+CREATE INDEX IF NOT EXISTS idx_notifications_delivered ON notifications(delivered_at);
+
+CREATE INDEX IF NOT EXISTS idx_notifications_read ON notifications(read_at);
+
+CREATE INDEX IF NOT EXISTS idx_app_events_user_id ON app_events(user_id);
+
+CREATE INDEX IF NOT EXISTS idx_app_events_type ON app_events(type);
+
+CREATE INDEX IF NOT EXISTS idx_app_events_timestamp ON app_events(timestamp);
+
+ALTER TABLE IF EXISTS user_profiles ENABLE ROW LEVEL SECURITY;
+
+ALTER TABLE IF EXISTS user_settings ENABLE ROW LEVEL SECURITY;
+
+ALTER TABLE IF EXISTS tasks ENABLE ROW LEVEL SECURITY;
+
+ALTER TABLE IF EXISTS routines ENABLE ROW LEVEL SECURITY;
+
+ALTER TABLE IF EXISTS routine_tasks ENABLE ROW LEVEL SECURITY;
+
+ALTER TABLE IF EXISTS mood_entries ENABLE ROW LEVEL SECURITY;
+
+ALTER TABLE IF EXISTS ai_insights ENABLE ROW LEVEL SECURITY;
+
+ALTER TABLE IF EXISTS shared_boards ENABLE ROW LEVEL SECURITY;
+
+ALTER TABLE IF EXISTS notifications ENABLE ROW LEVEL SECURITY;
+
+ALTER TABLE IF EXISTS app_events ENABLE ROW LEVEL SECURITY;
+
+ALTER TABLE IF EXISTS quick_captures ENABLE ROW LEVEL SECURITY;
+
+ALTER TABLE IF EXISTS user_activity ENABLE ROW LEVEL SECURITY;
+
+DO $$
+      BEGIN
+        IF NOT EXISTS (
+          SELECT 1 FROM pg_catalog.pg_policy p
+          JOIN pg_class c ON p.polrelid = c.oid
+          WHERE c.relname = 'user_profiles' AND p.polname = 'users_can_view_own_profile'
+        ) THEN
+          CREATE POLICY "Users can view own profile" ON user_profiles
+            FOR SELECT USING (auth.uid() = id);
+        END IF;
+      END$$;
+
+DO $$
+      BEGIN
+        IF NOT EXISTS (
+          SELECT 1 FROM pg_catalog.pg_policy p
+          JOIN pg_class c ON p.polrelid = c.oid
+          WHERE c.relname = 'user_profiles' AND p.polname = 'users_can_update_own_profile'
+        ) THEN
+          CREATE POLICY "Users can update own profile" ON user_profiles
+            FOR UPDATE USING (auth.uid() = id);
+        END IF;
+      END$$;
+
+DO $$
+      BEGIN
+        IF NOT EXISTS (
+          SELECT 1 FROM pg_catalog.pg_policy p
+          JOIN pg_class c ON p.polrelid = c.oid
+          WHERE c.relname = 'user_profiles' AND p.polname = 'users_can_insert_own_profile'
+        ) THEN
+          CREATE POLICY "Users can insert own profile" ON user_profiles
+            FOR INSERT WITH CHECK (auth.uid() = id);
+        END IF;
+      END$$;
+
+DO $$
+      BEGIN
+        IF NOT EXISTS (
+          SELECT 1 FROM pg_catalog.pg_policy p
+          JOIN pg_class c ON p.polrelid = c.oid
+          WHERE c.relname = 'user_settings' AND p.polname = 'users_can_manage_own_settings'
+        ) THEN
+          CREATE POLICY "Users can manage own settings" ON user_settings
+            FOR ALL USING (auth.uid() = user_id);
+        END IF;
+      END$$;
+
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+      RETURNS TRIGGER AS $$
+      BEGIN
+        NEW.updated_at = NOW();
+        RETURN NEW;
+      END;
+      $$ language 'plpgsql';
+
+DO $$
+      BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'update_user_profiles_updated_at') THEN
+          CREATE TRIGGER update_user_profiles_updated_at 
+            BEFORE UPDATE ON user_profiles 
+            FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+        END IF;
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'update_tasks_updated_at') THEN
+          CREATE TRIGGER update_tasks_updated_at 
+            BEFORE UPDATE ON tasks 
+            FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+        END IF;
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'update_routines_updated_at') THEN
+          CREATE TRIGGER update_routines_updated_at 
+            BEFORE UPDATE ON routines 
+            FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+        END IF;
+      END$$;
+
+CREATE OR REPLACE FUNCTION handle_new_user()
+      RETURNS TRIGGER AS $$
+      BEGIN
+        INSERT INTO user_profiles (id, email, display_name, neurotype, age_group)
+        VALUES (
+          NEW.id,
+          NEW.email,
+          COALESCE(NEW.raw_user_meta_data->>'display_name', 'User'),
+          COALESCE(NEW.raw_user_meta_data->>'neurotype', 'exploring')::neurotype,
+          COALESCE(NEW.raw_user_meta_data->>'age_group', 'adult')::age_group
+        );
+        RETURN NEW;
+      END;
+      $$ language 'plpgsql' SECURITY DEFINER;
+
+DO $$
+      BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_trigger WHERE tgname = 'on_auth_user_created') THEN
+          CREATE TRIGGER on_auth_user_created
+            AFTER INSERT ON auth.users
+            FOR EACH ROW EXECUTE FUNCTION handle_new_user();
+        END IF;
+      END$$;
+
+-- =============================================
+-- 002_enhanced_routine_steps.sql
+-- =============================================
+CREATE TYPE routine_step_type AS ENUM ('routine', 'flexZone', 'note');
+
+CREATE TYPE transition_cue_type AS ENUM ('text', 'audio', 'visual', 'mixed');
+
+CREATE TYPE freeform_data_type AS ENUM ('note', 'sketch');
+
+CREATE TYPE step_execution_status AS ENUM ('pending', 'active', 'paused', 'completed', 'skipped');
+
+CREATE TYPE timer_notification_type AS ENUM ('visual', 'audio', 'vibration', 'all');
+
+CREATE TYPE timer_intensity AS ENUM ('subtle', 'normal', 'prominent');
+
+CREATE TYPE neurotype_time_awareness AS ENUM ('high', 'medium', 'low');
+
+CREATE TYPE autism_routine_rigidity AS ENUM ('flexible', 'structured', 'strict');
+
+CREATE TABLE routine_steps (
+  step_id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+  routine_id UUID NOT NULL REFERENCES routines(id) ON DELETE CASCADE,
+  step_type routine_step_type NOT NULL DEFAULT 'routine',
+  title TEXT NOT NULL,
+  description TEXT,
+  duration INTEGER NOT NULL DEFAULT 0, -- minutes
+  order_index INTEGER NOT NULL,
+  
+  -- Transition Support Properties
+  transition_cue JSONB, -- TransitionCue object
+  
+  -- Flex Zone Specific Properties
+  freeform_data JSONB, -- FreeformData object
+  timer_settings JSONB, -- TimerSettings object
+  is_flexible BOOLEAN DEFAULT false,
+  
+  -- Visual and Accessibility Support
+  visual_cues JSONB, -- color, icon, emoji, backgroundColor, borderColor
+  
+  -- Neurotype Adaptations
+  neurotype_adaptations JSONB, -- ADHD, autism, dyslexia specific settings
+  
+  -- Execution State (runtime)
+  execution_state JSONB, -- status, startedAt, completedAt, actualDuration, notes
+  
+  -- Metadata
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  updated_at TIMESTAMPTZ DEFAULT NOW(),
+  version INTEGER DEFAULT 1
+);
+
+CREATE TABLE routine_executions (
+  id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+  routine_id UUID NOT NULL REFERENCES routines(id) ON DELETE CASCADE,
+  user_id UUID NOT NULL REFERENCES user_profiles(id) ON DELETE CASCADE,
+  
+  -- Execution tracking
+  started_at TIMESTAMPTZ NOT NULL,
+  completed_at TIMESTAMPTZ,
+  current_step_id UUID REFERENCES routine_steps(step_id),
+  total_duration INTEGER, -- actual minutes taken
+  
+  -- Flexibility tracking
+  modifications JSONB DEFAULT '[]', -- RoutineModification array
+  
+  -- Metadata
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE step_executions (
+  id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+  routine_execution_id UUID NOT NULL REFERENCES routine_executions(id) ON DELETE CASCADE,
+  step_id UUID NOT NULL REFERENCES routine_steps(step_id) ON DELETE CASCADE,
+  
+  started_at TIMESTAMPTZ NOT NULL,
+  completed_at TIMESTAMPTZ,
+  actual_duration INTEGER, -- minutes
+  status step_execution_status DEFAULT 'pending',
+  
+  -- Flex zone specific
+  freeform_data_snapshot JSONB, -- Snapshot of freeform content
+  timer_overrun INTEGER DEFAULT 0, -- minutes past planned duration
+  
+  -- User feedback
+  difficulty_rating INTEGER CHECK (difficulty_rating >= 1 AND difficulty_rating <= 5),
+  satisfaction_rating INTEGER CHECK (satisfaction_rating >= 1 AND satisfaction_rating <= 5),
+  notes TEXT,
+  
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE routine_interruptions (
+  id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+  routine_execution_id UUID NOT NULL REFERENCES routine_executions(id) ON DELETE CASCADE,
+  interruption_type TEXT NOT NULL CHECK (interruption_type IN ('external', 'internal', 'planned')),
+  description TEXT,
+  started_at TIMESTAMPTZ NOT NULL,
+  ended_at TIMESTAMPTZ,
+  impact TEXT NOT NULL CHECK (impact IN ('minor', 'moderate', 'major')),
+  
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE routine_templates (
+  id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+  name TEXT NOT NULL,
+  description TEXT,
+  category TEXT NOT NULL CHECK (category IN ('morning', 'evening', 'work', 'self-care', 'exercise', 'custom')),
+  estimated_duration INTEGER NOT NULL,
+  
+  -- Template metadata
+  is_public BOOLEAN DEFAULT false,
+  author_id UUID REFERENCES user_profiles(id) ON DELETE SET NULL,
+  tags TEXT[] DEFAULT '{}',
+  difficulty TEXT CHECK (difficulty IN ('beginner', 'intermediate', 'advanced')),
+  neurotype_optimized TEXT[] DEFAULT '{}', -- ['adhd', 'autism', 'dyslexia']
+  
+  -- Usage statistics
+  usage_count INTEGER DEFAULT 0,
+  rating DECIMAL(3,2) CHECK (rating >= 0 AND rating <= 5),
+  
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE template_steps (
+  id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+  template_id UUID NOT NULL REFERENCES routine_templates(id) ON DELETE CASCADE,
+  step_type routine_step_type NOT NULL DEFAULT 'routine',
+  title TEXT NOT NULL,
+  description TEXT,
+  duration INTEGER NOT NULL DEFAULT 0,
+  order_index INTEGER NOT NULL,
+  
+  -- All the same properties as routine_steps but without routine_id
+  transition_cue JSONB,
+  freeform_data JSONB,
+  timer_settings JSONB,
+  is_flexible BOOLEAN DEFAULT false,
+  visual_cues JSONB,
+  neurotype_adaptations JSONB,
+  
+  created_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE INDEX idx_routine_steps_routine_id ON routine_steps(routine_id);
+
+CREATE INDEX idx_routine_steps_order ON routine_steps(order_index);
+
+CREATE INDEX idx_routine_steps_type ON routine_steps(step_type);
+
+CREATE INDEX idx_routine_executions_user_id ON routine_executions(user_id);
+
+CREATE INDEX idx_routine_executions_routine_id ON routine_executions(routine_id);
+
+CREATE INDEX idx_routine_executions_started_at ON routine_executions(started_at);
+
+CREATE INDEX idx_step_executions_routine_execution_id ON step_executions(routine_execution_id);
+
+CREATE INDEX idx_step_executions_step_id ON step_executions(step_id);
+
+CREATE INDEX idx_step_executions_status ON step_executions(status);
+
+CREATE INDEX idx_routine_interruptions_routine_execution_id ON routine_interruptions(routine_execution_id);
+
+CREATE INDEX idx_routine_templates_category ON routine_templates(category);
+
+CREATE INDEX idx_routine_templates_public ON routine_templates(is_public);
+
+CREATE INDEX idx_routine_templates_author_id ON routine_templates(author_id);
+
+CREATE INDEX idx_template_steps_template_id ON template_steps(template_id);
+
+CREATE INDEX idx_template_steps_order ON template_steps(order_index);
+
+ALTER TABLE routine_steps ENABLE ROW LEVEL SECURITY;
+
+ALTER TABLE routine_executions ENABLE ROW LEVEL SECURITY;
+
+ALTER TABLE step_executions ENABLE ROW LEVEL SECURITY;
+
+ALTER TABLE routine_interruptions ENABLE ROW LEVEL SECURITY;
+
+ALTER TABLE routine_templates ENABLE ROW LEVEL SECURITY;
+
+ALTER TABLE template_steps ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can manage routine steps" ON routine_steps
+  FOR ALL USING (
+    EXISTS (
+      SELECT 1 FROM routines 
+      WHERE routines.id = routine_steps.routine_id 
+      AND routines.user_id = auth.uid()
+    )
+  );
+
+CREATE POLICY "Users can manage own routine executions" ON routine_executions
+  FOR ALL USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can manage step executions" ON step_executions
+  FOR ALL USING (
+    EXISTS (
+      SELECT 1 FROM routine_executions 
+      WHERE routine_executions.id = step_executions.routine_execution_id 
+      AND routine_executions.user_id = auth.uid()
+    )
+  );
+
+CREATE POLICY "Users can manage routine interruptions" ON routine_interruptions
+  FOR ALL USING (
+    EXISTS (
+      SELECT 1 FROM routine_executions 
+      WHERE routine_executions.id = routine_interruptions.routine_execution_id 
+      AND routine_executions.user_id = auth.uid()
+    )
+  );
+
+CREATE POLICY "Users can view public templates" ON routine_templates
+  FOR SELECT USING (is_public = true OR author_id = auth.uid());
+
+CREATE POLICY "Users can manage own templates" ON routine_templates
+  FOR ALL USING (auth.uid() = author_id);
+
+CREATE POLICY "Users can create templates" ON routine_templates
+  FOR INSERT WITH CHECK (auth.uid() = author_id);
+
+CREATE POLICY "Users can view template steps" ON template_steps
+  FOR SELECT USING (
+    EXISTS (
+      SELECT 1 FROM routine_templates 
+      WHERE routine_templates.id = template_steps.template_id 
+      AND (routine_templates.is_public = true OR routine_templates.author_id = auth.uid())
+    )
+  );
+
+CREATE POLICY "Users can manage own template steps" ON template_steps
+  FOR ALL USING (
+    EXISTS (
+      SELECT 1 FROM routine_templates 
+      WHERE routine_templates.id = template_steps.template_id 
+      AND routine_templates.author_id = auth.uid()
+    )
+  );
+
+CREATE TRIGGER update_routine_steps_updated_at 
+  BEFORE UPDATE ON routine_steps 
+  FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_routine_executions_updated_at 
+  BEFORE UPDATE ON routine_executions 
+  FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_routine_templates_updated_at 
+  BEFORE UPDATE ON routine_templates 
+  FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE OR REPLACE FUNCTION calculate_routine_duration(routine_id_param UUID)
+RETURNS INTEGER AS $$
+DECLARE
+  total_duration INTEGER := 0;
+BEGIN
+  SELECT COALESCE(SUM(duration), 0) INTO total_duration
+  FROM routine_steps
+  WHERE routine_id = routine_id_param;
+  
+  RETURN total_duration;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION get_next_step_order(routine_id_param UUID)
+RETURNS INTEGER AS $$
+DECLARE
+  next_order INTEGER := 1;
+BEGIN
+  SELECT COALESCE(MAX(order_index), 0) + 1 INTO next_order
+  FROM routine_steps
+  WHERE routine_id = routine_id_param;
+  
+  RETURN next_order;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION reorder_routine_steps()
+RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE routine_steps 
+  SET order_index = order_index - 1
+  WHERE routine_id = OLD.routine_id 
+  AND order_index > OLD.order_index;
+  
+  RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER reorder_steps_after_delete
+  AFTER DELETE ON routine_steps
+  FOR EACH ROW
+  EXECUTE FUNCTION reorder_routine_steps();
+
+CREATE OR REPLACE FUNCTION validate_routine_constraints()
+RETURNS TRIGGER AS $$
+BEGIN
+  -- Prevent consecutive flex zones (business rule example)
+  IF NEW.step_type = 'flexZone' THEN
+    -- Check if previous step is also a flex zone
+    IF EXISTS (
+      SELECT 1 FROM routine_steps 
+      WHERE routine_id = NEW.routine_id 
+      AND order_index = NEW.order_index - 1 
+      AND step_type = 'flexZone'
+    ) THEN
+      RAISE EXCEPTION 'Cannot have consecutive flex zones in routine';
+    END IF;
+  END IF;
+  
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER validate_routine_step_constraints
+  BEFORE INSERT OR UPDATE ON routine_steps
+  FOR EACH ROW
+  EXECUTE FUNCTION validate_routine_constraints();
+
+COMMENT ON TABLE routine_steps IS 'Enhanced routine steps supporting flex zones and transitions';
+
+COMMENT ON TABLE routine_executions IS 'Tracks individual routine execution sessions';
+
+COMMENT ON TABLE step_executions IS 'Tracks execution of individual routine steps';
+
+COMMENT ON TABLE routine_interruptions IS 'Records interruptions during routine execution';
+
+COMMENT ON TABLE routine_templates IS 'Reusable routine templates with community sharing';
+
+COMMENT ON TABLE template_steps IS 'Steps belonging to routine templates';
+
+COMMENT ON COLUMN routine_steps.transition_cue IS 'JSON object containing transition cue settings (text, audio, visual)';
+
+COMMENT ON COLUMN routine_steps.freeform_data IS 'JSON object for free write/sketch content in flex zones';
+
+COMMENT ON COLUMN routine_steps.timer_settings IS 'JSON object for timer configuration and notifications';
+
+COMMENT ON COLUMN routine_steps.neurotype_adaptations IS 'JSON object with ADHD, autism, dyslexia specific adaptations';
+
+-- =============================================
+-- 002_new_features.sql
+-- =============================================
+CREATE TABLE IF NOT EXISTS public.pomodoro_sessions (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    preset_id TEXT NOT NULL,
+    preset_name TEXT NOT NULL,
+    work_duration INTEGER NOT NULL, -- in seconds
+    break_duration INTEGER NOT NULL,
+    started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    completed_at TIMESTAMPTZ,
+    phase TEXT NOT NULL CHECK (phase IN ('work', 'break', 'long-break')),
+    completed BOOLEAN NOT NULL DEFAULT false,
+    interruptions INTEGER DEFAULT 0,
+    notes TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE public.pomodoro_sessions ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own pomodoro sessions"
+    ON public.pomodoro_sessions FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can insert own pomodoro sessions"
+    ON public.pomodoro_sessions FOR INSERT
+    WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "Users can update own pomodoro sessions"
+    ON public.pomodoro_sessions FOR UPDATE
+    USING (auth.uid() = user_id);
+
+CREATE INDEX idx_pomodoro_sessions_user_id ON public.pomodoro_sessions(user_id);
+
+CREATE INDEX idx_pomodoro_sessions_started_at ON public.pomodoro_sessions(started_at);
+
+CREATE TABLE IF NOT EXISTS public.habits (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    description TEXT,
+    icon TEXT,
+    color TEXT,
+    category TEXT NOT NULL CHECK (category IN ('health', 'productivity', 'self-care', 'social', 'learning', 'creative')),
+    frequency TEXT NOT NULL CHECK (frequency IN ('daily', 'weekly', 'custom')),
+    target_days INTEGER[] DEFAULT ARRAY[0,1,2,3,4,5,6], -- 0=Sunday, 6=Saturday
+    reminder_time TIME,
+    reminder_enabled BOOLEAN DEFAULT false,
+    current_streak INTEGER DEFAULT 0,
+    longest_streak INTEGER DEFAULT 0,
+    archived BOOLEAN DEFAULT false,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE public.habits ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own habits"
+    ON public.habits FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can insert own habits"
+    ON public.habits FOR INSERT
+    WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "Users can update own habits"
+    ON public.habits FOR UPDATE
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can delete own habits"
+    ON public.habits FOR DELETE
+    USING (auth.uid() = user_id);
+
+CREATE INDEX idx_habits_user_id ON public.habits(user_id);
+
+CREATE INDEX idx_habits_category ON public.habits(category);
+
+CREATE TABLE IF NOT EXISTS public.habit_logs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    habit_id UUID NOT NULL REFERENCES public.habits(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    completed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    notes TEXT,
+    mood TEXT CHECK (mood IN ('great', 'good', 'okay', 'struggling', 'difficult')),
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE public.habit_logs ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own habit logs"
+    ON public.habit_logs FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can insert own habit logs"
+    ON public.habit_logs FOR INSERT
+    WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "Users can delete own habit logs"
+    ON public.habit_logs FOR DELETE
+    USING (auth.uid() = user_id);
+
+CREATE INDEX idx_habit_logs_habit_id ON public.habit_logs(habit_id);
+
+CREATE INDEX idx_habit_logs_user_id ON public.habit_logs(user_id);
+
+CREATE INDEX idx_habit_logs_completed_at ON public.habit_logs(completed_at);
+
+CREATE TABLE IF NOT EXISTS public.habit_stacks (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    trigger_habit_id UUID REFERENCES public.habits(id) ON DELETE CASCADE,
+    new_habit_id UUID NOT NULL REFERENCES public.habits(id) ON DELETE CASCADE,
+    trigger_description TEXT NOT NULL,
+    order_index INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE public.habit_stacks ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own habit stacks"
+    ON public.habit_stacks FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can insert own habit stacks"
+    ON public.habit_stacks FOR INSERT
+    WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "Users can delete own habit stacks"
+    ON public.habit_stacks FOR DELETE
+    USING (auth.uid() = user_id);
+
+CREATE INDEX idx_habit_stacks_user_id ON public.habit_stacks(user_id);
+
+CREATE TABLE IF NOT EXISTS public.focus_sessions (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    task_name TEXT,
+    duration INTEGER NOT NULL, -- in seconds
+    start_time TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    end_time TIMESTAMPTZ,
+    distraction_count INTEGER DEFAULT 0,
+    ambient_sound TEXT,
+    blocked_sites TEXT[],
+    completed BOOLEAN DEFAULT false,
+    focus_score INTEGER CHECK (focus_score >= 0 AND focus_score <= 100),
+    notes TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE public.focus_sessions ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own focus sessions"
+    ON public.focus_sessions FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can insert own focus sessions"
+    ON public.focus_sessions FOR INSERT
+    WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "Users can update own focus sessions"
+    ON public.focus_sessions FOR UPDATE
+    USING (auth.uid() = user_id);
+
+CREATE INDEX idx_focus_sessions_user_id ON public.focus_sessions(user_id);
+
+CREATE INDEX idx_focus_sessions_start_time ON public.focus_sessions(start_time);
+
+CREATE TABLE IF NOT EXISTS public.energy_logs (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    energy_level INTEGER NOT NULL CHECK (energy_level >= 1 AND energy_level <= 5),
+    mood TEXT,
+    physical_energy INTEGER CHECK (physical_energy >= 1 AND physical_energy <= 5),
+    mental_energy INTEGER CHECK (mental_energy >= 1 AND mental_energy <= 5),
+    factors TEXT[], -- e.g., ['slept_well', 'exercised', 'caffeine']
+    notes TEXT,
+    logged_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE public.energy_logs ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own energy logs"
+    ON public.energy_logs FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can insert own energy logs"
+    ON public.energy_logs FOR INSERT
+    WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "Users can update own energy logs"
+    ON public.energy_logs FOR UPDATE
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can delete own energy logs"
+    ON public.energy_logs FOR DELETE
+    USING (auth.uid() = user_id);
+
+CREATE INDEX idx_energy_logs_user_id ON public.energy_logs(user_id);
+
+CREATE INDEX idx_energy_logs_logged_at ON public.energy_logs(logged_at);
+
+CREATE TABLE IF NOT EXISTS public.body_doubling_rooms (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    name TEXT NOT NULL,
+    description TEXT,
+    room_type TEXT NOT NULL CHECK (room_type IN ('video', 'silent', 'audio-only')),
+    created_by UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    is_public BOOLEAN DEFAULT true,
+    max_participants INTEGER DEFAULT 10,
+    current_participants INTEGER DEFAULT 0,
+    tags TEXT[],
+    scheduled_start TIMESTAMPTZ,
+    scheduled_end TIMESTAMPTZ,
+    status TEXT NOT NULL DEFAULT 'active' CHECK (status IN ('active', 'scheduled', 'ended')),
+    webrtc_room_id TEXT UNIQUE, -- For WebRTC integration
+    external_service_id TEXT, -- For integration with external body doubling services
+    external_service_name TEXT, -- e.g., 'focusmate', 'study-together', 'flow-club'
+    webhook_url TEXT, -- Webhook URL for external service integration
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE public.body_doubling_rooms ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Anyone can view public rooms"
+    ON public.body_doubling_rooms FOR SELECT
+    USING (is_public = true OR auth.uid() = created_by);
+
+CREATE POLICY "Authenticated users can create rooms"
+    ON public.body_doubling_rooms FOR INSERT
+    WITH CHECK (auth.uid() = created_by);
+
+CREATE POLICY "Room creators can update their rooms"
+    ON public.body_doubling_rooms FOR UPDATE
+    USING (auth.uid() = created_by);
+
+CREATE POLICY "Room creators can delete their rooms"
+    ON public.body_doubling_rooms FOR DELETE
+    USING (auth.uid() = created_by);
+
+CREATE INDEX idx_body_doubling_rooms_created_by ON public.body_doubling_rooms(created_by);
+
+CREATE INDEX idx_body_doubling_rooms_status ON public.body_doubling_rooms(status);
+
+CREATE INDEX idx_body_doubling_rooms_external_service ON public.body_doubling_rooms(external_service_id);
+
+CREATE TABLE IF NOT EXISTS public.room_participants (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    room_id UUID NOT NULL REFERENCES public.body_doubling_rooms(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    joined_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    left_at TIMESTAMPTZ,
+    is_active BOOLEAN DEFAULT true,
+    camera_enabled BOOLEAN DEFAULT false,
+    microphone_enabled BOOLEAN DEFAULT false,
+    peer_id TEXT, -- For WebRTC peer connection
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    UNIQUE(room_id, user_id)
+);
+
+ALTER TABLE public.room_participants ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view participants in their rooms"
+    ON public.room_participants FOR SELECT
+    USING (
+        EXISTS (
+            SELECT 1 FROM public.body_doubling_rooms
+            WHERE id = room_id AND (is_public = true OR created_by = auth.uid())
+        )
+    );
+
+CREATE POLICY "Users can join rooms"
+    ON public.room_participants FOR INSERT
+    WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "Users can update their own participation"
+    ON public.room_participants FOR UPDATE
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can leave rooms"
+    ON public.room_participants FOR DELETE
+    USING (auth.uid() = user_id);
+
+CREATE INDEX idx_room_participants_room_id ON public.room_participants(room_id);
+
+CREATE INDEX idx_room_participants_user_id ON public.room_participants(user_id);
+
+CREATE TABLE IF NOT EXISTS public.task_chunks (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    original_task TEXT NOT NULL,
+    chunks JSONB NOT NULL, -- Array of {title, description, estimatedTime, difficulty, completed, order}
+    completed_chunks INTEGER DEFAULT 0,
+    total_chunks INTEGER NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE public.task_chunks ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own task chunks"
+    ON public.task_chunks FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can insert own task chunks"
+    ON public.task_chunks FOR INSERT
+    WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "Users can update own task chunks"
+    ON public.task_chunks FOR UPDATE
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can delete own task chunks"
+    ON public.task_chunks FOR DELETE
+    USING (auth.uid() = user_id);
+
+CREATE INDEX idx_task_chunks_user_id ON public.task_chunks(user_id);
+
+CREATE TABLE IF NOT EXISTS public.hyperfocus_sessions (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    start_time TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    end_time TIMESTAMPTZ,
+    duration_minutes INTEGER,
+    break_reminders_sent INTEGER DEFAULT 0,
+    hydration_reminders_sent INTEGER DEFAULT 0,
+    movement_reminders_sent INTEGER DEFAULT 0,
+    reminders_acknowledged INTEGER DEFAULT 0,
+    reminders_snoozed INTEGER DEFAULT 0,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE public.hyperfocus_sessions ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own hyperfocus sessions"
+    ON public.hyperfocus_sessions FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can insert own hyperfocus sessions"
+    ON public.hyperfocus_sessions FOR INSERT
+    WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "Users can update own hyperfocus sessions"
+    ON public.hyperfocus_sessions FOR UPDATE
+    USING (auth.uid() = user_id);
+
+CREATE INDEX idx_hyperfocus_sessions_user_id ON public.hyperfocus_sessions(user_id);
+
+CREATE INDEX idx_hyperfocus_sessions_start_time ON public.hyperfocus_sessions(start_time);
+
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER update_pomodoro_sessions_updated_at
+    BEFORE UPDATE ON public.pomodoro_sessions
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_habits_updated_at
+    BEFORE UPDATE ON public.habits
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_focus_sessions_updated_at
+    BEFORE UPDATE ON public.focus_sessions
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_energy_logs_updated_at
+    BEFORE UPDATE ON public.energy_logs
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_body_doubling_rooms_updated_at
+    BEFORE UPDATE ON public.body_doubling_rooms
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_task_chunks_updated_at
+    BEFORE UPDATE ON public.task_chunks
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_hyperfocus_sessions_updated_at
+    BEFORE UPDATE ON public.hyperfocus_sessions
+    FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
+
+CREATE OR REPLACE FUNCTION update_room_participant_count()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        UPDATE public.body_doubling_rooms
+        SET current_participants = current_participants + 1
+        WHERE id = NEW.room_id;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE public.body_doubling_rooms
+        SET current_participants = GREATEST(0, current_participants - 1)
+        WHERE id = OLD.room_id;
+    ELSIF TG_OP = 'UPDATE' THEN
+        IF NEW.is_active = false AND OLD.is_active = true THEN
+            UPDATE public.body_doubling_rooms
+            SET current_participants = GREATEST(0, current_participants - 1)
+            WHERE id = NEW.room_id;
+        ELSIF NEW.is_active = true AND OLD.is_active = false THEN
+            UPDATE public.body_doubling_rooms
+            SET current_participants = current_participants + 1
+            WHERE id = NEW.room_id;
+        END IF;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER update_room_participant_count_trigger
+    AFTER INSERT OR UPDATE OR DELETE ON public.room_participants
+    FOR EACH ROW EXECUTE FUNCTION update_room_participant_count();
+
+CREATE OR REPLACE FUNCTION notify_room_webhook()
+RETURNS TRIGGER AS $$
+DECLARE
+    webhook TEXT;
+BEGIN
+    SELECT webhook_url INTO webhook
+    FROM public.body_doubling_rooms
+    WHERE id = NEW.room_id;
+
+    IF webhook IS NOT NULL THEN
+        -- This would be called by a Supabase Edge Function or external service
+        -- Store webhook notification in a queue table
+        INSERT INTO public.webhook_queue (
+            webhook_url,
+            payload,
+            event_type
+        ) VALUES (
+            webhook,
+            jsonb_build_object(
+                'room_id', NEW.room_id,
+                'user_id', NEW.user_id,
+                'event', TG_OP,
+                'timestamp', NOW()
+            ),
+            'room_participant_change'
+        );
+    END IF;
+    
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TABLE IF NOT EXISTS public.webhook_queue (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    webhook_url TEXT NOT NULL,
+    payload JSONB NOT NULL,
+    event_type TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'processing', 'completed', 'failed')),
+    attempts INTEGER DEFAULT 0,
+    max_attempts INTEGER DEFAULT 3,
+    last_attempt_at TIMESTAMPTZ,
+    error_message TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    processed_at TIMESTAMPTZ
+);
+
+CREATE INDEX idx_webhook_queue_status ON public.webhook_queue(status);
+
+CREATE INDEX idx_webhook_queue_created_at ON public.webhook_queue(created_at);
+
+CREATE TRIGGER notify_room_webhook_trigger
+    AFTER INSERT OR UPDATE OR DELETE ON public.room_participants
+    FOR EACH ROW EXECUTE FUNCTION notify_room_webhook();
+
+CREATE OR REPLACE VIEW habit_completion_stats AS
+SELECT 
+    h.id,
+    h.user_id,
+    h.name,
+    h.category,
+    h.current_streak,
+    h.longest_streak,
+    COUNT(hl.id) as total_completions,
+    COUNT(DISTINCT DATE(hl.completed_at)) as unique_days_completed,
+    MAX(hl.completed_at) as last_completed
+FROM public.habits h
+LEFT JOIN public.habit_logs hl ON h.id = hl.habit_id
+WHERE h.archived = false
+GROUP BY h.id, h.user_id, h.name, h.category, h.current_streak, h.longest_streak;
+
+CREATE OR REPLACE VIEW energy_patterns AS
+SELECT 
+    user_id,
+    EXTRACT(HOUR FROM logged_at) as hour_of_day,
+    AVG(energy_level) as avg_energy_level,
+    AVG(physical_energy) as avg_physical_energy,
+    AVG(mental_energy) as avg_mental_energy,
+    COUNT(*) as sample_count
+FROM public.energy_logs
+WHERE logged_at > NOW() - INTERVAL '30 days'
+GROUP BY user_id, EXTRACT(HOUR FROM logged_at);
+
+CREATE OR REPLACE VIEW focus_session_stats AS
+SELECT 
+    user_id,
+    COUNT(*) as total_sessions,
+    SUM(duration) as total_focus_time_seconds,
+    AVG(duration) as avg_session_duration,
+    AVG(distraction_count) as avg_distractions,
+    AVG(focus_score) as avg_focus_score,
+    COUNT(*) FILTER (WHERE completed = true) as completed_sessions
+FROM public.focus_sessions
+WHERE start_time > NOW() - INTERVAL '30 days'
+GROUP BY user_id;
+
+GRANT ALL ON public.pomodoro_sessions TO authenticated;
+
+GRANT ALL ON public.habits TO authenticated;
+
+GRANT ALL ON public.habit_logs TO authenticated;
+
+GRANT ALL ON public.habit_stacks TO authenticated;
+
+GRANT ALL ON public.focus_sessions TO authenticated;
+
+GRANT ALL ON public.energy_logs TO authenticated;
+
+GRANT ALL ON public.body_doubling_rooms TO authenticated;
+
+GRANT ALL ON public.room_participants TO authenticated;
+
+GRANT ALL ON public.task_chunks TO authenticated;
+
+GRANT ALL ON public.hyperfocus_sessions TO authenticated;
+
+GRANT ALL ON public.webhook_queue TO authenticated;
+
+GRANT SELECT ON habit_completion_stats TO authenticated;
+
+GRANT SELECT ON energy_patterns TO authenticated;
+
+GRANT SELECT ON focus_session_stats TO authenticated;
+
+-- =============================================
+-- 003_boards_system.sql
+-- =============================================
+CREATE TABLE IF NOT EXISTS public.boards (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    title TEXT NOT NULL,
+    description TEXT,
+    board_type TEXT NOT NULL CHECK (board_type IN ('routine', 'visual', 'kanban', 'timeline', 'custom')),
+    layout TEXT NOT NULL DEFAULT 'linear' CHECK (layout IN ('linear', 'grid', 'kanban', 'timeline', 'freeform')),
+    theme TEXT DEFAULT 'default',
+    
+    -- Configuration
+    config JSONB DEFAULT '{
+        "showProgress": true,
+        "showTimers": true,
+        "highlightTransitions": true,
+        "allowReordering": true,
+        "autoSave": true,
+        "pauseBetweenSteps": 0
+    }'::jsonb,
+    
+    -- Schedule settings
+    schedule JSONB DEFAULT '{
+        "isScheduled": false,
+        "frequency": null,
+        "daysOfWeek": [],
+        "timeOfDay": null,
+        "autoStart": false
+    }'::jsonb,
+    
+    -- Visual customization
+    visual_settings JSONB DEFAULT '{
+        "backgroundColor": "#ffffff",
+        "cardStyle": "modern",
+        "iconSet": "default",
+        "fontSize": "medium",
+        "spacing": "normal"
+    }'::jsonb,
+    
+    -- Status and metadata
+    is_active BOOLEAN DEFAULT true,
+    is_template BOOLEAN DEFAULT false,
+    is_public BOOLEAN DEFAULT false,
+    share_code TEXT UNIQUE,
+    tags TEXT[] DEFAULT '{}',
+    
+    -- Analytics
+    total_executions INTEGER DEFAULT 0,
+    last_executed_at TIMESTAMPTZ,
+    average_duration INTEGER, -- minutes
+    completion_rate DECIMAL(3,2),
+    
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE public.boards ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own boards"
+    ON public.boards FOR SELECT
+    USING (auth.uid() = user_id OR is_public = true);
+
+CREATE POLICY "Users can insert own boards"
+    ON public.boards FOR INSERT
+    WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "Users can update own boards"
+    ON public.boards FOR UPDATE
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can delete own boards"
+    ON public.boards FOR DELETE
+    USING (auth.uid() = user_id);
+
+CREATE INDEX idx_boards_user_id ON public.boards(user_id);
+
+CREATE INDEX idx_boards_board_type ON public.boards(board_type);
+
+CREATE INDEX idx_boards_is_active ON public.boards(is_active, user_id);
+
+CREATE INDEX idx_boards_share_code ON public.boards(share_code) WHERE share_code IS NOT NULL;
+
+CREATE INDEX idx_boards_tags ON public.boards USING GIN(tags);
+
+CREATE TABLE IF NOT EXISTS public.board_steps (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    board_id UUID NOT NULL REFERENCES public.boards(id) ON DELETE CASCADE,
+    step_type TEXT NOT NULL CHECK (step_type IN ('task', 'flexZone', 'note', 'transition', 'break')),
+    title TEXT NOT NULL,
+    description TEXT,
+    duration INTEGER NOT NULL DEFAULT 0, -- minutes
+    order_index INTEGER NOT NULL,
+    
+    -- Visual customization
+    visual_cues JSONB DEFAULT '{
+        "color": "#3b82f6",
+        "icon": "⭐",
+        "emoji": null,
+        "backgroundColor": null,
+        "borderColor": null
+    }'::jsonb,
+    
+    -- Transition support
+    transition_cue JSONB,
+    
+    -- Flex zone specific
+    freeform_data JSONB,
+    timer_settings JSONB DEFAULT '{
+        "autoStart": false,
+        "showWarningAt": null,
+        "allowOverrun": true,
+        "endNotification": {
+            "type": "visual",
+            "intensity": "normal"
+        }
+    }'::jsonb,
+    
+    -- Neurotype adaptations
+    neurotype_adaptations JSONB DEFAULT '{}'::jsonb,
+    
+    -- Flags
+    is_flexible BOOLEAN DEFAULT false,
+    is_optional BOOLEAN DEFAULT false,
+    is_completed BOOLEAN DEFAULT false,
+    
+    -- Execution tracking
+    execution_state JSONB DEFAULT '{
+        "status": "pending",
+        "startedAt": null,
+        "completedAt": null,
+        "actualDuration": null,
+        "notes": null
+    }'::jsonb,
+    
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE public.board_steps ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view steps of accessible boards"
+    ON public.board_steps FOR SELECT
+    USING (
+        EXISTS (
+            SELECT 1 FROM public.boards
+            WHERE id = board_steps.board_id 
+            AND (user_id = auth.uid() OR is_public = true)
+        )
+    );
+
+CREATE POLICY "Users can insert steps to own boards"
+    ON public.board_steps FOR INSERT
+    WITH CHECK (
+        EXISTS (
+            SELECT 1 FROM public.boards
+            WHERE id = board_steps.board_id AND user_id = auth.uid()
+        )
+    );
+
+CREATE POLICY "Users can update steps of own boards"
+    ON public.board_steps FOR UPDATE
+    USING (
+        EXISTS (
+            SELECT 1 FROM public.boards
+            WHERE id = board_steps.board_id AND user_id = auth.uid()
+        )
+    );
+
+CREATE POLICY "Users can delete steps from own boards"
+    ON public.board_steps FOR DELETE
+    USING (
+        EXISTS (
+            SELECT 1 FROM public.boards
+            WHERE id = board_steps.board_id AND user_id = auth.uid()
+        )
+    );
+
+CREATE INDEX idx_board_steps_board_id ON public.board_steps(board_id);
+
+CREATE INDEX idx_board_steps_order ON public.board_steps(board_id, order_index);
+
+CREATE INDEX idx_board_steps_type ON public.board_steps(step_type);
+
+CREATE TABLE IF NOT EXISTS public.board_executions (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    board_id UUID NOT NULL REFERENCES public.boards(id) ON DELETE CASCADE,
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    
+    -- Execution tracking
+    started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    completed_at TIMESTAMPTZ,
+    current_step_id UUID REFERENCES public.board_steps(id) ON DELETE SET NULL,
+    total_duration INTEGER, -- minutes
+    
+    -- Step executions (array of step execution records)
+    step_executions JSONB DEFAULT '[]'::jsonb,
+    
+    -- Interruptions and modifications
+    interruptions JSONB DEFAULT '[]'::jsonb,
+    modifications JSONB DEFAULT '[]'::jsonb,
+    
+    -- Completion data
+    status TEXT NOT NULL DEFAULT 'in_progress' CHECK (status IN ('in_progress', 'completed', 'abandoned', 'paused')),
+    completion_percentage INTEGER DEFAULT 0 CHECK (completion_percentage >= 0 AND completion_percentage <= 100),
+    
+    -- User feedback
+    satisfaction_rating INTEGER CHECK (satisfaction_rating >= 1 AND satisfaction_rating <= 5),
+    difficulty_rating INTEGER CHECK (difficulty_rating >= 1 AND difficulty_rating <= 5),
+    notes TEXT,
+    
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE public.board_executions ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own executions"
+    ON public.board_executions FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can insert own executions"
+    ON public.board_executions FOR INSERT
+    WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "Users can update own executions"
+    ON public.board_executions FOR UPDATE
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can delete own executions"
+    ON public.board_executions FOR DELETE
+    USING (auth.uid() = user_id);
+
+CREATE INDEX idx_board_executions_board_id ON public.board_executions(board_id);
+
+CREATE INDEX idx_board_executions_user_id ON public.board_executions(user_id);
+
+CREATE INDEX idx_board_executions_started_at ON public.board_executions(started_at);
+
+CREATE INDEX idx_board_executions_status ON public.board_executions(status, user_id);
+
+CREATE TABLE IF NOT EXISTS public.board_templates (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    name TEXT NOT NULL,
+    description TEXT,
+    category TEXT NOT NULL CHECK (category IN ('morning', 'evening', 'work', 'self-care', 'exercise', 'study', 'custom')),
+    difficulty TEXT CHECK (difficulty IN ('beginner', 'intermediate', 'advanced')),
+    
+    -- Template structure (copied to boards table)
+    template_data JSONB NOT NULL,
+    
+    -- Neurotype optimization
+    neurotype_optimized TEXT[] DEFAULT '{}',
+    
+    -- Metadata
+    is_public BOOLEAN DEFAULT true,
+    author_id UUID REFERENCES auth.users(id) ON DELETE SET NULL,
+    estimated_duration INTEGER, -- minutes
+    tags TEXT[] DEFAULT '{}',
+    
+    -- Usage stats
+    usage_count INTEGER DEFAULT 0,
+    rating DECIMAL(3,2),
+    rating_count INTEGER DEFAULT 0,
+    
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE public.board_templates ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Everyone can view public templates"
+    ON public.board_templates FOR SELECT
+    USING (is_public = true OR auth.uid() = author_id);
+
+CREATE POLICY "Users can create templates"
+    ON public.board_templates FOR INSERT
+    WITH CHECK (auth.uid() = author_id);
+
+CREATE POLICY "Authors can update own templates"
+    ON public.board_templates FOR UPDATE
+    USING (auth.uid() = author_id);
+
+CREATE POLICY "Authors can delete own templates"
+    ON public.board_templates FOR DELETE
+    USING (auth.uid() = author_id);
+
+CREATE INDEX idx_board_templates_category ON public.board_templates(category);
+
+CREATE INDEX idx_board_templates_public ON public.board_templates(is_public);
+
+CREATE INDEX idx_board_templates_tags ON public.board_templates USING GIN(tags);
+
+CREATE INDEX idx_board_templates_neurotype ON public.board_templates USING GIN(neurotype_optimized);
+
+CREATE OR REPLACE FUNCTION update_boards_updated_at()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER update_boards_timestamp
+    BEFORE UPDATE ON public.boards
+    FOR EACH ROW EXECUTE FUNCTION update_boards_updated_at();
+
+CREATE TRIGGER update_board_steps_timestamp
+    BEFORE UPDATE ON public.board_steps
+    FOR EACH ROW EXECUTE FUNCTION update_boards_updated_at();
+
+CREATE TRIGGER update_board_executions_timestamp
+    BEFORE UPDATE ON public.board_executions
+    FOR EACH ROW EXECUTE FUNCTION update_boards_updated_at();
+
+CREATE TRIGGER update_board_templates_timestamp
+    BEFORE UPDATE ON public.board_templates
+    FOR EACH ROW EXECUTE FUNCTION update_boards_updated_at();
+
+CREATE OR REPLACE FUNCTION update_board_analytics()
+RETURNS TRIGGER AS $$
+DECLARE
+    avg_dur INTEGER;
+    comp_rate DECIMAL(3,2);
+BEGIN
+    IF NEW.status = 'completed' AND (OLD.status IS NULL OR OLD.status != 'completed') THEN
+        -- Update board statistics
+        UPDATE public.boards
+        SET 
+            total_executions = total_executions + 1,
+            last_executed_at = NEW.completed_at
+        WHERE id = NEW.board_id;
+        
+        -- Calculate average duration
+        SELECT AVG(total_duration)::INTEGER INTO avg_dur
+        FROM public.board_executions
+        WHERE board_id = NEW.board_id AND status = 'completed';
+        
+        -- Calculate completion rate
+        SELECT (COUNT(*) FILTER (WHERE status = 'completed')::DECIMAL / NULLIF(COUNT(*), 0)) INTO comp_rate
+        FROM public.board_executions
+        WHERE board_id = NEW.board_id;
+        
+        -- Update analytics
+        UPDATE public.boards
+        SET 
+            average_duration = avg_dur,
+            completion_rate = comp_rate
+        WHERE id = NEW.board_id;
+    END IF;
+    
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER update_board_analytics_trigger
+    AFTER UPDATE ON public.board_executions
+    FOR EACH ROW EXECUTE FUNCTION update_board_analytics();
+
+CREATE OR REPLACE FUNCTION generate_share_code()
+RETURNS TEXT AS $$
+BEGIN
+    RETURN substring(md5(random()::text || clock_timestamp()::text) from 1 for 8);
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE VIEW board_stats AS
+SELECT 
+    b.id,
+    b.user_id,
+    b.title,
+    b.board_type,
+    b.total_executions,
+    b.last_executed_at,
+    b.average_duration,
+    b.completion_rate,
+    COUNT(bs.id) as total_steps,
+    COUNT(bs.id) FILTER (WHERE bs.is_optional = false) as required_steps,
+    SUM(bs.duration) as estimated_total_duration
+FROM public.boards b
+LEFT JOIN public.board_steps bs ON b.id = bs.board_id
+GROUP BY b.id, b.user_id, b.title, b.board_type, b.total_executions, 
+         b.last_executed_at, b.average_duration, b.completion_rate;
+
+CREATE OR REPLACE VIEW recent_board_activity AS
+SELECT 
+    be.id as execution_id,
+    b.id as board_id,
+    b.title as board_title,
+    be.user_id,
+    be.started_at,
+    be.completed_at,
+    be.status,
+    be.total_duration,
+    be.satisfaction_rating,
+    be.completion_percentage
+FROM public.board_executions be
+JOIN public.boards b ON be.board_id = b.id
+ORDER BY be.started_at DESC;
+
+GRANT ALL ON public.boards TO authenticated;
+
+GRANT ALL ON public.board_steps TO authenticated;
+
+GRANT ALL ON public.board_executions TO authenticated;
+
+GRANT ALL ON public.board_templates TO authenticated;
+
+GRANT SELECT ON board_stats TO authenticated;
+
+GRANT SELECT ON recent_board_activity TO authenticated;
+
+-- =============================================
+-- 004_board_templates_seed.sql
+-- =============================================
+INSERT INTO board_templates (
+  name,
+  description,
+  category,
+  difficulty,
+  template_data,
+  neurotype_optimized,
+  is_public,
+  estimated_duration,
+  tags
+) VALUES (
+  'Morning Routine - Simple',
+  'A gentle morning routine to start your day with clarity and energy',
+  'morning',
+  'beginner',
+  jsonb_build_object(
+    'board', jsonb_build_object(
+      'board_type', 'routine',
+      'layout', 'linear',
+      'config', jsonb_build_object(
+        'showProgress', true,
+        'showTimers', true,
+        'highlightTransitions', true,
+        'allowReordering', false,
+        'autoSave', true,
+        'pauseBetweenSteps', 30
+      ),
+      'visual_settings', jsonb_build_object(
+        'backgroundColor', '#FFF5E6',
+        'cardStyle', 'modern',
+        'iconSet', 'default',
+        'fontSize', 'medium',
+        'spacing', 'normal'
+      )
+    ),
+    'steps', jsonb_build_array(
+      jsonb_build_object(
+        'step_type', 'task',
+        'title', 'Wake Up & Stretch',
+        'description', 'Gentle stretching to wake up your body',
+        'duration', 5,
+        'order_index', 0,
+        'visual_cues', jsonb_build_object('color', '#FFA500', 'icon', '🌅'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 60,
+          'allowOverrun', true,
+          'endNotification', jsonb_build_object('type', 'audio', 'intensity', 'subtle')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', true,
+        'is_optional', false,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      ),
+      jsonb_build_object(
+        'step_type', 'task',
+        'title', 'Hydrate',
+        'description', 'Drink a glass of water to rehydrate',
+        'duration', 2,
+        'order_index', 1,
+        'visual_cues', jsonb_build_object('color', '#4A90E2', 'icon', '💧'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 30,
+          'allowOverrun', true,
+          'endNotification', jsonb_build_object('type', 'visual', 'intensity', 'subtle')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', false,
+        'is_optional', false,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      ),
+      jsonb_build_object(
+        'step_type', 'task',
+        'title', 'Morning Hygiene',
+        'description', 'Brush teeth, wash face, get ready',
+        'duration', 10,
+        'order_index', 2,
+        'visual_cues', jsonb_build_object('color', '#50E3C2', 'icon', '🚿'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 120,
+          'allowOverrun', true,
+          'endNotification', jsonb_build_object('type', 'audio', 'intensity', 'normal')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', true,
+        'is_optional', false,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      ),
+      jsonb_build_object(
+        'step_type', 'task',
+        'title', 'Breakfast',
+        'description', 'Eat a healthy breakfast',
+        'duration', 15,
+        'order_index', 3,
+        'visual_cues', jsonb_build_object('color', '#F5A623', 'icon', '🍳'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 180,
+          'allowOverrun', true,
+          'endNotification', jsonb_build_object('type', 'audio', 'intensity', 'normal')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', true,
+        'is_optional', false,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      ),
+      jsonb_build_object(
+        'step_type', 'task',
+        'title', 'Plan Your Day',
+        'description', 'Review tasks and set intentions',
+        'duration', 5,
+        'order_index', 4,
+        'visual_cues', jsonb_build_object('color', '#9013FE', 'icon', '📝'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 60,
+          'allowOverrun', true,
+          'endNotification', jsonb_build_object('type', 'all', 'intensity', 'prominent')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', false,
+        'is_optional', false,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      )
+    )
+  ),
+  ARRAY['adhd', 'autism', 'executive-function'],
+  true,
+  37,
+  ARRAY['morning', 'routine', 'simple', 'beginner']
+);
+
+INSERT INTO board_templates (
+  name,
+  description,
+  category,
+  difficulty,
+  template_data,
+  neurotype_optimized,
+  is_public,
+  estimated_duration,
+  tags
+) VALUES (
+  'Evening Wind Down',
+  'A calming evening routine to prepare for restful sleep',
+  'evening',
+  'beginner',
+  jsonb_build_object(
+    'board', jsonb_build_object(
+      'board_type', 'routine',
+      'layout', 'linear',
+      'config', jsonb_build_object(
+        'showProgress', true,
+        'showTimers', true,
+        'highlightTransitions', true,
+        'allowReordering', false,
+        'autoSave', true,
+        'pauseBetweenSteps', 0
+      ),
+      'visual_settings', jsonb_build_object(
+        'backgroundColor', '#2C3E50',
+        'cardStyle', 'modern',
+        'iconSet', 'default',
+        'fontSize', 'medium',
+        'spacing', 'spacious'
+      )
+    ),
+    'steps', jsonb_build_array(
+      jsonb_build_object(
+        'step_type', 'task',
+        'title', 'Tidy Up',
+        'description', 'Quick 10-minute cleanup of main spaces',
+        'duration', 10,
+        'order_index', 0,
+        'visual_cues', jsonb_build_object('color', '#8B5CF6', 'icon', '🧹'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 120,
+          'allowOverrun', false,
+          'endNotification', jsonb_build_object('type', 'audio', 'intensity', 'normal')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', true,
+        'is_optional', true,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      ),
+      jsonb_build_object(
+        'step_type', 'task',
+        'title', 'Evening Hygiene',
+        'description', 'Brush teeth, skincare routine',
+        'duration', 8,
+        'order_index', 1,
+        'visual_cues', jsonb_build_object('color', '#60A5FA', 'icon', '🪥'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 120,
+          'allowOverrun', true,
+          'endNotification', jsonb_build_object('type', 'audio', 'intensity', 'subtle')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', false,
+        'is_optional', false,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      ),
+      jsonb_build_object(
+        'step_type', 'task',
+        'title', 'Prepare Tomorrow',
+        'description', 'Lay out clothes, pack bag, check calendar',
+        'duration', 5,
+        'order_index', 2,
+        'visual_cues', jsonb_build_object('color', '#EC4899', 'icon', '👕'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 60,
+          'allowOverrun', true,
+          'endNotification', jsonb_build_object('type', 'visual', 'intensity', 'subtle')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', true,
+        'is_optional', false,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      ),
+      jsonb_build_object(
+        'step_type', 'break',
+        'title', 'Calm Activity',
+        'description', 'Read, journal, or meditate',
+        'duration', 15,
+        'order_index', 3,
+        'visual_cues', jsonb_build_object('color', '#A78BFA', 'icon', '📖'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 180,
+          'allowOverrun', true,
+          'endNotification', jsonb_build_object('type', 'all', 'intensity', 'subtle')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', true,
+        'is_optional', false,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      ),
+      jsonb_build_object(
+        'step_type', 'task',
+        'title', 'Bedtime',
+        'description', 'Get into bed, lights off',
+        'duration', 2,
+        'order_index', 4,
+        'visual_cues', jsonb_build_object('color', '#1E293B', 'icon', '🌙'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 30,
+          'allowOverrun', true,
+          'endNotification', jsonb_build_object('type', 'visual', 'intensity', 'subtle')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', false,
+        'is_optional', false,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      )
+    )
+  ),
+  ARRAY['adhd', 'autism', 'executive-function'],
+  true,
+  40,
+  ARRAY['evening', 'routine', 'sleep', 'wind-down']
+);
+
+INSERT INTO board_templates (
+  name,
+  description,
+  category,
+  difficulty,
+  template_data,
+  neurotype_optimized,
+  is_public,
+  estimated_duration,
+  tags
+) VALUES (
+  'Pomodoro Work Session',
+  'Classic 25-5 Pomodoro technique for focused work',
+  'work',
+  'intermediate',
+  jsonb_build_object(
+    'board', jsonb_build_object(
+      'board_type', 'kanban',
+      'layout', 'linear',
+      'config', jsonb_build_object(
+        'showProgress', true,
+        'showTimers', true,
+        'highlightTransitions', false,
+        'allowReordering', false,
+        'autoSave', true,
+        'pauseBetweenSteps', 0
+      ),
+      'visual_settings', jsonb_build_object(
+        'backgroundColor', '#FFFFFF',
+        'cardStyle', 'minimal',
+        'iconSet', 'professional',
+        'fontSize', 'medium',
+        'spacing', 'normal'
+      )
+    ),
+    'steps', jsonb_build_array(
+      jsonb_build_object(
+        'step_type', 'task',
+        'title', 'Focus Work',
+        'description', 'Deep work - no distractions',
+        'duration', 25,
+        'order_index', 0,
+        'visual_cues', jsonb_build_object('color', '#EF4444', 'icon', '🎯'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 300,
+          'allowOverrun', false,
+          'endNotification', jsonb_build_object('type', 'all', 'intensity', 'prominent')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', false,
+        'is_optional', false,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      ),
+      jsonb_build_object(
+        'step_type', 'break',
+        'title', 'Short Break',
+        'description', 'Stand, stretch, hydrate',
+        'duration', 5,
+        'order_index', 1,
+        'visual_cues', jsonb_build_object('color', '#10B981', 'icon', '☕'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 60,
+          'allowOverrun', true,
+          'endNotification', jsonb_build_object('type', 'audio', 'intensity', 'normal')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', true,
+        'is_optional', false,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      ),
+      jsonb_build_object(
+        'step_type', 'task',
+        'title', 'Focus Work',
+        'description', 'Continue deep work',
+        'duration', 25,
+        'order_index', 2,
+        'visual_cues', jsonb_build_object('color', '#EF4444', 'icon', '🎯'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 300,
+          'allowOverrun', false,
+          'endNotification', jsonb_build_object('type', 'all', 'intensity', 'prominent')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', false,
+        'is_optional', false,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      ),
+      jsonb_build_object(
+        'step_type', 'break',
+        'title', 'Long Break',
+        'description', 'Walk around, get fresh air',
+        'duration', 15,
+        'order_index', 3,
+        'visual_cues', jsonb_build_object('color', '#06B6D4', 'icon', '🚶'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 180,
+          'allowOverrun', true,
+          'endNotification', jsonb_build_object('type', 'audio', 'intensity', 'normal')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', true,
+        'is_optional', false,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      )
+    )
+  ),
+  ARRAY['adhd', 'executive-function'],
+  true,
+  70,
+  ARRAY['work', 'focus', 'pomodoro', 'productivity']
+);
+
+INSERT INTO board_templates (
+  name,
+  description,
+  category,
+  difficulty,
+  template_data,
+  neurotype_optimized,
+  is_public,
+  estimated_duration,
+  tags
+) VALUES (
+  'Quick Exercise Break',
+  '15-minute energizing movement routine',
+  'exercise',
+  'beginner',
+  jsonb_build_object(
+    'board', jsonb_build_object(
+      'board_type', 'routine',
+      'layout', 'grid',
+      'config', jsonb_build_object(
+        'showProgress', true,
+        'showTimers', true,
+        'highlightTransitions', true,
+        'allowReordering', true,
+        'autoSave', true,
+        'pauseBetweenSteps', 10
+      ),
+      'visual_settings', jsonb_build_object(
+        'backgroundColor', '#ECFDF5',
+        'cardStyle', 'colorful',
+        'iconSet', 'playful',
+        'fontSize', 'large',
+        'spacing', 'spacious'
+      )
+    ),
+    'steps', jsonb_build_array(
+      jsonb_build_object(
+        'step_type', 'task',
+        'title', 'Warm Up',
+        'description', 'Light cardio to get blood flowing',
+        'duration', 3,
+        'order_index', 0,
+        'visual_cues', jsonb_build_object('color', '#F59E0B', 'icon', '🏃'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 30,
+          'allowOverrun', false,
+          'endNotification', jsonb_build_object('type', 'audio', 'intensity', 'normal')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', false,
+        'is_optional', false,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      ),
+      jsonb_build_object(
+        'step_type', 'task',
+        'title', 'Stretches',
+        'description', 'Full body stretching',
+        'duration', 5,
+        'order_index', 1,
+        'visual_cues', jsonb_build_object('color', '#8B5CF6', 'icon', '🧘'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 60,
+          'allowOverrun', true,
+          'endNotification', jsonb_build_object('type', 'audio', 'intensity', 'subtle')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', true,
+        'is_optional', false,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      ),
+      jsonb_build_object(
+        'step_type', 'task',
+        'title', 'Strength Exercises',
+        'description', 'Bodyweight exercises (push-ups, squats)',
+        'duration', 5,
+        'order_index', 2,
+        'visual_cues', jsonb_build_object('color', '#EF4444', 'icon', '💪'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 60,
+          'allowOverrun', true,
+          'endNotification', jsonb_build_object('type', 'audio', 'intensity', 'normal')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', true,
+        'is_optional', false,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      ),
+      jsonb_build_object(
+        'step_type', 'task',
+        'title', 'Cool Down',
+        'description', 'Light stretching and deep breathing',
+        'duration', 2,
+        'order_index', 3,
+        'visual_cues', jsonb_build_object('color', '#06B6D4', 'icon', '🌬️'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 30,
+          'allowOverrun', true,
+          'endNotification', jsonb_build_object('type', 'visual', 'intensity', 'subtle')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', true,
+        'is_optional', false,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      )
+    )
+  ),
+  ARRAY['adhd', 'sensory-regulation'],
+  true,
+  15,
+  ARRAY['exercise', 'movement', 'energy', 'quick']
+);
+
+INSERT INTO board_templates (
+  name,
+  description,
+  category,
+  difficulty,
+  template_data,
+  neurotype_optimized,
+  is_public,
+  estimated_duration,
+  tags
+) VALUES (
+  'Self-Care Hour',
+  'Dedicated time for rest and restoration',
+  'self-care',
+  'beginner',
+  jsonb_build_object(
+    'board', jsonb_build_object(
+      'board_type', 'freeform',
+      'layout', 'freeform',
+      'config', jsonb_build_object(
+        'showProgress', true,
+        'showTimers', false,
+        'highlightTransitions', true,
+        'allowReordering', true,
+        'autoSave', true,
+        'pauseBetweenSteps', 0
+      ),
+      'visual_settings', jsonb_build_object(
+        'backgroundColor', '#FFF1F2',
+        'cardStyle', 'modern',
+        'iconSet', 'playful',
+        'fontSize', 'medium',
+        'spacing', 'spacious'
+      )
+    ),
+    'steps', jsonb_build_array(
+      jsonb_build_object(
+        'step_type', 'flexZone',
+        'title', 'Choose Your Activity',
+        'description', 'Pick what feels right: bath, music, art, nature walk',
+        'duration', 30,
+        'order_index', 0,
+        'visual_cues', jsonb_build_object('color', '#EC4899', 'icon', '💝'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', false,
+          'showWarningAt', 300,
+          'allowOverrun', true,
+          'endNotification', jsonb_build_object('type', 'visual', 'intensity', 'subtle')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', true,
+        'is_optional', false,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      ),
+      jsonb_build_object(
+        'step_type', 'task',
+        'title', 'Hydrate & Snack',
+        'description', 'Nourish your body',
+        'duration', 10,
+        'order_index', 1,
+        'visual_cues', jsonb_build_object('color', '#F59E0B', 'icon', '🍎'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 120,
+          'allowOverrun', true,
+          'endNotification', jsonb_build_object('type', 'audio', 'intensity', 'subtle')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', true,
+        'is_optional', true,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      ),
+      jsonb_build_object(
+        'step_type', 'task',
+        'title', 'Reflection',
+        'description', 'Journal or meditate on your feelings',
+        'duration', 15,
+        'order_index', 2,
+        'visual_cues', jsonb_build_object('color', '#8B5CF6', 'icon', '🧘'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 180,
+          'allowOverrun', true,
+          'endNotification', jsonb_build_object('type', 'visual', 'intensity', 'subtle')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', true,
+        'is_optional', false,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      ),
+      jsonb_build_object(
+        'step_type', 'task',
+        'title', 'Gratitude',
+        'description', 'List 3 things you''re grateful for',
+        'duration', 5,
+        'order_index', 3,
+        'visual_cues', jsonb_build_object('color', '#10B981', 'icon', '✨'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 60,
+          'allowOverrun', true,
+          'endNotification', jsonb_build_object('type', 'audio', 'intensity', 'subtle')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', true,
+        'is_optional', true,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      )
+    )
+  ),
+  ARRAY['autism', 'burnout-prevention', 'sensory-regulation'],
+  true,
+  60,
+  ARRAY['self-care', 'wellness', 'rest', 'restoration']
+);
+
+INSERT INTO board_templates (
+  name,
+  description,
+  category,
+  difficulty,
+  template_data,
+  neurotype_optimized,
+  is_public,
+  estimated_duration,
+  tags
+) VALUES (
+  'Effective Study Session',
+  'Structured study routine with breaks',
+  'study',
+  'intermediate',
+  jsonb_build_object(
+    'board', jsonb_build_object(
+      'board_type', 'kanban',
+      'layout', 'linear',
+      'config', jsonb_build_object(
+        'showProgress', true,
+        'showTimers', true,
+        'highlightTransitions', true,
+        'allowReordering', false,
+        'autoSave', true,
+        'pauseBetweenSteps', 0
+      ),
+      'visual_settings', jsonb_build_object(
+        'backgroundColor', '#EFF6FF',
+        'cardStyle', 'modern',
+        'iconSet', 'professional',
+        'fontSize', 'medium',
+        'spacing', 'normal'
+      )
+    ),
+    'steps', jsonb_build_array(
+      jsonb_build_object(
+        'step_type', 'task',
+        'title', 'Review Notes',
+        'description', 'Quick review of previous material',
+        'duration', 10,
+        'order_index', 0,
+        'visual_cues', jsonb_build_object('color', '#3B82F6', 'icon', '📚'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 120,
+          'allowOverrun', true,
+          'endNotification', jsonb_build_object('type', 'audio', 'intensity', 'normal')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', true,
+        'is_optional', false,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      ),
+      jsonb_build_object(
+        'step_type', 'task',
+        'title', 'Active Learning',
+        'description', 'Read, take notes, solve problems',
+        'duration', 30,
+        'order_index', 1,
+        'visual_cues', jsonb_build_object('color', '#8B5CF6', 'icon', '✍️'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 300,
+          'allowOverrun', true,
+          'endNotification', jsonb_build_object('type', 'audio', 'intensity', 'normal')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', false,
+        'is_optional', false,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      ),
+      jsonb_build_object(
+        'step_type', 'break',
+        'title', 'Break',
+        'description', 'Rest your brain',
+        'duration', 10,
+        'order_index', 2,
+        'visual_cues', jsonb_build_object('color', '#10B981', 'icon', '☕'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 120,
+          'allowOverrun', true,
+          'endNotification', jsonb_build_object('type', 'audio', 'intensity', 'subtle')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', true,
+        'is_optional', false,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      ),
+      jsonb_build_object(
+        'step_type', 'task',
+        'title', 'Practice & Review',
+        'description', 'Test yourself, review key concepts',
+        'duration', 20,
+        'order_index', 3,
+        'visual_cues', jsonb_build_object('color', '#F59E0B', 'icon', '🎯'),
+        'timer_settings', jsonb_build_object(
+          'autoStart', true,
+          'showWarningAt', 240,
+          'allowOverrun', true,
+          'endNotification', jsonb_build_object('type', 'all', 'intensity', 'normal')
+        ),
+        'neurotype_adaptations', jsonb_build_object(),
+        'is_flexible', false,
+        'is_optional', false,
+        'is_completed', false,
+        'execution_state', jsonb_build_object('status', 'pending')
+      )
+    )
+  ),
+  ARRAY['adhd', 'executive-function'],
+  true,
+  70,
+  ARRAY['study', 'learning', 'focus', 'education']
+);
+
+INSERT INTO board_templates (
+  name,
+  description,
+  category,
+  difficulty,
+  template_data,
+  neurotype_optimized,
+  is_public,
+  estimated_duration,
+  tags
+) VALUES (
+  'Blank Canvas',
+  'Start from scratch - build your perfect board',
+  'custom',
+  'beginner',
+  jsonb_build_object(
+    'board', jsonb_build_object(
+      'board_type', 'custom',
+      'layout', 'freeform',
+      'config', jsonb_build_object(
+        'showProgress', true,
+        'showTimers', true,
+        'highlightTransitions', true,
+        'allowReordering', true,
+        'autoSave', true,
+        'pauseBetweenSteps', 0
+      ),
+      'visual_settings', jsonb_build_object(
+        'backgroundColor', '#FFFFFF',
+        'cardStyle', 'modern',
+        'iconSet', 'default',
+        'fontSize', 'medium',
+        'spacing', 'normal'
+      )
+    ),
+    'steps', jsonb_build_array()
+  ),
+  ARRAY['adhd', 'autism', 'executive-function'],
+  true,
+  0,
+  ARRAY['custom', 'blank', 'flexible']
+);
+
+-- =============================================
+-- 005_ai_integration.sql
+-- =============================================
+CREATE TABLE IF NOT EXISTS public.ai_conversations (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    conversation_type TEXT NOT NULL CHECK (conversation_type IN (
+        'general',
+        'board_suggestion',
+        'task_breakdown',
+        'mood_insight',
+        'context_recall',
+        'routine_creation'
+    )),
+    
+    -- Context linking to other entities
+    context_data JSONB, -- {board_id, task_id, mood_entry_id, etc.}
+    
+    -- Conversation history (array of messages)
+    messages JSONB NOT NULL DEFAULT '[]'::jsonb,
+    
+    -- Metadata
+    tokens_used INTEGER DEFAULT 0,
+    model_used TEXT,
+    started_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    last_message_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    
+    -- Quality and safety tracking
+    user_rating INTEGER CHECK (user_rating >= 1 AND user_rating <= 5),
+    user_feedback TEXT,
+    flagged_for_review BOOLEAN DEFAULT false,
+    flag_reason TEXT,
+    
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE public.ai_conversations ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own AI conversations"
+    ON public.ai_conversations FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can create own AI conversations"
+    ON public.ai_conversations FOR INSERT
+    WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "Users can update own AI conversations"
+    ON public.ai_conversations FOR UPDATE
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can delete own AI conversations"
+    ON public.ai_conversations FOR DELETE
+    USING (auth.uid() = user_id);
+
+CREATE INDEX idx_ai_conversations_user_id ON public.ai_conversations(user_id);
+
+CREATE INDEX idx_ai_conversations_type ON public.ai_conversations(conversation_type);
+
+CREATE INDEX idx_ai_conversations_created ON public.ai_conversations(created_at DESC);
+
+CREATE INDEX idx_ai_conversations_flagged ON public.ai_conversations(flagged_for_review) 
+    WHERE flagged_for_review = true;
+
+CREATE TABLE IF NOT EXISTS public.ai_suggestions (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    suggestion_type TEXT NOT NULL CHECK (suggestion_type IN (
+        'board',
+        'task',
+        'routine',
+        'habit',
+        'mood_coping',
+        'energy_management'
+    )),
+    
+    -- Source
+    conversation_id UUID REFERENCES public.ai_conversations(id) ON DELETE SET NULL,
+    trigger_context JSONB, -- What prompted this suggestion
+    
+    -- Suggestion content
+    title TEXT NOT NULL,
+    description TEXT,
+    suggestion_data JSONB NOT NULL, -- Actual board structure, task list, etc.
+    
+    -- User interaction
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN (
+        'pending',
+        'accepted',
+        'rejected',
+        'modified',
+        'implemented'
+    )),
+    user_modifications JSONB,
+    implemented_at TIMESTAMPTZ,
+    implemented_id TEXT, -- ID of the created board/task/etc.
+    
+    -- Analytics
+    confidence_score DECIMAL(3,2), -- AI's confidence in suggestion (0.00-1.00)
+    
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE public.ai_suggestions ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own AI suggestions"
+    ON public.ai_suggestions FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can create own AI suggestions"
+    ON public.ai_suggestions FOR INSERT
+    WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "Users can update own AI suggestions"
+    ON public.ai_suggestions FOR UPDATE
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can delete own AI suggestions"
+    ON public.ai_suggestions FOR DELETE
+    USING (auth.uid() = user_id);
+
+CREATE INDEX idx_ai_suggestions_user_id ON public.ai_suggestions(user_id);
+
+CREATE INDEX idx_ai_suggestions_type ON public.ai_suggestions(suggestion_type);
+
+CREATE INDEX idx_ai_suggestions_status ON public.ai_suggestions(status);
+
+CREATE INDEX idx_ai_suggestions_created ON public.ai_suggestions(created_at DESC);
+
+CREATE TABLE IF NOT EXISTS public.ai_usage_stats (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    date DATE NOT NULL DEFAULT CURRENT_DATE,
+    
+    -- Usage metrics
+    total_requests INTEGER DEFAULT 0,
+    total_tokens INTEGER DEFAULT 0,
+    total_cost DECIMAL(10,4) DEFAULT 0, -- Estimated cost in USD
+    
+    -- Breakdown by type
+    requests_by_type JSONB DEFAULT '{}'::jsonb,
+    tokens_by_model JSONB DEFAULT '{}'::jsonb,
+    
+    -- Hourly tracking for rate limiting
+    hourly_requests JSONB DEFAULT '{}'::jsonb, -- {hour: count}
+    
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    
+    UNIQUE(user_id, date)
+);
+
+ALTER TABLE public.ai_usage_stats ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own usage stats"
+    ON public.ai_usage_stats FOR SELECT
+    USING (auth.uid() = user_id);
+
+CREATE POLICY "Users can insert own usage stats"
+    ON public.ai_usage_stats FOR INSERT
+    WITH CHECK (auth.uid() = user_id);
+
+CREATE POLICY "Users can update own usage stats"
+    ON public.ai_usage_stats FOR UPDATE
+    USING (auth.uid() = user_id);
+
+CREATE INDEX idx_ai_usage_user_date ON public.ai_usage_stats(user_id, date DESC);
+
+CREATE INDEX idx_ai_usage_date ON public.ai_usage_stats(date DESC);
+
+CREATE TRIGGER update_ai_conversations_timestamp
+    BEFORE UPDATE ON public.ai_conversations
+    FOR EACH ROW EXECUTE FUNCTION update_boards_updated_at();
+
+CREATE TRIGGER update_ai_suggestions_timestamp
+    BEFORE UPDATE ON public.ai_suggestions
+    FOR EACH ROW EXECUTE FUNCTION update_boards_updated_at();
+
+CREATE TRIGGER update_ai_usage_stats_timestamp
+    BEFORE UPDATE ON public.ai_usage_stats
+    FOR EACH ROW EXECUTE FUNCTION update_boards_updated_at();
+
+CREATE OR REPLACE FUNCTION increment_ai_usage(
+    p_user_id UUID,
+    p_date DATE,
+    p_requests INTEGER,
+    p_tokens INTEGER,
+    p_cost DECIMAL,
+    p_type TEXT,
+    p_model TEXT
+)
+RETURNS VOID AS $$
+DECLARE
+    v_hour TEXT;
+    v_requests_by_type JSONB;
+    v_tokens_by_model JSONB;
+    v_hourly_requests JSONB;
+BEGIN
+    v_hour := EXTRACT(HOUR FROM NOW())::TEXT;
+    
+    -- Insert or update usage stats
+    INSERT INTO public.ai_usage_stats (
+        user_id,
+        date,
+        total_requests,
+        total_tokens,
+        total_cost,
+        requests_by_type,
+        tokens_by_model,
+        hourly_requests
+    ) VALUES (
+        p_user_id,
+        p_date,
+        p_requests,
+        p_tokens,
+        p_cost,
+        jsonb_build_object(p_type, p_requests),
+        jsonb_build_object(p_model, p_tokens),
+        jsonb_build_object(v_hour, p_requests)
+    )
+    ON CONFLICT (user_id, date) DO UPDATE SET
+        total_requests = ai_usage_stats.total_requests + p_requests,
+        total_tokens = ai_usage_stats.total_tokens + p_tokens,
+        total_cost = ai_usage_stats.total_cost + p_cost,
+        requests_by_type = ai_usage_stats.requests_by_type || 
+            jsonb_build_object(
+                p_type, 
+                COALESCE((ai_usage_stats.requests_by_type->p_type)::INTEGER, 0) + p_requests
+            ),
+        tokens_by_model = ai_usage_stats.tokens_by_model || 
+            jsonb_build_object(
+                p_model,
+                COALESCE((ai_usage_stats.tokens_by_model->p_model)::INTEGER, 0) + p_tokens
+            ),
+        hourly_requests = ai_usage_stats.hourly_requests || 
+            jsonb_build_object(
+                v_hour,
+                COALESCE((ai_usage_stats.hourly_requests->v_hour)::INTEGER, 0) + p_requests
+            ),
+        updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION check_ai_rate_limit(
+    p_user_id UUID,
+    p_hourly_limit INTEGER DEFAULT 20,
+    p_daily_limit INTEGER DEFAULT 100
+)
+RETURNS TABLE (
+    within_limits BOOLEAN,
+    hourly_count INTEGER,
+    daily_count INTEGER
+) AS $$
+DECLARE
+    v_hour TEXT;
+    v_hourly_count INTEGER;
+    v_daily_count INTEGER;
+BEGIN
+    v_hour := EXTRACT(HOUR FROM NOW())::TEXT;
+    
+    -- Get today's usage
+    SELECT 
+        COALESCE((hourly_requests->v_hour)::INTEGER, 0),
+        COALESCE(total_requests, 0)
+    INTO v_hourly_count, v_daily_count
+    FROM public.ai_usage_stats
+    WHERE user_id = p_user_id AND date = CURRENT_DATE;
+    
+    -- If no record exists, set counts to 0
+    v_hourly_count := COALESCE(v_hourly_count, 0);
+    v_daily_count := COALESCE(v_daily_count, 0);
+    
+    -- Return results
+    RETURN QUERY SELECT
+        (v_hourly_count < p_hourly_limit AND v_daily_count < p_daily_limit),
+        v_hourly_count,
+        v_daily_count;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE VIEW ai_usage_summary AS
+SELECT 
+    u.id as user_id,
+    u.email,
+    DATE_TRUNC('day', aus.created_at) as date,
+    SUM(aus.total_requests) as requests,
+    SUM(aus.total_tokens) as tokens,
+    SUM(aus.total_cost) as cost,
+    COUNT(DISTINCT ac.id) as conversations,
+    COUNT(DISTINCT asug.id) as suggestions_created,
+    COUNT(DISTINCT asug.id) FILTER (WHERE asug.status = 'implemented') as suggestions_implemented
+FROM auth.users u
+LEFT JOIN public.ai_usage_stats aus ON u.id = aus.user_id
+LEFT JOIN public.ai_conversations ac ON u.id = ac.user_id
+LEFT JOIN public.ai_suggestions asug ON u.id = asug.user_id
+GROUP BY u.id, u.email, DATE_TRUNC('day', aus.created_at);
+
+CREATE OR REPLACE VIEW conversation_insights AS
+SELECT 
+    ac.id,
+    ac.user_id,
+    ac.conversation_type,
+    ac.model_used,
+    ac.tokens_used,
+    ac.user_rating,
+    ac.started_at,
+    ac.last_message_at,
+    (ac.last_message_at - ac.started_at) as conversation_duration,
+    jsonb_array_length(ac.messages) as message_count,
+    COUNT(asug.id) as suggestions_generated
+FROM public.ai_conversations ac
+LEFT JOIN public.ai_suggestions asug ON ac.id = asug.conversation_id
+GROUP BY ac.id;
+
+GRANT ALL ON public.ai_conversations TO authenticated;
+
+GRANT ALL ON public.ai_suggestions TO authenticated;
+
+GRANT ALL ON public.ai_usage_stats TO authenticated;
+
+GRANT SELECT ON ai_usage_summary TO authenticated;
+
+GRANT SELECT ON conversation_insights TO authenticated;
+
+GRANT EXECUTE ON FUNCTION increment_ai_usage TO authenticated;
+
+GRANT EXECUTE ON FUNCTION check_ai_rate_limit TO authenticated;
+
+COMMENT ON TABLE public.ai_conversations IS 'Stores complete AI conversation history with context and quality tracking';
+
+COMMENT ON TABLE public.ai_suggestions IS 'AI-generated suggestions for boards, tasks, routines, and coping strategies';
+
+COMMENT ON TABLE public.ai_usage_stats IS 'Daily usage statistics for rate limiting and cost management';
+
+COMMENT ON FUNCTION increment_ai_usage IS 'Updates AI usage statistics after each request';
+
+COMMENT ON FUNCTION check_ai_rate_limit IS 'Checks if user has exceeded hourly or daily rate limits';
+
+-- =============================================
+-- 006_missing_tables.sql
+-- =============================================
+CREATE TABLE IF NOT EXISTS public.time_blocks (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES user_profiles(id) ON DELETE CASCADE,
+    task_id UUID REFERENCES tasks(id) ON DELETE CASCADE,
+    title TEXT NOT NULL,
+    description TEXT,
+    start_time TIMESTAMPTZ NOT NULL,
+    end_time TIMESTAMPTZ NOT NULL,
+    is_recurring BOOLEAN DEFAULT false,
+    recurrence_rule JSONB, -- iCal RRULE format
+    color TEXT DEFAULT '#3B82F6', -- Default blue
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    CONSTRAINT valid_time_range CHECK (end_time > start_time)
+);
+
+CREATE INDEX idx_time_blocks_user_id ON public.time_blocks(user_id);
+
+CREATE INDEX idx_time_blocks_task_id ON public.time_blocks(task_id);
+
+CREATE INDEX idx_time_blocks_start_time ON public.time_blocks(start_time);
+
+CREATE INDEX idx_time_blocks_end_time ON public.time_blocks(end_time);
+
+ALTER TABLE public.time_blocks ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own time blocks"
+    ON public.time_blocks FOR SELECT
+    USING (auth.uid() IN (
+        SELECT id FROM auth.users 
+        WHERE id IN (SELECT id FROM user_profiles WHERE id = time_blocks.user_id)
+    ));
+
+CREATE POLICY "Users can insert own time blocks"
+    ON public.time_blocks FOR INSERT
+    WITH CHECK (auth.uid() IN (
+        SELECT id FROM auth.users 
+        WHERE id IN (SELECT id FROM user_profiles WHERE id = time_blocks.user_id)
+    ));
+
+CREATE POLICY "Users can update own time blocks"
+    ON public.time_blocks FOR UPDATE
+    USING (auth.uid() IN (
+        SELECT id FROM auth.users 
+        WHERE id IN (SELECT id FROM user_profiles WHERE id = time_blocks.user_id)
+    ));
+
+CREATE POLICY "Users can delete own time blocks"
+    ON public.time_blocks FOR DELETE
+    USING (auth.uid() IN (
+        SELECT id FROM auth.users 
+        WHERE id IN (SELECT id FROM user_profiles WHERE id = time_blocks.user_id)
+    ));
+
+CREATE TABLE IF NOT EXISTS public.task_templates (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID NOT NULL REFERENCES user_profiles(id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    description TEXT,
+    category task_category NOT NULL,
+    priority priority DEFAULT 'medium',
+    estimated_duration INTEGER NOT NULL, -- minutes
+    tags TEXT[] DEFAULT '{}',
+    energy_required energy_level DEFAULT 'medium',
+    focus_required focus_level DEFAULT 'medium',
+    sensory_considerations JSONB DEFAULT '[]',
+    is_public BOOLEAN DEFAULT false, -- Allow sharing templates
+    usage_count INTEGER DEFAULT 0, -- Track popularity
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX idx_task_templates_user_id ON public.task_templates(user_id);
+
+CREATE INDEX idx_task_templates_category ON public.task_templates(category);
+
+CREATE INDEX idx_task_templates_is_public ON public.task_templates(is_public);
+
+CREATE INDEX idx_task_templates_usage_count ON public.task_templates(usage_count DESC);
+
+ALTER TABLE public.task_templates ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can view own task templates"
+    ON public.task_templates FOR SELECT
+    USING (
+        auth.uid() IN (
+            SELECT id FROM auth.users 
+            WHERE id IN (SELECT id FROM user_profiles WHERE id = task_templates.user_id)
+        )
+        OR is_public = true
+    );
+
+CREATE POLICY "Users can insert own task templates"
+    ON public.task_templates FOR INSERT
+    WITH CHECK (auth.uid() IN (
+        SELECT id FROM auth.users 
+        WHERE id IN (SELECT id FROM user_profiles WHERE id = task_templates.user_id)
+    ));
+
+CREATE POLICY "Users can update own task templates"
+    ON public.task_templates FOR UPDATE
+    USING (auth.uid() IN (
+        SELECT id FROM auth.users 
+        WHERE id IN (SELECT id FROM user_profiles WHERE id = task_templates.user_id)
+    ));
+
+CREATE POLICY "Users can delete own task templates"
+    ON public.task_templates FOR DELETE
+    USING (auth.uid() IN (
+        SELECT id FROM auth.users 
+        WHERE id IN (SELECT id FROM user_profiles WHERE id = task_templates.user_id)
+    ));
+
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER update_time_blocks_updated_at
+    BEFORE UPDATE ON public.time_blocks
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_task_templates_updated_at
+    BEFORE UPDATE ON public.task_templates
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+COMMENT ON TABLE public.time_blocks IS 'Calendar time blocks for scheduling tasks and events';
+
+COMMENT ON TABLE public.task_templates IS 'Reusable task templates for quick task creation';
+
+COMMENT ON COLUMN public.time_blocks.recurrence_rule IS 'iCalendar RRULE format for recurring events';
+
+COMMENT ON COLUMN public.task_templates.usage_count IS 'Number of times this template has been used';
+
+COMMENT ON COLUMN public.task_templates.is_public IS 'Whether this template is shared with all users';
+
+-- =============================================
+-- 007_schema_updates.sql
+-- =============================================
+DO $$ 
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns 
+        WHERE table_schema = 'public' 
+        AND table_name = 'boards' 
+        AND column_name = 'is_public'
+    ) THEN
+        ALTER TABLE public.boards ADD COLUMN is_public BOOLEAN DEFAULT false;
+        CREATE INDEX idx_boards_is_public ON public.boards(is_public) WHERE is_public = true;
+    END IF;
+END $$;
+
+COMMENT ON COLUMN public.user_activity.context IS 'Flexible JSONB field for storing activity-specific data. For analytics activities, stores metrics like tasksCompleted, averageCompletionTime, productivityScore, streakDays, etc.';
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.tables 
+        WHERE table_schema = 'public' 
+        AND table_name = 'notifications'
+    ) THEN
+        -- Create notifications type if it doesn't exist
+        DO $notification_type$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'notification_type') THEN
+                CREATE TYPE notification_type AS ENUM (
+                    'reminder', 'celebration', 'suggestion', 'warning', 'update', 'social'
+                );
+            END IF;
+        END $notification_type$;
+
+        -- Create priority type if it doesn't exist (may already exist from tasks)
+        DO $priority_type$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'notification_priority') THEN
+                CREATE TYPE notification_priority AS ENUM ('low', 'medium', 'high', 'urgent');
+            END IF;
+        END $priority_type$;
+
+        -- Create the notifications table
+        CREATE TABLE public.notifications (
+            id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+            user_id UUID NOT NULL REFERENCES user_profiles(id) ON DELETE CASCADE,
+            type notification_type NOT NULL,
+            title TEXT NOT NULL,
+            message TEXT NOT NULL,
+            priority notification_priority DEFAULT 'medium',
+            actionable BOOLEAN DEFAULT false,
+            actions JSONB DEFAULT '[]', -- Array of action buttons
+            scheduled_for TIMESTAMPTZ,
+            delivered_at TIMESTAMPTZ,
+            read_at TIMESTAMPTZ,
+            dismissed_at TIMESTAMPTZ,
+            metadata JSONB DEFAULT '{}',
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        );
+
+        -- Add indexes
+        CREATE INDEX idx_notifications_user_id ON public.notifications(user_id);
+        CREATE INDEX idx_notifications_delivered_at ON public.notifications(delivered_at);
+        CREATE INDEX idx_notifications_read_at ON public.notifications(read_at) WHERE read_at IS NULL;
+        CREATE INDEX idx_notifications_scheduled_for ON public.notifications(scheduled_for) WHERE scheduled_for IS NOT NULL;
+
+        -- Enable RLS
+        ALTER TABLE public.notifications ENABLE ROW LEVEL SECURITY;
+
+        -- RLS Policies
+        CREATE POLICY "Users can view own notifications"
+            ON public.notifications FOR SELECT
+            USING (auth.uid() IN (
+                SELECT id FROM auth.users 
+                WHERE id IN (SELECT id FROM user_profiles WHERE id = notifications.user_id)
+            ));
+
+        CREATE POLICY "Users can insert own notifications"
+            ON public.notifications FOR INSERT
+            WITH CHECK (auth.uid() IN (
+                SELECT id FROM auth.users 
+                WHERE id IN (SELECT id FROM user_profiles WHERE id = notifications.user_id)
+            ));
+
+        CREATE POLICY "Users can update own notifications"
+            ON public.notifications FOR UPDATE
+            USING (auth.uid() IN (
+                SELECT id FROM auth.users 
+                WHERE id IN (SELECT id FROM user_profiles WHERE id = notifications.user_id)
+            ));
+
+        CREATE POLICY "Users can delete own notifications"
+            ON public.notifications FOR DELETE
+            USING (auth.uid() IN (
+                SELECT id FROM auth.users 
+                WHERE id IN (SELECT id FROM user_profiles WHERE id = notifications.user_id)
+            ));
+
+        -- Add update trigger
+        CREATE TRIGGER update_notifications_updated_at
+            BEFORE UPDATE ON public.notifications
+            FOR EACH ROW
+            EXECUTE FUNCTION update_updated_at_column();
+    END IF;
+END $$;
+
+ALTER TABLE public.time_blocks DROP CONSTRAINT IF EXISTS valid_time_range;
+
+ALTER TABLE public.time_blocks ADD CONSTRAINT valid_time_range 
+    CHECK (end_time > start_time);
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.constraint_column_usage 
+        WHERE table_name = 'tasks' AND constraint_name = 'positive_estimated_duration'
+    ) THEN
+        ALTER TABLE public.tasks ADD CONSTRAINT positive_estimated_duration 
+            CHECK (estimated_duration > 0);
+    END IF;
+END $$;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.constraint_column_usage 
+        WHERE table_name = 'task_templates' AND constraint_name = 'positive_template_duration'
+    ) THEN
+        ALTER TABLE public.task_templates ADD CONSTRAINT positive_template_duration 
+            CHECK (estimated_duration > 0);
+    END IF;
+END $$;
+
+CREATE INDEX IF NOT EXISTS idx_tasks_scheduled_at ON public.tasks(scheduled_at) WHERE scheduled_at IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_user_activity_user_id ON public.user_activity(user_id);
+
+CREATE INDEX IF NOT EXISTS idx_user_activity_type ON public.user_activity(activity_type);
+
+CREATE INDEX IF NOT EXISTS idx_user_activity_started_at ON public.user_activity(started_at);
+
+COMMENT ON COLUMN public.tasks.scheduled_at IS 'Specific date/time when task is scheduled on calendar';
+
+COMMENT ON COLUMN public.tasks.due_date IS 'Deadline for task completion';
+
+COMMENT ON COLUMN public.tasks.actual_duration IS 'Actual time spent on task in minutes';
+
+COMMENT ON COLUMN public.tasks.buffer_time IS 'Extra time buffer in minutes for transitions';
+
+COMMENT ON COLUMN public.tasks.completed_at IS 'Timestamp when task was marked complete';
+
+COMMENT ON COLUMN public.boards.share_code IS 'Unique code for sharing board with others';
+
+COMMENT ON COLUMN public.boards.is_public IS 'Whether board is publicly accessible via share code';
+
+-- =============================================
+-- 008_add_task_quadrant.sql
+-- =============================================
+begin;
+
+alter table public.tasks
+  add column if not exists quadrant text
+  check (quadrant in (
+    'urgent-important',
+    'urgent-not-important',
+    'not-urgent-important',
+    'not-urgent-not-important'
+  ))
+  default 'not-urgent-not-important';
+
+update public.tasks
+set quadrant = case
+  when priority in ('high', 'urgent') and due_date is not null and due_date <= (now() + interval '2 days') then 'urgent-important'
+  when priority in ('high', 'urgent') and (due_date is null or due_date > (now() + interval '2 days')) then 'not-urgent-important'
+  when (priority is null or priority not in ('high', 'urgent')) and due_date is not null and due_date <= (now() + interval '2 days') then 'urgent-not-important'
+  else 'not-urgent-not-important'
+end;
+
+create index if not exists idx_tasks_quadrant on public.tasks(quadrant);
+
+commit;
+
+-- =============================================
+-- 009_medication_health_diet.sql
+-- =============================================
+begin;
+
+do $$
+begin
+  if not exists (select 1 from pg_type where typname = 'routine_step_type') then
+    null;
+  end if;
+  if not exists (select 1 from pg_type where typname = 'medication_intake_context') then
+    create type medication_intake_context as enum ('morning', 'midday', 'evening', 'bedtime', 'custom');
+  end if;
+
+  if not exists (select 1 from pg_type where typname = 'treatment_channel') then
+    create type treatment_channel as enum ('therapy', 'occupational', 'pt', 'coaching', 'medical');
+  end if;
+
+  if not exists (select 1 from pg_type where typname = 'nutrition_entry_type') then
+    create type nutrition_entry_type as enum ('meal', 'snack', 'drink', 'supplement');
+  end if;
+end $$;
+
+alter type routine_step_type add value if not exists 'medication';
+
+alter type routine_step_type add value if not exists 'health';
+
+alter table if exists routine_steps
+  add column if not exists extensions jsonb;
+
+create table if not exists medication_regimens (
+  id uuid primary key default uuid_generate_v4(),
+  user_id uuid not null references user_profiles(id) on delete cascade,
+  name text not null,
+  description text,
+  provider_name text,
+  color_token text,
+  sensory_considerations text,
+  adherence_goal integer default 0,
+  created_at timestamptz default now(),
+  updated_at timestamptz default now()
+);
+
+create table if not exists medication_doses (
+  id uuid primary key default uuid_generate_v4(),
+  regimen_id uuid not null references medication_regimens(id) on delete cascade,
+  routine_step_id uuid references routine_steps(step_id) on delete set null,
+  label text not null,
+  dosage text not null,
+  instructions text,
+  requires_food boolean default false,
+  intake_window medication_intake_context default 'morning',
+  scheduled_time time,
+  prn boolean default false,
+  reminders jsonb default '{}'::jsonb,
+  side_effect_watchlist text[],
+  last_taken_at timestamptz,
+  streak integer default 0,
+  created_at timestamptz default now(),
+  updated_at timestamptz default now()
+);
+
+create table if not exists treatment_sessions (
+  id uuid primary key default uuid_generate_v4(),
+  user_id uuid not null references user_profiles(id) on delete cascade,
+  routine_id uuid references routines(id) on delete set null,
+  channel treatment_channel not null,
+  focus_areas text[],
+  provider text,
+  cadence text,
+  meeting_link text,
+  prep_template jsonb,
+  created_at timestamptz default now(),
+  updated_at timestamptz default now()
+);
+
+create table if not exists treatment_check_ins (
+  id uuid primary key default uuid_generate_v4(),
+  session_id uuid not null references treatment_sessions(id) on delete cascade,
+  occurred_at timestamptz not null default now(),
+  mood_before integer,
+  mood_after integer,
+  energy_before integer,
+  energy_after integer,
+  highlights jsonb,
+  blockers jsonb,
+  homework jsonb,
+  ai_summary text,
+  created_at timestamptz default now()
+);
+
+create table if not exists health_nutrition_entries (
+  id uuid primary key default uuid_generate_v4(),
+  user_id uuid not null references user_profiles(id) on delete cascade,
+  entry_type nutrition_entry_type not null,
+  title text not null,
+  description text,
+  occurred_at timestamptz not null default now(),
+  sensory_profile jsonb,
+  energy_before integer,
+  energy_after integer,
+  mood_shift integer,
+  hydration_score integer,
+  tags text[],
+  ai_recommendation jsonb,
+  created_at timestamptz default now(),
+  updated_at timestamptz default now()
+);
+
+create table if not exists health_insight_snapshots (
+  id uuid primary key default uuid_generate_v4(),
+  user_id uuid not null references user_profiles(id) on delete cascade,
+  window_start timestamptz not null,
+  window_end timestamptz not null,
+  adherence jsonb,
+  correlations jsonb,
+  next_actions jsonb,
+  generated_at timestamptz default now()
+);
+
+create index if not exists idx_medication_regimens_user on medication_regimens(user_id);
+
+create index if not exists idx_medication_doses_regimen on medication_doses(regimen_id);
+
+create index if not exists idx_medication_doses_routine_step on medication_doses(routine_step_id);
+
+create index if not exists idx_treatment_sessions_user on treatment_sessions(user_id);
+
+create index if not exists idx_treatment_sessions_routine on treatment_sessions(routine_id);
+
+create index if not exists idx_treatment_checkins_session on treatment_check_ins(session_id);
+
+create index if not exists idx_health_entries_user on health_nutrition_entries(user_id);
+
+create index if not exists idx_health_entries_type on health_nutrition_entries(entry_type);
+
+create index if not exists idx_health_insights_user on health_insight_snapshots(user_id);
+
+alter table if exists medication_regimens enable row level security;
+
+alter table if exists medication_doses enable row level security;
+
+alter table if exists treatment_sessions enable row level security;
+
+alter table if exists treatment_check_ins enable row level security;
+
+alter table if exists health_nutrition_entries enable row level security;
+
+alter table if exists health_insight_snapshots enable row level security;
+
+create policy "Users manage medication regimens" on medication_regimens
+  for all using (auth.uid() = user_id);
+
+create policy "Users manage medication doses" on medication_doses
+  for all using (
+    exists (
+      select 1 from medication_regimens
+      where medication_regimens.id = medication_doses.regimen_id
+      and medication_regimens.user_id = auth.uid()
+    )
+  );
+
+create policy "Users manage treatment sessions" on treatment_sessions
+  for all using (auth.uid() = user_id);
+
+create policy "Users manage treatment check-ins" on treatment_check_ins
+  for all using (
+    exists (
+      select 1 from treatment_sessions
+      where treatment_sessions.id = treatment_check_ins.session_id
+      and treatment_sessions.user_id = auth.uid()
+    )
+  );
+
+create policy "Users manage health entries" on health_nutrition_entries
+  for all using (auth.uid() = user_id);
+
+create policy "Users manage health insights" on health_insight_snapshots
+  for all using (auth.uid() = user_id);
+
+create trigger update_medication_regimens_updated_at
+  before update on medication_regimens
+  for each row execute function update_updated_at_column();
+
+create trigger update_medication_doses_updated_at
+  before update on medication_doses
+  for each row execute function update_updated_at_column();
+
+create trigger update_treatment_sessions_updated_at
+  before update on treatment_sessions
+  for each row execute function update_updated_at_column();
+
+create trigger update_health_entries_updated_at
+  before update on health_nutrition_entries
+  for each row execute function update_updated_at_column();
+
+commit;
+
+-- =============================================
+-- 010_routine_analytics.sql
+-- =============================================
+CREATE VIEW routine_analytics_view AS
+WITH routine_stats AS (
+  SELECT
+    user_id,
+    COUNT(*) AS total_routines,
+    COALESCE(SUM(total_duration), 0) AS total_minutes,
+    COUNT(DISTINCT DATE(started_at)) AS days_tracked,
+    MAX(DATE(started_at)) AS last_tracked_date
+  FROM routine_executions
+  GROUP BY user_id
+),
+step_stats AS (
+  SELECT
+    re.user_id,
+    COUNT(*) FILTER (WHERE se.status = 'completed') AS total_steps,
+    COALESCE(SUM(COALESCE(se.actual_duration, 0)), 0) AS total_step_minutes
+  FROM step_executions se
+  INNER JOIN routine_executions re ON re.id = se.routine_execution_id
+  GROUP BY re.user_id
+)
+SELECT
+  rs.user_id,
+  rs.total_routines,
+  COALESCE(ss.total_steps, 0) AS total_steps,
+  rs.total_minutes,
+  COALESCE(ss.total_step_minutes, 0) AS total_step_minutes,
+  rs.days_tracked,
+  rs.last_tracked_date
+FROM routine_stats rs
+LEFT JOIN step_stats ss ON ss.user_id = rs.user_id;
+
+GRANT SELECT ON routine_analytics_view TO authenticated;
+
+-- =============================================
+-- 20251120_add_app_metrics_rejections.sql
+-- =============================================
+CREATE TABLE IF NOT EXISTS public.app_metrics_rejections (
+  id uuid DEFAULT gen_random_uuid() PRIMARY KEY,
+  ip inet,
+  user_id uuid,
+  reason text,
+  content_length integer,
+  note text,
+  payload jsonb,
+  created_at timestamptz DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_app_metrics_rejections_created_at ON public.app_metrics_rejections (created_at DESC);
+
+-- =============================================
+-- 20251120_add_app_metrics_table.sql
+-- =============================================
+CREATE EXTENSION IF NOT EXISTS pgcrypto;
+
+CREATE TABLE IF NOT EXISTS public.app_metrics (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  user_id uuid REFERENCES auth.users(id) ON DELETE CASCADE,
+  metrics jsonb NOT NULL,
+  source text DEFAULT 'client',
+  created_at timestamptz DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_app_metrics_created_at ON public.app_metrics (created_at DESC);
+
+ALTER TABLE public.app_metrics ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY app_metrics_owner ON public.app_metrics
+  USING (auth.uid() = user_id)
+  WITH CHECK (auth.uid() = user_id);
+
+-- =============================================
+-- 20251120_add_board_collaborators.sql
+-- =============================================
+CREATE EXTENSION IF NOT EXISTS "pgcrypto";
+
+CREATE TABLE IF NOT EXISTS public.board_collaborators (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  board_id uuid NOT NULL REFERENCES public.boards(id) ON DELETE CASCADE,
+  user_id uuid NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+  role text NOT NULL DEFAULT 'viewer',
+  can_edit boolean DEFAULT FALSE,
+  can_delete boolean DEFAULT FALSE,
+  can_invite boolean DEFAULT FALSE,
+  status text DEFAULT 'accepted',
+  invited_by uuid,
+  invited_at timestamptz DEFAULT now(),
+  created_at timestamptz DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_board_collaborators_board_id ON public.board_collaborators(board_id);
+
+CREATE INDEX IF NOT EXISTS idx_board_collaborators_user_id ON public.board_collaborators(user_id);
+
+-- =============================================
+-- 20251120_add_template_snapshots.sql
+-- =============================================
+CREATE TABLE IF NOT EXISTS public.board_snapshots (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  template_id uuid NOT NULL,
+  owner_id uuid NOT NULL,
+  snapshot_data jsonb NOT NULL,
+  title text,
+  is_public boolean DEFAULT false,
+  shared_with jsonb DEFAULT '[]'::jsonb,
+  created_at timestamptz DEFAULT now(),
+  updated_at timestamptz DEFAULT now()
+);
+
+COMMENT ON TABLE public.board_snapshots IS 'User-owned snapshots created from board templates for branching/collaboration.';
+
+ALTER TABLE public.board_snapshots ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "board_snapshots_owner_manage" ON public.board_snapshots
+  USING (owner_id = auth.uid())
+  WITH CHECK (owner_id = auth.uid());
+
+CREATE POLICY "board_snapshots_collaborators_select" ON public.board_snapshots
+  FOR SELECT
+  USING (
+    owner_id = auth.uid()
+    OR EXISTS (
+      SELECT 1 FROM public.board_collaborators bc WHERE bc.board_id = public.board_snapshots.template_id AND bc.user_id = auth.uid()
+    )
+  );
+
+CREATE POLICY "board_snapshots_insert_auth" ON public.board_snapshots
+  FOR INSERT
+  WITH CHECK (owner_id = auth.uid());
+
+CREATE TABLE IF NOT EXISTS public.routine_snapshots (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  template_id uuid NOT NULL,
+  owner_id uuid NOT NULL,
+  snapshot_data jsonb NOT NULL,
+  title text,
+  is_public boolean DEFAULT false,
+  shared_with jsonb DEFAULT '[]'::jsonb,
+  created_at timestamptz DEFAULT now(),
+  updated_at timestamptz DEFAULT now()
+);
+
+COMMENT ON TABLE public.routine_snapshots IS 'User-owned snapshots created from routine templates for branching/collaboration.';
+
+ALTER TABLE public.routine_snapshots ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "routine_snapshots_owner_manage" ON public.routine_snapshots
+  USING (owner_id = auth.uid())
+  WITH CHECK (owner_id = auth.uid());
+
+CREATE POLICY "routine_snapshots_insert_auth" ON public.routine_snapshots
+  FOR INSERT
+  WITH CHECK (owner_id = auth.uid());
+
+CREATE POLICY "routine_snapshots_collaborators_select" ON public.routine_snapshots
+  FOR SELECT
+  USING (
+    owner_id = auth.uid()
+    OR EXISTS (
+      SELECT 1 FROM public.routines r JOIN public.board_collaborators bc ON bc.board_id = r.id WHERE r.id = public.routine_snapshots.template_id AND bc.user_id = auth.uid()
+    )
+  );
+
+CREATE INDEX IF NOT EXISTS idx_board_snapshots_owner ON public.board_snapshots(owner_id);
+
+CREATE INDEX IF NOT EXISTS idx_routine_snapshots_owner ON public.routine_snapshots(owner_id);
+
+-- =============================================
+-- 20251120_add_visual_mood_sensory_tables.sql
+-- =============================================
+CREATE EXTENSION IF NOT EXISTS pgcrypto;
+
+CREATE TABLE IF NOT EXISTS public.visual_routines (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  user_id uuid NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+  title text NOT NULL,
+  steps jsonb DEFAULT '[]'::jsonb,
+  metadata jsonb DEFAULT '{}'::jsonb,
+  created_at timestamptz DEFAULT now(),
+  updated_at timestamptz DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_visual_routines_updated_at ON public.visual_routines (updated_at DESC);
+
+CREATE TABLE IF NOT EXISTS public.sensory_preferences (
+  id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+  user_id uuid NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+  preferences jsonb DEFAULT '{}'::jsonb,
+  timestamp timestamptz DEFAULT now(),
+  updated_at timestamptz DEFAULT now()
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS ux_sensory_preferences_user ON public.sensory_preferences (user_id);
+
+ALTER TABLE public.user_activity ADD COLUMN IF NOT EXISTS created_at timestamptz DEFAULT now();
+
+CREATE INDEX IF NOT EXISTS idx_user_activity_created_at ON public.user_activity (created_at DESC);
+
+ALTER TABLE public.visual_routines ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY visual_routines_owner ON public.visual_routines
+  USING (auth.uid() = user_id)
+  WITH CHECK (auth.uid() = user_id);
+
+ALTER TABLE public.mood_entries ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY mood_entries_owner ON public.mood_entries
+  USING (auth.uid() = user_id)
+  WITH CHECK (auth.uid() = user_id);
+
+ALTER TABLE public.sensory_preferences ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY sensory_preferences_owner ON public.sensory_preferences
+  USING (auth.uid() = user_id)
+  WITH CHECK (auth.uid() = user_id);
+
+ALTER TABLE public.user_activity ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY user_activity_owner ON public.user_activity
+  USING (auth.uid() = user_id)
+  WITH CHECK (auth.uid() = user_id);
+
+-- =============================================
+-- 20251120_app_metrics_views.sql
+-- =============================================
+DO $$
+BEGIN
+  IF to_regclass('public.app_metrics') IS NOT NULL THEN
+    -- Average elapsed time (ms) for matrix.initialize timers per user
+    EXECUTE $VIEW$
+      CREATE OR REPLACE VIEW public.view_avg_matrix_init_ms AS
+      SELECT
+        user_id,
+        avg(((timer->>'end')::bigint - (timer->>'start')::bigint)) AS avg_init_ms,
+        count(*) AS samples
+      FROM public.app_metrics,
+        jsonb_array_elements(metrics->'timers') AS t(timer)
+      WHERE (timer->>'label') = 'matrix.initialize' AND (timer->>'end') IS NOT NULL
+      GROUP BY user_id;
+    $VIEW$;
+
+    -- Count of failure events per user (events with name containing 'failure')
+    EXECUTE $VIEW$
+      CREATE OR REPLACE VIEW public.view_failure_counts AS
+      SELECT
+        user_id,
+        sum(CASE WHEN (event->>'name') IS NOT NULL AND (event->>'name') LIKE '%failure%' THEN 1 ELSE 0 END) AS failure_count
+      FROM public.app_metrics,
+        jsonb_array_elements(metrics->'events') AS e(event)
+      GROUP BY user_id;
+    $VIEW$;
+
+    -- Last upload timestamp per user
+    EXECUTE $VIEW$
+      CREATE OR REPLACE VIEW public.view_last_upload_per_user AS
+      SELECT
+        user_id,
+        max(created_at) as last_upload_at,
+        count(*) as uploads
+      FROM public.app_metrics
+      GROUP BY user_id;
+    $VIEW$;
+
+    -- Simple activity: number of snapshots per day
+    EXECUTE $VIEW$
+      CREATE OR REPLACE VIEW public.view_metrics_daily_counts AS
+      SELECT
+        date_trunc('day', created_at) as day,
+        count(*) as snapshots
+      FROM public.app_metrics
+      GROUP BY date_trunc('day', created_at)
+      ORDER BY day DESC;
+    $VIEW$;
+  END IF;
+END
+$$;
+
+-- =============================================
+-- 20251120_collaboration_delta.sql
+-- =============================================
+CREATE EXTENSION IF NOT EXISTS "pg_cron"
+;
+
+CREATE INDEX IF NOT EXISTS idx_board_invitations_email ON board_invitations(invitee_email)
+;
+
+CREATE INDEX IF NOT EXISTS idx_board_invitations_token ON board_invitations(access_token)
+;
+
+CREATE INDEX IF NOT EXISTS idx_collaborative_tasks_board_id ON collaborative_tasks(board_id)
+;
+
+CREATE INDEX IF NOT EXISTS idx_collaborative_tasks_owner_id ON collaborative_tasks(owner_id)
+;
+
+CREATE INDEX IF NOT EXISTS idx_collaborative_routines_board_id ON collaborative_routines(board_id)
+;
+
+CREATE INDEX IF NOT EXISTS idx_task_comments_task_id ON task_comments(task_id)
+;
+
+CREATE INDEX IF NOT EXISTS idx_audit_logs_board_id ON audit_logs(board_id)
+;
+
+CREATE INDEX IF NOT EXISTS idx_audit_logs_actor_id ON audit_logs(actor_id)
+;
+
+CREATE INDEX IF NOT EXISTS idx_audit_logs_timestamp ON audit_logs(timestamp)
+;
+
+CREATE INDEX IF NOT EXISTS idx_realtime_events_board_id ON realtime_events(board_id)
+;
+
+CREATE INDEX IF NOT EXISTS idx_realtime_events_created_at ON realtime_events(created_at)
+;
+
+CREATE INDEX IF NOT EXISTS idx_user_presence_board_id ON user_presence(board_id)
+;
+
+ALTER TABLE collaborative_boards ENABLE ROW LEVEL SECURITY
+;
+
+ALTER TABLE board_collaborators ENABLE ROW LEVEL SECURITY
+;
+
+ALTER TABLE board_invitations ENABLE ROW LEVEL SECURITY
+;
+
+ALTER TABLE collaborative_tasks ENABLE ROW LEVEL SECURITY
+;
+
+ALTER TABLE collaborative_routines ENABLE ROW LEVEL SECURITY
+;
+
+ALTER TABLE task_comments ENABLE ROW LEVEL SECURITY
+;
+
+ALTER TABLE comment_reactions ENABLE ROW LEVEL SECURITY
+;
+
+ALTER TABLE task_attachments ENABLE ROW LEVEL SECURITY
+;
+
+ALTER TABLE audit_logs ENABLE ROW LEVEL SECURITY
+;
+
+ALTER TABLE realtime_events ENABLE ROW LEVEL SECURITY
+;
+
+ALTER TABLE user_presence ENABLE ROW LEVEL SECURITY
+;
+
+ALTER TABLE routine_completions ENABLE ROW LEVEL SECURITY
+;
+
+CREATE POLICY "Owners can update boards" ON collaborative_boards
+  FOR UPDATE USING (owner_id = auth.uid())
+;
+
+CREATE POLICY "Owners can delete boards" ON collaborative_boards
+  FOR DELETE USING (owner_id = auth.uid())
+;
+
+CREATE POLICY "Users can create boards" ON collaborative_boards
+  FOR INSERT WITH CHECK (owner_id = auth.uid())
+;
+
+CREATE POLICY "Board owners can manage collaborators" ON board_collaborators
+  FOR ALL USING (
+    board_id IN (SELECT id FROM collaborative_boards WHERE owner_id = auth.uid())
+  )
+;
+
+CREATE POLICY "Users can create tasks in accessible boards" ON collaborative_tasks
+  FOR INSERT WITH CHECK (
+    board_id IN (
+      SELECT id FROM collaborative_boards 
+      WHERE owner_id = auth.uid() OR
+      id IN (
+        SELECT board_id FROM board_collaborators 
+        WHERE user_id = auth.uid() AND status = 'accepted' AND can_edit = true
+      )
+    )
+  )
+;
+
+CREATE POLICY "Users can update tasks they can edit" ON collaborative_tasks
+  FOR UPDATE USING (
+    owner_id = auth.uid() OR
+    (
+      board_id IN (
+        SELECT board_id FROM board_collaborators 
+        WHERE user_id = auth.uid() AND status = 'accepted' AND can_edit = true
+      ) AND is_private = false
+    )
+  )
+;
+
+CREATE TRIGGER update_collaborative_boards_updated_at BEFORE UPDATE ON collaborative_boards FOR EACH ROW EXECUTE FUNCTION update_updated_at_column()
+;
+
+CREATE TRIGGER update_collaborative_tasks_updated_at BEFORE UPDATE ON collaborative_tasks FOR EACH ROW EXECUTE FUNCTION update_updated_at_column()
+;
+
+CREATE TRIGGER update_collaborative_routines_updated_at BEFORE UPDATE ON collaborative_routines FOR EACH ROW EXECUTE FUNCTION update_updated_at_column()
+;
+
+CREATE TRIGGER add_board_owner_collaborator AFTER INSERT ON collaborative_boards FOR EACH ROW EXECUTE FUNCTION add_board_owner_as_collaborator()
+;
+
+CREATE INDEX IF NOT EXISTS idx_board_quick_lock_board_id ON board_quick_lock(board_id)
+;
+
+CREATE INDEX IF NOT EXISTS idx_board_quick_lock_active ON board_quick_lock(is_active) WHERE is_active = TRUE
+;
+
+ALTER TABLE board_quick_lock ENABLE ROW LEVEL SECURITY
+;
+
+CREATE POLICY "Board owners can manage privacy settings" ON board_privacy_settings
+  FOR ALL USING (
+    board_id IN (
+      SELECT id FROM collaborative_boards WHERE owner_id = auth.uid()
+    )
+  )
+;
+
+CREATE POLICY "Board collaborators with edit permissions can manage quick lock" ON board_quick_lock
+  FOR ALL USING (
+    board_id IN (
+      SELECT bc.board_id FROM board_collaborators bc
+      WHERE bc.user_id = auth.uid() 
+      AND bc.status = 'accepted'
+      AND bc.can_edit = TRUE
+    )
+  )
+;
+
+-- SKIPPED 20251120_collaboration_delta.sql:163: statement contains an unterminated literal